@@ -73,6 +73,9 @@ class PostListSerializer(serializers.ModelSerializer):
         return text[:150] + '...' if len(text) > 150 else text
 
     def get_comments_count(self, obj):
+        # annotated by PostViewSet.queryset
+        if hasattr(obj, 'comments_count'):
+            return obj.comments_count
         return obj.comments.count()
 
 
@@ -115,6 +118,8 @@ class PostDetailSerializer(TaggitSerializer, serializers.ModelSerializer):
         lookup_field = 'slug'
 
     def get_comments_count(self, obj):
+        if hasattr(obj, 'comments_count'):
+            return obj.comments_count
         return obj.comments.count()
 
     def get_user_has_liked(self, obj):
@@ -5,19 +5,34 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
 from rest_framework.exceptions import PermissionDenied
-from django.db.models import Count
+from django.db.models import Count, Prefetch
+
+from core.comment_tree import CommentThreadPagination, thread_page
 from .models import Post, Comment, UserVote
 from .serializers import PostListSerializer, PostDetailSerializer, CommentSerializer
 
+class BlogCommentPagination(CommentThreadPagination):
+    ordering = '-created_at'
+
+
 class PostViewSet(viewsets.ReadOnlyModelViewSet):
     """
     A ViewSet for listing and retrieving blog posts.
     """
     queryset = Post.objects.filter(status=Post.Status.PUBLISHED).annotate(
         comments_count=Count('comments')
-    )
+    ).select_related('author').prefetch_related('tags', 'tags_en')
     permission_classes = [AllowAny]
     lookup_field = 'slug'
+    query_budget = {'list': 4, 'latest_posts': 4, 'retrieve': 8, 'comments': 5, 'default': 8}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch('comments', queryset=Comment.objects.select_related('author'))
+            )
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -117,9 +132,8 @@ class PostViewSet(viewsets.ReadOnlyModelViewSet):
             serializer = CommentSerializer(comment)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         
-        comments = post.comments.all()
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        return thread_page(request, post.comments.select_related('author'), CommentSerializer,
+                           pagination_class=BlogCommentPagination)
 
     @action(detail=False, methods=['get'], url_path='latest' , permission_classes=[AllowAny])
     def latest_posts(self, request):
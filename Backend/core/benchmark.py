@@ -0,0 +1,385 @@
+"""
+End-to-end load benchmark for the hot API endpoints.
+
+The benchmark command seeds a scratch database, starts the project's WSGI
+application on a threaded local server and drives every scenario below with a
+pool of concurrent HTTP clients while the LLM providers are served by
+``core.llm_stub``.  Each response carries the number of SQL queries it ran
+(counted with ``connection.execute_wrapper``), so results include latency
+percentiles, throughput and queries per request.  Results can be saved as a
+JSON baseline and later runs compared against it.
+"""
+import io
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import numpy as np
+import requests
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection, transaction
+from django.utils import timezone
+
+QUERY_COUNT_HEADER = 'X-Benchmark-Queries'
+
+# Dataset size at scale 1; every count is multiplied by ``scale``
+BASE_VOLUMES = {
+    'plants': 500,
+    'diseases': 40,
+    'users': 100,
+    'garden_plants_per_user': 6,
+    'reminders_per_garden_plant': 3,
+    'chat_messages_per_user': 4,
+    'posts': 60,
+}
+
+SEARCH_TERMS = ('pothos', 'ficus', 'low light', 'cactus', 'بنفشه', 'fern')
+DEFAULT_CHAT_REPLY = 'Yellow leaves usually mean overwatering; let the soil dry out first.'
+
+# Users whose gardens the authenticated scenarios act as
+MAX_CONTEXT_USERS = 1000
+
+
+# =====================================================================
+# DATASET
+# =====================================================================
+def _png_bytes(size=64):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (size, size), (34, 139, 34)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def seed_dataset(scale=1, seed=42):
+    """
+    Bulk-load a synthetic dataset into the current database.
+
+    Signals are bypassed (``bulk_create``), so derived data such as care codes
+    and care reminders is written explicitly.  Returns the row counts used.
+    """
+    from blog.models import Post
+    from diseases.models import Disease
+    from gardens.models import PlantChatMessage, Reminder, UserPlant
+    from plants.care_codes import compute_care_codes
+    from plants.models import Plant
+    from users.models import CustomUser
+
+    rng = random.Random(seed)
+    volumes = {name: max(1, int(count * scale)) for name, count in BASE_VOLUMES.items()}
+    volumes['garden_plants_per_user'] = BASE_VOLUMES['garden_plants_per_user']
+    volumes['reminders_per_garden_plant'] = BASE_VOLUMES['reminders_per_garden_plant']
+    volumes['chat_messages_per_user'] = BASE_VOLUMES['chat_messages_per_user']
+    now = timezone.now()
+
+    watering = ('very low', 'low', 'medium', 'high', 'very high')
+    light = ('low light', 'medium indirect light', 'bright indirect light', 'direct sun')
+    humidity = ('low', 'moderate', 'high')
+    soil = ('cactus mix', 'standard potting mix', 'peat-based mix', 'orchid bark mix')
+    genera = ('Ficus', 'Epipremnum', 'Philodendron', 'Calathea', 'Opuntia', 'Nephrolepis', 'Saintpaulia')
+
+    with transaction.atomic():
+        plants = []
+        for i in range(volumes['plants']):
+            genus = genera[i % len(genera)]
+            plant = Plant(
+                farsi_name=f'گیاه {i}',
+                english_name=f'{genus} plant {i}',
+                scientific_name=f'{genus} benchmarkii {i}',
+                description='توضیحات ' * 40,
+                description_en='Description ' * 40,
+                watering_frequency_en=rng.choice(watering),
+                light_requirements_en=rng.choice(light),
+                humidity_level_en=rng.choice(humidity),
+                soil_type_en=rng.choice(soil),
+                temperature_range_en='18-24°C',
+                care_difficulty=rng.choice(('easy', 'medium', 'hard')),
+                is_toxic=rng.random() < 0.3,
+                view_count=int(rng.paretovariate(1.2) * 10),
+            )
+            for code_field, code in compute_care_codes(plant).items():
+                setattr(plant, code_field, code)
+            plants.append(plant)
+        plants = Plant.objects.bulk_create(plants, batch_size=2000)
+
+        Disease.objects.bulk_create([
+            Disease(
+                name='Powdery Mildew' if i == 0 else f'Benchmark Disease {i}',
+                name_fa='سفیدک سطحی' if i == 0 else f'بیماری {i}',
+                description='A fungal disease.', symptoms='Spots.', solution='Remove leaves.',
+                affected_plants_list=', '.join(rng.choice(plants).english_name for _ in range(3)),
+            )
+            for i in range(volumes['diseases'])
+        ], batch_size=2000)
+
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'bench{i}', email=f'bench{i}@example.com', password='!')
+            for i in range(volumes['users'])
+        ], batch_size=2000)
+
+        garden = []
+        for user in users:
+            for plant in rng.sample(plants, min(volumes['garden_plants_per_user'], len(plants))):
+                garden.append(UserPlant(
+                    user=user, plant=plant,
+                    last_watered=now - timedelta(days=rng.randint(0, 7)),
+                    next_watering_date=now + timedelta(days=rng.randint(0, 7)),
+                ))
+        garden = UserPlant.objects.bulk_create(garden, batch_size=2000)
+
+        reminders = []
+        for user_plant in garden:
+            for _ in range(volumes['reminders_per_garden_plant']):
+                reminders.append(Reminder(
+                    user_id=user_plant.user_id, user_plant=user_plant,
+                    title=f'Water plant {user_plant.plant_id}',
+                    care_type=rng.choice(('watering', 'fertilizing', 'pruning')),
+                    scheduled_date=now + timedelta(hours=rng.randint(-48, 72)),
+                ))
+        Reminder.objects.bulk_create(reminders, batch_size=5000)
+
+        messages = []
+        by_user = {}
+        for user_plant in garden:
+            by_user.setdefault(user_plant.user_id, []).append(user_plant)
+        for user_id, user_plants in by_user.items():
+            for _ in range(volumes['chat_messages_per_user']):
+                messages.append(PlantChatMessage(
+                    user_id=user_id, user_plant=rng.choice(user_plants),
+                    message='Why are the leaves yellow?', response=DEFAULT_CHAT_REPLY,
+                ))
+        PlantChatMessage.objects.bulk_create(messages, batch_size=5000)
+
+        Post.objects.bulk_create([
+            Post(
+                title=f'Post {i}', slug=f'post-{i}', content='<p>' + 'Plant care. ' * 60 + '</p>',
+                author=users[i % len(users)], status=Post.Status.PUBLISHED,
+                publish=now - timedelta(days=i),
+            )
+            for i in range(volumes['posts'])
+        ], batch_size=2000)
+
+    return volumes
+
+
+def dataset_context(image=None):
+    """Collect the ids the scenarios need from an already seeded database."""
+    from gardens.models import UserPlant
+    from plants.models import Plant
+
+    garden = {}
+    rows = UserPlant.objects.order_by('user_id').values_list('user_id', 'plant_id')
+    for user_id, plant_id in rows.iterator():
+        if user_id not in garden and len(garden) >= MAX_CONTEXT_USERS:
+            break
+        garden.setdefault(user_id, []).append(plant_id)
+    plant = Plant.objects.order_by('id').first()
+    return {
+        'user_ids': list(garden),
+        'garden': garden,
+        'scientific_name': plant.scientific_name if plant else None,
+        'english_name': plant.english_name if plant else None,
+        'farsi_name': plant.farsi_name if plant else None,
+        'image': image if image is not None else _png_bytes(),
+    }
+
+
+# =====================================================================
+# SCENARIOS
+# =====================================================================
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: object                    # str or callable(rng, context) -> str
+    auth: bool = False
+    payload: object = None          # None, or callable(rng, context) -> (kwargs for requests)
+    uses_llm: bool = False
+
+
+def _chat_payload(rng, context):
+    plant_id = rng.choice(context['garden'][context['user_id']])
+    return {'json': {'plant_id': plant_id, 'message': 'How often should I water it?'}}
+
+
+def _image_payload(rng, context):
+    return {'files': {'image': ('leaf.png', context['image'], 'image/png')}}
+
+
+SCENARIOS = (
+    Scenario('plant_list', 'GET', lambda rng, ctx: f'/api/plants/?page={rng.randint(1, 5)}'),
+    Scenario('plant_search', 'GET', lambda rng, ctx: f'/api/plants/?search={rng.choice(SEARCH_TERMS)}'),
+    Scenario('identify', 'POST', '/api/plants/identify/', auth=True, payload=_image_payload, uses_llm=True),
+    Scenario('diagnose', 'POST', '/api/diseases/diagnose/', payload=_image_payload, uses_llm=True),
+    Scenario('checkup', 'POST', '/api/plants/checkup/', auth=True, payload=_image_payload, uses_llm=True),
+    Scenario('chat', 'POST', '/api/my-garden/chat/', auth=True, payload=_chat_payload, uses_llm=True),
+    Scenario('garden_list', 'GET', '/api/my-garden/', auth=True),
+    Scenario('notifications', 'GET', '/api/my-garden/notifications/', auth=True),
+    Scenario('blog_list', 'GET', '/api/blog/posts/'),
+)
+
+
+# =====================================================================
+# SERVER
+# =====================================================================
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def query_counting_app(application):
+    """Wrap a WSGI app so every response reports its SQL query count in a header."""
+    def app(environ, start_response):
+        queries = [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        def counting_start_response(status, headers, exc_info=None):
+            headers = list(headers) + [(QUERY_COUNT_HEADER, str(queries[0]))]
+            return start_response(status, headers, exc_info)
+
+        with connection.execute_wrapper(count):
+            return application(environ, counting_start_response)
+    return app
+
+
+class BenchmarkServer:
+    """The project's WSGI application on a threaded local server."""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self._server = ThreadedWSGIServer((host, port), _QuietHandler, allow_reuse_address=False)
+        self._server.set_app(query_counting_app(WSGIHandler()))
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='benchmark-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# =====================================================================
+# RUNNER
+# =====================================================================
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies_ms: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    errors: int = 0
+    status_codes: dict = field(default_factory=dict)
+    wall_seconds: float = 0.0
+
+    def summary(self):
+        latencies = np.asarray(self.latencies_ms or [0.0])
+        queries = np.asarray(self.queries or [0])
+        completed = len(self.latencies_ms)
+        return {
+            'requests': completed,
+            'errors': self.errors,
+            'status_codes': {str(code): count for code, count in sorted(self.status_codes.items())},
+            'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+            'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+            'mean_ms': round(float(latencies.mean()), 2),
+            'throughput_rps': round(completed / self.wall_seconds, 2) if self.wall_seconds else 0.0,
+            'queries_mean': round(float(queries.mean()), 2),
+            'queries_max': int(queries.max()),
+        }
+
+
+def access_tokens(user_ids):
+    from rest_framework_simplejwt.tokens import AccessToken
+    from users.models import CustomUser
+
+    return {user.id: str(AccessToken.for_user(user)) for user in CustomUser.objects.filter(id__in=user_ids)}
+
+
+def run_scenario(base_url, scenario, dataset, tokens, requests_count=200, concurrency=8, seed=0):
+    """Issue ``requests_count`` requests for ``scenario`` from ``concurrency`` client threads."""
+    result = ScenarioResult(scenario.name)
+    lock = threading.Lock()
+    per_worker = [requests_count // concurrency + (1 if i < requests_count % concurrency else 0)
+                  for i in range(concurrency)]
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        session = requests.Session()
+        for _ in range(per_worker[index]):
+            user_id = rng.choice(dataset['user_ids'])
+            context = dict(dataset, user_id=user_id)
+            path = scenario.path(rng, context) if callable(scenario.path) else scenario.path
+            kwargs = scenario.payload(rng, context) if scenario.payload else {}
+            headers = {'Authorization': f'Bearer {tokens[user_id]}'} if scenario.auth else {}
+            started = time.perf_counter()
+            try:
+                response = session.request(scenario.method, base_url + path, headers=headers, timeout=120, **kwargs)
+                elapsed = (time.perf_counter() - started) * 1000
+                queries = int(response.headers.get(QUERY_COUNT_HEADER, 0))
+                failed = response.status_code >= 400
+                status_code = response.status_code
+            except requests.RequestException:
+                elapsed, queries, failed, status_code = (time.perf_counter() - started) * 1000, 0, True, 'error'
+            with lock:
+                result.latencies_ms.append(elapsed)
+                result.queries.append(queries)
+                result.errors += int(failed)
+                result.status_codes[status_code] = result.status_codes.get(status_code, 0) + 1
+        session.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    result.wall_seconds = time.perf_counter() - started
+    return result
+
+
+# =====================================================================
+# BASELINES
+# =====================================================================
+def compare_to_baseline(results, baseline, tolerance=0.2):
+    """
+    Return a list of regression messages for scenarios present in both runs.
+
+    A scenario regresses when p95 latency or queries per request grow, or
+    throughput drops, by more than ``tolerance`` (a fraction).
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous['throughput_rps'] and current['throughput_rps'] < previous['throughput_rps'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s"
+            )
+        if current['queries_mean'] > previous['queries_mean'] * (1 + tolerance) + 0.5:
+            regressions.append(f"{name}: queries/request {previous['queries_mean']} -> {current['queries_mean']}")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def save_baseline(path, results, config):
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump({'config': config, 'scenarios': results}, handle, indent=2, ensure_ascii=False)
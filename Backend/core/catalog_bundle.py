@@ -0,0 +1,154 @@
+"""
+Offline catalog bundle for the mobile app.
+
+The app downloads the whole plant and disease listing once as a compact,
+gzipped JSON document and afterwards asks for deltas with ``?since=<version>``.
+A version is the latest change time in the catalog in epoch milliseconds: the
+newest ``updated_at`` of plants and diseases, or the newest tombstone
+(``core.CatalogTombstone``, written by the delete signals).  Tombstones are
+kept for ``TOMBSTONE_RETENTION``; a client whose version is older than that
+gets a full bundle instead of a delta.
+
+Rows are encoded as arrays under a shared ``columns`` list to keep the payload
+small.  Only listing and search fields are included; details still come from
+the regular endpoints.  Counters such as ``view_count`` are left out: they are
+written without touching ``updated_at`` and would go stale in a delta.  Full
+bundles are cached per version.
+"""
+import gzip
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+
+BUNDLE_SCHEMA = 2
+CACHE_TIMEOUT = 60 * 60 * 24
+COMPRESS_LEVEL = 6
+TOMBSTONE_RETENTION = timedelta(days=90)
+
+PLANT_COLUMNS = (
+    'id', 'farsi_name', 'english_name', 'other_names', 'other_names_en', 'scientific_name',
+    'care_difficulty', 'is_toxic', 'watering_code', 'light_code', 'humidity_code', 'temperature_code',
+    'soil_code', 'image',
+)
+DISEASE_COLUMNS = ('id', 'name', 'name_fa', 'severity_level', 'spread_rate', 'image')
+
+
+def _to_version(moment):
+    return int(moment.timestamp() * 1000) if moment else 0
+
+
+def _from_version(version):
+    return datetime.fromtimestamp(version / 1000, tz=dt_timezone.utc)
+
+
+def current_version():
+    """Latest catalog change in epoch milliseconds (0 for an empty catalog)."""
+    from diseases.models import Disease
+    from plants.models import Plant
+
+    from .models import CatalogTombstone
+
+    moments = [
+        Plant.objects.aggregate(latest=Max('updated_at'))['latest'],
+        Disease.objects.aggregate(latest=Max('updated_at'))['latest'],
+        CatalogTombstone.objects.aggregate(latest=Max('deleted_at'))['latest'],
+    ]
+    return max(_to_version(moment) for moment in moments)
+
+
+def tombstone_cutoff(now=None):
+    """Version before which deletions may have been pruned."""
+    return _to_version((now or timezone.now()) - TOMBSTONE_RETENTION)
+
+
+def prune_tombstones(now=None):
+    """Delete tombstones older than ``TOMBSTONE_RETENTION``; returns how many."""
+    from .models import CatalogTombstone
+
+    cutoff = (now or timezone.now()) - TOMBSTONE_RETENTION
+    return CatalogTombstone.objects.filter(deleted_at__lt=cutoff).delete()[0]
+
+
+def _media_url(name):
+    return f'{settings.MEDIA_URL}{name}' if name else None
+
+
+def _plant_rows(queryset):
+    from plants.models import PlantImage
+
+    plants = queryset.order_by('id').values_list(*PLANT_COLUMNS[:-1])
+    images = {}
+    # Meta ordering puts the primary image first; keep the first per plant
+    image_rows = PlantImage.objects.filter(plant__in=queryset.values('id')).values_list('plant_id', 'image')
+    for plant_id, image in image_rows:
+        images.setdefault(plant_id, image)
+    return [list(row) + [_media_url(images.get(row[0]))] for row in plants]
+
+
+def _disease_rows(queryset):
+    rows = queryset.order_by('id').values_list(*DISEASE_COLUMNS[:-1], 'image', 'image_url')
+    return [list(row[:-2]) + [_media_url(row[-2]) or row[-1]] for row in rows]
+
+
+def _labels():
+    from plants.care_codes import CARE_CHOICES
+
+    return {
+        attribute: {code: {'en': en, 'fa': fa} for code, en, fa, *_ in choices}
+        for attribute, choices in CARE_CHOICES.items()
+    }
+
+
+def build_bundle(since=None):
+    """
+    Return the bundle as a dict.  With ``since`` only rows changed at or after
+    that version and the ids deleted since then are included.
+    """
+    from diseases.models import Disease
+    from plants.models import Plant
+
+    from .models import CatalogTombstone
+
+    version = current_version()
+    plants, diseases = Plant.objects.all(), Disease.objects.all()
+    bundle = {'schema': BUNDLE_SCHEMA, 'version': version, 'full': since is None}
+    if since is not None:
+        # ``>=`` so rows written in the same millisecond as ``since`` are resent, not lost
+        changed_after = _from_version(since)
+        plants = plants.filter(updated_at__gte=changed_after)
+        diseases = diseases.filter(updated_at__gte=changed_after)
+        deleted = {'plants': [], 'diseases': []}
+        tombstones = CatalogTombstone.objects.filter(deleted_at__gte=changed_after)
+        for kind, object_id in tombstones.values_list('kind', 'object_id'):
+            deleted[f'{kind}s'].append(object_id)
+        bundle['deleted'] = deleted
+    else:
+        bundle['labels'] = _labels()
+
+    bundle['plants'] = {'columns': PLANT_COLUMNS, 'rows': _plant_rows(plants)}
+    bundle['diseases'] = {'columns': DISEASE_COLUMNS, 'rows': _disease_rows(diseases)}
+    return bundle
+
+
+def encode_bundle(bundle):
+    payload = json.dumps(bundle, ensure_ascii=False, separators=(',', ':'))
+    return gzip.compress(payload.encode('utf-8'), compresslevel=COMPRESS_LEVEL)
+
+
+def get_bundle_bytes(since=None):
+    """``(version, gzipped JSON)``; full bundles are cached per catalog version."""
+    if since is not None:
+        bundle = build_bundle(since)
+        return bundle['version'], encode_bundle(bundle)
+
+    version = current_version()
+    data = cache.get(f'catalog:bundle:{BUNDLE_SCHEMA}:{version}')
+    if data is None:
+        bundle = build_bundle()
+        version, data = bundle['version'], encode_bundle(bundle)
+        cache.set(f'catalog:bundle:{BUNDLE_SCHEMA}:{version}', data, CACHE_TIMEOUT)
+    return version, data
@@ -0,0 +1,348 @@
+"""
+Catalog export and import in JSONL or Parquet.
+
+Exports stream rows with ``QuerySet.iterator(chunk_size=...)`` and emit one
+chunk of output per chunk of rows, so memory stays flat regardless of the
+catalog size.  Plant image metadata is attached with one query per chunk.
+Comments are exported with natural keys (plant scientific name, disease name,
+username) for analytics.
+
+Imports upsert plants on ``scientific_name`` and diseases on ``name`` with
+``bulk_create(update_conflicts=True)``; only the columns present in the input
+are overwritten.  Counters, care codes and ids are environment specific and
+are never taken from the input.  ``bulk_create`` skips the save signals, so the
+disease to plant links are rebuilt here: per batch for imported diseases, and
+for every disease once a plant import has finished.
+
+Parquet support needs ``pyarrow`` (in requirements.txt); without it Parquet
+requests fail with ``ParquetUnavailable``.
+"""
+import io
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import F
+
+EXPORT_DATASETS = ('plants', 'diseases', 'plant_comments', 'disease_comments')
+IMPORT_DATASETS = ('plants', 'diseases')
+FORMATS = ('jsonl', 'parquet')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+# Columns owned by the target environment, never exported for import
+PLANT_SKIP_ON_IMPORT = {'view_count', 'favourite_count', 'comment_count', 'garden_count', 'updated_at'}
+DISEASE_SKIP_ON_IMPORT = {'comment_count', 'updated_at'}
+
+
+class CatalogFormatError(ValueError):
+    """Raised for unknown datasets or formats."""
+
+
+class ParquetUnavailable(CatalogFormatError):
+    """Raised when Parquet is requested but pyarrow is not installed."""
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ParquetUnavailable("Parquet support requires the 'pyarrow' package (pip install pyarrow).") from exc
+    return pyarrow, pyarrow.parquet
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# =====================================================================
+# DATASETS
+# =====================================================================
+def _catalog_fields(model):
+    from plants.care_codes import CODE_FIELDS
+
+    return [field for field in model._meta.concrete_fields if not field.primary_key and field.name not in CODE_FIELDS]
+
+
+def _comment_columns(target):
+    """(column, lookup) pairs for a comment model; ``target`` is the commented object's natural key."""
+    return [
+        ('id', 'id'), ('parent_id', 'parent_id'), target, ('username', 'user__username'),
+        ('content', 'content'), ('is_approved', 'is_approved'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
+
+
+def _dataset(name):
+    from diseases.models import Disease, DiseaseComment
+    from plants.models import Plant, PlantComment
+
+    if name == 'plants':
+        return Plant, [(field.name, field.name) for field in _catalog_fields(Plant)]
+    if name == 'diseases':
+        return Disease, [(field.name, field.name) for field in _catalog_fields(Disease)]
+    if name == 'plant_comments':
+        return PlantComment, _comment_columns(('plant_scientific_name', 'plant__scientific_name'))
+    if name == 'disease_comments':
+        return DiseaseComment, _comment_columns(('disease_name', 'disease__name'))
+    raise CatalogFormatError(f"Unknown dataset '{name}'. Choose from: {', '.join(EXPORT_DATASETS)}")
+
+
+def iter_records(dataset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one dict per row of ``dataset`` in primary-key order."""
+    from plants.models import PlantImage
+
+    model, columns = _dataset(dataset)
+    renamed = {column: F(lookup) for column, lookup in columns if column != lookup}
+    queryset = model.objects.order_by('pk').values(
+        'pk', *[column for column, lookup in columns if column == lookup], **renamed
+    )
+    for rows in _batched(queryset.iterator(chunk_size=chunk_size), chunk_size):
+        if dataset == 'plants':
+            images = {}
+            image_rows = PlantImage.objects.filter(plant_id__in=[row['pk'] for row in rows]).values(
+                'plant_id', 'image', 'caption', 'is_primary', 'created_at'
+            )
+            for image in image_rows:
+                images.setdefault(image.pop('plant_id'), []).append(image)
+            for row in rows:
+                row['images'] = images.get(row['pk'], [])
+        for row in rows:
+            del row['pk']
+            yield row
+
+
+# =====================================================================
+# EXPORT
+# =====================================================================
+def _arrow_type(pa, field):
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, (models.IntegerField, models.AutoField, models.ForeignKey)):
+        return pa.int64()
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    return pa.string()
+
+
+def arrow_schema(dataset):
+    pa, _ = _require_pyarrow()
+    from plants.models import PlantImage
+
+    model, columns = _dataset(dataset)
+    arrow_fields = []
+    for column, lookup in columns:
+        if column == 'parent_id':
+            arrow_type = pa.int64()
+        elif '__' in lookup:
+            arrow_type = pa.string()
+        else:
+            arrow_type = _arrow_type(pa, model._meta.get_field(lookup))
+        arrow_fields.append(pa.field(column, arrow_type))
+    if dataset == 'plants':
+        image_type = pa.struct([
+            pa.field(name, _arrow_type(pa, PlantImage._meta.get_field(name)))
+            for name in ('image', 'caption', 'is_primary', 'created_at')
+        ])
+        arrow_fields.append(pa.field('images', pa.list_(image_type)))
+    return pa.schema(arrow_fields)
+
+
+class _StreamSink(io.RawIOBase):
+    """Write-only file object that hands out what was written since the last drain."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def stream_export(dataset, file_format='jsonl', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the export of ``dataset`` as byte chunks, one per ``chunk_size`` rows."""
+    if file_format not in FORMATS:
+        raise CatalogFormatError(f"Unknown format '{file_format}'. Choose from: {', '.join(FORMATS)}")
+    _dataset(dataset)
+    if file_format == 'parquet':
+        _require_pyarrow()
+        return _stream_parquet(dataset, chunk_size)
+    return _stream_jsonl(dataset, chunk_size)
+
+
+def _stream_jsonl(dataset, chunk_size):
+    for rows in _batched(iter_records(dataset, chunk_size), chunk_size):
+        lines = (json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) for row in rows)
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _stream_parquet(dataset, chunk_size):
+    pa, pq = _require_pyarrow()
+    schema = arrow_schema(dataset)
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for rows in _batched(iter_records(dataset, chunk_size), chunk_size):
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+# =====================================================================
+# IMPORT
+# =====================================================================
+def read_records(path, file_format=None, batch_size=DEFAULT_CHUNK_SIZE):
+    """Yield dicts from a JSONL or Parquet file; the format defaults to the file extension."""
+    file_format = file_format or ('parquet' if str(path).endswith('.parquet') else 'jsonl')
+    if file_format == 'parquet':
+        _, pq = _require_pyarrow()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield from batch.to_pylist()
+    elif file_format == 'jsonl':
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise CatalogFormatError(f"Unknown format '{file_format}'. Choose from: {', '.join(FORMATS)}")
+
+
+def _group_batch(model, key, fields, batch):
+    """
+    Split one batch into ``(columns, instances)`` groups of records carrying the
+    same columns, so each upsert overwrites only what its records provide.
+    """
+    by_key = {}
+    for record in batch:
+        if record.get(key):
+            by_key[record[key]] = record         # last one wins within a batch
+    groups = {}
+    for record in by_key.values():
+        columns = tuple(field.name for field in fields if field.name in record)
+        groups.setdefault(columns, []).append(model(**{column: record[column] for column in columns}))
+    return list(groups.items()), len(batch) - len(by_key)
+
+
+def _check_unique_columns(model, key, columns, instances):
+    """
+    Raise ``CatalogFormatError`` when a unique column other than ``key`` (e.g.
+    ``Disease.name_fa``) would take a value that belongs to another row.
+    """
+    for field in model._meta.concrete_fields:
+        if not field.unique or field.primary_key or field.name == key or field.name not in columns:
+            continue
+        owners = {}
+        for instance in instances:
+            value = getattr(instance, field.attname)
+            if value is None:
+                continue
+            owner = owners.setdefault(value, getattr(instance, key))
+            if owner != getattr(instance, key):
+                raise CatalogFormatError(
+                    f"{field.name} '{value}' is used by both '{owner}' and '{getattr(instance, key)}'"
+                )
+        existing = model.objects.filter(**{f'{field.name}__in': list(owners)}).values_list(field.attname, key)
+        for value, owner in existing:
+            if owners[value] != owner:
+                raise CatalogFormatError(
+                    f"{field.name} '{value}' of '{owners[value]}' already belongs to '{owner}'"
+                )
+
+
+def import_records(dataset, records, batch_size=DEFAULT_CHUNK_SIZE):
+    """
+    Upsert ``records`` into ``dataset`` ('plants' or 'diseases').
+
+    Returns ``{'upserted': n, 'skipped': n, 'images': n}``; records without a
+    scientific name (plants) or name (diseases) are skipped.  A record whose
+    other unique column (``Disease.name_fa``) belongs to a different row raises
+    ``CatalogFormatError``; batches before it stay imported.
+    """
+    from diseases.affected_plants import relink_diseases
+    from diseases.models import Disease
+    from plants.care_codes import CARE_ATTRIBUTES, compute_care_codes
+    from plants.models import Plant, PlantImage
+
+    if dataset == 'plants':
+        model, key, skip = Plant, 'scientific_name', PLANT_SKIP_ON_IMPORT
+    elif dataset == 'diseases':
+        model, key, skip = Disease, 'name', DISEASE_SKIP_ON_IMPORT
+    else:
+        raise CatalogFormatError(f"Cannot import '{dataset}'. Choose from: {', '.join(IMPORT_DATASETS)}")
+
+    fields = [field for field in _catalog_fields(model) if field.name not in skip]
+    totals = {'upserted': 0, 'skipped': 0, 'images': 0}
+    for batch in _batched(records, batch_size):
+        groups, skipped = _group_batch(model, key, fields, batch)
+        totals['skipped'] += skipped
+        with transaction.atomic():
+            for columns, instances in groups:
+                _check_unique_columns(model, key, columns, instances)
+                update_fields = [column for column in columns if column != key]
+                if dataset == 'plants':
+                    # bulk_create bypasses Plant.save(), which normally derives the codes
+                    for plant in instances:
+                        for code_field, code in compute_care_codes(plant).items():
+                            setattr(plant, code_field, code)
+                    update_fields += [
+                        code_field for source, code_field in CARE_ATTRIBUTES.values()
+                        if source in columns or f'{source}_en' in columns
+                    ]
+                model.objects.bulk_create(
+                    instances, update_conflicts=True, unique_fields=[key],
+                    update_fields=update_fields + ['updated_at'],
+                )
+                totals['upserted'] += len(instances)
+            if dataset == 'plants':
+                totals['images'] += _replace_images(batch, PlantImage, Plant)
+            else:
+                relink_diseases(Disease.objects.filter(name__in=[record[key] for record in batch if record.get(key)]))
+
+    if dataset == 'plants' and totals['upserted']:
+        # new and renamed plants may be named by any disease
+        relink_diseases()
+    return totals
+
+
+def _replace_images(batch, image_model, plant_model):
+    """Replace the image rows of plants whose records carry an ``images`` list."""
+    with_images = {record['scientific_name']: record['images'] for record in batch
+                   if record.get('scientific_name') and record.get('images') is not None}
+    if not with_images:
+        return 0
+    ids = dict(plant_model.objects.filter(scientific_name__in=with_images).values_list('scientific_name', 'id'))
+    image_model.objects.filter(plant_id__in=ids.values()).delete()
+    images = [
+        image_model(plant_id=ids[name], **{key: image[key] for key in ('image', 'caption', 'is_primary', 'created_at')
+                                           if image.get(key) is not None})
+        for name, plant_images in with_images.items() if name in ids
+        for image in plant_images
+    ]
+    image_model.objects.bulk_create(images, batch_size=DEFAULT_CHUNK_SIZE)
+    return len(images)
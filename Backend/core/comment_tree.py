@@ -0,0 +1,68 @@
+"""
+Comment threads for plant, disease and blog comments.
+
+Root comments are paginated with a keyset cursor (``CommentThreadPagination``).
+Every reply below the roots on a page is then fetched in one recursive query
+and attached as ``thread_replies``, so a page costs two queries however deep
+its threads go.  ``CommentRepliesMixin`` renders ``thread_replies`` when it is
+present.
+"""
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from rest_framework.pagination import CursorPagination
+
+
+class CommentThreadPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'created_at'
+
+
+def _has_field(model, name):
+    return any(field.name == name for field in model._meta.get_fields())
+
+
+def _descendants_sql(model, root_count, approved_only):
+    """Ids of every comment below ``root_count`` root ids, as one recursive CTE."""
+    table = connection.ops.quote_name(model._meta.db_table)
+    parent = connection.ops.quote_name(model._meta.get_field('parent').column)
+    approved = f' AND c.{connection.ops.quote_name("is_approved")} = %s' if approved_only else ''
+    placeholders = ', '.join(['%s'] * root_count)
+    return (
+        f'WITH RECURSIVE thread(id) AS ('
+        f'SELECT c.id FROM {table} c WHERE c.{parent} IN ({placeholders}){approved} '
+        f'UNION ALL '
+        f'SELECT c.id FROM {table} c JOIN thread ON c.{parent} = thread.id WHERE 1 = 1{approved}'
+        f') SELECT id FROM thread'
+    )
+
+
+def attach_replies(roots, select_related=('user',)):
+    """Load all replies below ``roots`` in one query and set ``thread_replies`` on every comment."""
+    roots = list(roots)
+    if not roots or not _has_field(type(roots[0]), 'parent'):
+        return roots
+    model = type(roots[0])
+    approved_only = _has_field(model, 'is_approved')
+    root_ids = [root.pk for root in roots]
+    # the approval flag is used by both the anchor and the recursive step
+    params = root_ids + [True] * (2 if approved_only else 0)
+    replies = model.objects.filter(
+        pk__in=RawSQL(_descendants_sql(model, len(root_ids), approved_only), params)
+    ).select_related(*select_related).order_by('created_at', 'pk')
+
+    children = {}
+    for reply in replies:
+        children.setdefault(reply.parent_id, []).append(reply)
+    for comment in [*roots, *(reply for thread in children.values() for reply in thread)]:
+        comment.thread_replies = children.get(comment.pk, [])
+    return roots
+
+
+def thread_page(request, queryset, serializer_class, pagination_class=CommentThreadPagination, context=None):
+    """Cursor-paginated response of the root comments in ``queryset`` with their reply trees."""
+    paginator = pagination_class()
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(attach_replies(page), many=True, context=context or {'request': request})
+    return paginator.get_paginated_response(serializer.data)
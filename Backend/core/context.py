@@ -0,0 +1,31 @@
+"""
+The request being handled by the current thread or task.
+
+Set by ``core.middleware.RequestContextMiddleware`` so code far from the view
+(LLM telemetry, for instance) can attribute work to a user.  DRF copies the
+authenticated user onto the underlying Django request, so JWT users are seen
+here once the view has authenticated.
+"""
+from contextvars import ContextVar
+
+_current_request = ContextVar('current_request', default=None)
+
+
+def set_current_request(request):
+    return _current_request.set(request)
+
+
+def reset_current_request(token):
+    _current_request.reset(token)
+
+
+def get_current_request():
+    return _current_request.get()
+
+
+def get_current_user_id():
+    request = _current_request.get()
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return None
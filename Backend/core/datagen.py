@@ -0,0 +1,535 @@
+"""
+Synthetic data generator for scale testing.
+
+Relationships are sampled up front with NumPy (Zipf-skewed plant popularity
+and user activity), so denormalized counters such as ``Plant.garden_count``
+are known before the first row is written.  Rows are then streamed into the
+database in large chunks, one transaction per chunk, with explicit primary
+keys that continue after the current maximum id.
+
+Rows are written with ``executemany`` on plain column dicts rather than
+``bulk_create``: at millions of rows, building model instances and compiling
+the INSERT through the ORM costs several times more than SQLite itself.
+Column defaults still come from the model fields, so the tables look exactly
+as the ORM would have written them.
+"""
+import time
+from contextlib import contextmanager
+from datetime import timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+# =====================================================================
+# CONFIGURATION
+# =====================================================================
+DEFAULT_VOLUMES = {
+    'plants': 50_000,
+    'diseases': 500,
+    'users': 500_000,
+    'garden_plants': 2_000_000,
+    'reminders': 5_000_000,
+    'chat_messages': 1_000_000,
+    'growth_records': 1_000_000,
+    'favourites': 1_500_000,
+    'plant_comments': 300_000,
+    'posts': 2_000,
+    'post_comments': 100_000,
+}
+
+CHUNK_SIZE = 50_000          # rows built and committed per transaction
+PLANT_POPULARITY_EXPONENT = 1.07
+USER_ACTIVITY_EXPONENT = 0.8
+REPLY_RATE = 0.25
+DEFAULT_PASSWORD = 'plant-scale-test'
+
+# PRAGMAs applied for the duration of the load; restored afterwards
+BULK_LOAD_PRAGMAS = {
+    'synchronous': 'OFF',
+    'journal_mode': 'MEMORY',
+    'temp_store': 'MEMORY',
+    'cache_size': '-262144',        # 256 MB
+    'foreign_keys': 'OFF',          # ids are generated consistently
+}
+
+GENERA = (
+    'Ficus', 'Epipremnum', 'Philodendron', 'Monstera', 'Calathea', 'Dracaena', 'Sansevieria',
+    'Opuntia', 'Echeveria', 'Nephrolepis', 'Saintpaulia', 'Spathiphyllum', 'Aloe', 'Begonia',
+)
+# Care attribute -> (Plant field, sample values)
+CARE_VALUES = {
+    'watering': ('watering_frequency_en', ('very low', 'low', 'medium', 'high', 'very high')),
+    'light': ('light_requirements_en', ('low light', 'medium indirect light', 'bright indirect light',
+                                        'direct sun', 'full sun to partial shade')),
+    'humidity': ('humidity_level_en', ('low', 'moderate', 'high', 'very high')),
+    'soil': ('soil_type_en', ('cactus mix', 'succulent mix', 'standard potting mix', 'peat-based mix',
+                              'loamy soil', 'orchid bark mix')),
+    'fertilizer': ('fertilizer_schedule_en', ('never', 'once a year', 'every 3 months', 'monthly',
+                                              'every 2 weeks', 'weekly')),
+    'temperature': ('temperature_range_en', ('10-15°C', '15-20°C', '18-24°C', '20-30°C', 'above 15°C',
+                                             'above 20°C')),
+    'propagation': ('propagation_methods_en', ('stem cuttings', 'leaf cuttings', 'root division', 'seeds',
+                                               'air layering', 'offsets / pups')),
+}
+DISEASES = (
+    'Powdery Mildew', 'Root Rot', 'Leaf Spot', 'Downy Mildew', 'Botrytis Blight', 'Anthracnose',
+    'Rust', 'Fusarium Wilt', 'Bacterial Blight', 'Sooty Mold', 'Mosaic Virus', 'Late Blight',
+)
+CARE_TYPES = ('watering', 'fertilizing', 'pruning', 'repotting')
+CHAT_QUESTIONS = (
+    'Why are the leaves turning yellow?',
+    'How often should I water it in winter?',
+    'برگ‌هایش قهوه‌ای شده، چه کنم؟',
+    'Can I put it near a south window?',
+    'چه کودی برای این گیاه مناسب است؟',
+)
+CHAT_REPLY = 'Let the top few centimetres of soil dry out before watering and keep it in bright, indirect light.'
+
+
+def scaled_volumes(scale=1.0, **overrides):
+    volumes = {name: max(1, int(count * scale)) for name, count in DEFAULT_VOLUMES.items()}
+    volumes.update({name: count for name, count in overrides.items() if count is not None})
+    return volumes
+
+
+# =====================================================================
+# DATABASE
+# =====================================================================
+@contextmanager
+def bulk_load_session():
+    """Tune the SQLite connection for a bulk load, then restore it and refresh planner statistics."""
+    if connection.vendor != 'sqlite':
+        yield
+        return
+
+    previous = {}
+    # synchronous, journal_mode and foreign_keys cannot change inside a transaction
+    pragmas = {} if connection.in_atomic_block else BULK_LOAD_PRAGMAS
+    with connection.cursor() as cursor:
+        for pragma, value in pragmas.items():
+            cursor.execute(f'PRAGMA {pragma}')
+            previous[pragma] = cursor.fetchone()[0]
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for pragma, value in previous.items():
+                cursor.execute(f'PRAGMA {pragma} = {value}')
+            cursor.execute('ANALYZE')
+
+
+def _next_id(model):
+    return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+
+class _TableWriter:
+    """
+    ``executemany`` INSERTs for one model.  Rows are dicts keyed by attname
+    holding database-ready values; missing columns get the field's default.
+    """
+
+    def __init__(self, model, now):
+        fields = model._meta.concrete_fields
+        self.columns = [field.attname for field in fields]
+        self.defaults = {}
+        for field in fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                value = now
+            else:
+                value = field.get_db_prep_save(field.get_default(), connection)
+            self.defaults[field.attname] = value
+        quote = connection.ops.quote_name
+        self.sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+
+    def write(self, rows):
+        columns = self.columns
+        defaults = self.defaults
+        params = [tuple(row.get(column, defaults[column]) for column in columns) for row in rows]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(self.sql, params)
+
+
+# =====================================================================
+# SAMPLING
+# =====================================================================
+def _zipf_weights(rng, n, exponent):
+    """Zipf weights over ``n`` items, shuffled so popularity is not tied to id order."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _unique_pairs(rng, left_weights, right_weights, count):
+    """Sample ``count`` distinct (left, right) index pairs from the two distributions."""
+    n_right = len(right_weights)
+    count = min(count, len(left_weights) * n_right)
+    keys = np.empty(0, dtype=np.int64)
+    draw = int(count * 1.2) + 16
+    while len(keys) < count:
+        left = rng.choice(len(left_weights), size=draw, p=left_weights)
+        right = rng.choice(n_right, size=draw, p=right_weights)
+        keys = np.unique(np.concatenate([keys, left.astype(np.int64) * n_right + right]))
+        draw *= 2
+    keys = rng.permutation(keys)[:count]
+    return keys // n_right, keys % n_right
+
+
+def _reply_parents(rng, groups, rate=REPLY_RATE):
+    """
+    For rows grouped by ``groups`` (e.g. plant index) pick an earlier row of the
+    same group as parent with probability ``rate``; -1 means a root comment.
+    """
+    n = len(groups)
+    if not n:
+        return np.empty(0, dtype=np.int64)
+    order = np.argsort(groups, kind='stable')
+    sorted_groups = groups[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(sorted_groups)) + 1]
+    group_start = np.repeat(starts, np.diff(np.r_[starts, n]))
+    position = np.arange(n) - group_start
+    is_reply = (rng.random(n) < rate) & (position > 0)
+    earlier = group_start + np.floor(rng.random(n) * position).astype(np.int64)
+    parents = np.full(n, -1, dtype=np.int64)
+    parents[order[is_reply]] = order[earlier[is_reply]]
+    return parents
+
+
+# =====================================================================
+# GENERATOR
+# =====================================================================
+class DataGenerator:
+    """
+    Generate ``volumes`` rows (see DEFAULT_VOLUMES) into the current database.
+
+    ``progress`` is called with ``(table, rows, seconds)`` after each table.
+    """
+
+    def __init__(self, volumes, seed=42, chunk_size=CHUNK_SIZE, progress=None):
+        self.volumes = volumes
+        self.rng = np.random.default_rng(seed)
+        self.chunk_size = chunk_size
+        self.progress = progress or (lambda table, rows, seconds: None)
+        now = timezone.now()
+        # Datetimes are stored the way the SQLite backend stores them
+        self.now = timezone.make_naive(now, dt_timezone.utc) if settings.USE_TZ else now
+
+    def run(self):
+        from diseases.affected_plants import relink_diseases
+
+        rng = self.rng
+        v = self.volumes
+        self.plant_weights = _zipf_weights(rng, v['plants'], PLANT_POPULARITY_EXPONENT)
+        self.user_weights = _zipf_weights(rng, v['users'], USER_ACTIVITY_EXPONENT)
+
+        # Relationships first, so counters can be written with the plants.
+        garden_users, garden_plants = _unique_pairs(rng, self.user_weights, self.plant_weights, v['garden_plants'])
+        favourite_users, favourite_plants = _unique_pairs(
+            rng, self.user_weights, self.plant_weights, v['favourites']
+        )
+        comment_plants = rng.choice(v['plants'], size=v['plant_comments'], p=self.plant_weights)
+        comment_users = rng.choice(v['users'], size=v['plant_comments'], p=self.user_weights)
+        comment_approved = rng.random(v['plant_comments']) < 0.95
+
+        with bulk_load_session():
+            self.user_base = self.insert_users()
+            self.plant_base = self.insert_plants(
+                garden_count=np.bincount(garden_plants, minlength=v['plants']),
+                favourite_count=np.bincount(favourite_plants, minlength=v['plants']),
+                comment_count=np.bincount(comment_plants[comment_approved], minlength=v['plants']),
+            )
+            self.insert_diseases()
+            garden_base = self.insert_garden(garden_users, garden_plants)
+            self.insert_reminders(garden_base, garden_users)
+            self.insert_chat_messages(garden_base, garden_users)
+            self.insert_growth_records(garden_base, len(garden_users))
+            self.insert_favourites(favourite_users, favourite_plants)
+            self.insert_plant_comments(comment_plants, comment_users, comment_approved)
+            post_base = self.insert_posts()
+            self.insert_post_comments(post_base)
+        # existing diseases may name the generated plants
+        relink_diseases()
+
+    # -----------------------------------------------------------------
+    def _write(self, model, count, build):
+        """Insert ``count`` rows, building ``build(start, stop)`` row dicts per chunk."""
+        started = time.perf_counter()
+        writer = _TableWriter(model, str(self.now))
+        for start in range(0, count, self.chunk_size):
+            writer.write(build(start, min(start + self.chunk_size, count)))
+        self.progress(model._meta.db_table, count, time.perf_counter() - started)
+
+    def _ages(self, max_days, size):
+        """Random ages in seconds; turned into timestamps per chunk to keep memory flat."""
+        return self.rng.integers(0, int(max_days * 86400), size=size)
+
+    def _ago(self, seconds):
+        return str(self.now - timedelta(seconds=int(seconds)))
+
+    def insert_users(self):
+        from users.models import CustomUser
+
+        base = _next_id(CustomUser)
+        n = self.volumes['users']
+        password = make_password(DEFAULT_PASSWORD)
+        joined = self._ages(3 * 365, n)
+        has_token = self.rng.random(n) < 0.4
+
+        def build(start, stop):
+            return [
+                {
+                    'id': base + i, 'username': f'user{base + i}', 'email': f'user{base + i}@example.com',
+                    'password': password, 'date_joined': self._ago(joined[i]),
+                    'push_token': f'ExponentPushToken[{base + i:022d}]' if has_token[i] else None,
+                }
+                for i in range(start, stop)
+            ]
+
+        self._write(CustomUser, n, build)
+        return base
+
+    def insert_plants(self, garden_count, favourite_count, comment_count):
+        from plants.care_codes import CARE_ATTRIBUTES, resolve_code
+        from plants.models import Plant
+
+        base = _next_id(Plant)
+        rng = self.rng
+        n = self.volumes['plants']
+        picks = {attribute: rng.integers(0, len(values), size=n) for attribute, (_, values) in CARE_VALUES.items()}
+        # Codes depend on the sampled value only, so resolve each value once
+        codes = {
+            attribute: [resolve_code(attribute, value) for value in values]
+            for attribute, (_, values) in CARE_VALUES.items()
+        }
+        difficulty = rng.choice(['easy', 'medium', 'hard'], size=n, p=[0.45, 0.4, 0.15])
+        toxic = rng.random(n) < 0.3
+        views = (self.plant_weights * n * 200).astype(np.int64) + rng.integers(0, 20, size=n)
+        created = self._ages(2 * 365, n)
+
+        def build(start, stop):
+            plants = []
+            for i in range(start, stop):
+                genus = GENERA[i % len(GENERA)]
+                row = {
+                    'id': base + i,
+                    'farsi_name': f'گیاه {genus} {base + i}',
+                    'english_name': f'{genus} {base + i}',
+                    'scientific_name': f'{genus} synthetica {base + i}',
+                    'description': f'گیاه {genus} از گیاهان آپارتمانی محبوب است. <h2>راهنمای مراقبت</h2>',
+                    'description_en': f'{genus} is a popular houseplant. <h2>Care Guide</h2>',
+                    'care_difficulty': str(difficulty[i]),
+                    'is_toxic': bool(toxic[i]),
+                    'view_count': int(views[i]),
+                    'garden_count': int(garden_count[i]),
+                    'favourite_count': int(favourite_count[i]),
+                    'comment_count': int(comment_count[i]),
+                    'created_at': self._ago(created[i]),
+                }
+                for attribute, (field, values) in CARE_VALUES.items():
+                    pick = picks[attribute][i]
+                    row[field] = values[pick]
+                    row[CARE_ATTRIBUTES[attribute][1]] = codes[attribute][pick]
+                plants.append(row)
+            return plants
+
+        self._write(Plant, n, build)
+        return base
+
+    def insert_diseases(self):
+        from diseases.models import Disease
+
+        base = _next_id(Disease)
+        existing = set(Disease.objects.values_list('name', flat=True))
+        names = [name for name in DISEASES if name not in existing]
+        n = self.volumes['diseases']
+        severity = self.rng.choice(['low', 'medium', 'high', 'critical'], size=n)
+
+        def build(start, stop):
+            diseases = []
+            for i in range(start, stop):
+                name = names[i] if i < len(names) else f'{DISEASES[i % len(DISEASES)]} variant {base + i}'
+                diseases.append({
+                    'id': base + i, 'name': name, 'name_fa': f'بیماری {base + i}',
+                    'description': f'{name} is a common plant disease.', 'symptoms': 'Discoloured leaves.',
+                    'solution': 'Remove affected leaves and improve airflow.',
+                    'severity_level': str(severity[i]),
+                })
+            return diseases
+
+        self._write(Disease, n, build)
+
+    def insert_garden(self, users, plants):
+        from gardens.models import UserPlant
+
+        base = _next_id(UserPlant)
+        n = len(users)
+        watered = self._ages(14, n)
+        interval = self.rng.choice([3, 5, 7, 10, 14], size=n)
+        pot_size = self.rng.choice(['small', 'medium', 'large'], size=n)
+
+        def build(start, stop):
+            return [
+                {
+                    'id': base + i, 'user_id': self.user_base + int(users[i]),
+                    'plant_id': self.plant_base + int(plants[i]),
+                    'last_watered': self._ago(watered[i]), 'watering_interval_days': int(interval[i]),
+                    'next_watering_date': self._ago(watered[i] - int(interval[i]) * 86400),
+                    'pot_size': str(pot_size[i]),
+                }
+                for i in range(start, stop)
+            ]
+
+        self._write(UserPlant, n, build)
+        return base
+
+    def insert_reminders(self, garden_base, garden_users):
+        from gardens.models import Reminder
+
+        base = _next_id(Reminder)
+        n = self.volumes['reminders']
+        rows = self.rng.integers(0, len(garden_users), size=n)
+        # Negative ages are in the future: reminders span the last 60 and the next 30 days
+        ages = self.rng.integers(-30 * 86400, 60 * 86400, size=n)
+        care_types = self.rng.choice(len(CARE_TYPES), size=n, p=[0.7, 0.15, 0.1, 0.05])
+        completed = (ages > 0) & (self.rng.random(n) < 0.85)
+
+        def build(start, stop):
+            return [
+                {
+                    'id': base + i, 'user_id': self.user_base + int(garden_users[rows[i]]),
+                    'user_plant_id': garden_base + int(rows[i]),
+                    'title': f'{CARE_TYPES[care_types[i]].title()} reminder',
+                    'care_type': CARE_TYPES[care_types[i]],
+                    'scheduled_date': self._ago(ages[i]), 'is_completed': bool(completed[i]),
+                    'notified': bool(ages[i] > 0), 'is_recurring': bool(care_types[i] == 0),
+                    'recurrence_interval': 7,
+                }
+                for i in range(start, stop)
+            ]
+
+        self._write(Reminder, n, build)
+
+    def insert_chat_messages(self, garden_base, garden_users):
+        from gardens.models import PlantChatMessage
+
+        base = _next_id(PlantChatMessage)
+        n = self.volumes['chat_messages']
+        weights = self.user_weights[garden_users]
+        rows = self.rng.choice(len(garden_users), size=n, p=weights / weights.sum())
+        questions = self.rng.integers(0, len(CHAT_QUESTIONS), size=n)
+        sent = self._ages(365, n)
+
+        def build(start, stop):
+            return [
+                {
+                    'id': base + i, 'user_id': self.user_base + int(garden_users[rows[i]]),
+                    'user_plant_id': garden_base + int(rows[i]),
+                    'message': CHAT_QUESTIONS[questions[i]], 'response': CHAT_REPLY,
+                    'created_at': self._ago(sent[i]),
+                }
+                for i in range(start, stop)
+            ]
+
+        self._write(PlantChatMessage, n, build)
+
+    def insert_growth_records(self, garden_base, garden_size):
+        from gardens.models import GrowthRecord
+
+        base = _next_id(GrowthRecord)
+        n = self.volumes['growth_records']
+        rows = self.rng.integers(0, garden_size, size=n)
+        heights = np.round(self.rng.lognormal(3.0, 0.6, size=n), 2)
+        dates = self._ages(365, n)
+
+        def build(start, stop):
+            return [
+                {
+                    'id': base + i, 'user_plant_id': garden_base + int(rows[i]), 'date': self._ago(dates[i]),
+                    'height': f'{heights[i]:.2f}', 'width': f'{heights[i] * 0.6:.2f}',
+                }
+                for i in range(start, stop)
+            ]
+
+        self._write(GrowthRecord, n, build)
+
+    def insert_favourites(self, users, plants):
+        from plants.models import PlantFavourite
+
+        base = _next_id(PlantFavourite)
+
+        def build(start, stop):
+            return [
+                {'id': base + i, 'user_id': self.user_base + int(users[i]), 'plant_id': self.plant_base + int(plants[i])}
+                for i in range(start, stop)
+            ]
+
+        self._write(PlantFavourite, len(users), build)
+
+    def insert_plant_comments(self, plants, users, approved):
+        from plants.models import PlantComment
+
+        base = _next_id(PlantComment)
+        parents = _reply_parents(self.rng, plants)
+
+        def build(start, stop):
+            return [
+                {
+                    'id': base + i, 'user_id': self.user_base + int(users[i]),
+                    'plant_id': self.plant_base + int(plants[i]),
+                    'parent_id': base + int(parents[i]) if parents[i] >= 0 else None,
+                    'content': 'Mine grows really well in a bright bathroom.', 'is_approved': bool(approved[i]),
+                }
+                for i in range(start, stop)
+            ]
+
+        self._write(PlantComment, len(plants), build)
+
+    def insert_posts(self):
+        from blog.models import Post
+
+        base = _next_id(Post)
+        n = self.volumes['posts']
+        authors = self.rng.integers(0, min(50, self.volumes['users']), size=n)
+        published = self._ages(3 * 365, n)
+        content = '<p>' + 'Healthy roots start with the right soil. ' * 30 + '</p>'
+
+        def build(start, stop):
+            return [
+                {
+                    'id': base + i, 'title': f'Plant care guide {base + i}', 'slug': f'plant-care-guide-{base + i}',
+                    'content': content, 'author_id': self.user_base + int(authors[i]),
+                    'publish': self._ago(published[i]), 'status': Post.Status.PUBLISHED.value,
+                }
+                for i in range(start, stop)
+            ]
+
+        self._write(Post, n, build)
+        return base
+
+    def insert_post_comments(self, post_base):
+        from blog.models import Comment
+
+        base = _next_id(Comment)
+        n = self.volumes['post_comments']
+        posts = self.rng.choice(self.volumes['posts'], size=n,
+                                p=_zipf_weights(self.rng, self.volumes['posts'], PLANT_POPULARITY_EXPONENT))
+        users = self.rng.choice(self.volumes['users'], size=n, p=self.user_weights)
+
+        def build(start, stop):
+            return [
+                {
+                    'id': base + i, 'post_id': post_base + int(posts[i]),
+                    'author_id': self.user_base + int(users[i]), 'content': 'Thanks, this helped my fern!',
+                }
+                for i in range(start, stop)
+            ]
+
+        self._write(Comment, n, build)
@@ -0,0 +1,256 @@
+"""
+Local stand-in for the Gemini and OpenAI-compatible HTTP APIs.
+
+Used by the benchmark command so LLM-backed endpoints can be driven under load
+without network access or API spend.  The server answers
+``POST .../models/{model}:generateContent`` (Gemini) and
+``POST .../chat/completions`` (OpenAI) after a configurable delay, and picks a
+canned response by looking for a marker phrase from each module's prompt.
+"""
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import import_module
+
+# Modules holding a module-level Gemini ``client`` and/or an ``OpenAI`` factory
+LLM_MODULES = (
+    'plants.ml_models',
+    'plants.llm_identifier',
+    'plants.llm_recomend',
+    'plants.checkup',
+    'diseases.ml_models',
+    'diseases.llm_diseas',
+    'gardens.llm_chat',
+)
+
+
+def _plant_info(stub):
+    return {
+        'farsi_name': stub.plant_name_fa,
+        'english_name': stub.plant_name_en,
+        'scientific_name': stub.scientific_name,
+        'description': 'گیاه آزمایشی <h2>راهنمای مراقبت</h2>',
+        'description_en': 'Benchmark plant <h2>Care Guide</h2>',
+        'watering_frequency': 'متوسط',
+        'watering_frequency_en': 'medium',
+        'light_requirements': 'نور غیرمستقیم روشن',
+        'light_requirements_en': 'bright indirect light',
+        'humidity_level': 'متوسط',
+        'humidity_level_en': 'moderate',
+        'temperature_range_en': '18-24°C',
+        'soil_type_en': 'standard potting mix',
+        'care_difficulty': 'easy',
+        'is_toxic': False,
+    }
+
+
+def _disease_details(stub):
+    return {
+        'disease_name_fa': 'سفیدک سطحی',
+        'disease_name_en': stub.disease_name,
+        'description_fa': 'بیماری قارچی',
+        'description_en': 'A fungal disease.',
+        'symptoms_fa': 'لکه‌های سفید',
+        'symptoms_en': 'White powdery spots.',
+        'severity': 'medium',
+        'spread_rate': 'moderate',
+        'is_infectious': 'بله',
+        'is_infectious_en': 'yes',
+        'treatment_steps_fa': ['حذف برگ‌های آلوده'],
+        'treatment_steps_en': ['Remove infected leaves'],
+        'prevention_fa': 'تهویه مناسب',
+        'prevention_en': 'Good air circulation',
+        'organic_treatment_fa': 'محلول جوش شیرین',
+        'organic_treatment_en': 'Baking soda spray',
+    }
+
+
+# (marker found in the request body, response factory); first match wins
+RESPONSES = (
+    ('plant health checkup', lambda stub: json.dumps({
+        'is_plant': True,
+        'common_name': stub.plant_name_en,
+        'scientific_name': stub.scientific_name,
+        'plant_confidence': 92,
+        'disease_name': stub.disease_name,
+        'disease_confidence': 88,
+    })),
+    ('plant identification specialist', lambda stub: json.dumps({
+        'is_plant': True,
+        'common_name': stub.plant_name_en,
+        'scientific_name': stub.scientific_name,
+        'confidence': 92,
+    })),
+    ('Analyze this plant image', lambda stub: json.dumps({'disease_name': stub.disease_name, 'confidence': 88})),
+    ('generate the JSON for disease', lambda stub: json.dumps(_disease_details(stub))),
+    ('expert botanist with deep knowledge', lambda stub: json.dumps(_plant_info(stub))),
+    ('houseplant expert', lambda stub: json.dumps({
+        'plant_name_fa': stub.plant_name_fa,
+        'plant_name_en': stub.plant_name_en,
+        'scientific_name': stub.scientific_name,
+        'reason_fa': 'این گیاه با شرایط شما سازگار است.',
+        'reason_en': 'This plant suits your conditions.',
+    })),
+)
+DEFAULT_TEXT = 'Water when the top 3 cm of soil is dry and keep it in bright, indirect light.'
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8', errors='replace')
+        stub.record(self.path)
+        stub.sleep()
+
+        text = stub.respond(body)
+        if ':generateContent' in self.path:
+            payload = {
+                'candidates': [{
+                    'content': {'role': 'model', 'parts': [{'text': text}]},
+                    'finishReason': 'STOP',
+                    'index': 0,
+                }],
+                'usageMetadata': {
+                    'promptTokenCount': len(body) // 4,
+                    'candidatesTokenCount': len(text) // 4,
+                    'totalTokenCount': (len(body) + len(text)) // 4,
+                },
+                'modelVersion': 'stub',
+            }
+        elif self.path.endswith('/chat/completions'):
+            payload = {
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': 'stub',
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': text},
+                    'finish_reason': 'stop',
+                }],
+                'usage': {
+                    'prompt_tokens': len(body) // 4,
+                    'completion_tokens': len(text) // 4,
+                    'total_tokens': (len(body) + len(text)) // 4,
+                },
+            }
+        else:
+            self.send_error(404)
+            return
+
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubLLMServer:
+    """
+    Threaded stub server; use as a context manager or call start()/stop().
+
+    ``latency_ms`` and ``jitter_ms`` shape the simulated provider latency
+    (normally distributed, never negative).
+    """
+
+    def __init__(self, latency_ms=300, jitter_ms=50, host='127.0.0.1', port=0, seed=None,
+                 plant_name_en='Golden Pothos', plant_name_fa='پوتوس',
+                 scientific_name='Epipremnum aureum', disease_name='Powdery Mildew'):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.plant_name_en = plant_name_en
+        self.plant_name_fa = plant_name_fa
+        self.scientific_name = scientific_name
+        self.disease_name = disease_name
+        self.calls = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='llm-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def record(self, path):
+        with self._lock:
+            self.calls[path] = self.calls.get(path, 0) + 1
+
+    def sleep(self):
+        with self._lock:
+            delay = self._random.gauss(self.latency_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def respond(self, body):
+        for marker, factory in RESPONSES:
+            if marker in body:
+                return factory(self)
+        return DEFAULT_TEXT
+
+
+@contextmanager
+def stub_llm_clients(base_url, modules=LLM_MODULES):
+    """
+    Point every LLM module at ``base_url`` for the duration of the block.
+
+    The module-level Gemini ``client`` is rebound to one using ``base_url``,
+    and the ``OpenAI`` name is wrapped so clients created inline use it too.
+    """
+    originals = []
+    try:
+        for name in modules:
+            module = import_module(name)
+            if hasattr(module, 'client'):
+                from google import genai
+                from google.genai import types
+
+                originals.append((module, 'client', module.client))
+                module.client = genai.Client(
+                    api_key='benchmark', http_options=types.HttpOptions(base_url=base_url)
+                )
+            if hasattr(module, 'OpenAI'):
+                original_openai = module.OpenAI
+                originals.append((module, 'OpenAI', original_openai))
+
+                def openai_factory(*args, _openai=original_openai, **kwargs):
+                    kwargs.update(base_url=f'{base_url}/v1', api_key='benchmark')
+                    return _openai(*args, **kwargs)
+
+                module.OpenAI = openai_factory
+            for key_name in ('GEMINI_API_KEY', 'AVALAI_API_KEY', 'YOUR_GAPGPT_API_KEY'):
+                if hasattr(module, key_name):
+                    originals.append((module, key_name, getattr(module, key_name)))
+                    setattr(module, key_name, 'benchmark')
+        yield
+    finally:
+        for module, attribute, value in reversed(originals):
+            setattr(module, attribute, value)
@@ -0,0 +1,254 @@
+"""
+Telemetry for Gemini and OpenAI-compatible calls.
+
+Every call site wraps its provider call in :func:`track_llm_call`::
+
+    with track_llm_call('garden_chat', CHAT_MODEL) as call:
+        response = chat.send_message(question)
+        call.record(response)
+
+which records latency, status, token usage and estimated cost.  Figures are
+kept in bounded in-memory counters and histograms, exposed as Prometheus text
+by ``core.views.LLMMetricsView``.  They are also added to the ``LLMUsageDaily``
+rollup for the current user (taken from ``core.context``), which backs the
+``llm_cost_report`` command.  Telemetry failures are logged and never reach
+the caller.
+"""
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .context import get_current_user_id
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 60000)
+MAX_SERIES = 200                 # distinct (feature, model) pairs kept in memory
+OVERFLOW_LABEL = 'other'
+
+# USD per million (prompt, completion) tokens; override with settings.LLM_PRICING
+DEFAULT_PRICING = {
+    'gemini-3.5-flash': (0.30, 2.50),
+    'gemini-3.1-flash-lite': (0.10, 0.40),
+    'gpt-4o-mini': (0.15, 0.60),
+    'gemma-3-27b-it': (0.10, 0.20),
+    'gemma-4-31b-it': (0.10, 0.20),
+}
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    pricing = getattr(settings, 'LLM_PRICING', None) or DEFAULT_PRICING
+    prompt_price, completion_price = pricing.get(model, (0, 0))
+    return (Decimal(str(prompt_price)) * prompt_tokens
+            + Decimal(str(completion_price)) * completion_tokens) / Decimal(1_000_000)
+
+
+# =====================================================================
+# IN-MEMORY METRICS
+# =====================================================================
+class _Series:
+    __slots__ = ('calls', 'errors', 'retries', 'cache_hits', 'prompt_tokens', 'completion_tokens',
+                 'cost_usd', 'latency_sum_ms', 'buckets')
+
+    def __init__(self):
+        self.calls = self.errors = self.retries = self.cache_hits = 0
+        self.prompt_tokens = self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.latency_sum_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)     # last one is +Inf
+
+
+class LLMMetrics:
+    """Process-wide counters and latency histograms keyed by (feature, model)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _get(self, feature, model):
+        key = (feature, model)
+        series = self._series.get(key)
+        if series is None:
+            if len(self._series) >= MAX_SERIES:
+                key = (OVERFLOW_LABEL, OVERFLOW_LABEL)
+                series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series()
+        return series
+
+    def observe(self, call):
+        with self._lock:
+            series = self._get(call.feature, call.model)
+            series.calls += 1
+            series.errors += 0 if call.ok else 1
+            series.retries += call.retries
+            series.prompt_tokens += call.prompt_tokens
+            series.completion_tokens += call.completion_tokens
+            series.cost_usd += float(call.cost_usd)
+            series.latency_sum_ms += call.latency_ms
+            series.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, call.latency_ms)] += 1
+
+    def cache_hit(self, feature, model):
+        with self._lock:
+            self._get(feature, model).cache_hits += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: _copy(series) for key, series in self._series.items()}
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def prometheus(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        snapshot = sorted(self.snapshot().items())
+        counters = (
+            ('llm_calls_total', 'calls', 'LLM calls'),
+            ('llm_errors_total', 'errors', 'LLM calls that raised'),
+            ('llm_retries_total', 'retries', 'LLM call retries'),
+            ('llm_cache_hits_total', 'cache_hits', 'LLM results served from cache'),
+            ('llm_cost_usd_total', 'cost_usd', 'Estimated LLM cost in USD'),
+        )
+        for name, attribute, help_text in counters:
+            family(name, 'counter', help_text)
+            for (feature, model), series in snapshot:
+                lines.append(f'{name}{{{_labels(feature, model)}}} {getattr(series, attribute)}')
+
+        family('llm_tokens_total', 'counter', 'LLM tokens by direction')
+        for (feature, model), series in snapshot:
+            labels = _labels(feature, model)
+            lines.append(f'llm_tokens_total{{{labels},direction="prompt"}} {series.prompt_tokens}')
+            lines.append(f'llm_tokens_total{{{labels},direction="completion"}} {series.completion_tokens}')
+
+        family('llm_latency_seconds', 'histogram', 'LLM call latency')
+        for (feature, model), series in snapshot:
+            labels = _labels(feature, model)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS_MS, series.buckets):
+                cumulative += count
+                lines.append(f'llm_latency_seconds_bucket{{{labels},le="{bound / 1000:g}"}} {cumulative}')
+            cumulative += series.buckets[-1]
+            lines.append(f'llm_latency_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f'llm_latency_seconds_sum{{{labels}}} {series.latency_sum_ms / 1000:.6f}')
+            lines.append(f'llm_latency_seconds_count{{{labels}}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(series):
+    copy = _Series()
+    for attribute in _Series.__slots__:
+        value = getattr(series, attribute)
+        setattr(copy, attribute, list(value) if isinstance(value, list) else value)
+    return copy
+
+
+def _labels(feature, model):
+    escape = lambda value: value.replace('\\', '\\\\').replace('"', '\\"')  # noqa: E731
+    return f'feature="{escape(feature)}",model="{escape(model)}"'
+
+
+metrics = LLMMetrics()
+
+
+# =====================================================================
+# CALL TRACKING
+# =====================================================================
+class LLMCall:
+    """One provider call; ``record(response)`` pulls token usage from a Gemini or OpenAI response."""
+
+    def __init__(self, feature, model):
+        self.feature = feature
+        self.model = model
+        self.ok = True
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_ms = 0.0
+        self.cost_usd = Decimal(0)
+
+    def record(self, response):
+        usage = getattr(response, 'usage_metadata', None)           # Gemini
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_token_count or 0
+            self.completion_tokens += usage.candidates_token_count or 0
+            return
+        usage = getattr(response, 'usage', None)                    # OpenAI
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_tokens or 0
+            self.completion_tokens += usage.completion_tokens or 0
+
+    def retry(self):
+        self.retries += 1
+
+
+@contextmanager
+def track_llm_call(feature, model):
+    call = LLMCall(feature, model)
+    started = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        call.ok = False
+        raise
+    finally:
+        call.latency_ms = (time.perf_counter() - started) * 1000
+        call.cost_usd = estimate_cost(model, call.prompt_tokens, call.completion_tokens)
+        try:
+            metrics.observe(call)
+            if getattr(settings, 'LLM_TELEMETRY_PERSIST', True):
+                persist_usage(call, user_id=get_current_user_id())
+        except Exception as e:
+            logger.error(f"Failed to record LLM telemetry for {feature}: {e}")
+
+
+def record_cache_hit(feature, model):
+    """Count an LLM result served from cache instead of a provider call."""
+    try:
+        metrics.cache_hit(feature, model)
+        if getattr(settings, 'LLM_TELEMETRY_PERSIST', True):
+            _add_usage(timezone.localdate(), get_current_user_id(), feature, model, cache_hits=1)
+    except Exception as e:
+        logger.error(f"Failed to record LLM cache hit for {feature}: {e}")
+
+
+def persist_usage(call, user_id=None):
+    _add_usage(
+        timezone.localdate(), user_id, call.feature, call.model,
+        calls=1, errors=0 if call.ok else 1, retries=call.retries,
+        prompt_tokens=call.prompt_tokens, completion_tokens=call.completion_tokens,
+        cost_usd=call.cost_usd, total_latency_ms=call.latency_ms,
+    )
+
+
+def _add_usage(date, user_id, feature, model, **increments):
+    """Add ``increments`` to the day's rollup row, creating it on first use.
+
+    The row is unique, so when another process creates it first the insert
+    fails and the increments are applied to that row instead.
+    """
+    from .models import LLMUsageDaily
+
+    rows = LLMUsageDaily.objects.filter(date=date, user_id=user_id, feature=feature, model=model)
+    updates = {field: F(field) + value for field, value in increments.items()}
+    if rows.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            LLMUsageDaily.objects.create(date=date, user_id=user_id, feature=feature, model=model, **increments)
+    except IntegrityError:
+        rows.update(**updates)
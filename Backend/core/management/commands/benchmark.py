@@ -0,0 +1,130 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.views import APIView
+
+from core.benchmark import (
+    SCENARIOS, BenchmarkServer, access_tokens, compare_to_baseline, dataset_context,
+    load_baseline, run_scenario, save_baseline, seed_dataset,
+)
+from core.llm_stub import StubLLMServer, stub_llm_clients
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch database and measure p50/p95/p99 latency, throughput and "
+        "queries per request of the hot endpoints, with the LLM providers stubbed locally."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Dataset size multiplier')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client threads')
+        parser.add_argument('--scenarios', default='', help='Comma-separated scenario names (default: all)')
+        parser.add_argument('--llm-latency-ms', type=float, default=300.0, help='Mean stub LLM latency')
+        parser.add_argument('--llm-jitter-ms', type=float, default=50.0, help='Stub LLM latency std deviation')
+        parser.add_argument('--db', default=None,
+                            help='Scratch SQLite file (default: a temporary file, removed afterwards); '
+                                 'an existing file is only used with --keepdb')
+        parser.add_argument('--keepdb', action='store_true', help='Keep and reuse the seeded scratch database')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--save-baseline', default=None, help='Write results to this JSON file')
+        parser.add_argument('--compare', default=None, help='Compare results against this baseline JSON file')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed relative regression before --compare fails (default 0.2)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("The benchmark builds its scratch database with SQLite only.")
+        if options['db'] and not options['keepdb'] and os.path.exists(options['db']):
+            # without --keepdb the scratch database is rebuilt and deleted afterwards
+            raise CommandError(f"{options['db']} already exists; pass --keepdb to reuse it, or choose a new path.")
+
+        selected = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        scenarios = [scenario for scenario in SCENARIOS if not selected or scenario.name in selected]
+        unknown = set(selected) - {scenario.name for scenario in SCENARIOS}
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        baseline = load_baseline(options['compare']) if options['compare'] else None
+        workdir = tempfile.mkdtemp(prefix='plant-benchmark-')
+        db_path = options['db'] or os.path.join(workdir, 'benchmark.sqlite3')
+        keepdb = options['keepdb'] and bool(options['db'])
+
+        # A separate database built straight from the models (the project's
+        # migration history cannot build a fresh database on its own).  The
+        # connection points at it before it ever opens, so the development
+        # database is not opened, or created, on the way in or out.
+        default_name = connection.settings_dict['NAME']
+        settings.DATABASES[connection.alias]['NAME'] = connection.settings_dict['NAME'] = db_path
+        connection.settings_dict['TEST'] = {'NAME': db_path, 'MIGRATE': False}
+        connection.settings_dict.setdefault('OPTIONS', {})['timeout'] = 30
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+        throttle_classes = APIView.throttle_classes
+        try:
+            from plants.models import Plant
+
+            if not Plant.objects.exists():
+                self.stdout.write(f"Seeding dataset at scale {options['scale']} ...")
+                volumes = seed_dataset(options['scale'], seed=options['seed'])
+                self.stdout.write(', '.join(f'{name}={count}' for name, count in volumes.items()))
+            context = dataset_context()
+            if not context['user_ids']:
+                raise CommandError("The scratch database has no garden plants to act on.")
+            tokens = access_tokens(context['user_ids'])
+
+            # Rate limits would turn the run into a throttling test.
+            APIView.throttle_classes = ()
+            stub = StubLLMServer(
+                latency_ms=options['llm_latency_ms'], jitter_ms=options['llm_jitter_ms'], seed=options['seed'],
+                plant_name_en=context['english_name'], plant_name_fa=context['farsi_name'],
+                scientific_name=context['scientific_name'],
+            )
+            results = {}
+            with override_settings(DEBUG=False, MEDIA_ROOT=os.path.join(workdir, 'media')), \
+                    stub, stub_llm_clients(stub.url), BenchmarkServer() as server:
+                for index, scenario in enumerate(scenarios):
+                    result = run_scenario(
+                        server.url, scenario, context, tokens,
+                        requests_count=options['requests'], concurrency=options['concurrency'],
+                        seed=options['seed'] + index,
+                    )
+                    results[scenario.name] = result.summary()
+                    self.report(scenario.name, results[scenario.name])
+        finally:
+            APIView.throttle_classes = throttle_classes
+            connection.creation.destroy_test_db(db_path, verbosity=0, keepdb=keepdb)
+            settings.DATABASES[connection.alias]['NAME'] = connection.settings_dict['NAME'] = default_name
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        config = {key: options[key] for key in ('scale', 'requests', 'concurrency', 'llm_latency_ms', 'llm_jitter_ms')}
+        if options['save_baseline']:
+            save_baseline(options['save_baseline'], results, config)
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save_baseline']}"))
+
+        if baseline is not None:
+            if baseline.get('config') != config:
+                self.stdout.write(self.style.WARNING(
+                    f"Baseline was recorded with a different configuration: {json.dumps(baseline.get('config'))}"
+                ))
+            regressions = compare_to_baseline(results, baseline, options['tolerance'])
+            if regressions:
+                for line in regressions:
+                    self.stdout.write(self.style.ERROR(line))
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+    def report(self, name, summary):
+        style = self.style.ERROR if summary['errors'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{name:<14} p50 {summary['p50_ms']:>8.1f}ms  p95 {summary['p95_ms']:>8.1f}ms  "
+            f"p99 {summary['p99_ms']:>8.1f}ms  {summary['throughput_rps']:>7.1f} req/s  "
+            f"{summary['queries_mean']:>6.1f} q/req (max {summary['queries_max']})  "
+            f"errors {summary['errors']}/{summary['requests']}"
+        ))
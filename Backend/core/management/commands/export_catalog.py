@@ -0,0 +1,36 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalog_io import DEFAULT_CHUNK_SIZE, EXPORT_DATASETS, FORMATS, CatalogFormatError, stream_export
+
+
+class Command(BaseCommand):
+    help = "Export the plant/disease catalog and comments as JSONL or Parquet files, streaming in chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('datasets', nargs='*',
+                            help=f"Datasets to export: {', '.join(EXPORT_DATASETS)} (default: all)")
+        parser.add_argument('--format', choices=FORMATS, default='jsonl', dest='file_format')
+        parser.add_argument('--output-dir', default='.', help='Directory for the <dataset>.<format> files')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        unknown = set(options['datasets']) - set(EXPORT_DATASETS)
+        if unknown:
+            raise CommandError(f"Unknown datasets: {', '.join(sorted(unknown))}")
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for dataset in options['datasets'] or EXPORT_DATASETS:
+            path = os.path.join(options['output_dir'], f"{dataset}.{options['file_format']}")
+            started = time.perf_counter()
+            try:
+                chunks = stream_export(dataset, options['file_format'], options['chunk_size'])
+                with open(path, 'wb') as handle:
+                    for chunk in chunks:
+                        handle.write(chunk)
+            except CatalogFormatError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(
+                f"Exported {dataset} to {path} ({os.path.getsize(path):,} bytes) in {time.perf_counter() - started:.1f}s"
+            ))
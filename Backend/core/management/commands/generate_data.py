@@ -0,0 +1,68 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from core.datagen import DEFAULT_VOLUMES, DataGenerator, scaled_volumes
+
+
+class _NoMigrations(dict):
+    """MIGRATION_MODULES value that makes ``migrate --run-syncdb`` build every app from its models."""
+
+    def __contains__(self, app_label):
+        return True
+
+    def __getitem__(self, app_label):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic dataset (plants, users, gardens, reminders, chats, growth "
+        "records, favourites and comments) with skewed popularity, for scale testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Multiplier applied to every default volume')
+        for name, count in DEFAULT_VOLUMES.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=None, dest=name,
+                                help=f'Rows to generate (default {count:,} x scale)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--create-schema', action='store_true',
+                            help='Create the tables straight from the models first (for an empty database file)')
+        parser.add_argument('--skip-similarity', action='store_true',
+                            help='Do not rebuild the related-plants table afterwards')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("The generator tunes SQLite for bulk loading and supports SQLite only.")
+
+        if options['create_schema']:
+            # The migration history cannot build a fresh database on its own.
+            with override_settings(MIGRATION_MODULES=_NoMigrations()):
+                call_command('migrate', run_syncdb=True, verbosity=0, skip_checks=True)
+
+        volumes = scaled_volumes(options['scale'], **{name: options[name] for name in DEFAULT_VOLUMES})
+        self.stdout.write(', '.join(f'{name}={count:,}' for name, count in volumes.items()))
+
+        started = time.perf_counter()
+        generator = DataGenerator(volumes, seed=options['seed'], progress=self.report)
+        generator.run()
+
+        if not options['skip_similarity']:
+            from plants.similarity import rebuild_similarity_table
+
+            step = time.perf_counter()
+            rows = rebuild_similarity_table()
+            self.report('plants_plantsimilarity', rows, time.perf_counter() - step)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {sum(volumes.values()):,} rows in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def report(self, table, rows, seconds):
+        rate = rows / seconds if seconds else 0
+        self.stdout.write(f"{table:<28} {rows:>12,} rows  {seconds:>8.1f}s  {rate:>10,.0f} rows/s")
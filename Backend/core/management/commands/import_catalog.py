@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.catalog_io import (
+    DEFAULT_CHUNK_SIZE, FORMATS, IMPORT_DATASETS, CatalogFormatError, import_records, read_records,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Upsert plants (on scientific_name) or diseases (on name) from a JSONL or Parquet export. "
+        "Only columns present in the file are overwritten."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=IMPORT_DATASETS)
+        parser.add_argument('path', help='File written by export_catalog or the export endpoint')
+        parser.add_argument('--format', choices=FORMATS, default=None, dest='file_format',
+                            help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            records = read_records(options['path'], options['file_format'], options['batch_size'])
+            totals = import_records(options['dataset'], records, options['batch_size'])
+        except (CatalogFormatError, OSError) as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            f"Upserted {totals['upserted']} {options['dataset']}, skipped {totals['skipped']} without a key"
+        ))
+        if options['dataset'] == 'plants' and totals['upserted']:
+            self.stdout.write(f"Replaced {totals['images']} plant images.")
+            self.stdout.write("Run 'python manage.py build_plant_similarity' to refresh related plants.")
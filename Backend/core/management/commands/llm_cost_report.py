@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.utils import timezone
+
+from core.models import LLMUsageDaily
+
+GROUPINGS = {
+    'feature': ('feature',),
+    'model': ('model',),
+    'user': ('user__username',),
+    'user-feature': ('user__username', 'feature'),
+    'day': ('date',),
+}
+
+
+class Command(BaseCommand):
+    help = "Report LLM calls, tokens and estimated cost from the daily usage rollup"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Number of days back from today (default 30)')
+        parser.add_argument('--by', choices=GROUPINGS, default='feature')
+        parser.add_argument('--limit', type=int, default=50, help='Show only the most expensive rows')
+
+    def handle(self, *args, **options):
+        since = timezone.localdate() - timedelta(days=options['days'] - 1)
+        columns = GROUPINGS[options['by']]
+        rows = (
+            LLMUsageDaily.objects.filter(date__gte=since)
+            .values(*columns)
+            .annotate(
+                calls_sum=Sum('calls'), errors_sum=Sum('errors'), cache_hits_sum=Sum('cache_hits'),
+                prompt_sum=Sum('prompt_tokens'), completion_sum=Sum('completion_tokens'),
+                cost_sum=Sum('cost_usd'), latency_sum=Sum('total_latency_ms'),
+            )
+            .order_by('-cost_sum', *columns)[:options['limit']]
+        )
+
+        header = ' / '.join(column.replace('user__username', 'user') for column in columns)
+        self.stdout.write(f"LLM usage since {since} by {options['by']}")
+        self.stdout.write(f"{header:<40} {'calls':>8} {'errors':>7} {'cached':>7} {'prompt tok':>11} "
+                          f"{'compl. tok':>11} {'avg ms':>8} {'cost $':>10}")
+        total = 0
+        for row in rows:
+            label = ' / '.join(str(row[column] or 'anonymous') for column in columns)
+            average_ms = row['latency_sum'] / row['calls_sum'] if row['calls_sum'] else 0
+            total += row['cost_sum']
+            self.stdout.write(
+                f"{label[:40]:<40} {row['calls_sum']:>8} {row['errors_sum']:>7} {row['cache_hits_sum']:>7} "
+                f"{row['prompt_sum']:>11} {row['completion_sum']:>11} {average_ms:>8.0f} {row['cost_sum']:>10.4f}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Total estimated cost: ${total:.4f}"))
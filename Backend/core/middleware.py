@@ -0,0 +1,109 @@
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .context import reset_current_request, set_current_request
+from .query_budget import QueryBudgetExceeded, QueryInspector, get_query_budget, view_action
+from .timing import db_timer, install_hooks, timing_request
+
+logger = logging.getLogger('core.timing')
+budget_logger = logging.getLogger('core.query_budget')
+
+
+class RequestContextMiddleware:
+    """Expose the current request through ``core.context`` for the duration of the request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = set_current_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_current_request(token)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a ``Server-Timing`` header (db, serialize, render, llm, push, http, total)
+    to a sampled share of requests and logs a JSON line for slow ones.
+
+    Settings: SERVER_TIMING_ENABLED, SERVER_TIMING_SAMPLE_RATE (0-1),
+    SERVER_TIMING_SLOW_MS.  When disabled the middleware removes itself.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 1.0)
+        self.slow_ms = getattr(settings, 'SERVER_TIMING_SLOW_MS', 1000)
+        install_hooks()
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            started = time.perf_counter()
+            response = self.get_response(request)
+            total_ms = (time.perf_counter() - started) * 1000
+            if total_ms >= self.slow_ms:
+                self.log(request, response, total_ms, None)
+            return response
+
+        with timing_request() as timings, connection.execute_wrapper(db_timer):
+            response = self.get_response(request)
+        total_ms = timings.total_ms
+        response['Server-Timing'] = timings.header(total_ms)
+        if total_ms >= self.slow_ms:
+            self.log(request, response, total_ms, timings.as_dict())
+        return response
+
+    def log(self, request, response, total_ms, spans):
+        match = getattr(request, 'resolver_match', None)
+        logger.warning(json.dumps({
+            'event': 'slow_request',
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'spans': spans,
+        }, ensure_ascii=False))
+
+
+class QueryBudgetMiddleware:
+    """
+    Development aid: counts the queries of each request, adds an
+    ``X-Query-Budget: <used>/<budget>`` header and logs a report naming the
+    serializer field and stack when a viewset action goes over its declared
+    ``query_budget`` or repeats a query shape.
+
+    Settings: QUERY_BUDGET_ENABLED, QUERY_BUDGET_STRICT (raise instead of log).
+    When disabled the middleware removes itself.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_BUDGET_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+
+    def __call__(self, request):
+        with QueryInspector().capture() as inspector:
+            response = self.get_response(request)
+        view_class, action = view_action(request)
+        budget = get_query_budget(view_class, action) if view_class else None
+        response['X-Query-Budget'] = f'{inspector.count}/{budget if budget is not None else "-"}'
+        try:
+            inspector.check(budget)
+        except QueryBudgetExceeded as exc:
+            name = f'{view_class.__name__}.{action}' if view_class else request.path
+            if self.strict:
+                raise QueryBudgetExceeded(f'{request.method} {request.path} ({name}): {exc}')
+            budget_logger.warning(f"{request.method} {request.path} ({name}): {exc}")
+        return response
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+SUMMED_FIELDS = ('calls', 'errors', 'retries', 'cache_hits', 'prompt_tokens', 'completion_tokens',
+                 'cost_usd', 'total_latency_ms')
+
+
+def merge_duplicate_rows(apps, schema_editor):
+    """Fold rows written twice by racing requests into the first one."""
+    LLMUsageDaily = apps.get_model('core', 'LLMUsageDaily')
+    kept = {}
+    for row in LLMUsageDaily.objects.order_by('id'):
+        key = (row.date, row.user_id, row.feature, row.model)
+        first = kept.setdefault(key, row)
+        if first is row:
+            continue
+        for field in SUMMED_FIELDS:
+            setattr(first, field, getattr(first, field) + getattr(row, field))
+        first.save(update_fields=SUMMED_FIELDS)
+        row.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_llmusagedaily'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='llmusagedaily',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', False)), fields=('date', 'user', 'feature', 'model'), name='llm_usage_unique_user_row'),
+        ),
+        migrations.AddConstraint(
+            model_name='llmusagedaily',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('date', 'feature', 'model'), name='llm_usage_unique_anonymous_row'),
+        ),
+    ]
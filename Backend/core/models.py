@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class CatalogTombstone(models.Model):
+    """A deleted catalog row, kept so offline bundles can drop it on the next delta sync."""
+    KIND_CHOICES = [
+        ('plant', 'Plant'),
+        ('disease', 'Disease'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} deleted at {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class LLMUsageDaily(models.Model):
+    """Per-day LLM usage for one user (or anonymous), feature and model."""
+    date = models.DateField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL,
+                             related_name='llm_usage')
+    feature = models.CharField(max_length=50)
+    model = models.CharField(max_length=100)
+    calls = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    retries = models.PositiveIntegerField(default=0)
+    cache_hits = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveBigIntegerField(default=0)
+    completion_tokens = models.PositiveBigIntegerField(default=0)
+    cost_usd = models.DecimalField(max_digits=14, decimal_places=6, default=0)
+    total_latency_ms = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ['-date', 'feature']
+        indexes = [
+            models.Index(fields=['date', 'feature'], name='llm_usage_date_feature_idx'),
+            models.Index(fields=['user', 'date'], name='llm_usage_user_date_idx'),
+        ]
+        # NULLs never collide in a unique index, so anonymous usage needs its own constraint
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'user', 'feature', 'model'],
+                                    condition=models.Q(user__isnull=False), name='llm_usage_unique_user_row'),
+            models.UniqueConstraint(fields=['date', 'feature', 'model'],
+                                    condition=models.Q(user__isnull=True), name='llm_usage_unique_anonymous_row'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.feature} ({self.model}): {self.calls} calls"
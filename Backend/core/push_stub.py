@@ -0,0 +1,132 @@
+"""
+Local stand-in for the Expo push API (``POST /--/api/v2/push/send`` and
+``/--/api/v2/push/getReceipts``).
+
+Used by ``benchmark_push`` and the tests to measure push delivery without
+network access.  It answers a single message or a batch with one ticket per
+message:
+
+- tokens containing ``unregistered`` get a ``DeviceNotRegistered`` error ticket
+- tokens containing ``gone`` get an ok ticket, then a ``DeviceNotRegistered``
+  receipt
+
+The stub counts requests, messages and TCP connections, so the effect of
+batching and keep-alive shows up in the counters.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PUSH_PATH = '/--/api/v2/push/send'
+RECEIPTS_PATH = '/--/api/v2/push/getReceipts'
+
+
+class _ExpoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.stub.count('connections')
+
+    def do_POST(self):
+        stub = self.server.stub
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'null')
+        if self.path == RECEIPTS_PATH:
+            return self.receipts(stub, body)
+        messages = body if isinstance(body, list) else [body]
+        stub.count('requests')
+        stub.count('messages', len(messages))
+        stub.sleep()
+
+        tickets = []
+        for message in messages:
+            if 'unregistered' in str(message.get('to', '')):
+                tickets.append({'status': 'error', 'message': f"{message['to']} is not a registered push token",
+                                'details': {'error': 'DeviceNotRegistered'}})
+            else:
+                ticket_id = f'ticket-{stub.next_id()}'
+                stub.tokens[ticket_id] = message.get('to', '')
+                tickets.append({'status': 'ok', 'id': ticket_id})
+        self.reply({'data': tickets if isinstance(body, list) else tickets[0]})
+
+    def receipts(self, stub, body):
+        stub.count('receipt_requests')
+        receipts = {}
+        for ticket_id in body.get('ids', []):
+            token = stub.tokens.get(ticket_id)
+            if token is None:
+                continue
+            if 'gone' in token:
+                receipts[ticket_id] = {'status': 'error', 'message': f'{token} is not a registered push token',
+                                       'details': {'error': 'DeviceNotRegistered'}}
+            else:
+                receipts[ticket_id] = {'status': 'ok'}
+        self.reply({'data': receipts})
+
+    def reply(self, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubExpoServer:
+    """Threaded stub server; use as a context manager or call start()/stop()."""
+
+    def __init__(self, latency_ms=50, jitter_ms=10, host='127.0.0.1', port=0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.counters = {'connections': 0, 'requests': 0, 'messages': 0, 'receipt_requests': 0}
+        self.tokens = {}
+        self._ids = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _ExpoHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{PUSH_PATH}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='expo-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def next_id(self):
+        with self._lock:
+            self._ids += 1
+            return self._ids
+
+    def sleep(self):
+        with self._lock:
+            delay = self._random.gauss(self.latency_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
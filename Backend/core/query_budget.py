@@ -0,0 +1,181 @@
+"""
+Query budgets and N+1 detection.
+
+Every viewset declares how many SQL queries one request may run, either as a
+number or per action::
+
+    class PlantViewSet(viewsets.ModelViewSet):
+        query_budget = {'list': 4, 'retrieve': 5, 'default': 8}
+
+``QueryInspector`` records each query of a block together with the serializer
+field that was being rendered and the project frames of the stack.  Queries
+are grouped by shape (SQL with literals and ``IN`` lists collapsed), so the
+same query repeated for every row shows up as one N+1 group.
+
+Tests use ``QueryBudgetTestMixin.assertQueryBudget``; during development
+``core.middleware.QueryBudgetMiddleware`` logs (or, in strict mode, raises)
+for requests over budget.
+"""
+import re
+import sys
+import traceback
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.urls import URLPattern, URLResolver, get_resolver
+
+REPEAT_THRESHOLD = 3        # the same query shape this many times in one request is an N+1
+STACK_DEPTH = 6
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r'\s+')
+_PROJECT_DIR = str(Path(settings.BASE_DIR).resolve())
+_THIS_FILE = str(Path(__file__).resolve())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_shape(sql):
+    """``sql`` with parameters, literals and ``IN`` lists collapsed."""
+    shape = _IN_LIST.sub('IN (...)', sql)
+    shape = _LITERAL.sub('?', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+def get_query_budget(view_class, action):
+    """The declared budget of ``view_class`` for ``action``, or None."""
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(action, budget.get('default'))
+    return budget
+
+
+def iter_viewsets(patterns=None):
+    """Yield ``(viewset class, actions)`` for every routed viewset in the URLconf."""
+    from rest_framework.viewsets import ViewSetMixin
+
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_viewsets(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'cls', None)
+            if view_class and issubclass(view_class, ViewSetMixin):
+                yield view_class, set(pattern.callback.actions.values())
+
+
+def view_action(request):
+    """``(view class, action)`` of a resolved request, or ``(None, None)``."""
+    match = getattr(request, 'resolver_match', None)
+    view_class = getattr(match.func, 'cls', None) if match else None
+    if view_class is None:
+        return None, None
+    actions = getattr(match.func, 'actions', None)
+    method = request.method.lower()
+    return view_class, actions.get(method, method) if actions else method
+
+
+def _serializer_field(frame):
+    """``Serializer.field`` being rendered at ``frame``, from the innermost serializer frame."""
+    from rest_framework.serializers import Serializer
+
+    while frame is not None:
+        if frame.f_code.co_name == 'to_representation':
+            owner, field = frame.f_locals.get('self'), frame.f_locals.get('field')
+            if isinstance(owner, Serializer) and field is not None:
+                return f'{type(owner).__name__}.{field.field_name}'
+        frame = frame.f_back
+    return None
+
+
+def _project_stack(frame):
+    frames = [
+        entry for entry in traceback.extract_stack(frame)
+        if entry.filename.startswith(_PROJECT_DIR) and entry.filename != _THIS_FILE
+        and 'site-packages' not in entry.filename
+    ]
+    return frames[-STACK_DEPTH:]
+
+
+class QueryRecord:
+    __slots__ = ('sql', 'shape', 'field', 'stack')
+
+    def __init__(self, sql, field, stack):
+        self.sql = sql
+        self.shape = query_shape(sql)
+        self.field = field
+        self.stack = stack
+
+
+class QueryInspector:
+    """``connection.execute_wrapper`` that records the queries of a block."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        frame = sys._getframe(1)
+        self.queries.append(QueryRecord(sql, _serializer_field(frame), _project_stack(frame)))
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def capture(self):
+        with connection.execute_wrapper(self):
+            yield self
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    def repeated(self, threshold=REPEAT_THRESHOLD):
+        """Query groups sharing a shape at least ``threshold`` times, largest first."""
+        groups = {}
+        for record in self.queries:
+            groups.setdefault(record.shape, []).append(record)
+        return sorted((group for group in groups.values() if len(group) >= threshold), key=len, reverse=True)
+
+    def report(self, budget=None, threshold=REPEAT_THRESHOLD):
+        limit = f' (budget {budget})' if budget is not None else ''
+        lines = [f'{self.count} queries{limit}.']
+        for group in self.repeated(threshold):
+            first = group[0]
+            lines.append(f'\nRepeated {len(group)}x from {first.field or "outside a serializer"}:')
+            lines.append(f'    {first.shape[:300]}')
+            lines.extend('    ' + line for line in ''.join(traceback.format_list(first.stack)).rstrip().splitlines())
+        return '\n'.join(lines)
+
+    def check(self, budget, threshold=REPEAT_THRESHOLD):
+        """Raise ``QueryBudgetExceeded`` when over ``budget`` or when any query shape repeats."""
+        if (budget is not None and self.count > budget) or self.repeated(threshold):
+            raise QueryBudgetExceeded(self.report(budget, threshold))
+
+
+class QueryBudgetTestMixin:
+    """
+    Test-case mixin::
+
+        with self.assertQueryBudget(PlantViewSet, 'list'):
+            self.client.get('/api/plants/')
+
+    fails when the block runs more queries than the viewset declares for the
+    action, or repeats a query shape ``threshold`` times, and prints the
+    offending serializer field and stack.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, view_class, action, budget=None, threshold=REPEAT_THRESHOLD):
+        if budget is None:
+            budget = get_query_budget(view_class, action)
+        if budget is None:
+            self.fail(f'{view_class.__name__} declares no query budget for {action!r}')
+        inspector = QueryInspector()
+        with inspector.capture():
+            yield inspector
+        try:
+            inspector.check(budget, threshold)
+        except QueryBudgetExceeded as exc:
+            self.fail(f'{view_class.__name__}.{action}: {exc}')
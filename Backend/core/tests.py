@@ -0,0 +1,545 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, F, Sum
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.benchmark import QUERY_COUNT_HEADER, ScenarioResult, compare_to_baseline, query_counting_app
+from core.catalog_io import CatalogFormatError, import_records, stream_export
+from core.context import reset_current_request, set_current_request
+from core.datagen import DataGenerator, scaled_volumes
+from core.llm_stub import StubLLMServer, stub_llm_clients
+from core.llm_telemetry import metrics, record_cache_hit, track_llm_call
+from core.query_budget import (QueryBudgetExceeded, QueryBudgetTestMixin, QueryInspector, get_query_budget,
+                               iter_viewsets)
+from core.timing import classify_url, install_hooks, timing_request, uninstall_hooks
+
+
+class StubLLMServerTests(SimpleTestCase):
+
+    def test_llm_modules_are_served_by_the_stub(self):
+        from gardens import llm_chat
+        from plants import ml_models
+
+        original_client = ml_models.client
+        with StubLLMServer(latency_ms=0, jitter_ms=0) as stub, stub_llm_clients(stub.url):
+            response = ml_models.client.models.generate_content(
+                model=ml_models.VISION_MODEL, contents=ml_models.SYSTEM_PROMPT,
+            )
+            self.assertIn('"is_plant": true', response.text)
+            chat = llm_chat.client.chats.create(model=llm_chat.CHAT_MODEL)
+            self.assertTrue(chat.send_message('hello').text)
+        self.assertIs(ml_models.client, original_client)
+        self.assertEqual(sum(stub.calls.values()), 2)
+
+
+class BenchmarkReportTests(TestCase):
+
+    def test_summary_percentiles_and_throughput(self):
+        result = ScenarioResult('plant_list', latencies_ms=list(range(1, 101)), queries=[3] * 100,
+                                errors=2, wall_seconds=4.0)
+        summary = result.summary()
+        self.assertAlmostEqual(summary['p50_ms'], 50.5)
+        self.assertAlmostEqual(summary['p99_ms'], 99.01)
+        self.assertEqual(summary['throughput_rps'], 25.0)
+        self.assertEqual(summary['queries_mean'], 3.0)
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        baseline = {'scenarios': {'plant_list': {'p95_ms': 100.0, 'throughput_rps': 50.0, 'queries_mean': 4.0}}}
+        steady = {'plant_list': {'p95_ms': 110.0, 'throughput_rps': 45.0, 'queries_mean': 4.0}}
+        slower = {'plant_list': {'p95_ms': 150.0, 'throughput_rps': 30.0, 'queries_mean': 20.0}}
+        self.assertEqual(compare_to_baseline(steady, baseline, tolerance=0.2), [])
+        self.assertEqual(len(compare_to_baseline(slower, baseline, tolerance=0.2)), 3)
+
+    def test_query_counting_app_reports_queries_in_header(self):
+        def application(environ, start_response):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.execute('SELECT 2')
+            start_response('200 OK', [])
+            return [b'']
+
+        headers = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            headers.update(response_headers)
+
+        query_counting_app(application)({}, start_response)
+        self.assertEqual(headers[QUERY_COUNT_HEADER], '2')
+
+    def test_existing_db_file_is_refused_without_keepdb(self):
+        with tempfile.NamedTemporaryFile(suffix='.sqlite3') as handle:
+            handle.write(b'not a scratch database')
+            handle.flush()
+            with self.assertRaisesMessage(CommandError, '--keepdb'):
+                call_command('benchmark', '--db', handle.name, stdout=StringIO())
+            self.assertTrue(os.path.exists(handle.name))
+
+
+class DataGeneratorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.volumes = scaled_volumes(0.0004)
+        DataGenerator(cls.volumes, seed=7, chunk_size=250).run()
+
+    def test_generates_requested_volumes(self):
+        from gardens.models import Reminder, UserPlant
+        from plants.models import Plant, PlantComment
+        from users.models import CustomUser
+
+        self.assertEqual(Plant.objects.count(), self.volumes['plants'])
+        self.assertEqual(CustomUser.objects.count(), self.volumes['users'])
+        self.assertEqual(UserPlant.objects.count(), self.volumes['garden_plants'])
+        self.assertEqual(Reminder.objects.count(), self.volumes['reminders'])
+        self.assertFalse(Reminder.objects.exclude(user_id=F('user_plant__user_id')).exists())
+        self.assertFalse(PlantComment.objects.filter(parent__isnull=False).exclude(plant_id=F('parent__plant_id')).exists())
+
+    def test_denormalized_counters_match_rows(self):
+        from gardens.models import UserPlant
+        from plants.models import Plant, PlantFavourite
+
+        totals = Plant.objects.aggregate(gardens=Sum('garden_count'), favourites=Sum('favourite_count'))
+        self.assertEqual(totals['gardens'], UserPlant.objects.count())
+        self.assertEqual(totals['favourites'], PlantFavourite.objects.count())
+        duplicates = UserPlant.objects.values('user_id', 'plant_id').annotate(n=Count('id')).filter(n__gt=1)
+        self.assertFalse(duplicates.exists())
+        self.assertFalse(Plant.objects.filter(light_code__isnull=True).exists())
+
+
+class CatalogExportImportTests(APITestCase):
+
+    def setUp(self):
+        from plants.models import Plant, PlantImage
+
+        self.plant = Plant.objects.create(
+            farsi_name='پوتوس', english_name='Golden Pothos', scientific_name='Epipremnum aureum',
+            description='-', description_en='-', light_requirements_en='low light', garden_count=7,
+        )
+        PlantImage.objects.create(plant=self.plant, image='plant_images/pothos.jpg', is_primary=True)
+
+    def export_records(self, dataset):
+        payload = b''.join(stream_export(dataset, 'jsonl', chunk_size=1)).decode('utf-8')
+        return [json.loads(line) for line in payload.splitlines()]
+
+    def test_round_trip_upserts_on_scientific_name(self):
+        from plants.models import Plant, PlantImage
+
+        records = self.export_records('plants')
+        self.assertEqual(records[0]['images'][0]['image'], 'plant_images/pothos.jpg')
+        records[0]['light_requirements_en'] = 'full sun'
+        records.append({'scientific_name': 'Ficus lyrata', 'farsi_name': 'انجیر', 'description': '-',
+                        'description_en': '-', 'images': []})
+
+        totals = import_records('plants', records)
+        self.assertEqual(totals['upserted'], 2)
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.light_requirements_en, 'full sun')
+        self.assertEqual(self.plant.light_code, 'direct_sun')
+        self.assertEqual(self.plant.garden_count, 7)
+        self.assertEqual(Plant.objects.count(), 2)
+        self.assertEqual(PlantImage.objects.filter(plant=self.plant).count(), 1)
+
+    def test_imports_link_diseases_to_the_plants_they_name(self):
+        from diseases.models import Disease
+
+        import_records('diseases', [{'name': 'Root Rot', 'description': '-',
+                                     'affected_plants_list': 'Golden Pothos, Fiddle Leaf Fig'}])
+        rot = Disease.objects.get(name='Root Rot')
+        self.assertEqual(list(rot.affected_plants.all()), [self.plant])
+
+        import_records('plants', [{'scientific_name': 'Ficus lyrata', 'english_name': 'Fiddle Leaf Fig',
+                                   'farsi_name': 'انجیر', 'description': '-', 'description_en': '-'}])
+        self.assertEqual(sorted(rot.affected_plants.values_list('english_name', flat=True)),
+                         ['Fiddle Leaf Fig', 'Golden Pothos'])
+
+    def test_disease_import_reports_name_fa_collisions(self):
+        from diseases.models import Disease
+
+        Disease.objects.create(name='Rust', name_fa='زنگ', description='-', symptoms='-', solution='-')
+        records = [{'name': 'Leaf Rust', 'name_fa': 'زنگ', 'description': '-', 'symptoms': '-', 'solution': '-'}]
+        with self.assertRaisesMessage(CatalogFormatError, "already belongs to 'Rust'"):
+            import_records('diseases', records)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False, encoding='utf-8') as handle:
+            handle.write(json.dumps(records[0], ensure_ascii=False) + '\n')
+        self.addCleanup(os.remove, handle.name)
+        with self.assertRaises(CommandError):
+            call_command('import_catalog', 'diseases', handle.name, stdout=StringIO())
+        self.assertFalse(Disease.objects.filter(name='Leaf Rust').exists())
+
+    def test_parquet_round_trip(self):
+        from plants.models import Plant
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.skipTest('pyarrow is not installed')
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        call_command('export_catalog', 'plants', '--format', 'parquet', '--output-dir', output_dir, stdout=StringIO())
+        Plant.objects.filter(pk=self.plant.pk).update(light_requirements_en='full sun')
+
+        call_command('import_catalog', 'plants', os.path.join(output_dir, 'plants.parquet'), stdout=StringIO())
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.light_requirements_en, 'low light')
+        self.assertEqual(Plant.objects.count(), 1)
+
+    def test_export_endpoint_is_admin_only(self):
+        url = reverse('catalog-export', kwargs={'dataset': 'plants', 'file_format': 'jsonl'})
+        user = get_user_model().objects.create_user(username='member', password='pw')
+        self.client.force_authenticate(user=user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        user.is_staff = True
+        user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(json.loads(lines[0])['scientific_name'], 'Epipremnum aureum')
+
+
+class CatalogBundleTests(APITestCase):
+
+    def setUp(self):
+        from diseases.models import Disease
+        from plants.models import Plant, PlantImage
+
+        self.pothos = Plant.objects.create(farsi_name='پوتوس', english_name='Golden Pothos',
+                                           scientific_name='Epipremnum aureum', description='-',
+                                           description_en='-', light_requirements_en='low light')
+        self.fern = Plant.objects.create(farsi_name='سرخس', english_name='Boston Fern',
+                                         scientific_name='Nephrolepis exaltata', description='-', description_en='-')
+        PlantImage.objects.create(plant=self.pothos, image='plant_images/pothos.jpg', is_primary=True)
+        self.rust = Disease.objects.create(name='Rust', description='-', symptoms='-', solution='-')
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Plant.objects.update(updated_at=an_hour_ago)
+        Disease.objects.update(updated_at=an_hour_ago + timedelta(minutes=30))
+        self.url = reverse('catalog-bundle')
+
+    def get_bundle(self, **params):
+        response = self.client.get(self.url, params, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        return response, json.loads(gzip.decompress(response.content))
+
+    def test_full_bundle_is_compact_and_cacheable(self):
+        response, bundle = self.get_bundle()
+        self.assertTrue(bundle['full'])
+        plants = [dict(zip(bundle['plants']['columns'], row)) for row in bundle['plants']['rows']]
+        self.assertEqual(plants[0]['scientific_name'], 'Epipremnum aureum')
+        self.assertEqual(plants[0]['light_code'], 'low_light')
+        self.assertTrue(plants[0]['image'].endswith('plant_images/pothos.jpg'))
+        self.assertIn('low_light', bundle['labels']['light'])
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_delta_returns_changes_and_tombstones_since_version(self):
+        _, bundle = self.get_bundle()
+        self.fern.light_requirements_en = 'bright indirect light'
+        self.fern.save()
+        rust_id = self.rust.pk
+        self.rust.delete()
+
+        _, delta = self.get_bundle(since=bundle['version'])
+        self.assertFalse(delta['full'])
+        self.assertEqual([row[0] for row in delta['plants']['rows']], [self.fern.pk])
+        self.assertEqual(delta['diseases']['rows'], [])
+        self.assertEqual(delta['deleted'], {'plants': [], 'diseases': [rust_id]})
+        self.assertGreater(delta['version'], bundle['version'])
+
+    def test_bundle_leaves_out_counters(self):
+        _, bundle = self.get_bundle()
+        self.assertNotIn('view_count', bundle['plants']['columns'])
+
+    def test_old_tombstones_are_pruned_and_stale_clients_get_a_full_bundle(self):
+        from core.catalog_bundle import TOMBSTONE_RETENTION, _to_version
+        from core.models import CatalogTombstone
+
+        long_ago = timezone.now() - TOMBSTONE_RETENTION - timedelta(days=1)
+        CatalogTombstone.objects.create(kind='plant', object_id=999)
+        CatalogTombstone.objects.update(deleted_at=long_ago)
+        fern_id = self.fern.pk
+        self.fern.delete()
+        self.assertEqual(list(CatalogTombstone.objects.values_list('object_id', flat=True)), [fern_id])
+
+        _, bundle = self.get_bundle(since=_to_version(long_ago))
+        self.assertTrue(bundle['full'])
+
+
+class ServerTimingTests(APITestCase):
+
+    def setUp(self):
+        from plants.models import Plant
+
+        Plant.objects.create(farsi_name='پوتوس', scientific_name='Epipremnum aureum', description='-', description_en='-')
+        self.addCleanup(uninstall_hooks)
+
+    @override_settings(SERVER_TIMING_ENABLED=True, SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_header_breaks_down_sampled_request(self):
+        response = self.client.get('/api/plants/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        header = response['Server-Timing']
+        for span in ('db;dur=', 'serialize;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(span, header)
+
+    def test_disabled_middleware_adds_nothing(self):
+        response = self.client.get('/api/plants/')
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(SERVER_TIMING_LLM_HOSTS=('127.0.0.1',))
+    def test_outbound_llm_calls_are_classified_by_host(self):
+        from gardens import llm_chat
+
+        self.assertEqual(classify_url('https://exp.host/--/api/v2/push/send'), 'push')
+        self.assertEqual(classify_url('https://oauth2.googleapis.com/token'), 'http')
+        install_hooks()
+        with StubLLMServer(latency_ms=0, jitter_ms=0) as stub, stub_llm_clients(stub.url), \
+                timing_request() as timings:
+            llm_chat.client.chats.create(model=llm_chat.CHAT_MODEL).send_message('hello')
+        self.assertEqual(timings.spans['llm'][0], 1)
+
+    def test_nested_serializer_data_is_timed_once_and_hooks_uninstall(self):
+        from rest_framework import serializers
+
+        original = serializers.Serializer.__dict__['data']
+
+        class InnerSerializer(serializers.Serializer):
+            name = serializers.CharField()
+
+        class OuterSerializer(serializers.Serializer):
+            inner = serializers.SerializerMethodField()
+
+            def get_inner(self, obj):
+                return InnerSerializer(obj).data
+
+        install_hooks()
+        with timing_request() as timings:
+            OuterSerializer({'name': 'fern'}).data
+        self.assertEqual(timings.spans['serialize'][0], 1)
+
+        uninstall_hooks()
+        self.assertIs(serializers.Serializer.__dict__['data'], original)
+
+
+class LLMTelemetryTests(APITestCase):
+
+    def setUp(self):
+        metrics.reset()
+        self.user = get_user_model().objects.create_user(username='grower', password='pass12345')
+
+    def test_call_records_tokens_metrics_and_daily_rollup(self):
+        from core.models import LLMUsageDaily
+        from gardens import llm_chat
+
+        request = RequestFactory().get('/')
+        request.user = self.user
+        token = set_current_request(request)
+        try:
+            with StubLLMServer(latency_ms=0, jitter_ms=0) as stub, stub_llm_clients(stub.url):
+                with track_llm_call('garden_chat', llm_chat.CHAT_MODEL) as call:
+                    call.record(llm_chat.client.chats.create(model=llm_chat.CHAT_MODEL).send_message('hello'))
+            record_cache_hit('garden_chat', llm_chat.CHAT_MODEL)
+            with self.assertRaises(RuntimeError), track_llm_call('garden_chat', llm_chat.CHAT_MODEL):
+                raise RuntimeError('provider down')
+        finally:
+            reset_current_request(token)
+
+        self.assertGreater(call.prompt_tokens, 0)
+        self.assertGreater(call.completion_tokens, 0)
+        series = metrics.snapshot()[('garden_chat', llm_chat.CHAT_MODEL)]
+        self.assertEqual((series.calls, series.errors, series.cache_hits), (2, 1, 1))
+        row = LLMUsageDaily.objects.get(user=self.user, feature='garden_chat')
+        self.assertEqual((row.calls, row.errors, row.cache_hits), (2, 1, 1))
+        self.assertEqual(row.prompt_tokens, call.prompt_tokens)
+        self.assertGreater(row.cost_usd, 0)
+
+    def test_rollup_row_created_concurrently_is_incremented_not_duplicated(self):
+        from django.db import IntegrityError, transaction
+        from django.db.models import QuerySet
+
+        from core.llm_telemetry import _add_usage
+        from core.models import LLMUsageDaily
+
+        today = timezone.localdate()
+        LLMUsageDaily.objects.create(date=today, user=None, feature='garden_chat', model='m', calls=1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            LLMUsageDaily.objects.create(date=today, user=None, feature='garden_chat', model='m')
+
+        real_update = QuerySet.update
+        misses = iter([True])
+
+        def update(queryset, **kwargs):
+            # the first update runs before the other process's insert lands
+            return 0 if next(misses, False) else real_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', update):
+            _add_usage(today, None, 'garden_chat', 'm', calls=2)
+        self.assertEqual(list(LLMUsageDaily.objects.values_list('calls', flat=True)), [3])
+
+    @override_settings(METRICS_TOKEN='scrape-me')
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        with track_llm_call('plant_lookup', 'gemini-3.1-flash-lite'):
+            pass
+        url = reverse('llm-metrics')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(url, HTTP_X_METRICS_TOKEN='scrape-me')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE llm_latency_seconds histogram', body)
+        self.assertIn('llm_calls_total{feature="plant_lookup",model="gemini-3.1-flash-lite"} 1', body)
+        self.assertIn('llm_latency_seconds_bucket{feature="plant_lookup",model="gemini-3.1-flash-lite",le="+Inf"} 1',
+                      body)
+
+    def test_cost_report_groups_rollup_rows(self):
+        from core.models import LLMUsageDaily
+
+        today = timezone.localdate()
+        LLMUsageDaily.objects.create(date=today, user=self.user, feature='garden_chat', model='m', calls=3,
+                                     cost_usd='0.250000')
+        LLMUsageDaily.objects.create(date=today, user=None, feature='garden_chat', model='m', calls=1,
+                                     cost_usd='0.050000')
+        LLMUsageDaily.objects.create(date=today - timedelta(days=40), feature='garden_chat', model='m', calls=9,
+                                     cost_usd='9')
+        out = StringIO()
+        call_command('llm_cost_report', '--by', 'user', stdout=out)
+        report = out.getvalue()
+        self.assertIn('grower', report)
+        self.assertIn('anonymous', report)
+        self.assertIn('Total estimated cost: $0.3000', report)
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+
+    def setUp(self):
+        from blog.models import Comment, Post
+        from gardens.models import GrowthRecord, Reminder, UserPlant
+        from plants.models import Plant, PlantComment, PlantFavourite, PlantImage
+
+        self.user = get_user_model().objects.create_user(username='grower', password='pass12345')
+        for i in range(6):
+            plant = Plant.objects.create(farsi_name=f'گیاه {i}', scientific_name=f'Planta {i}',
+                                         description='-', description_en='-')
+            PlantImage.objects.create(plant=plant, image=f'plant_images/{i}.jpg', is_primary=True)
+            PlantFavourite.objects.create(user=self.user, plant=plant)
+            comment = PlantComment.objects.create(user=self.user, plant=plant, content='?', is_approved=True)
+            PlantComment.objects.create(user=self.user, plant=plant, parent=comment, content='!', is_approved=True)
+            user_plant = UserPlant.objects.create(user=self.user, plant=plant)
+            Reminder.objects.create(user=self.user, user_plant=user_plant, title='water', care_type='watering',
+                                    scheduled_date=timezone.now())
+            GrowthRecord.objects.create(user_plant=user_plant, date=timezone.now())
+            post = Post.objects.create(title=f'post {i}', slug=f'post-{i}', author=self.user, content='-',
+                                       status=Post.Status.PUBLISHED)
+            post.tags.add('care')
+            Comment.objects.create(post=post, author=self.user, content='-')
+        self.plant = plant
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_every_viewset_declares_a_budget(self):
+        missing = [
+            f'{view_class.__name__}.{action}'
+            for view_class, actions in iter_viewsets() for action in sorted(actions)
+            if get_query_budget(view_class, action) is None
+        ]
+        self.assertEqual(missing, [])
+
+    def test_read_endpoints_stay_within_budget(self):
+        from blog.views import PostViewSet
+        from diseases.models import Disease
+        from diseases.views import DiseaseViewSet
+        from gardens.views import UserPlantViewSet
+        from plants.views import PlantCommentViewSet, PlantViewSet
+
+        disease = Disease.objects.create(name='Leaf Spot', description='-', symptoms='-', solution='-',
+                                         affected_plants_list=', '.join(f'Planta {i}' for i in range(6)))
+        endpoints = [
+            (DiseaseViewSet, 'retrieve', f'/api/diseases/{disease.pk}/'),
+            (PlantViewSet, 'list', '/api/plants/'),
+            (PlantViewSet, 'retrieve', f'/api/plants/{self.plant.pk}/'),
+            (PlantViewSet, 'related', f'/api/plants/{self.plant.pk}/related/'),
+            (PlantCommentViewSet, 'list', f'/api/plants/{self.plant.pk}/comments/'),
+            (UserPlantViewSet, 'list', '/api/my-garden/'),
+            (PostViewSet, 'list', '/api/blog/posts/'),
+            (PostViewSet, 'retrieve', '/api/blog/posts/post-0/'),
+        ]
+        for view_class, action, url in endpoints:
+            with self.subTest(url=url), self.assertQueryBudget(view_class, action):
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_repeated_queries_name_the_serializer_field(self):
+        from plants.models import Plant
+        from plants.serializers import PlantSerializer
+
+        inspector = QueryInspector()
+        with inspector.capture():
+            PlantSerializer(Plant.objects.all(), many=True).data
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            inspector.check(budget=None)
+        self.assertIn('Repeated 6x from PlantSerializer.primary_image', str(raised.exception))
+        self.assertIn('plants/serializers.py', str(raised.exception))
+
+
+class CommentTreeTests(APITestCase):
+
+    def setUp(self):
+        from plants.models import Plant, PlantComment
+
+        self.user = get_user_model().objects.create_user(username='commenter', password='pass12345')
+        self.plant = Plant.objects.create(farsi_name='پوتوس', scientific_name='Epipremnum aureum',
+                                          description='-', description_en='-')
+        self.roots = []
+        for i in range(3):
+            parent = root = PlantComment.objects.create(user=self.user, plant=self.plant, content=f'root {i}')
+            for depth in range(4):
+                parent = PlantComment.objects.create(user=self.user, plant=self.plant, parent=parent,
+                                                     content=f'reply {i}.{depth}')
+            self.roots.append(root)
+
+    def test_page_of_threads_loads_in_two_queries(self):
+        url = f'/api/plants/{self.plant.pk}/comments/'
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'page_size': 2})
+        self.assertEqual([comment['content'] for comment in response.data['results']], ['root 0', 'root 1'])
+        node, depth = response.data['results'][1], 0
+        while node['replies']:
+            node, depth = node['replies'][0], depth + 1
+        self.assertEqual((depth, node['content']), (4, 'reply 1.3'))
+
+        second = self.client.get(response.data['next'])
+        self.assertEqual([comment['content'] for comment in second.data['results']], ['root 2'])
+        self.assertIsNone(second.data['next'])
+
+    def test_unapproved_reply_hides_its_subtree(self):
+        from plants.models import PlantComment
+
+        PlantComment.objects.filter(content='reply 0.1').update(is_approved=False)
+        response = self.client.get(f'/api/plants/{self.plant.pk}/comments/')
+        first_reply = response.data['results'][0]['replies'][0]
+        self.assertEqual(first_reply['content'], 'reply 0.0')
+        self.assertEqual(first_reply['replies'], [])
+
+    def test_blog_comments_are_cursor_paginated_newest_first(self):
+        from blog.models import Comment, Post
+
+        post = Post.objects.create(title='care', slug='care', author=self.user, content='-',
+                                   status=Post.Status.PUBLISHED)
+        for i in range(3):
+            Comment.objects.create(post=post, author=self.user, content=f'comment {i}')
+        response = self.client.get('/api/blog/posts/care/comments/', {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
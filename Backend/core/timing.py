@@ -0,0 +1,183 @@
+"""
+Per-request time breakdown.
+
+A ``RequestTimings`` is bound to a context variable for the duration of a
+sampled request (see ``core.middleware.ServerTimingMiddleware``).  Database
+queries, DRF serialization and rendering, and outbound HTTP calls report into
+it; outbound calls are classified as ``llm``, ``push`` or ``http`` by host.
+
+The hooks are installed once, and only when timing is enabled; tests undo
+them with ``uninstall_hooks``.  Outside a sampled request each hook costs one
+context-variable lookup.  Spans of the same name do not nest: a serializer
+whose method field renders another serializer's ``data`` is timed once.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+DEFAULT_LLM_HOSTS = (
+    'generativelanguage.googleapis.com',
+    'api.avalai.ir',
+    'api.gapgpt.app',
+    'openrouter.ai',
+    'api.openai.com',
+)
+DEFAULT_PUSH_HOSTS = ('exp.host',)
+
+_current = ContextVar('request_timings', default=None)
+_open_spans = ContextVar('open_timing_spans', default=frozenset())
+_install_lock = threading.Lock()
+_originals = []
+
+
+class RequestTimings:
+    """Counts and total milliseconds per category for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, duration_ms):
+        with self._lock:
+            count, total = self.spans.get(name, (0, 0.0))
+            self.spans[name] = (count + 1, total + duration_ms)
+
+    @property
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def header(self, total_ms):
+        """The ``Server-Timing`` header value."""
+        parts = [
+            f'{name};dur={total:.1f};desc="{count} call{"s" if count != 1 else ""}"'
+            for name, (count, total) in sorted(self.spans.items())
+        ]
+        parts.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(parts)
+
+    def as_dict(self):
+        return {name: {'count': count, 'ms': round(total, 1)} for name, (count, total) in sorted(self.spans.items())}
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def timing_request():
+    """Collect timings for the enclosed block; yields the ``RequestTimings``."""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """Record the enclosed block under ``name`` when a sampled request is being timed.
+
+    Only the outermost of nested blocks with the same name is recorded.
+    """
+    timings = _current.get()
+    open_spans = _open_spans.get()
+    if timings is None or name in open_spans:
+        yield
+        return
+    token = _open_spans.set(open_spans | {name})
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - started) * 1000)
+        _open_spans.reset(token)
+
+
+def db_timer(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', (time.perf_counter() - started) * 1000)
+
+
+def classify_url(url):
+    host = (urlsplit(str(url)).hostname or '').lower()
+    llm_hosts = getattr(settings, 'SERVER_TIMING_LLM_HOSTS', DEFAULT_LLM_HOSTS)
+    push_hosts = getattr(settings, 'SERVER_TIMING_PUSH_HOSTS', DEFAULT_PUSH_HOSTS)
+    if any(host == known or host.endswith('.' + known) for known in llm_hosts):
+        return 'llm'
+    if any(host == known or host.endswith('.' + known) for known in push_hosts):
+        return 'push'
+    return 'http'
+
+
+def _wrap_send(original, url_of):
+    def send(self, request, *args, **kwargs):
+        if _current.get() is None:
+            return original(self, request, *args, **kwargs)
+        with timed(classify_url(url_of(request))):
+            return original(self, request, *args, **kwargs)
+    send.__wrapped__ = original
+    return send
+
+
+def _wrap_property(prop, name):
+    def getter(self):
+        with timed(name):
+            return prop.fget(self)
+    return property(getter)
+
+
+def _wrap_method(original, name):
+    def method(self, *args, **kwargs):
+        with timed(name):
+            return original(self, *args, **kwargs)
+    method.__wrapped__ = original
+    return method
+
+
+def _patch(owner, attr, wrap, *args):
+    original = owner.__dict__[attr]
+    _originals.append((owner, attr, original))
+    setattr(owner, attr, wrap(original, *args))
+
+
+def install_hooks():
+    """Patch serializers, renderers and HTTP clients once per process."""
+    with _install_lock:
+        if _originals:
+            return
+        from rest_framework import renderers, serializers
+
+        _patch(serializers.Serializer, 'data', _wrap_property, 'serialize')
+        _patch(serializers.ListSerializer, 'data', _wrap_property, 'serialize')
+        _patch(renderers.JSONRenderer, 'render', _wrap_method, 'render')
+
+        import requests
+        _patch(requests.Session, 'send', _wrap_send, lambda request: request.url)
+        try:
+            import httpx
+        except ImportError:
+            pass
+        else:
+            # Used by both the Gemini and OpenAI SDKs
+            _patch(httpx.Client, 'send', _wrap_send, lambda request: request.url)
+
+
+def uninstall_hooks():
+    """Restore everything ``install_hooks`` patched."""
+    with _install_lock:
+        while _originals:
+            owner, attr, original = _originals.pop()
+            setattr(owner, attr, original)
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import CatalogBundleView, CatalogExportView
+
+urlpatterns = [
+    path('bundle/', CatalogBundleView.as_view(), name='catalog-bundle'),
+    path('export/<slug:dataset>.<slug:file_format>', CatalogExportView.as_view(), name='catalog-export'),
+]
@@ -0,0 +1,89 @@
+import gzip
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .catalog_bundle import current_version, get_bundle_bytes, tombstone_cutoff
+from .catalog_io import CONTENT_TYPES, DEFAULT_CHUNK_SIZE, CatalogFormatError, ParquetUnavailable, stream_export
+from .llm_telemetry import metrics
+
+MAX_CHUNK_SIZE = 10000
+
+
+class CatalogExportView(APIView):
+    """Admin-only streaming export: GET /api/catalog/export/<dataset>.<jsonl|parquet>"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, dataset, file_format):
+        try:
+            chunk_size = min(int(request.query_params.get('chunk_size', DEFAULT_CHUNK_SIZE)), MAX_CHUNK_SIZE)
+        except ValueError:
+            return Response({'error': 'chunk_size must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            chunks = stream_export(dataset, file_format, max(chunk_size, 1))
+        except ParquetUnavailable as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        except CatalogFormatError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.{file_format}"'
+        return response
+
+
+class CatalogBundleView(APIView):
+    """
+    Offline catalog for the mobile app: GET /api/catalog/bundle/ for the full
+    bundle, ``?since=<version>`` for the rows changed and deleted since then.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return Response({'error': 'since must be a bundle version'}, status=status.HTTP_400_BAD_REQUEST)
+
+        version = current_version()
+        if since is not None and since > version:
+            since = None            # unknown future version, e.g. after a database restore
+        elif since is not None and since < tombstone_cutoff():
+            since = None            # deletions that old may have been pruned
+        etag = f'"catalog-{version}-{since if since is not None else "full"}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            version, data = get_bundle_bytes(since)
+            etag = f'"catalog-{version}-{since if since is not None else "full"}"'
+            if 'gzip' in request.headers.get('Accept-Encoding', ''):
+                response = HttpResponse(data, content_type='application/json')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(gzip.decompress(data), content_type='application/json')
+        response['ETag'] = etag
+        response['X-Catalog-Version'] = str(version)
+        response['Cache-Control'] = 'public, max-age=300'
+        response['Vary'] = 'Accept-Encoding'
+        return response
+
+
+
+class LLMMetricsView(APIView):
+    """
+    LLM call metrics in the Prometheus text format: GET /api/metrics/llm/.
+    Staff users, or scrapers sending ``X-Metrics-Token: <METRICS_TOKEN>``.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        supplied = request.headers.get('X-Metrics-Token', '')
+        if not (request.user.is_staff or (token and constant_time_compare(supplied, token))):
+            return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+        return HttpResponse(metrics.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,12 +1,20 @@
 # diseases/admin.py
 from django.contrib import admin
-from .models import Disease, DiseaseComment
+from .models import Disease, DiseaseAnalysis, DiseaseComment
 
 @admin.register(Disease)
 class DiseaseAdmin(admin.ModelAdmin):
     list_display = ['name', 'name_fa', 'severity_level', 'spread_rate', 'affected_plants_list']
     search_fields = ['name', 'name_fa']
     list_filter = ['severity_level', 'spread_rate']
+    # resolved from affected_plants_list on save
+    readonly_fields = ['affected_plants']
+
+@admin.register(DiseaseAnalysis)
+class DiseaseAnalysisAdmin(admin.ModelAdmin):
+    list_display = ['name_key', 'disease', 'prompt_version', 'model', 'generated_at']
+    search_fields = ['name_key']
+    list_filter = ['prompt_version', 'model']
 
 @admin.register(DiseaseComment)
 class DiseaseCommentAdmin(admin.ModelAdmin):
@@ -0,0 +1,83 @@
+"""
+Resolution of a disease's ``affected_plants_list`` text into ``affected_plants`` links.
+
+The list is free text ("Rose, Cucumber، گوجه‌فرنگی"), so each name is matched
+case-insensitively against the plants' English, Persian and scientific names.
+Names that match no plant are left in the text only.
+
+Links are kept current from both sides: a disease is relinked when its list
+changes, a plant when it is created or renamed.  Bulk loads that bypass the
+signals (catalog import, data generation) call ``relink_diseases``, and the
+``link_affected_plants`` management command backfills everything.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+
+_SEPARATORS = re.compile(r'[,،;؛\n]+')
+
+# Plant columns an affected_plants_list name can match
+PLANT_NAME_FIELDS = frozenset({'english_name', 'farsi_name', 'scientific_name'})
+
+
+def parse_plant_names(text):
+    names = (name.strip() for name in _SEPARATORS.split(text or ''))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def resolve_plant_ids(names, plant_model=None):
+    """Ids of the plants named in ``names``; ``plant_model`` lets migrations pass the historical model."""
+    if plant_model is None:
+        from plants.models import Plant as plant_model
+    if not names:
+        return []
+    match = reduce(or_, (Q(english_name__iexact=name) | Q(farsi_name=name) | Q(scientific_name__iexact=name)
+                         for name in names))
+    return list(plant_model.objects.filter(match).values_list('id', flat=True))
+
+
+def link_affected_plants(disease):
+    disease.affected_plants.set(resolve_plant_ids(parse_plant_names(disease.affected_plants_list)))
+
+
+def relink_diseases(diseases=None):
+    """Rebuild the links of ``diseases`` (a queryset; all diseases by default). Returns the number of links."""
+    from .models import Disease
+
+    if diseases is None:
+        diseases = Disease.objects.all()
+    Link = Disease.affected_plants.through
+    disease_ids, links = [], []
+    for disease_id, text in diseases.values_list('id', 'affected_plants_list'):
+        disease_ids.append(disease_id)
+        links.extend(Link(disease_id=disease_id, plant_id=plant_id)
+                     for plant_id in resolve_plant_ids(parse_plant_names(text)))
+    with transaction.atomic():
+        Link.objects.filter(disease_id__in=disease_ids).delete()
+        Link.objects.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+    return len(links)
+
+
+def _names_plant(names, plant):
+    """Whether one of ``names`` matches ``plant`` the way ``resolve_plant_ids`` would."""
+    folded = {name.casefold() for name in names}
+    return (plant.farsi_name in names
+            or any(name and name.casefold() in folded for name in (plant.english_name, plant.scientific_name)))
+
+
+def link_plant(plant):
+    """Link ``plant`` to exactly the diseases whose ``affected_plants_list`` names it."""
+    from .models import Disease
+
+    names = [name for name in (plant.english_name, plant.farsi_name, plant.scientific_name) if name]
+    if not names:
+        plant.diseases.clear()
+        return
+    mentions = reduce(or_, (Q(affected_plants_list__icontains=name) for name in names))
+    plant.diseases.set([
+        disease_id for disease_id, text in Disease.objects.filter(mentions).values_list('id', 'affected_plants_list')
+        if _names_plant(parse_plant_names(text), plant)
+    ])
@@ -0,0 +1,209 @@
+"""
+In-memory alias index for matching disease names from the vision model.
+
+Every disease is indexed under its ``name``, ``name_fa`` and ``aliases``
+(synonyms reported by the LLM and vision labels it was created from).
+Aliases are normalized for case, punctuation, diacritics and Persian/Arabic
+letter variants.  A lookup tries an exact alias first, then scores the
+candidates that share trigrams with the label by trigram overlap, containment
+and edit distance.
+
+The index holds only ids and short strings.  It is loaded on first use,
+updated by the ``Disease`` save/delete signals, and reloaded when another
+process has changed the table (checked at most every RELOAD_CHECK_SECONDS).
+"""
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, namedtuple
+
+MIN_SCORE = 0.6
+CANDIDATES = 20                  # aliases sharing the most trigrams with the label that get scored
+EDIT_MIN_DICE = 0.3              # below this trigram overlap an edit-distance match is not worth checking
+RELOAD_CHECK_SECONDS = 60
+
+AliasMatch = namedtuple('AliasMatch', 'disease_id alias score')
+
+_PERSIAN_VARIANTS = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی', 'ك': 'ک', 'ة': 'ه', 'ۀ': 'ه', 'ؤ': 'و',
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    '‌': ' ', '‍': '', 'ـ': '',       # ZWNJ, ZWJ, tatweel
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+})
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize(text):
+    """Lowercase, strip diacritics and punctuation, and unify Persian letter variants."""
+    text = unicodedata.normalize('NFKC', text or '').translate(_PERSIAN_VARIANTS).lower()
+    text = ''.join(char for char in unicodedata.normalize('NFD', text) if not unicodedata.combining(char))
+    return _NON_WORD.sub(' ', text).strip()
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit=None):
+    """Levenshtein distance, or ``limit + 1`` as soon as it is known to exceed ``limit``."""
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def split_aliases(text):
+    return [alias.strip() for alias in (text or '').splitlines() if alias.strip()]
+
+
+def merge_aliases(existing, names, exclude=()):
+    """``existing`` aliases text plus any of ``names`` not already covered, one per line."""
+    aliases = split_aliases(existing)
+    seen = {normalize(name) for name in [*aliases, *exclude] if name}
+    for name in names:
+        if isinstance(name, str) and normalize(name) and normalize(name) not in seen:
+            seen.add(normalize(name))
+            aliases.append(name.strip())
+    return '\n'.join(aliases)
+
+
+class AliasIndex:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._aliases = {}           # normalized alias -> set of disease ids
+        self._by_disease = {}        # disease id -> set of normalized aliases
+        self._trigrams = {}          # trigram -> set of normalized aliases
+        self._loaded = False
+        self._version = None
+        self._checked_at = 0.0
+
+    # ---- maintenance ----
+    def _add(self, disease_id, names):
+        for name in names:
+            alias = normalize(name)
+            if not alias:
+                continue
+            self._aliases.setdefault(alias, set()).add(disease_id)
+            self._by_disease.setdefault(disease_id, set()).add(alias)
+            for gram in trigrams(alias):
+                self._trigrams.setdefault(gram, set()).add(alias)
+
+    def _remove(self, disease_id):
+        for alias in self._by_disease.pop(disease_id, ()):
+            ids = self._aliases.get(alias)
+            ids.discard(disease_id)
+            if not ids:
+                del self._aliases[alias]
+                for gram in trigrams(alias):
+                    self._trigrams[gram].discard(alias)
+
+    @staticmethod
+    def _db_version():
+        from django.db.models import Count, Max
+
+        from .models import Disease
+
+        stats = Disease.objects.aggregate(latest=Max('updated_at'), count=Count('id'))
+        return stats['latest'], stats['count']
+
+    def load(self):
+        from .models import Disease
+
+        with self._lock:
+            self._aliases, self._by_disease, self._trigrams = {}, {}, {}
+            for disease_id, name, name_fa, aliases in Disease.objects.values_list('id', 'name', 'name_fa', 'aliases'):
+                self._add(disease_id, [name, name_fa, *split_aliases(aliases)])
+            self._version = self._db_version()
+            self._checked_at = time.monotonic()
+            self._loaded = True
+
+    def update(self, disease):
+        with self._lock:
+            if not self._loaded:
+                return
+            self._remove(disease.pk)
+            self._add(disease.pk, [disease.name, disease.name_fa, *split_aliases(disease.aliases)])
+            self._version = None          # force a cheap re-check for changes from other processes
+
+    def remove(self, disease_id):
+        with self._lock:
+            if self._loaded:
+                self._remove(disease_id)
+                self._version = None
+
+    def clear(self):
+        with self._lock:
+            self._aliases, self._by_disease, self._trigrams = {}, {}, {}
+            self._loaded = False
+
+    def _ensure_fresh(self):
+        if not self._loaded:
+            self.load()
+            return
+        if time.monotonic() - self._checked_at < RELOAD_CHECK_SECONDS:
+            return
+        version = self._db_version()
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if self._version is None:
+                self._version = version
+                return
+        if version != self._version:
+            self.load()
+
+    # ---- lookup ----
+    def lookup(self, label, limit=5, min_score=MIN_SCORE):
+        """Best ``AliasMatch``es for ``label``, highest score first."""
+        query = normalize(label)
+        if not query:
+            return []
+        self._ensure_fresh()
+        with self._lock:
+            exact = self._aliases.get(query)
+            if exact:
+                return [AliasMatch(disease_id, query, 1.0) for disease_id in sorted(exact)][:limit]
+
+            query_grams = trigrams(query)
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self._trigrams.get(gram, ()))
+            best = {}
+            for alias, overlap in shared.most_common(CANDIDATES):
+                dice = 2 * overlap / (len(query_grams) + len(trigrams(alias)))
+                longer = max(len(alias), len(query))
+                score = dice
+                if dice >= EDIT_MIN_DICE:
+                    # only distances that could beat both the dice score and the threshold matter
+                    max_edits = int(longer * (1 - max(dice, min_score)))
+                    score = max(dice, 1 - edit_distance(alias, query, max_edits) / longer)
+                if alias in query or query in alias:
+                    # "powdery mildew" in "powdery mildew on cucumber": strong but not exact
+                    score = max(score, 0.75 + 0.2 * min(len(alias), len(query)) / longer)
+                if score < min_score:
+                    continue
+                for disease_id in self._aliases[alias]:
+                    if score > best.get(disease_id, (0,))[0]:
+                        best[disease_id] = (score, alias)
+        matches = [AliasMatch(disease_id, alias, round(score, 3)) for disease_id, (score, alias) in best.items()]
+        matches.sort(key=lambda match: (-match.score, match.disease_id))
+        return matches[:limit]
+
+    def best(self, label, min_score=MIN_SCORE):
+        matches = self.lookup(label, limit=1, min_score=min_score)
+        return matches[0] if matches else None
+
+
+alias_index = AliasIndex()
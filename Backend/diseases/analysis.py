@@ -0,0 +1,124 @@
+"""
+Stored LLM analyses for disease names.
+
+An analysis is generated the first time a name is asked for and then served
+from ``DiseaseAnalysis`` to every user.  An analysis made by an older prompt
+version or model, or older than DISEASE_ANALYSIS_MAX_AGE_DAYS, is still
+served, and a single background refresh is started for it.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .alias_index import alias_index, normalize
+from .diagnosis import run_in_background
+from .llm_diseas import DISEASE_MODEL, DISEASE_PROMPT_VERSION, get_disease_details_from_llm
+from .models import Disease, DiseaseAnalysis
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_DAYS = 90
+REFRESH_CLAIM_TIMEOUT = timedelta(minutes=10)   # a refresh that has not finished by then may be retried
+
+
+def analysis_key(name):
+    return normalize(name)[:255]
+
+
+def is_stale(analysis):
+    max_age = timedelta(days=getattr(settings, 'DISEASE_ANALYSIS_MAX_AGE_DAYS', DEFAULT_MAX_AGE_DAYS))
+    return (analysis.prompt_version != DISEASE_PROMPT_VERSION
+            or analysis.model != DISEASE_MODEL
+            or analysis.generated_at < timezone.now() - max_age)
+
+
+def store_analysis(key, data, disease=None):
+    analysis, _ = DiseaseAnalysis.objects.update_or_create(name_key=key, defaults={
+        'disease': disease,
+        'data': data,
+        'prompt_version': DISEASE_PROMPT_VERSION,
+        'model': DISEASE_MODEL,
+        'generated_at': timezone.now(),
+        'refresh_started_at': None,
+    })
+    return analysis
+
+
+def _resolve(name, disease=None):
+    """``(key, disease)`` for ``name``: a name that is exactly a known alias is keyed by its disease."""
+    if disease is None:
+        match = alias_index.best(name, min_score=1.0)
+        if match:
+            disease = Disease.objects.filter(pk=match.disease_id).first()
+    return analysis_key(disease.name if disease else name), disease
+
+
+def _stored(key):
+    analysis = DiseaseAnalysis.objects.filter(name_key=key).first()
+    if analysis is None:
+        return None
+    if is_stale(analysis):
+        schedule_refresh(analysis)
+    return analysis.data
+
+
+def stored_analysis(name, disease=None):
+    """The stored analysis for ``name``, or None; unlike ``get_analysis`` this never calls the LLM."""
+    key, _ = _resolve(name, disease)
+    return _stored(key) if key else None
+
+
+def get_analysis(name, disease=None):
+    """
+    The analysis for ``name`` (or ``disease``): served from storage when there
+    is one, otherwise generated and stored.  None when generation fails.
+    """
+    key, disease = _resolve(name, disease)
+    if not key:
+        return None
+
+    data = _stored(key)
+    if data is not None:
+        return data
+
+    data = get_disease_details_from_llm(disease.name if disease else name)
+    if not data:
+        return None
+    store_analysis(key, data, disease)
+    return data
+
+
+def schedule_refresh(analysis):
+    """Start one background refresh for a stale analysis; concurrent requests see the claim and skip it."""
+    now = timezone.now()
+    claimed = DiseaseAnalysis.objects.filter(pk=analysis.pk).filter(
+        Q(refresh_started_at__isnull=True) | Q(refresh_started_at__lt=now - REFRESH_CLAIM_TIMEOUT)
+    ).update(refresh_started_at=now)
+    if claimed:
+        transaction.on_commit(lambda: run_in_background(_refresh_in_worker, analysis.pk))
+    return bool(claimed)
+
+
+def refresh_analysis(analysis_id):
+    analysis = DiseaseAnalysis.objects.select_related('disease').filter(pk=analysis_id).first()
+    if analysis is None:
+        return None
+    data = get_disease_details_from_llm(analysis.disease.name if analysis.disease else analysis.name_key)
+    if not data:
+        # keep the claim so the next retry waits out REFRESH_CLAIM_TIMEOUT
+        logger.warning(f"Refreshing the analysis of '{analysis.name_key}' failed; serving the stored one")
+        return None
+    return store_analysis(analysis.name_key, data, analysis.disease)
+
+
+def _refresh_in_worker(analysis_id):
+    try:
+        refresh_analysis(analysis_id)
+    except Exception as e:
+        logger.error(f"Background refresh of disease analysis {analysis_id} failed: {e}")
+    finally:
+        connection.close()
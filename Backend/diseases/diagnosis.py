@@ -0,0 +1,173 @@
+"""
+Second half of the disease diagnosis, after the vision model has named the disease.
+
+The bilingual details are generated by the LLM in a worker thread while the
+name is resolved against the database.  A name with a stored analysis
+(``diseases.analysis``) is served from it without a call, and generated
+details are stored for the next diagnosis.  A disease missing from the
+database is created from that same details object, so a miss costs one details
+call instead of two.  Concurrent diagnoses of the same disease share one
+details call while it is in flight.
+
+Every stage is timed.  The breakdown is returned with the prediction and
+reported in ``Server-Timing`` (see ``core.timing``).  It is logged as a
+warning when the total goes over DIAGNOSIS_LATENCY_BUDGET_MS.
+"""
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+from core.timing import current_timings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUDGET_MS = 20000
+
+_executor = ThreadPoolExecutor(max_workers=getattr(settings, 'DIAGNOSIS_WORKERS', 8),
+                               thread_name_prefix='diagnosis')
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class StageTimings:
+    """Milliseconds per diagnosis stage, plus the total since creation."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    def add(self, name, started):
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.stages[name] = round(duration_ms, 1)
+        request_timings = current_timings()
+        if request_timings is not None:
+            request_timings.add(f'diagnose-{name}', duration_ms)
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, started)
+
+    def as_dict(self):
+        return {**self.stages, 'total': round((time.perf_counter() - self.started) * 1000, 1)}
+
+    def check_budget(self, label):
+        budget_ms = getattr(settings, 'DIAGNOSIS_LATENCY_BUDGET_MS', DEFAULT_LATENCY_BUDGET_MS)
+        breakdown = self.as_dict()
+        if breakdown['total'] > budget_ms:
+            logger.warning(f"Diagnosis of '{label}' took {breakdown['total']:.0f} ms "
+                           f"(budget {budget_ms} ms): {breakdown}")
+        return breakdown
+
+
+def _generate_details(label, timings):
+    from .llm_diseas import get_disease_details_from_llm
+
+    try:
+        with timings.stage('details'):
+            return get_disease_details_from_llm(label)
+    finally:
+        # LLM telemetry may have opened a connection on this worker thread
+        connection.close()
+
+
+def _forget(key, future):
+    with _inflight_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+def run_in_background(fn, *args):
+    """Run ``fn`` on the diagnosis workers, carrying the request context (user, Server-Timing) along."""
+    context = contextvars.copy_context()
+    return _executor.submit(context.run, fn, *args)
+
+
+def request_details(label, timings):
+    """
+    Future for the details of ``label``: the stored analysis when there is one,
+    otherwise an LLM call shared with an identical request already in flight.
+    Storage is read here, on the request thread; the workers only call the LLM.
+    """
+    from .analysis import analysis_key, stored_analysis
+
+    with timings.stage('analysis'):
+        stored = stored_analysis(label)
+    if stored is not None:
+        future = Future()
+        future.set_result(stored)
+        future.stored = True
+        return future
+
+    key = analysis_key(label)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is None:
+            future = run_in_background(_generate_details, label, timings)
+            _inflight[key] = future
+            future.add_done_callback(lambda done: _forget(key, done))
+    return future
+
+
+def find_disease(label):
+    """The stored disease best matching a vision label, via the alias index."""
+    from .alias_index import alias_index
+    from .models import Disease
+
+    match = alias_index.best(label)
+    if match is None:
+        return None
+    return Disease.objects.filter(pk=match.disease_id).first()
+
+
+def resolve_diagnosis(label, timings, future=None):
+    """
+    ``(disease or None, details or None)`` for a vision label: details
+    generation and the database lookup run concurrently, and a missing
+    disease is created from the generated details.  ``future`` is a details
+    request the caller has already started.
+    """
+    if future is None:
+        future = request_details(label, timings)
+
+    disease, lookup_failed = None, False
+    try:
+        with timings.stage('lookup'):
+            disease = find_disease(label)
+    except Exception as db_error:
+        lookup_failed = True
+        logger.error(f"Database lookup error: {db_error}")
+
+    details = None
+    try:
+        with timings.stage('details_wait'):
+            details = future.result()
+    except Exception as e:
+        logger.error(f"Failed to generate details for '{label}': {e}")
+
+    if disease is None and details and not lookup_failed:
+        try:
+            from .llm_diseas import create_or_update_disease_from_llm
+
+            with timings.stage('upsert'):
+                disease = create_or_update_disease_from_llm(label, info=details)
+        except Exception as create_err:
+            logger.error(f"Failed to dynamically create disease '{label}': {create_err}")
+
+    if details and not getattr(future, 'stored', False):
+        try:
+            from .analysis import analysis_key, store_analysis
+
+            store_analysis(analysis_key(disease.name if disease else label), details, disease)
+        except Exception as store_err:
+            logger.error(f"Failed to store the analysis of '{label}': {store_err}")
+    return disease, details
@@ -1,5 +1,9 @@
 import json
 from django.conf import settings
+
+from core.llm_telemetry import track_llm_call
+
+from .alias_index import merge_aliases
 from .models import Disease
 
 # =====================================================================
@@ -8,6 +12,8 @@ from .models import Disease
 USE_GEMINI = True
 
 DISEASE_MODEL = "gemini-3.5-flash" if USE_GEMINI else "gemma-4-31b-it"
+# Bump when the details prompt or its JSON structure changes; stored analyses are then regenerated
+DISEASE_PROMPT_VERSION = 1
 
 # =====================================================================
 # IMPORTS & CLIENT INITIALIZATION
@@ -50,6 +56,8 @@ Return ONLY a valid JSON object (no markdown, no extra text). The JSON must stri
 {{
     "disease_name_fa": "نام کامل بیماری به فارسی (مثلاً سفیدک سطحی خیار)",
     "disease_name_en": "Full disease name in English (e.g., Powdery Mildew of Cucurbits)",
+    "synonyms_fa": ["نام‌های دیگر این بیماری به فارسی (در صورت وجود)"],
+    "synonyms_en": ["Other common or scientific names of the disease in English, if any"],
     "description_fa": "توضیح کامل بیماری به فارسی: شامل عوامل بیماری‌زا (قارچ، باکتری، ویروس)، نحوه آلودگی، چرخه زندگی، شرایط مساعد برای بروز، و علائم اصلی (حداقل ۳ خط).",
     "description_en": "Full description in English: causal agent (fungus, bacterium, virus), infection process, life cycle, favorable conditions, and key symptoms (at least 3 lines).",
     "symptoms_fa": "علائم دقیق به فارسی: ظاهر لکه‌ها، تغییر رنگ، پژمردگی، تغییر شکل، رشد قارچی و ... (لیست یا پاراگراف).",
@@ -93,14 +101,16 @@ Now, generate the JSON for disease: **{disease_name}**
     content = ""
     if USE_GEMINI:
         try:
-            response = client.models.generate_content(
-                model=DISEASE_MODEL,
-                contents=system_prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    temperature=0.2,
+            with track_llm_call('disease_lookup', DISEASE_MODEL) as call:
+                response = client.models.generate_content(
+                    model=DISEASE_MODEL,
+                    contents=system_prompt,
+                    config=types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                        temperature=0.2,
+                    )
                 )
-            )
+                call.record(response)
             content = response.text.strip()
         except Exception as e:
             print(f"Gemini API error in disease generation: {repr(e)}")
@@ -112,17 +122,19 @@ Now, generate the JSON for disease: **{disease_name}**
                 api_key=AVALAI_API_KEY
             )
 
-            response = openai_client.chat.completions.create(
-                model=DISEASE_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a professional plant pathologist. Respond only with valid JSON as instructed."},
-                    {"role": "user", "content": system_prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.2,
-                max_tokens=2000,
-                timeout=90
-            )
+            with track_llm_call('disease_lookup', DISEASE_MODEL) as call:
+                response = openai_client.chat.completions.create(
+                    model=DISEASE_MODEL,
+                    messages=[
+                        {"role": "system", "content": "You are a professional plant pathologist. Respond only with valid JSON as instructed."},
+                        {"role": "user", "content": system_prompt}
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.2,
+                    max_tokens=2000,
+                    timeout=90
+                )
+                call.record(response)
             content = response.choices[0].message.content.strip()
         except Exception as e:
             print(f"OpenAI API error in disease generation: {repr(e)}")
@@ -154,8 +166,10 @@ Now, generate the JSON for disease: **{disease_name}**
 
 
 
-def create_or_update_disease_from_llm(disease_name):
-    info = get_disease_details_from_llm(disease_name)
+def create_or_update_disease_from_llm(disease_name, info=None):
+    """Create or update a Disease from LLM details; pass ``info`` to reuse details already generated."""
+    if info is None:
+        info = get_disease_details_from_llm(disease_name)
     if not info:
         return None
 
@@ -177,6 +191,8 @@ def create_or_update_disease_from_llm(disease_name):
         treatment_steps_fa = '\n'.join(info.get('treatment_steps_fa', []))
         organic_en = info.get('organic_treatment_en', '')
         organic_fa = info.get('organic_treatment_fa', '')
+        # The vision label and the LLM's synonyms let later diagnoses find this disease by any of its names
+        other_names = [disease_name, *(info.get('synonyms_en') or []), *(info.get('synonyms_fa') or [])]
 
         disease = Disease.objects.filter(name_fa=name_fa).first()
         if not disease:
@@ -195,6 +211,7 @@ def create_or_update_disease_from_llm(disease_name):
             disease.prevention_methods_fa = prevention_fa
             disease.severity_level = severity
             disease.spread_rate = info.get('spread_rate', 'moderate')
+            disease.aliases = merge_aliases(disease.aliases, other_names, exclude=[name_en, name_fa])
 
             disease.save()
         else:
@@ -211,6 +228,7 @@ def create_or_update_disease_from_llm(disease_name):
                 prevention_methods_fa=prevention_fa,
                 severity_level=severity,
                 spread_rate=info.get('spread_rate', 'moderate'),
+                aliases=merge_aliases('', other_names, exclude=[name_en, name_fa]),
             )
 
 
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from diseases.affected_plants import relink_diseases
+
+
+class Command(BaseCommand):
+    help = "Rebuild every disease's affected plant links from its affected_plants_list"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        links = relink_diseases()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f'Stored {links} disease to plant links in {elapsed:.2f}s')
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diseases', '0008_disease_image_url'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='disease',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Last update timestamp'),
+        ),
+    ]
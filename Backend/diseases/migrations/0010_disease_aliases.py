@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diseases', '0009_disease_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='disease',
+            name='aliases',
+            field=models.TextField(blank=True, default='', help_text='Other names for the disease (synonyms, vision labels), one per line'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diseases', '0010_disease_aliases'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiseaseAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name_key', models.CharField(max_length=255, unique=True)),
+                ('data', models.JSONField()),
+                ('prompt_version', models.PositiveSmallIntegerField()),
+                ('model', models.CharField(max_length=100)),
+                ('generated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('refresh_started_at', models.DateTimeField(blank=True, null=True)),
+                ('disease', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analyses', to='diseases.disease')),
+            ],
+            options={
+                'verbose_name_plural': 'disease analyses',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+from diseases.affected_plants import parse_plant_names, resolve_plant_ids
+
+
+def backfill_affected_plants(apps, schema_editor):
+    Disease = apps.get_model('diseases', 'Disease')
+    Plant = apps.get_model('plants', 'Plant')
+    Link = Disease.affected_plants.through
+    links = []
+    for disease_id, text in Disease.objects.exclude(affected_plants_list=None).values_list('id', 'affected_plants_list'):
+        links.extend(Link(disease_id=disease_id, plant_id=plant_id)
+                     for plant_id in resolve_plant_ids(parse_plant_names(text), Plant))
+    Link.objects.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('diseases', '0011_diseaseanalysis'),
+        ('plants', '0018_plant_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='disease',
+            name='affected_plants',
+            field=models.ManyToManyField(blank=True, help_text='Plants resolved from affected_plants_list', related_name='diseases', to='plants.plant'),
+        ),
+        migrations.RunPython(backfill_affected_plants, migrations.RunPython.noop),
+    ]
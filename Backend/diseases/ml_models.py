@@ -6,7 +6,10 @@ import logging
 import base64
 import time
 from django.conf import settings
-from django.db.models import Q
+
+from core.llm_telemetry import track_llm_call
+
+from .diagnosis import StageTimings, resolve_diagnosis
 
 logger = logging.getLogger(__name__)
 
@@ -63,9 +66,37 @@ def encode_image_to_base64(image_path):
         return None
 
 
-def predict_disease(image_data):
-    from .models import Disease
+def resolve_disease(result, timings, details_future=None):
+    """
+    The diagnosis for a parsed vision reply: healthy, or the disease resolved
+    against the database (reusing ``details_future`` when given).
+    """
+    predicted_disease_label = result.get("disease_name", "Healthy")
+    confidence_score = result.get("confidence", 0)
+
+    if predicted_disease_label.lower() == "healthy":
+        logger.info("Plant is diagnosed as healthy.")
+        return {'id': None, 'name': 'Healthy', 'details': None, 'confidence': confidence_score}
+
+    # Details generation and DB resolution run concurrently; a miss reuses the same details
+    detected_disease, disease_details = resolve_diagnosis(predicted_disease_label, timings, details_future)
+    detected_disease_id = detected_disease.id if detected_disease else None
+    if detected_disease_id is None:
+        logger.warning(f"No matching disease found in DB for: '{predicted_disease_label}'")
 
+    logger.info(
+        f"Vision Prediction: {predicted_disease_label} ({confidence_score:.2f}%), ID: {detected_disease_id}")
+
+    return {
+        'id': detected_disease_id,
+        'name': predicted_disease_label,
+        'details': disease_details,
+        'confidence': confidence_score,
+        'timings': timings.check_budget(predicted_disease_label),
+    }
+
+
+def predict_disease(image_data):
     if USE_GEMINI:
         if not GEMINI_API_KEY:
             logger.error("Gemini API key is missing.")
@@ -114,6 +145,8 @@ def predict_disease(image_data):
             mime_type = "image/jpeg"
 
         content = ""
+        timings = StageTimings()
+        vision_started = time.perf_counter()
 
         # ---- 1. GEMINI VISION FLOW ----
         if USE_GEMINI:
@@ -121,17 +154,19 @@ def predict_disease(image_data):
                 with open(tmp_path, "rb") as f:
                     image_bytes = f.read()
 
-                response = client.models.generate_content(
-                    model=VISION_MODEL,
-                    contents=[
-                        types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
-                        f"{SYSTEM_PROMPT}\n\nAnalyze this plant image and return the output format strictly."
-                    ],
-                    config=types.GenerateContentConfig(
-                        response_mime_type="application/json",
-                        temperature=0.2,
+                with track_llm_call('disease_diagnose_image', VISION_MODEL) as call:
+                    response = client.models.generate_content(
+                        model=VISION_MODEL,
+                        contents=[
+                            types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
+                            f"{SYSTEM_PROMPT}\n\nAnalyze this plant image and return the output format strictly."
+                        ],
+                        config=types.GenerateContentConfig(
+                            response_mime_type="application/json",
+                            temperature=0.2,
+                        )
                     )
-                )
+                    call.record(response)
                 content = response.text.strip()
             except APIError as api_err:
                 logger.error(f"Google GenAI Disease Vision API Error: {repr(api_err)}")
@@ -149,29 +184,32 @@ def predict_disease(image_data):
             )
 
             logger.info("Sending image to AvalAI Vision API for disease detection...")
-            openai_response = openai_client.chat.completions.create(
-                model=VISION_MODEL,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"{SYSTEM_PROMPT}\n\nAnalyze this plant image and return the output format strictly."
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:{mime_type};base64,{base64_image}"
+            with track_llm_call('disease_diagnose_image', VISION_MODEL) as call:
+                openai_response = openai_client.chat.completions.create(
+                    model=VISION_MODEL,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "text",
+                                    "text": f"{SYSTEM_PROMPT}\n\nAnalyze this plant image and return the output format strictly."
+                                },
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": f"data:{mime_type};base64,{base64_image}"
+                                    }
                                 }
-                            }
-                        ]
-                    }
-                ],
-                temperature=0.2,
-                timeout=50
-            )
+                            ]
+                        }
+                    ],
+                    temperature=0.2,
+                    timeout=50
+                )
+                call.record(openai_response)
             content = openai_response.choices[0].message.content.strip()
+        timings.add('vision', vision_started)
 
         # ---- PARSING LOGIC ----
         if "```json" in content:
@@ -185,60 +223,7 @@ def predict_disease(image_data):
             return {'id': None, 'details': None}
 
         result = json.loads(json_match.group())
-        predicted_disease_label = result.get("disease_name", "Healthy")
-        confidence_score = result.get("confidence", 0)
-
-        if predicted_disease_label.lower() == "healthy":
-            logger.info("Plant is diagnosed as healthy.")
-            return {'id': None, 'name': 'Healthy', 'details': None, 'confidence': confidence_score}
-
-        disease_details = None
-        try:
-            from .llm_diseas import get_disease_details_from_llm
-            disease_details = get_disease_details_from_llm(predicted_disease_label)
-        except Exception as e:
-            logger.error(f"Failed to import or execute llm_diseas module: {e}")
-
-        detected_disease_id = None
-        try:
-            predicted_lower = predicted_disease_label.lower()
-            detected_disease = Disease.objects.filter(
-                Q(name__iexact=predicted_disease_label) |
-                Q(name_fa__icontains=predicted_disease_label)
-            ).first()
-
-            if not detected_disease:
-                diseases = Disease.objects.all()
-                for d in diseases:
-                    if d.name.lower() in predicted_lower or predicted_lower in d.name.lower():
-                        detected_disease = d
-                        break
-
-            # If still not found, and it is not "Healthy", try to fetch and create it dynamically via LLM
-            if not detected_disease and predicted_disease_label.lower() != "healthy":
-                try:
-                    from .llm_diseas import create_or_update_disease_from_llm
-                    detected_disease = create_or_update_disease_from_llm(predicted_disease_label)
-                except Exception as create_err:
-                    logger.error(f"Failed to dynamically create disease '{predicted_disease_label}': {create_err}")
-
-            if detected_disease:
-                detected_disease_id = detected_disease.id
-            else:
-                logger.warning(f"No matching disease found in DB for: '{predicted_disease_label}'")
-
-        except Exception as db_error:
-            logger.error(f"Database lookup error: {db_error}")
-
-        logger.info(
-            f"Vision Prediction: {predicted_disease_label} ({confidence_score:.2f}%), ID: {detected_disease_id}")
-
-        return {
-            'id': detected_disease_id,
-            'name': predicted_disease_label,
-            'details': disease_details,
-            'confidence': confidence_score
-        }
+        return resolve_disease(result, timings)
 
     except Exception as e:
         logger.error(f"Error during disease vision prediction flow: {e}")
@@ -2,9 +2,35 @@ from django.db import models
 from django.utils import timezone
 from django.conf import settings
 
+SEVERITY_RANK = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
+SPREAD_RANK = {'slow': 1, 'moderate': 2, 'fast': 3}
+
+
+def _rank(field, ranks):
+    return models.Case(*(models.When(**{field: value}, then=rank) for value, rank in ranks.items()),
+                       default=0, output_field=models.IntegerField())
+
+
+class DiseaseQuerySet(models.QuerySet):
+    def with_affected_plants(self, user=None):
+        """Prefetch ``affected_plants`` ready for the plant serializers (see ``Plant.objects.for_listing``)."""
+        from plants.models import Plant
+
+        return self.prefetch_related(models.Prefetch('affected_plants', queryset=Plant.objects.for_listing(user)))
+
+    def by_risk(self):
+        """Most severe first, then fastest spreading."""
+        return self.annotate(
+            severity_rank=_rank('severity_level', SEVERITY_RANK),
+            spread_rank=_rank('spread_rate', SPREAD_RANK),
+        ).order_by('-severity_rank', '-spread_rank', 'name')
+
+
 class Disease(models.Model):
     name = models.CharField(max_length=255, unique=True, help_text="Disease name in English")
     name_fa = models.CharField(max_length=255, unique=True, blank=True, null=True, help_text="Disease name in Persian")
+    aliases = models.TextField(blank=True, default='',
+                               help_text="Other names for the disease (synonyms, vision labels), one per line")
     description = models.TextField(help_text="Description in English")
     description_fa = models.TextField(blank=True, null=True, help_text="Description in Persian")
     symptoms = models.TextField(help_text="Symptoms in English")
@@ -16,6 +42,10 @@ class Disease(models.Model):
         blank=True, null=True,
         help_text="Comma-separated list of affected plant names (e.g., 'Rose, Cucumber, Strawberry')"
     )
+    affected_plants = models.ManyToManyField(
+        'plants.Plant', blank=True, related_name='diseases',
+        help_text="Plants resolved from affected_plants_list"
+    )
     is_infectious_en = models.TextField(blank=True, null=True)
     severity_level = models.CharField(max_length=20, choices=[
         ('low', 'Low'),
@@ -42,12 +72,35 @@ class Disease(models.Model):
     view_count = models.PositiveIntegerField(default=0, help_text="Number of times disease detail has been viewed")
 
     created_at = models.DateTimeField(default=timezone.now, help_text="Creation timestamp")
-    updated_at = models.DateTimeField(auto_now=True, help_text="Last update timestamp")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, help_text="Last update timestamp")
+
+    objects = DiseaseQuerySet.as_manager()
 
     def __str__(self):
         return self.name_fa or self.name
 
 
+class DiseaseAnalysis(models.Model):
+    """
+    Stored LLM analysis for a disease name, so it is generated once and served
+    to everyone.  ``name_key`` is the normalized name; ``disease`` is set when
+    the name belongs to a stored disease.
+    """
+    name_key = models.CharField(max_length=255, unique=True)
+    disease = models.ForeignKey(Disease, null=True, blank=True, on_delete=models.CASCADE, related_name='analyses')
+    data = models.JSONField()
+    prompt_version = models.PositiveSmallIntegerField()
+    model = models.CharField(max_length=100)
+    generated_at = models.DateTimeField(default=timezone.now)
+    refresh_started_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'disease analyses'
+
+    def __str__(self):
+        return f"{self.name_key} (v{self.prompt_version}, {self.model})"
+
+
 class DiseaseComment(models.Model):
     """Comment on a disease."""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='disease_comments')
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from .models import Disease, DiseaseComment
-from plants.serializers import PlantSerializer
+from plants.serializers import CommentRepliesMixin, PlantSerializer
 
 class DiseaseSerializer(serializers.ModelSerializer):
     affected_plants_list = serializers.CharField(read_only=True)
@@ -8,7 +8,7 @@ class DiseaseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Disease
-        fields = '__all__'
+        exclude = ('affected_plants',)
 
     def get_image(self, obj):
         if obj.image:
@@ -34,7 +34,8 @@ class DiseaseDetailSerializer(serializers.ModelSerializer):
             return obj.image.url
         return obj.image_url
 
-class DiseaseCommentSerializer(serializers.ModelSerializer):
+class DiseaseCommentSerializer(CommentRepliesMixin, serializers.ModelSerializer):
+    replies_scope = 'disease_id'
     user_name = serializers.CharField(source='user.username', read_only=True)
     replies = serializers.SerializerMethodField()
 
@@ -44,7 +45,25 @@ class DiseaseCommentSerializer(serializers.ModelSerializer):
                   'is_approved', 'created_at', 'updated_at', 'replies')
         read_only_fields = ('user', 'disease', 'is_approved', 'created_at', 'updated_at')
 
-    def get_replies(self, obj):
-        if obj.replies.exists():
-            return DiseaseCommentSerializer(obj.replies.all(), many=True, context=self.context).data
-        return []
\ No newline at end of file
+
+class DiseaseRiskSerializer(serializers.ModelSerializer):
+    """A disease threatening a user's garden, with the garden plants it can affect."""
+    image = serializers.SerializerMethodField()
+    user_plants = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Disease
+        fields = ('id', 'name', 'name_fa', 'severity_level', 'spread_rate', 'is_infectious_en',
+                  'image', 'user_plants')
+
+    def get_image(self, obj):
+        if obj.image:
+            request = self.context.get('request')
+            if request:
+                return request.build_absolute_uri(obj.image.url)
+            return obj.image.url
+        return obj.image_url
+
+    def get_user_plants(self, obj):
+        by_plant = self.context.get('user_plants_by_plant', {})
+        return [user_plant for plant in obj.garden_plants for user_plant in by_plant.get(plant.id, [])]
@@ -0,0 +1,34 @@
+# diseases/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.catalog_bundle import prune_tombstones
+from core.models import CatalogTombstone
+from .affected_plants import link_affected_plants
+from .alias_index import alias_index
+from .models import Disease
+
+
+@receiver(post_delete, sender=Disease)
+def record_disease_tombstone(sender, instance, **kwargs):
+    """Let offline catalog bundles drop the disease on their next delta sync."""
+    CatalogTombstone.objects.create(kind='disease', object_id=instance.pk)
+    prune_tombstones()
+
+
+@receiver(post_save, sender=Disease)
+def refresh_disease_aliases(sender, instance, **kwargs):
+    alias_index.update(instance)
+
+
+@receiver(post_delete, sender=Disease)
+def drop_disease_aliases(sender, instance, **kwargs):
+    alias_index.remove(instance.pk)
+
+
+@receiver(post_save, sender=Disease)
+def relink_affected_plants(sender, instance, created, update_fields=None, **kwargs):
+    if created and not instance.affected_plants_list:
+        return
+    if update_fields is None or 'affected_plants_list' in update_fields:
+        link_affected_plants(instance)
@@ -1,3 +1,167 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.llm_stub import StubLLMServer, stub_llm_clients
+
+from diseases.alias_index import alias_index, normalize
+from diseases.analysis import refresh_analysis
+from diseases.diagnosis import StageTimings, find_disease, request_details
+from diseases.llm_diseas import DISEASE_PROMPT_VERSION
+from diseases.models import Disease, DiseaseAnalysis
+from plants.models import Plant
+
+
+@override_settings(LLM_TELEMETRY_PERSIST=False)
+class DiagnosisPipelineTests(TestCase):
+
+    def setUp(self):
+        alias_index.clear()
+
+    def image(self):
+        return SimpleUploadedFile('leaf.jpg', b'\xff\xd8\xff\xe0 not really a jpeg', content_type='image/jpeg')
+
+    def test_missing_disease_is_created_from_the_same_details(self):
+        from diseases.ml_models import predict_disease
+
+        with StubLLMServer(latency_ms=0, jitter_ms=0) as stub, stub_llm_clients(stub.url):
+            result = predict_disease(self.image())
+
+        disease = Disease.objects.get(name='Powdery Mildew')
+        self.assertEqual(result['id'], disease.id)
+        self.assertEqual(result['details']['disease_name_en'], 'Powdery Mildew')
+        # vision + one details call; the upsert reuses the details
+        self.assertEqual(sum(stub.calls.values()), 2)
+        self.assertLessEqual({'vision', 'lookup', 'details', 'upsert', 'total'}, set(result['timings']))
+
+    def test_known_disease_skips_the_upsert(self):
+        from diseases.ml_models import predict_disease
+
+        disease = Disease.objects.create(name='Powdery Mildew', name_fa='سفیدک سطحی', description='-')
+        with StubLLMServer(latency_ms=0, jitter_ms=0) as stub, stub_llm_clients(stub.url):
+            result = predict_disease(self.image())
+        self.assertEqual(result['id'], disease.id)
+        self.assertNotIn('upsert', result['timings'])
+        self.assertEqual(Disease.objects.count(), 1)
+
+    def test_identical_details_requests_share_one_call(self):
+        with StubLLMServer(latency_ms=200, jitter_ms=0) as stub, stub_llm_clients(stub.url):
+            first = request_details('Powdery Mildew', StageTimings())
+            second = request_details('powdery mildew ', StageTimings())
+            self.assertIs(first, second)
+            self.assertEqual(first.result()['disease_name_en'], 'Powdery Mildew')
+        self.assertEqual(sum(stub.calls.values()), 1)
+
+    def test_diagnosis_details_are_stored_and_reused(self):
+        from diseases.ml_models import predict_disease
+
+        with StubLLMServer(latency_ms=0, jitter_ms=0) as stub, stub_llm_clients(stub.url):
+            first = predict_disease(self.image())
+            second = predict_disease(self.image())
+        self.assertEqual(second['details'], first['details'])
+        # two vision calls, one details call
+        self.assertEqual(sum(stub.calls.values()), 3)
+        self.assertEqual(DiseaseAnalysis.objects.get().disease, Disease.objects.get(name='Powdery Mildew'))
+
+
+class AliasIndexTests(TestCase):
+
+    def setUp(self):
+        alias_index.clear()
+        self.mildew = Disease.objects.create(name='Powdery Mildew', name_fa='سفیدک سطحی', description='-',
+                                             aliases='Oidium\nWhite mould')
+        self.blight = Disease.objects.create(name='Early Blight', name_fa='بلایت زودرس', description='-')
+
+    def test_normalizes_case_punctuation_and_persian_variants(self):
+        self.assertEqual(normalize('  Powdery-Mildew! '), 'powdery mildew')
+        # Arabic yeh/kaf, ZWNJ and diacritics all fold to the Persian form
+        self.assertEqual(normalize('سفيدك‌سَطحی'), normalize('سفیدک سطحی'))
+        self.assertEqual(find_disease('سفيدك سطحي'), self.mildew)
+        self.assertEqual(find_disease('OIDIUM'), self.mildew)
+
+    def test_fuzzy_match_scores_typos_and_longer_labels(self):
+        match = alias_index.best('Powdry Mildw')
+        self.assertEqual(match.disease_id, self.mildew.id)
+        self.assertLess(match.score, 1.0)
+        self.assertEqual(find_disease('Tomato early blight'), self.blight)
+        self.assertIsNone(find_disease('Root Knot Nematode'))
+
+    def test_fuzzy_lookup_returns_up_to_limit_matches(self):
+        rusts = [Disease.objects.create(name=name, description='-') for name in ('Rust', 'Rusts', 'Rust Mite')]
+        matches = alias_index.lookup('Rus', limit=5)
+        self.assertEqual({match.disease_id for match in matches}, {disease.id for disease in rusts})
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(alias_index.best('Early Blight').score, 1.0)
+        self.blight.aliases = 'Alternaria leaf spot'
+        self.blight.save()
+        self.assertEqual(find_disease('alternaria leaf spot'), self.blight)
+        self.blight.delete()
+        self.assertIsNone(find_disease('Early Blight'))
+
+
+@override_settings(LLM_TELEMETRY_PERSIST=False)
+class AffectedPlantsTests(TestCase):
+
+    def setUp(self):
+        self.rose = Plant.objects.create(farsi_name='رز', english_name='Rose', scientific_name='Rosa',
+                                         description='-', description_en='-')
+        self.rust = Disease.objects.create(name='Rust', description='-', affected_plants_list='Rose, Cucumber')
+
+    def test_plants_created_or_renamed_after_the_disease_are_linked(self):
+        cucumber = Plant.objects.create(farsi_name='خیار', english_name='cucumber', scientific_name='Cucumis sativus',
+                                        description='-', description_en='-')
+        self.assertEqual(set(self.rust.affected_plants.all()), {self.rose, cucumber})
+
+        self.rose.english_name = 'Garden Rose'
+        self.rose.scientific_name = 'Rosa gallica'
+        self.rose.save()
+        self.assertEqual(list(self.rust.affected_plants.all()), [cucumber])
+
+    def test_backfill_command_rebuilds_links_skipped_by_bulk_writes(self):
+        self.rust.affected_plants.clear()
+        Disease.objects.filter(pk=self.rust.pk).update(affected_plants_list='Rose')
+        call_command('link_affected_plants', stdout=StringIO())
+        self.assertEqual(list(self.rust.affected_plants.all()), [self.rose])
+
+
+class DiseaseAnalysisTests(TestCase):
+
+    def setUp(self):
+        alias_index.clear()
+
+    def test_analysis_is_generated_once_and_served_from_storage(self):
+        with StubLLMServer(latency_ms=0, jitter_ms=0) as stub, stub_llm_clients(stub.url):
+            first = self.client.get('/api/diseases/llm/', {'name': 'Powdery Mildew'})
+            second = self.client.get('/api/diseases/llm/', {'name': 'powdery  mildew!'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(sum(stub.calls.values()), 1)
+        self.assertEqual(DiseaseAnalysis.objects.get().name_key, 'powdery mildew')
+
+    def test_known_disease_analysis_is_linked_and_reused_by_retrieve(self):
+        disease = Disease.objects.create(name='Powdery Mildew', name_fa='سفیدک سطحی', description='-')
+        with StubLLMServer(latency_ms=0, jitter_ms=0) as stub, stub_llm_clients(stub.url):
+            self.client.get('/api/diseases/llm/', {'name': 'سفيدك سطحي'})
+            response = self.client.get(f'/api/diseases/{disease.id}/', {'include_llm': 'true'})
+        self.assertEqual(response.json()['llm_analysis']['disease_name_en'], 'Powdery Mildew')
+        self.assertEqual(sum(stub.calls.values()), 1)
+        self.assertEqual(DiseaseAnalysis.objects.get().disease, disease)
+
+    def test_stale_analysis_is_served_and_refreshed_once(self):
+        analysis = DiseaseAnalysis.objects.create(name_key='powdery mildew', data={'disease_name_en': 'old'},
+                                                  prompt_version=DISEASE_PROMPT_VERSION - 1, model='old-model')
+        with self.captureOnCommitCallbacks() as callbacks:
+            first = self.client.get('/api/diseases/llm/', {'name': 'Powdery Mildew'})
+            self.client.get('/api/diseases/llm/', {'name': 'Powdery Mildew'})
+        self.assertEqual(first.json(), {'disease_name_en': 'old'})
+        self.assertEqual(len(callbacks), 1)
+
+        with StubLLMServer(latency_ms=0, jitter_ms=0) as stub, stub_llm_clients(stub.url):
+            refresh_analysis(analysis.pk)
+        analysis.refresh_from_db()
+        self.assertEqual(analysis.data['disease_name_en'], 'Powdery Mildew')
+        self.assertEqual(analysis.prompt_version, DISEASE_PROMPT_VERSION)
+        self.assertIsNone(analysis.refresh_started_at)
@@ -8,7 +8,9 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, F
 from rest_framework.pagination import PageNumberPagination
 
-from .llm_diseas import get_disease_details_from_llm
+from core.comment_tree import thread_page
+
+from .analysis import get_analysis
 from .models import Disease, DiseaseComment
 from .serializers import DiseaseSerializer, DiseaseDetailSerializer, DiseaseCommentSerializer
 from .ml_models import predict_disease
@@ -24,6 +26,7 @@ class DiseaseViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = DiseaseSerializer
     permission_classes = [AllowAny]
     pagination_class = DiseasePagination   # اضافه شد
+    query_budget = {'list': 3, 'retrieve': 6, 'get_comments': 4}
     filter_backends = [filters.SearchFilter, DjangoFilterBackend, filters.OrderingFilter]
     search_fields = [
         'name', 'name_fa', 'description', 'description_fa',
@@ -34,6 +37,11 @@ class DiseaseViewSet(viewsets.ReadOnlyModelViewSet):
     ordering = ['-created_at']
     filterset_fields = ['severity_level', 'spread_rate']
 
+    def get_queryset(self):
+        if self.action == 'retrieve':
+            return Disease.objects.with_affected_plants(self.request.user)
+        return super().get_queryset()
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return DiseaseDetailSerializer
@@ -42,12 +50,13 @@ class DiseaseViewSet(viewsets.ReadOnlyModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         Disease.objects.filter(pk=instance.pk).update(view_count=F('view_count') + 1)
-        instance.refresh_from_db()
+        # a full refresh would drop the prefetched plants
+        instance.refresh_from_db(fields=['view_count'])
         serializer = self.get_serializer(instance)
         data = serializer.data
 
         if request.query_params.get('include_llm', 'false').lower() == 'true':
-            llm_data = get_disease_details_from_llm(instance.name)
+            llm_data = get_analysis(instance.name, disease=instance)
             if llm_data:
                 data['llm_analysis'] = llm_data
 
@@ -56,9 +65,117 @@ class DiseaseViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'], url_path='comments')
     def get_comments(self, request, pk=None):
         disease = self.get_object()
-        comments = disease.comments.filter(parent=None, is_approved=True)
-        serializer = DiseaseCommentSerializer(comments, many=True, context={'request': request})
-        return Response(serializer.data)
+        comments = disease.comments.filter(parent=None, is_approved=True).select_related('user')
+        return thread_page(request, comments, DiseaseCommentSerializer)
+
+
+def diagnosis_response(request, prediction_result):
+    """Response for a ``predict_disease`` result, from the stored disease or the generated details."""
+    disease_id = prediction_result.get('id')
+    disease_name = prediction_result.get('name')
+    disease_details = prediction_result.get('details')
+    confidence = prediction_result.get('confidence')
+
+    if confidence is not None:
+        try:
+            conf_val = float(confidence)
+            if conf_val <= 60:
+                lang = request.query_params.get('lang') or request.headers.get('Accept-Language', 'en')
+                if 'fa' in lang.lower():
+                    err_msg = 'کیفیت عکس شما مناسب نیست. لطفاً عکس بهتر و واضح‌تری گرفته و دوباره تلاش کنید.'
+                else:
+                    err_msg = 'Your photo is not good enough. Please take a clearer, better photo and try again.'
+                return Response({'error': err_msg}, status=status.HTTP_400_BAD_REQUEST)
+        except (ValueError, TypeError):
+            pass
+
+
+    if disease_id is None:
+        if disease_name == 'Healthy':
+            return Response({
+                'id': None,
+                'name': 'Healthy',
+                'name_fa': 'سالم',
+                'description': 'The plant appears to be healthy and shows no signs of disease.',
+                'description_fa': 'گیاه سالم به نظر می‌رسد و علائمی از بیماری ندارد.',
+                'symptoms': 'No symptoms detected.',
+                'symptoms_fa': 'هیچ علامتی شناسایی نشد.',
+                'solution': 'Continue regular watering, proper lighting, and routine care.',
+                'solution_fa': 'آبیاری منظم، نور مناسب و مراقبت‌های معمول را ادامه دهید.',
+                'prevention_methods': 'Keep plant isolated from other infected plants, inspect leaves regularly.',
+                'prevention_methods_fa': 'گیاه را از سایر گیاهان آلوده دور نگه دارید و برگ‌ها را مرتب بررسی کنید.',
+                'severity_level': 'low',
+                'spread_rate': 'slow',
+                'confidence': confidence,
+                'detected_name': disease_name,
+            }, status=status.HTTP_200_OK)
+
+        if disease_details:
+            response_data = {
+                'id': None,
+                'name': disease_name,
+                'llm_analysis': disease_details,
+                'confidence': confidence,
+                'description': disease_details.get('description_en', disease_details.get('description', '')),
+                'description_fa': disease_details.get('description_fa', ''),
+                'symptoms': disease_details.get('symptoms_en', disease_details.get('symptoms', '')),
+                'symptoms_fa': disease_details.get('symptoms_fa', ''),
+                'solution': '\n'.join(disease_details.get('treatment_steps_en', [])) if isinstance(disease_details.get('treatment_steps_en'), list) else disease_details.get('treatment_steps_en', ''),
+                'solution_fa': '\n'.join(disease_details.get('treatment_steps_fa', [])) if isinstance(disease_details.get('treatment_steps_fa'), list) else disease_details.get('treatment_steps_fa', ''),
+                'prevention_methods': disease_details.get('prevention_en', disease_details.get('prevention', '')),
+                'prevention_methods_fa': disease_details.get('prevention_fa', ''),
+                'severity_level': disease_details.get('severity', 'unknown'),
+                'spread_rate': disease_details.get('spread_rate', 'unknown'),
+                'affected_plants': [],
+                'created_at': None,
+                'updated_at': None,
+                'detected_name': disease_name,
+            }
+            return Response(response_data, status=status.HTTP_200_OK)
+
+        return Response({'error': 'Could not diagnose the disease.'}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        disease = Disease.objects.with_affected_plants(request.user).get(id=disease_id)
+        serializer = DiseaseDetailSerializer(disease)
+        disease_data = serializer.data
+
+        # Add LLM analysis (which is now bilingual)
+        if disease_details:
+            disease_data['llm_analysis'] = disease_details
+        if confidence:
+            disease_data['confidence'] = confidence
+        if disease_name:
+            disease_data['detected_name'] = disease_name
+
+        return Response(disease_data, status=status.HTTP_200_OK)
+
+    except Disease.DoesNotExist:
+        if disease_details:
+            response_data = {
+                'id': disease_id,
+                'name': disease_name,
+                'llm_analysis': disease_details,
+                'confidence': confidence,
+                'description': disease_details.get('description_en', disease_details.get('description', '')),
+                'description_fa': disease_details.get('description_fa', ''),
+                'symptoms': disease_details.get('symptoms_en', disease_details.get('symptoms', '')),
+                'symptoms_fa': disease_details.get('symptoms_fa', ''),
+                'solution': '\n'.join(disease_details.get('treatment_steps_en', [])) if isinstance(disease_details.get('treatment_steps_en'), list) else disease_details.get('treatment_steps_en', ''),
+                'solution_fa': '\n'.join(disease_details.get('treatment_steps_fa', [])) if isinstance(disease_details.get('treatment_steps_fa'), list) else disease_details.get('treatment_steps_fa', ''),
+                'prevention_methods': disease_details.get('prevention_en', disease_details.get('prevention', '')),
+                'prevention_methods_fa': disease_details.get('prevention_fa', ''),
+                'severity_level': disease_details.get('severity', 'unknown'),
+                'spread_rate': disease_details.get('spread_rate', 'unknown'),
+                'affected_plants': [],
+                'created_at': None,
+                'updated_at': None,
+                'detected_name': disease_name,
+            }
+            return Response(response_data, status=status.HTTP_200_OK)
+        else:
+            return Response({'error': f'Disease with ID {disease_id} not found in the database.'}, status=status.HTTP_404_NOT_FOUND)
+
 
 class DiseaseDiagnoseView(APIView):
     """
@@ -74,110 +191,7 @@ class DiseaseDiagnoseView(APIView):
 
         image_file = request.data['image']
         prediction_result = predict_disease(image_file)
-        disease_id = prediction_result.get('id')
-        disease_name = prediction_result.get('name')
-        disease_details = prediction_result.get('details')
-        confidence = prediction_result.get('confidence')
-
-        if confidence is not None:
-            try:
-                conf_val = float(confidence)
-                if conf_val <= 60:
-                    lang = request.query_params.get('lang') or request.headers.get('Accept-Language', 'en')
-                    if 'fa' in lang.lower():
-                        err_msg = 'کیفیت عکس شما مناسب نیست. لطفاً عکس بهتر و واضح‌تری گرفته و دوباره تلاش کنید.'
-                    else:
-                        err_msg = 'Your photo is not good enough. Please take a clearer, better photo and try again.'
-                    return Response({'error': err_msg}, status=status.HTTP_400_BAD_REQUEST)
-            except (ValueError, TypeError):
-                pass
-
-
-        if disease_id is None:
-            if disease_name == 'Healthy':
-                return Response({
-                    'id': None,
-                    'name': 'Healthy',
-                    'name_fa': 'سالم',
-                    'description': 'The plant appears to be healthy and shows no signs of disease.',
-                    'description_fa': 'گیاه سالم به نظر می‌رسد و علائمی از بیماری ندارد.',
-                    'symptoms': 'No symptoms detected.',
-                    'symptoms_fa': 'هیچ علامتی شناسایی نشد.',
-                    'solution': 'Continue regular watering, proper lighting, and routine care.',
-                    'solution_fa': 'آبیاری منظم، نور مناسب و مراقبت‌های معمول را ادامه دهید.',
-                    'prevention_methods': 'Keep plant isolated from other infected plants, inspect leaves regularly.',
-                    'prevention_methods_fa': 'گیاه را از سایر گیاهان آلوده دور نگه دارید و برگ‌ها را مرتب بررسی کنید.',
-                    'severity_level': 'low',
-                    'spread_rate': 'slow',
-                    'confidence': confidence,
-                    'detected_name': disease_name,
-                }, status=status.HTTP_200_OK)
-
-            if disease_details:
-                response_data = {
-                    'id': None,
-                    'name': disease_name,
-                    'llm_analysis': disease_details,
-                    'confidence': confidence,
-                    'description': disease_details.get('description_en', disease_details.get('description', '')),
-                    'description_fa': disease_details.get('description_fa', ''),
-                    'symptoms': disease_details.get('symptoms_en', disease_details.get('symptoms', '')),
-                    'symptoms_fa': disease_details.get('symptoms_fa', ''),
-                    'solution': '\n'.join(disease_details.get('treatment_steps_en', [])) if isinstance(disease_details.get('treatment_steps_en'), list) else disease_details.get('treatment_steps_en', ''),
-                    'solution_fa': '\n'.join(disease_details.get('treatment_steps_fa', [])) if isinstance(disease_details.get('treatment_steps_fa'), list) else disease_details.get('treatment_steps_fa', ''),
-                    'prevention_methods': disease_details.get('prevention_en', disease_details.get('prevention', '')),
-                    'prevention_methods_fa': disease_details.get('prevention_fa', ''),
-                    'severity_level': disease_details.get('severity', 'unknown'),
-                    'spread_rate': disease_details.get('spread_rate', 'unknown'),
-                    'affected_plants': [],
-                    'created_at': None,
-                    'updated_at': None,
-                    'detected_name': disease_name,
-                }
-                return Response(response_data, status=status.HTTP_200_OK)
-
-            return Response({'error': 'Could not diagnose the disease.'}, status=status.HTTP_404_NOT_FOUND)
-
-        try:
-            disease = Disease.objects.get(id=disease_id)
-            serializer = DiseaseDetailSerializer(disease)
-            disease_data = serializer.data
-
-            # Add LLM analysis (which is now bilingual)
-            if disease_details:
-                disease_data['llm_analysis'] = disease_details
-            if confidence:
-                disease_data['confidence'] = confidence
-            if disease_name:
-                disease_data['detected_name'] = disease_name
-
-            return Response(disease_data, status=status.HTTP_200_OK)
-
-        except Disease.DoesNotExist:
-            if disease_details:
-                response_data = {
-                    'id': disease_id,
-                    'name': disease_name,
-                    'llm_analysis': disease_details,
-                    'confidence': confidence,
-                    'description': disease_details.get('description_en', disease_details.get('description', '')),
-                    'description_fa': disease_details.get('description_fa', ''),
-                    'symptoms': disease_details.get('symptoms_en', disease_details.get('symptoms', '')),
-                    'symptoms_fa': disease_details.get('symptoms_fa', ''),
-                    'solution': '\n'.join(disease_details.get('treatment_steps_en', [])) if isinstance(disease_details.get('treatment_steps_en'), list) else disease_details.get('treatment_steps_en', ''),
-                    'solution_fa': '\n'.join(disease_details.get('treatment_steps_fa', [])) if isinstance(disease_details.get('treatment_steps_fa'), list) else disease_details.get('treatment_steps_fa', ''),
-                    'prevention_methods': disease_details.get('prevention_en', disease_details.get('prevention', '')),
-                    'prevention_methods_fa': disease_details.get('prevention_fa', ''),
-                    'severity_level': disease_details.get('severity', 'unknown'),
-                    'spread_rate': disease_details.get('spread_rate', 'unknown'),
-                    'affected_plants': [],
-                    'created_at': None,
-                    'updated_at': None,
-                    'detected_name': disease_name,
-                }
-                return Response(response_data, status=status.HTTP_200_OK)
-            else:
-                return Response({'error': f'Disease with ID {disease_id} not found in the database.'}, status=status.HTTP_404_NOT_FOUND)
+        return diagnosis_response(request, prediction_result)
 
 
 class DiseaseSearchView(APIView):
@@ -224,10 +238,11 @@ class DiseaseCommentViewSet(mixins.CreateModelMixin,
     """ViewSet for comments on a disease."""
     serializer_class = DiseaseCommentSerializer
     permission_classes = [AllowAny]
+    query_budget = 8
 
     def get_queryset(self):
         disease_id = self.kwargs.get('disease_pk')
-        return DiseaseComment.objects.filter(disease_id=disease_id, is_approved=True)
+        return DiseaseComment.objects.filter(disease_id=disease_id, is_approved=True).select_related('user')
 
     def perform_create(self, serializer):
         disease = Disease.objects.get(pk=self.kwargs['disease_pk'])
@@ -248,7 +263,7 @@ class DiseaseFromLLMView(APIView):
         name = request.query_params.get('name')
         if not name:
             return Response({'error': 'name required'}, status=400)
-        data = get_disease_details_from_llm(name)
+        data = get_analysis(name)
         if not data:
             return Response({'error': 'LLM failed'}, status=500)
         return Response(data)
@@ -1,8 +1,15 @@
 from django.contrib import admin
-from .models import UserPlant
+from .models import PushMessage, UserPlant
 
 @admin.register(UserPlant)
 class UserPlantAdmin(admin.ModelAdmin):
     list_display = ('user', 'plant', 'nickname', 'added_date')
     search_fields = ('user__username', 'plant__farsi_name', 'nickname')
-    list_filter = ('added_date',)
\ No newline at end of file
+    list_filter = ('added_date',)
+
+@admin.register(PushMessage)
+class PushMessageAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'error')
+    list_filter = ('status',)
+    search_fields = ('user__username', 'push_token', 'ticket_id')
+    raw_id_fields = ('user', 'reminder')
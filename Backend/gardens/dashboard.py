@@ -0,0 +1,141 @@
+"""
+Garden dashboard: the user's task counts, each plant's next due action and a
+health summary, in one response.
+
+It costs three queries however large the garden is:
+
+- one conditional aggregate over the pending reminders for the overdue,
+  today and tomorrow counts
+- one over the user plants, with per-plant reminder counts and the next
+  pending reminder as annotations
+- one for the first image of each plant
+
+The result is cached per user under a key read from the database: the count
+and latest ``updated_at`` of the user's plants and reminders (one query).  Any
+process that changes the garden, the web workers, the reminder scheduler or
+a rollover's ``bulk_create``, therefore moves the key on.  The key also holds
+the catalog version and the user's local date, so the day boundaries move on
+at midnight.  Image URLs are cached relative and made absolute per request.
+"""
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, DateTimeField, Max, Min, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from plants.catalog import get_catalog_version
+from plants.models import PlantImage
+from .models import Reminder, UserPlant
+from .summaries import resolve_timezone
+
+CACHE_TIMEOUT = 60 * 60
+
+HEALTH_STATUSES = ('healthy', 'needs_attention', 'unhealthy')
+
+
+def _per_user(model, aggregate, output_field=None):
+    rows = (model.objects.filter(user=OuterRef('pk')).order_by()
+            .values('user').annotate(value=aggregate).values('value'))
+    return Subquery(rows, output_field=output_field)
+
+
+def garden_version(user):
+    """Changes whenever one of the user's plants or reminders is created, edited or deleted."""
+    state = get_user_model().objects.filter(pk=user.pk).values(
+        plant_count=Coalesce(_per_user(UserPlant, Count('id')), 0),
+        plants_updated=_per_user(UserPlant, Max('updated_at'), DateTimeField()),
+        reminder_count=Coalesce(_per_user(Reminder, Count('id')), 0),
+        reminders_updated=_per_user(Reminder, Max('updated_at'), DateTimeField()),
+    ).get()
+    return '-'.join(
+        f'{value.timestamp():.6f}' if isinstance(value, datetime) else str(value or 0)
+        for value in (state['plant_count'], state['plants_updated'],
+                      state['reminder_count'], state['reminders_updated'])
+    )
+
+
+def day_windows(user, now):
+    """The user's local date, and the starts of their today, tomorrow and the day after."""
+    tz = resolve_timezone(user.timezone)
+    local_today = now.astimezone(tz).date()
+    today_start = datetime.combine(local_today, time.min, tzinfo=tz)
+    return local_today, today_start, today_start + timedelta(days=1), today_start + timedelta(days=2)
+
+
+def _next_pending(field):
+    return Subquery(Reminder.objects.filter(user_plant=OuterRef('pk'), is_completed=False)
+                    .order_by('scheduled_date', 'id').values(field)[:1])
+
+
+def build_dashboard(user, now):
+    """The dashboard of ``user``, with image URLs relative to the site."""
+    local_today, today_start, tomorrow_start, day_after_start = day_windows(user, now)
+
+    counts = Reminder.objects.filter(user=user, is_completed=False).aggregate(
+        overdue=Count('id', filter=Q(scheduled_date__lt=today_start)),
+        today=Count('id', filter=Q(scheduled_date__gte=today_start, scheduled_date__lt=tomorrow_start)),
+        tomorrow=Count('id', filter=Q(scheduled_date__gte=tomorrow_start, scheduled_date__lt=day_after_start)),
+    )
+
+    pending = Q(reminders__is_completed=False)
+    user_plants = UserPlant.objects.filter(user=user).select_related('plant').prefetch_related(
+        Prefetch('plant__images', queryset=PlantImage.objects.all()[:1], to_attr='primary_images'),
+    ).annotate(
+        pending_count=Count('reminders', filter=pending),
+        overdue_count=Count('reminders', filter=pending & Q(reminders__scheduled_date__lt=today_start)),
+        next_due=Min('reminders__scheduled_date', filter=pending),
+        next_reminder_id=_next_pending('id'),
+        next_title=_next_pending('title'),
+        next_care_type=_next_pending('care_type'),
+    )
+
+    plants = []
+    health = dict.fromkeys(HEALTH_STATUSES, 0)
+    for user_plant in user_plants:
+        health[user_plant.health_status] = health.get(user_plant.health_status, 0) + 1
+        image = user_plant.plant.primary_images[0].image if user_plant.plant.primary_images else None
+        plants.append({
+            'id': user_plant.id,
+            'nickname': user_plant.nickname,
+            'plant_id': user_plant.plant_id,
+            'plant_name': user_plant.plant.farsi_name,
+            'plant_name_en': user_plant.plant.english_name,
+            'plant_image': image.url if image else None,
+            'health_status': user_plant.health_status,
+            'pending_count': user_plant.pending_count,
+            'overdue_count': user_plant.overdue_count,
+            'next_action': {
+                'reminder_id': user_plant.next_reminder_id,
+                'title': user_plant.next_title,
+                'care_type': user_plant.next_care_type,
+                'scheduled_date': user_plant.next_due.isoformat(),
+            } if user_plant.next_reminder_id else None,
+        })
+    # plants with something due soonest first, plants with nothing due last
+    plants.sort(key=lambda entry: (entry['next_action'] is None,
+                                   entry['next_action']['scheduled_date'] if entry['next_action'] else ''))
+
+    return {
+        'date': local_today.isoformat(),
+        'counts': counts,
+        'health': {**health, 'total': len(plants)},
+        'plants': plants,
+    }
+
+
+def get_dashboard(user, now, request=None):
+    """The cached dashboard of ``user``, rebuilt when their garden or local date changes."""
+    local_today = day_windows(user, now)[0]
+    cache_key = (f'gardens:dashboard:{user.pk}:{garden_version(user)}:'
+                 f'{get_catalog_version()}:{local_today.isoformat()}')
+    data = cache.get(cache_key)
+    if data is None:
+        data = build_dashboard(user, now)
+        cache.set(cache_key, data, CACHE_TIMEOUT)
+    if request is None:
+        return data
+    # the same entry serves every host the API is reached through
+    plants = [{**entry, 'plant_image': request.build_absolute_uri(entry['plant_image'])} if entry['plant_image']
+              else entry for entry in data['plants']]
+    return {**data, 'plants': plants}
@@ -1,6 +1,8 @@
 import json
 from django.conf import settings
 
+from core.llm_telemetry import track_llm_call
+
 # =====================================================================
 # CONFIGURATION & SWITCH
 # =====================================================================
@@ -118,7 +120,9 @@ def get_plant_chat_response(user_plant, user_question, chat_history=None):
                 history=gemini_history
             )
 
-            response = chat.send_message(user_question)
+            with track_llm_call('garden_chat', CHAT_MODEL) as call:
+                response = chat.send_message(user_question)
+                call.record(response)
             return response.text.strip()
 
         except APIError as api_err:
@@ -142,13 +146,15 @@ def get_plant_chat_response(user_plant, user_question, chat_history=None):
                 api_key=AVALAI_API_KEY
             )
 
-            response = openai_client.chat.completions.create(
-                model=CHAT_MODEL,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=600,
-                timeout=45
-            )
+            with track_llm_call('garden_chat', CHAT_MODEL) as call:
+                response = openai_client.chat.completions.create(
+                    model=CHAT_MODEL,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=600,
+                    timeout=45
+                )
+                call.record(response)
             return response.choices[0].message.content.strip()
 
         except (APIConnectionError, APITimeoutError) as net_err:
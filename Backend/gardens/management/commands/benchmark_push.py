@@ -0,0 +1,54 @@
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+
+from core.push_stub import StubExpoServer
+from gardens.notifications import HEADERS, PushDispatcher, build_message
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare sending push notifications one request at a time with batched "
+        "delivery over a kept-alive session, against a local stub of the Expo API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=500, help='Notifications to send')
+        parser.add_argument('--latency-ms', type=float, default=50.0, help='Mean stub Expo latency')
+        parser.add_argument('--jitter-ms', type=float, default=10.0, help='Stub Expo latency std deviation')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        tokens = [f'ExponentPushToken[bench-{i}]' for i in range(options['messages'])]
+        rows = []
+        for label, send in (('one per message', self.send_each), ('batched', self.send_batched)):
+            with StubExpoServer(options['latency_ms'], options['jitter_ms'], seed=options['seed']) as stub:
+                started = time.perf_counter()
+                accepted = send(stub.url, tokens)
+                elapsed = time.perf_counter() - started
+            rows.append((label, elapsed, accepted, stub.counters))
+
+        self.stdout.write(f"{'mode':<18}{'seconds':>10}{'msg/s':>10}{'accepted':>10}{'requests':>10}{'conns':>8}")
+        for label, elapsed, accepted, counters in rows:
+            self.stdout.write(
+                f"{label:<18}{elapsed:>10.2f}{len(tokens) / elapsed:>10.0f}{accepted:>10}"
+                f"{counters['requests']:>10}{counters['connections']:>8}"
+            )
+
+    def send_each(self, url, tokens):
+        """What send_reminders used to do: one ``requests.post`` per notification."""
+        accepted = 0
+        for token in tokens:
+            response = requests.post(url, json=build_message(token, 'Care Time! 🌿', 'Benchmark'),
+                                     headers=HEADERS, timeout=10)
+            accepted += response.json()['data']['status'] == 'ok'
+        return accepted
+
+    def send_batched(self, url, tokens):
+        with requests.Session() as session:
+            session.headers.update(HEADERS)
+            with PushDispatcher(url=url, session=session) as dispatcher:
+                for token in tokens:
+                    dispatcher.add(token, 'Care Time! 🌿', 'Benchmark')
+        return sum(ticket.ok for ticket in dispatcher.tickets)
@@ -0,0 +1,31 @@
+import signal
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from gardens.scheduler import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the reminder scheduler: exact pushes go out as reminders fall due, "
+        "and outbox retries, receipts, summaries and recurring rollover run every minute. Stop with SIGINT or SIGTERM."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-minutes', type=float, default=60.0,
+                            help='How far ahead pending reminders are kept in memory')
+        parser.add_argument('--poll-seconds', type=float, default=5.0, help='Change feed polling interval')
+        parser.add_argument('--maintenance-seconds', type=float, default=60.0,
+                            help='Interval of summaries and recurring rollover')
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler(
+            horizon=timedelta(minutes=options['horizon_minutes']),
+            poll_interval=timedelta(seconds=options['poll_seconds']),
+            maintenance_interval=timedelta(seconds=options['maintenance_seconds']),
+        )
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: scheduler.stop())
+        self.stdout.write("Reminder scheduler running, press CTRL-C to stop.")
+        scheduler.run()
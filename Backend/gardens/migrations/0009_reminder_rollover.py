@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_history_rolled_over(apps, schema_editor):
+    # the old command already created next occurrences for these, unlinked
+    Reminder = apps.get_model('gardens', 'Reminder')
+    Reminder.objects.filter(is_completed=True, is_recurring=True).update(rolled_over=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gardens', '0008_reminder_notified'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminder',
+            name='previous_occurrence',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='next_occurrence', to='gardens.reminder'),
+        ),
+        migrations.AddField(
+            model_name='reminder',
+            name='rolled_over',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_history_rolled_over, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(condition=models.Q(('is_completed', True), ('is_recurring', True), ('rolled_over', False)), fields=['id'], name='reminder_rollover_pending'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gardens', '0009_reminder_rollover'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(condition=models.Q(('is_completed', False), ('notified', False)), fields=['scheduled_date'], name='reminder_pending_due'),
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(fields=['updated_at'], name='reminder_updated'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gardens', '0011_pushmessage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pushmessage',
+            index=models.Index(condition=models.Q(('status__in', ['delivered', 'failed'])), fields=['updated_at'], name='push_settled'),
+        ),
+    ]
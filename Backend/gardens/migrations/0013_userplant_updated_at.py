@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gardens', '0012_pushmessage_settled_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userplant',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_settled_at(apps, schema_editor):
+    # the last change is the best record left of when an already settled message settled
+    PushMessage = apps.get_model('gardens', 'PushMessage')
+    PushMessage.objects.filter(status__in=['delivered', 'failed']).update(settled_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gardens', '0013_userplant_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='pushmessage',
+            name='push_settled',
+        ),
+        migrations.AddField(
+            model_name='pushmessage',
+            name='settled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_settled_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='pushmessage',
+            index=models.Index(condition=models.Q(('status__in', ['delivered', 'failed'])), fields=['settled_at'], name='push_settled'),
+        ),
+    ]
@@ -56,6 +56,7 @@ class UserPlant(models.Model):
     )
 
     notes = models.TextField(blank=True, null=True, help_text="Personal notes about the plant")
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         if self.last_watered and not self.next_watering_date:  # فقط اگر last_watered موجود باشد
@@ -113,6 +114,11 @@ class Reminder(models.Model):
     is_recurring = models.BooleanField(default=False)
     recurrence_interval = models.IntegerField(null=True, blank=True, help_text="Interval in days for recurring reminders")
     notified = models.BooleanField(default=False)
+    # Set once the next occurrence of a completed recurring reminder exists;
+    # the one-to-one link makes a second successor impossible
+    rolled_over = models.BooleanField(default=False)
+    previous_occurrence = models.OneToOneField('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                               related_name='next_occurrence')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -124,6 +130,14 @@ class Reminder(models.Model):
 
     class Meta:
         ordering = ['-scheduled_date']
+        indexes = [
+            models.Index(fields=['id'], name='reminder_rollover_pending',
+                         condition=models.Q(is_completed=True, is_recurring=True, rolled_over=False)),
+            # the scheduler's horizon load and change feed (gardens.scheduler)
+            models.Index(fields=['scheduled_date'], name='reminder_pending_due',
+                         condition=models.Q(is_completed=False, notified=False)),
+            models.Index(fields=['updated_at'], name='reminder_updated'),
+        ]
 
 
 
@@ -182,4 +196,48 @@ class PlantChatMessage(models.Model):
         verbose_name_plural = "پیام‌های چت گیاهان"
 
     def __str__(self):
-        return f"{self.user.username} - {self.user_plant.plant.farsi_name} - {self.created_at.strftime('%Y/%m/%d %H:%M')}"
\ No newline at end of file
+        return f"{self.user.username} - {self.user_plant.plant.farsi_name} - {self.created_at.strftime('%Y/%m/%d %H:%M')}"
+
+class PushMessage(models.Model):
+    """A push notification in the outbox (gardens.outbox), kept until Expo reports on it."""
+    PENDING = 'pending'
+    SENT = 'sent'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent, awaiting receipt'),
+        (DELIVERED, 'Delivered'),
+        (FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='push_messages',
+                             null=True, blank=True)
+    reminder = models.ForeignKey(Reminder, on_delete=models.SET_NULL, related_name='push_messages',
+                                 null=True, blank=True)
+    push_token = models.CharField(max_length=255)
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim = models.CharField(max_length=32, blank=True, default='')
+    ticket_id = models.CharField(max_length=64, blank=True, default='')
+    error = models.CharField(max_length=255, blank=True, default='')
+    sent_at = models.DateTimeField(null=True, blank=True)
+    settled_at = models.DateTimeField(null=True, blank=True)     # when it became delivered or failed
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['next_attempt_at'], name='push_pending_due', condition=models.Q(status='pending')),
+            models.Index(fields=['sent_at'], name='push_awaiting_receipt', condition=models.Q(status='sent')),
+            models.Index(fields=['settled_at'], name='push_settled',
+                         condition=models.Q(status__in=['delivered', 'failed'])),
+        ]
+
+    def __str__(self):
+        return f"{self.title} -> {self.push_token} ({self.status})"
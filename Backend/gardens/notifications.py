@@ -1,42 +1,168 @@
+import threading
+from collections import namedtuple
+
 import requests
 import logging
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
-def send_push_notification(push_token, title, body, data=None):
-    """
-    Sends a push notification to an Expo push token.
-    """
-    if not push_token or not push_token.startswith("ExponentPushToken"):
-        logger.warning(f"Invalid or empty push token '{push_token}', skipping notification.")
-        return False
-        
-    url = "https://exp.host/--/api/v2/push/send"
-    headers = {
-        "Content-Type": "application/json",
-        "accept": "application/json",
-        "accept-encoding": "gzip, deflate",
-    }
-    
-    payload = {
+DEFAULT_EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+EXPO_BATCH_SIZE = 100          # most messages Expo accepts in one request
+RECEIPTS_BATCH_SIZE = 1000     # most receipt ids Expo accepts in one request
+PUSH_TIMEOUT = 10
+
+HEADERS = {
+    "Content-Type": "application/json",
+    "accept": "application/json",
+    "accept-encoding": "gzip, deflate",
+}
+
+DEVICE_NOT_REGISTERED = 'DeviceNotRegistered'
+RETRYABLE_ERRORS = {'MessageRateExceeded'}
+
+# ``key`` is whatever the caller attached to the message (e.g. a reminder id);
+# ``retryable`` is set when the message never reached Expo or was rate limited
+PushTicket = namedtuple('PushTicket', 'key token ok ticket_id error retryable')
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide HTTP session, so pushes reuse kept-alive connections to Expo."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(HEADERS)
+            _session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=1))
+            _session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=1))
+        return _session
+
+
+def push_url():
+    return getattr(settings, 'EXPO_PUSH_URL', DEFAULT_EXPO_PUSH_URL)
+
+
+def receipts_url():
+    """The receipts endpoint next to the configured push endpoint."""
+    return push_url().rsplit('/', 1)[0] + '/getReceipts'
+
+
+def is_valid_token(push_token):
+    return bool(push_token) and push_token.startswith("ExponentPushToken")
+
+
+def build_message(push_token, title, body, data=None):
+    message = {
         "to": push_token,
         "title": title,
         "body": body,
         "sound": "default",
     }
-    
     if data:
-        payload["data"] = data
-        
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-        response_data = response.json()
-        if response.status_code == 200:
-            logger.info(f"Notification sent successfully to {push_token}: {response_data}")
-            return True
-        else:
-            logger.error(f"Failed to send notification. Status: {response.status_code}, Response: {response_data}")
+        message["data"] = data
+    return message
+
+
+class PushDispatcher:
+    """
+    Collects push messages and sends them to Expo in batches of up to 100 over
+    the shared keep-alive session.  Each message gets a ``PushTicket`` carrying
+    the ``key`` it was added with.  A full batch is sent as soon as it fills
+    up; the rest goes out on ``flush()``, or when the ``with`` block ends.
+    """
+
+    def __init__(self, url=None, batch_size=EXPO_BATCH_SIZE, session=None):
+        self.url = url or push_url()
+        self.batch_size = batch_size
+        self.session = session or get_session()
+        self.pending = []
+        self.tickets = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def add(self, push_token, title, body, data=None, key=None):
+        if not is_valid_token(push_token):
+            logger.warning(f"Invalid or empty push token '{push_token}', skipping notification.")
+            return False
+        self.pending.append((key, build_message(push_token, title, body, data)))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Send everything pending; returns the tickets of all messages sent so far."""
+        while self.pending:
+            batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            self.tickets.extend(self._send(batch))
+        return self.tickets
+
+    def _send(self, batch):
+        messages = [message for _, message in batch]
+        try:
+            response = self.session.post(self.url, json=messages, timeout=PUSH_TIMEOUT)
+            results = response.json().get('data') if response.status_code == 200 else None
+        except Exception as e:
+            logger.exception(f"Exception occurred while sending {len(batch)} push notifications: {e}")
+            results, response = None, None
+        if not isinstance(results, list) or len(results) != len(batch):
+            error = f"HTTP {response.status_code}" if response is not None else 'request failed'
+            logger.error(f"Failed to send {len(batch)} push notifications: {error}")
+            return [PushTicket(key, message['to'], False, None, error, True) for key, message in batch]
+
+        tickets = []
+        for (key, message), result in zip(batch, results):
+            if result.get('status') == 'ok':
+                tickets.append(PushTicket(key, message['to'], True, result.get('id'), None, False))
+            else:
+                error = (result.get('details') or {}).get('error') or result.get('message', 'error')
+                logger.warning(f"Push to {message['to']} rejected: {error}")
+                tickets.append(PushTicket(key, message['to'], False, None, error, error in RETRYABLE_ERRORS))
+        logger.info(f"Sent {len(batch)} push notifications, {sum(t.ok for t in tickets)} accepted")
+        return tickets
+
+
+def send_push_notification(push_token, title, body, data=None):
+    """
+    Sends a push notification to an Expo push token.
+    """
+    with PushDispatcher() as dispatcher:
+        if not dispatcher.add(push_token, title, body, data):
             return False
-    except Exception as e:
-        logger.exception(f"Exception occurred while sending push notification: {e}")
-        return False
+    return dispatcher.tickets[0].ok
+
+
+def fetch_receipts(ticket_ids, session=None):
+    """
+    ``{ticket id: (ok, error)}`` for the receipts Expo has ready; ids with
+    no receipt yet are missing.  Raises on transport errors.
+    """
+    session = session or get_session()
+    receipts = {}
+    ticket_ids = list(ticket_ids)
+    for start in range(0, len(ticket_ids), RECEIPTS_BATCH_SIZE):
+        response = session.post(receipts_url(), json={"ids": ticket_ids[start:start + RECEIPTS_BATCH_SIZE]},
+                                timeout=PUSH_TIMEOUT)
+        response.raise_for_status()
+        for ticket_id, receipt in (response.json().get('data') or {}).items():
+            if receipt.get('status') == 'ok':
+                receipts[ticket_id] = (True, None)
+            else:
+                receipts[ticket_id] = (False, (receipt.get('details') or {}).get('error') or receipt.get('message', 'error'))
+    return receipts
+
+
+def clear_dead_tokens(tokens):
+    """Forget push tokens Expo reported as ``DeviceNotRegistered``."""
+    tokens = set(tokens)
+    if tokens:
+        logger.info(f"Clearing {len(tokens)} unregistered push tokens")
+        get_user_model().objects.filter(push_token__in=tokens).update(push_token=None)
@@ -0,0 +1,367 @@
+"""
+Persistent push outbox.
+
+Pushes are written to ``PushMessage`` in the same transaction as the state
+that caused them, e.g. a reminder being marked notified, so a crash or an
+Expo outage loses nothing.  ``drain`` claims due messages under a short lease
+and sends them in batches of 100.  It spaces the batches with a token bucket
+kept under Expo's rate limit (``EXPO_PUSH_RATE`` messages per second):
+
+- a failed request, or a rate-limited message, is retried with exponential
+  backoff and jitter, up to ``MAX_ATTEMPTS``
+- any other ticket error fails the message
+
+``poll_receipts`` later asks Expo for the delivery receipts of sent messages.
+Tokens that come back as ``DeviceNotRegistered``, from a ticket or a receipt,
+are cleared from their user, so they are not pushed to again.  Delivered and
+failed messages are deleted by ``prune_settled`` once they have been settled
+(``settled_at``) for ``PUSH_RETENTION_DAYS``.
+
+A user's reminders falling due within ``PUSH_COALESCE_WINDOW_SECONDS`` of each
+other are pulled forward and sent as one grouped push, listing the plants.
+"""
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PushMessage, Reminder
+from .notifications import (
+    DEVICE_NOT_REGISTERED, EXPO_BATCH_SIZE, RETRYABLE_ERRORS, RECEIPTS_BATCH_SIZE, PushDispatcher,
+    clear_dead_tokens, fetch_receipts, get_session, is_valid_token,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+CLAIM_LEASE = timedelta(minutes=2)      # a crashed worker's claim expires after this
+RECEIPT_DELAY = timedelta(minutes=15)   # Expo has most receipts ready by then
+RECEIPT_TTL = timedelta(hours=24)       # and drops them after a day
+DEFAULT_PUSH_RATE = 600                 # Expo's per-project limit, messages per second
+DEFAULT_COALESCE_WINDOW_SECONDS = 120   # a user's reminders due this close together share a push
+GROUP_BODY_TASKS = 3
+GROUP_PAYLOAD_PLANTS = 20               # keeps the payload well under Expo's 4 KB
+DEFAULT_RETENTION_DAYS = 30             # settled messages are kept this long for support and debugging
+PRUNE_BATCH_SIZE = 1000
+
+RESULT_FIELDS = ['status', 'attempts', 'next_attempt_at', 'claim', 'ticket_id', 'error', 'sent_at', 'settled_at']
+
+
+class TokenBucket:
+    """Allows ``rate`` messages per second with bursts up to ``capacity``; ``take`` sleeps until allowed."""
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, count=1):
+        """Take ``count`` tokens, waiting as needed; returns the seconds waited."""
+        waited = 0.0
+        with self.lock:
+            self._refill()
+            # a request bigger than the bucket waits for a full bucket and overdraws it
+            needed = min(count, self.capacity)
+            if self.tokens < needed:
+                waited = (needed - self.tokens) / self.rate
+                self.sleep(waited)
+                self._refill()
+            self.tokens -= count
+        return waited
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide limiter shared by every drain in this process."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = TokenBucket(getattr(settings, 'EXPO_PUSH_RATE', DEFAULT_PUSH_RATE))
+        return _limiter
+
+
+def backoff(attempts):
+    """Delay before attempt ``attempts + 1``: doubling from ``BACKOFF_BASE``, half of it jittered."""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(0, attempts - 1))
+    return delay / 2 + delay / 2 * random.random()
+
+
+class PushOutbox:
+    """
+    Collects pushes and writes them to the outbox.  Used as a context manager,
+    it wraps the caller's changes and the outbox rows in one transaction.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self._atomic = None
+
+    def __enter__(self):
+        self._atomic = transaction.atomic()
+        self._atomic.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            try:
+                self.flush()
+            except Exception as e:
+                self._atomic.__exit__(type(e), e, e.__traceback__)
+                raise
+        self._atomic.__exit__(exc_type, exc_value, traceback)
+
+    def add(self, push_token, title, body, data=None, user_id=None, reminder_id=None):
+        if not is_valid_token(push_token):
+            logger.warning(f"Invalid or empty push token '{push_token}', skipping notification.")
+            return False
+        self.messages.append(PushMessage(
+            push_token=push_token, title=title, body=body, data=data or {},
+            user_id=user_id, reminder_id=reminder_id,
+        ))
+        return True
+
+    def flush(self):
+        PushMessage.objects.bulk_create(self.messages, batch_size=500)
+        count, self.messages = len(self.messages), []
+        return count
+
+
+def coalesce_window():
+    return timedelta(seconds=getattr(settings, 'PUSH_COALESCE_WINDOW_SECONDS', DEFAULT_COALESCE_WINDOW_SECONDS))
+
+
+def due_reminders(now, reminder_ids=None):
+    """
+    Pending reminders due by ``now`` (or just ``reminder_ids``), plus the
+    other pending reminders of the same users that fall due within the
+    coalescing window, so ``add_exact_reminders`` can group them.
+    """
+    pending = Reminder.objects.filter(is_completed=False, notified=False)
+    due = pending.filter(id__in=reminder_ids) if reminder_ids is not None else pending.filter(scheduled_date__lte=now)
+    window = coalesce_window()
+    if window:
+        due = pending.filter(
+            Q(id__in=due.values('id')) |
+            Q(user__in=due.values('user_id'), scheduled_date__lte=now + window)
+        )
+    return due.select_related('user', 'user_plant__plant').order_by('user_id', 'scheduled_date', 'id')
+
+
+def _group_by_window(reminders, window):
+    """Split each user's reminders into runs that start at most ``window`` apart."""
+    groups = []
+    for reminder in reminders:
+        group = groups[-1] if groups else None
+        if (group and group[0].user_id == reminder.user_id
+                and reminder.scheduled_date - group[0].scheduled_date <= window):
+            group.append(reminder)
+        else:
+            groups.append([reminder])
+    return groups
+
+
+def _plant_name(reminder):
+    return reminder.user_plant.plant.farsi_name if reminder.user_plant else "your plant"
+
+
+def reminder_message(group):
+    """``(title, body, data)`` of the push for one reminder, or for several due together."""
+    title = "Care Time! 🌿"
+    if len(group) == 1:
+        reminder = group[0]
+        body = f"It's time for {reminder.title} on your {_plant_name(reminder)}."
+        data = {
+            "type": "reminder_exact",
+            "reminder_id": reminder.id,
+            "plant_id": reminder.user_plant.id if reminder.user_plant else None
+        }
+        return title, body, data
+
+    tasks = ', '.join(reminder.title for reminder in group[:GROUP_BODY_TASKS])
+    more = f" and {len(group) - GROUP_BODY_TASKS} more" if len(group) > GROUP_BODY_TASKS else ""
+    body = f"It's time for {len(group)} care tasks: {tasks}{more}."
+    data = {
+        "type": "reminder_group",
+        "reminder_ids": [reminder.id for reminder in group],
+        "plants": [{
+            "reminder_id": reminder.id,
+            "plant_id": reminder.user_plant.id if reminder.user_plant else None,
+            "name": _plant_name(reminder),
+            "care_type": reminder.care_type,
+        } for reminder in group[:GROUP_PAYLOAD_PLANTS]],
+    }
+    return title, body, data
+
+
+def add_exact_reminders(outbox, reminders):
+    """
+    Queue the exact-time pushes of due reminders (with ``user`` and
+    ``user_plant__plant`` selected) and mark them all notified; the outbox
+    takes over delivery from here.  A user's reminders falling due within the
+    coalescing window share one push.  Returns how many pushes were queued.
+    """
+    reminders = sorted(reminders, key=lambda reminder: (reminder.user_id, reminder.scheduled_date, reminder.id))
+    queued = 0
+    for group in _group_by_window(reminders, coalesce_window()):
+        user = group[0].user
+        if user.notify_reminders_exact and user.push_token:
+            title, body, data = reminder_message(group)
+            logger.info(f"Queueing exact push notification to {user.username} for {len(group)} reminders")
+            queued += outbox.add(user.push_token, title, body, data, user_id=user.id, reminder_id=group[0].id)
+
+    Reminder.objects.filter(id__in=[reminder.id for reminder in reminders]).update(notified=True)
+    return queued
+
+
+def _claim(now, size):
+    """Claim up to ``size`` due pending messages for this worker by leasing them."""
+    due = PushMessage.objects.filter(status=PushMessage.PENDING, next_attempt_at__lte=now)
+    ids = list(due.order_by('next_attempt_at').values_list('id', flat=True)[:size])
+    if not ids:
+        return []
+    claim = uuid.uuid4().hex
+    due.filter(id__in=ids).update(claim=claim, next_attempt_at=now + CLAIM_LEASE)
+    return list(PushMessage.objects.filter(id__in=ids, claim=claim))
+
+
+def _retry_or_fail(message, now, error):
+    message.attempts += 1
+    message.error = error[:255]
+    if message.attempts >= MAX_ATTEMPTS:
+        message.status, message.settled_at = PushMessage.FAILED, now
+    else:
+        message.next_attempt_at = now + backoff(message.attempts)
+
+
+def _send_batch(batch, now, session):
+    with PushDispatcher(session=session) as dispatcher:
+        for message in batch:
+            dispatcher.add(message.push_token, message.title, message.body, message.data, key=message.id)
+    tickets = {ticket.key: ticket for ticket in dispatcher.tickets}
+
+    dead_tokens = []
+    for message in batch:
+        message.claim = ''
+        ticket = tickets.get(message.id)
+        if ticket is None:
+            continue
+        if ticket.ok:
+            message.status, message.ticket_id, message.sent_at, message.error = PushMessage.SENT, ticket.ticket_id, now, ''
+            message.attempts += 1
+        elif ticket.retryable:
+            _retry_or_fail(message, now, ticket.error)
+        else:
+            message.status, message.error, message.settled_at = PushMessage.FAILED, ticket.error[:255], now
+            message.attempts += 1
+            if ticket.error == DEVICE_NOT_REGISTERED:
+                dead_tokens.append(message.push_token)
+
+    PushMessage.objects.bulk_update(batch, RESULT_FIELDS)
+    clear_dead_tokens(dead_tokens)
+
+
+def drain(now=None, limit=None, limiter=None, session=None):
+    """
+    Send due outbox messages until none are left (or ``limit`` were tried).
+    Returns a count per resulting status.
+    """
+    now = now or timezone.now()
+    limiter = limiter or get_rate_limiter()
+    session = session or get_session()
+    counts = {PushMessage.SENT: 0, PushMessage.PENDING: 0, PushMessage.FAILED: 0}
+    tried = 0
+    while limit is None or tried < limit:
+        batch = _claim(now, EXPO_BATCH_SIZE if limit is None else min(EXPO_BATCH_SIZE, limit - tried))
+        if not batch:
+            break
+        limiter.take(len(batch))
+        _send_batch(batch, now, session)
+        tried += len(batch)
+        for message in batch:
+            counts[message.status] += 1
+    if counts[PushMessage.PENDING]:
+        logger.warning(f"{counts[PushMessage.PENDING]} push notifications failed and will be retried")
+    return counts
+
+
+def poll_receipts(now=None, session=None):
+    """Settle sent messages from their Expo receipts; returns a count per resulting status."""
+    now = now or timezone.now()
+    counts = {PushMessage.DELIVERED: 0, PushMessage.PENDING: 0, PushMessage.FAILED: 0}
+
+    # receipts are gone after a day; no news by then is taken as delivered
+    counts[PushMessage.DELIVERED] += PushMessage.objects.filter(
+        status=PushMessage.SENT, sent_at__lt=now - RECEIPT_TTL
+    ).update(status=PushMessage.DELIVERED, error='no receipt', settled_at=now)
+
+    awaiting = list(PushMessage.objects.filter(
+        status=PushMessage.SENT, sent_at__lte=now - RECEIPT_DELAY,
+    ).order_by('sent_at')[:RECEIPTS_BATCH_SIZE * 10])
+    if not awaiting:
+        return counts
+    try:
+        receipts = fetch_receipts([message.ticket_id for message in awaiting], session)
+    except Exception as e:
+        logger.error(f"Failed to fetch push receipts: {e}")
+        return counts
+
+    settled, dead_tokens = [], []
+    for message in awaiting:
+        if message.ticket_id not in receipts:
+            continue
+        ok, error = receipts[message.ticket_id]
+        if ok:
+            message.status, message.settled_at = PushMessage.DELIVERED, now
+        elif error in RETRYABLE_ERRORS:
+            message.status = PushMessage.PENDING
+            _retry_or_fail(message, now, error)
+        else:
+            message.status, message.error, message.settled_at = PushMessage.FAILED, error[:255], now
+            if error == DEVICE_NOT_REGISTERED:
+                dead_tokens.append(message.push_token)
+        counts[message.status] += 1
+        settled.append(message)
+
+    PushMessage.objects.bulk_update(settled, RESULT_FIELDS)
+    clear_dead_tokens(dead_tokens)
+    return counts
+
+
+def prune_settled(now=None):
+    """Delete delivered and failed messages settled more than ``PUSH_RETENTION_DAYS`` ago; returns how many."""
+    now = now or timezone.now()
+    days = getattr(settings, 'PUSH_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+    settled = PushMessage.objects.filter(
+        status__in=(PushMessage.DELIVERED, PushMessage.FAILED), settled_at__lt=now - timedelta(days=days),
+    )
+    deleted = 0
+    while True:
+        # in batches, so a large backlog does not hold the write lock for long
+        ids = list(settled.values_list('id', flat=True)[:PRUNE_BATCH_SIZE])
+        if not ids:
+            break
+        deleted += PushMessage.objects.filter(id__in=ids).delete()[0]
+    if deleted:
+        logger.info(f"Pruned {deleted} settled push notifications")
+    return deleted
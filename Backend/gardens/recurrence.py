@@ -0,0 +1,68 @@
+"""
+Rollover of completed recurring reminders into their next occurrence.
+
+Each run looks only at completed recurring reminders not yet ``rolled_over``.
+A partial index covers exactly that set, so the cost follows new completions
+rather than the whole reminder history.  Successors are created with
+``bulk_create``.  Each one points at the occurrence it follows through
+``previous_occurrence``, which is unique.  A second run, or two overlapping
+ones, therefore cannot create a duplicate.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Reminder
+
+logger = logging.getLogger(__name__)
+
+ROLLOVER_BATCH_SIZE = 500
+
+
+def next_scheduled_date(reminder, now):
+    """First date after ``now`` on the reminder's cadence, keeping its time of day."""
+    interval = timedelta(days=reminder.recurrence_interval)
+    steps = max(1, (now - reminder.scheduled_date) // interval + 1)
+    return reminder.scheduled_date + steps * interval
+
+
+def successor(reminder, now):
+    return Reminder(
+        user_id=reminder.user_id,
+        user_plant_id=reminder.user_plant_id,
+        title=reminder.title,
+        description=reminder.description,
+        care_type=reminder.care_type,
+        scheduled_date=next_scheduled_date(reminder, now),
+        is_completed=False,
+        is_recurring=True,
+        recurrence_interval=reminder.recurrence_interval,
+        notified=False,
+        previous_occurrence_id=reminder.id,
+    )
+
+
+def roll_over_completed(now=None, batch_size=ROLLOVER_BATCH_SIZE):
+    """Create the next occurrence of every newly completed recurring reminder; returns how many."""
+    now = now or timezone.now()
+    pending = Reminder.objects.filter(is_completed=True, is_recurring=True, rolled_over=False).order_by('id')
+    created = 0
+    last_id = 0
+    while True:
+        batch = list(pending.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return created
+        last_id = batch[-1].id
+        successors = [successor(reminder, now) for reminder in batch if reminder.recurrence_interval]
+        # ignore_conflicts silently skips successors an overlapping run already made
+        existing = Reminder.objects.filter(previous_occurrence__in=[reminder.id for reminder in batch])
+        with transaction.atomic():
+            before = existing.count()
+            Reminder.objects.bulk_create(successors, ignore_conflicts=True)
+            created += existing.count() - before
+            Reminder.objects.filter(id__in=[reminder.id for reminder in batch]).update(rolled_over=True)
+        logger.info(f"Rolled over {len(batch)} recurring reminders")
+        if len(batch) < batch_size:
+            return created
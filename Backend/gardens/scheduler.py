@@ -0,0 +1,151 @@
+"""
+Long-running scheduler for exact-time reminder pushes.
+
+Instead of scanning ``Reminder`` on every cron run, the scheduler keeps the
+unnotified reminders due within ``horizon`` in a heap.  It sleeps until the
+next one is due, or until the next poll, whichever comes first:
+
+- New and edited reminders are picked up from a change feed.  That is a
+  polling cursor on ``updated_at``, re-reading a few seconds of overlap to
+  catch transactions that committed late.
+- The horizon is extended before it runs out.
+- Heap entries are invalidated lazily: an entry only counts while it matches
+  the latest due time recorded for its reminder.
+
+Pushes go through the outbox (``gardens.outbox``).  Retries, receipts,
+pruning of settled pushes, the daily and tomorrow summaries and recurring
+rollover run every ``maintenance_interval``.  Run it with ``python manage.py run_reminder_scheduler``.
+"""
+import heapq
+import logging
+import threading
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Reminder
+from .outbox import PushOutbox, add_exact_reminders, drain, due_reminders, poll_receipts, prune_settled
+from .recurrence import roll_over_completed
+from .summaries import DAILY, TOMORROW, add_summaries
+
+logger = logging.getLogger(__name__)
+
+CHANGE_FEED_OVERLAP = timedelta(seconds=5)
+
+
+class ReminderScheduler:
+
+    def __init__(self, horizon=timedelta(hours=1), poll_interval=timedelta(seconds=5),
+                 maintenance_interval=timedelta(minutes=1)):
+        self.horizon = horizon
+        self.poll_interval = poll_interval
+        self.maintenance_interval = maintenance_interval
+        self.heap = []              # (scheduled_date, reminder_id)
+        self.entries = {}           # reminder_id -> scheduled_date
+        self.loaded_until = None
+        self.cursor = None
+        self.next_maintenance = None
+        self.stopped = threading.Event()
+
+    def schedule(self, reminder_id, scheduled_date):
+        self.entries[reminder_id] = scheduled_date
+        heapq.heappush(self.heap, (scheduled_date, reminder_id))
+
+    def unschedule(self, reminder_id):
+        self.entries.pop(reminder_id, None)
+
+    def _is_current(self, scheduled_date, reminder_id):
+        return self.entries.get(reminder_id) == scheduled_date
+
+    def start(self, now):
+        self.cursor = now
+        self.next_maintenance = now
+        self.load(now)
+
+    def load(self, now):
+        """Schedule pending reminders due up to ``now + horizon`` that are not loaded yet."""
+        until = now + self.horizon
+        pending = Reminder.objects.filter(is_completed=False, notified=False, scheduled_date__lte=until)
+        if self.loaded_until is not None:
+            pending = pending.filter(scheduled_date__gt=self.loaded_until)
+        for reminder_id, scheduled_date in pending.values_list('id', 'scheduled_date'):
+            self.schedule(reminder_id, scheduled_date)
+        self.loaded_until = until
+
+    def poll_changes(self):
+        """Apply reminders created or edited since the cursor to the heap."""
+        changes = Reminder.objects.filter(updated_at__gt=self.cursor - CHANGE_FEED_OVERLAP).values_list(
+            'id', 'scheduled_date', 'is_completed', 'notified', 'updated_at'
+        )
+        for reminder_id, scheduled_date, is_completed, notified, updated_at in changes:
+            self.cursor = max(self.cursor, updated_at)
+            if is_completed or notified or scheduled_date > self.loaded_until:
+                self.unschedule(reminder_id)
+            elif self.entries.get(reminder_id) != scheduled_date:
+                self.schedule(reminder_id, scheduled_date)
+
+    def dispatch_due(self, now):
+        """Send the pushes of every reminder due by ``now``; returns how many were queued."""
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            scheduled_date, reminder_id = heapq.heappop(self.heap)
+            if self._is_current(scheduled_date, reminder_id):
+                due.append(reminder_id)
+                self.unschedule(reminder_id)
+        if not due:
+            return 0
+
+        reminders = list(due_reminders(now, due))
+        with PushOutbox() as outbox:
+            queued = add_exact_reminders(outbox, reminders)
+        # reminders pulled forward into a grouped push are done too
+        for reminder in reminders:
+            self.unschedule(reminder.id)
+        drain(now)
+        return queued
+
+    def maintain(self, now):
+        """Summaries, outbox retries, receipts and pruning, and recurring rollover, once per ``maintenance_interval``."""
+        if now < self.next_maintenance:
+            return
+        self.next_maintenance = now + self.maintenance_interval
+        with PushOutbox() as outbox:
+            add_summaries(outbox, DAILY, now)
+            add_summaries(outbox, TOMORROW, now)
+        drain(now)
+        poll_receipts(now)
+        prune_settled(now)
+        roll_over_completed(now)
+
+    def tick(self, now):
+        self.poll_changes()
+        if now + self.horizon / 2 >= self.loaded_until:
+            self.load(now)
+        sent = self.dispatch_due(now)
+        self.maintain(now)
+        return sent
+
+    def next_wakeup(self, now):
+        while self.heap and not self._is_current(*self.heap[0]):
+            heapq.heappop(self.heap)
+        wakeup = min(now + self.poll_interval, self.next_maintenance)
+        return min(self.heap[0][0], wakeup) if self.heap else wakeup
+
+    def run(self):
+        self.start(timezone.now())
+        logger.info(f"Reminder scheduler started with {len(self.entries)} reminders due within {self.horizon}")
+        while not self.stopped.is_set():
+            close_old_connections()
+            now = timezone.now()
+            try:
+                sent = self.tick(now)
+                if sent:
+                    logger.info(f"Sent {sent} exact reminder pushes")
+            except Exception as e:
+                logger.exception(f"Reminder scheduler tick failed: {e}")
+            self.stopped.wait(max(0.0, (self.next_wakeup(now) - timezone.now()).total_seconds()))
+        logger.info("Reminder scheduler stopped")
+
+    def stop(self):
+        self.stopped.set()
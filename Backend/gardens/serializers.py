@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import UserPlant, Reminder, GrowthRecord
+from plants.models import Plant
 from plants.serializers import PlantSerializer
 
 class GrowthRecordSerializer(serializers.ModelSerializer):
@@ -15,7 +16,7 @@ class ReminderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reminder
         fields = '__all__'
-        read_only_fields = ('user',)
+        read_only_fields = ('user', 'rolled_over', 'previous_occurrence')
 
 class UserPlantSerializer(serializers.ModelSerializer):
     plant_details = PlantSerializer(source='plant', read_only=True)
@@ -39,4 +40,66 @@ class UserPlantSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+class GardenPlantSerializer(serializers.ModelSerializer):
+    """The few plant fields a garden card shows."""
+    primary_image = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Plant
+        fields = ('id', 'farsi_name', 'english_name', 'scientific_name', 'primary_image', 'is_toxic', 'care_difficulty')
+
+    def get_primary_image(self, obj):
+        # the garden list prefetches just the first image as ``primary_images``
+        if hasattr(obj, 'primary_images'):
+            primary_image = obj.primary_images[0].image if obj.primary_images else None
+        else:
+            primary_image = obj.primary_image
+        if primary_image:
+            request = self.context.get('request')
+            if request:
+                return request.build_absolute_uri(primary_image.url)
+            return primary_image.url
+        return None
+
+
+class UserPlantSummarySerializer(serializers.ModelSerializer):
+    """
+    Compact garden entry: counts and the latest growth record instead of the
+    full histories.  Names listed in the ``expand`` context are rendered in
+    full as well.
+    """
+    EXPANDABLE = {
+        'growth_records': GrowthRecordSerializer,
+        'reminders': ReminderSerializer,
+    }
+
+    plant_details = GardenPlantSerializer(source='plant', read_only=True)
+    growth_record_count = serializers.IntegerField(read_only=True)
+    pending_reminder_count = serializers.IntegerField(read_only=True)
+    latest_growth_record = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UserPlant
+        fields = (
+            'id', 'user', 'plant_details', 'nickname', 'added_date',
+            'last_watered', 'next_watering_date', 'watering_interval_days',
+            'last_fertilized', 'next_fertilizing_date', 'fertilizing_interval_days',
+            'last_pruned', 'next_pruning_date', 'pruning_interval_days',
+            'health_status', 'pot_size', 'notes',
+            'growth_record_count', 'pending_reminder_count', 'latest_growth_record',
+        )
+        read_only_fields = fields
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.context.get('expand', ()):
+            fields[name] = self.EXPANDABLE[name](many=True, read_only=True)
+        return fields
+
+    def get_latest_growth_record(self, obj):
+        latest = getattr(obj, 'latest_growth_records', None)
+        if latest is None:
+            latest = obj.growth_records.all()[:1]
+        return GrowthRecordSerializer(latest[0], context=self.context).data if latest else None
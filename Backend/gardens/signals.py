@@ -105,4 +105,4 @@ def increment_plant_garden_count(sender, instance, created, **kwargs):
 
 @receiver(post_delete, sender=UserPlant)
 def decrement_plant_garden_count(sender, instance, **kwargs):
-    Plant.objects.filter(pk=instance.plant_id).update(garden_count=F('garden_count') - 1)
\ No newline at end of file
+    Plant.objects.filter(pk=instance.plant_id).update(garden_count=F('garden_count') - 1)
@@ -0,0 +1,162 @@
+"""
+Daily and tomorrow reminder summaries, computed for all users at once.
+
+Users are bucketed by timezone.  Each bucket's local date and reminder window
+are worked out once.  Zones that share the same window then share a bucket.
+A run costs a fixed handful of queries however many users are due:
+
+- one query for the distinct timezones
+- one for the eligible users
+- one for their reminder counts
+- one for their plant names
+- one UPDATE of ``last_*_notification_date`` per local date (and thousand users)
+
+The eligible users are read once and everything after, including the
+UPDATE, is keyed on their ids, so a user who becomes eligible mid-run is left
+for the next run instead of being marked sent without a push.
+"""
+import logging
+from collections import namedtuple
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from functools import reduce
+from operator import or_
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Reminder
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_TIMEZONE = "Asia/Tehran"
+MARK_BATCH_SIZE = 1000
+
+# ``flag``/``last_sent`` are user fields; the summary is sent from ``hour``
+# local time and covers the local day ``day_offset`` days ahead
+SummaryKind = namedtuple('SummaryKind', 'name flag last_sent hour day_offset')
+
+DAILY = SummaryKind('daily_summary', 'notify_reminders_daily', 'last_daily_notification_date', 8, 0)
+TOMORROW = SummaryKind('tomorrow_summary', 'notify_reminders_tomorrow', 'last_tomorrow_notification_date', 20, 1)
+
+# ``window`` is the (start, end) of the summarized local day in UTC
+Bucket = namedtuple('Bucket', 'local_today summary_date window timezones')
+Summary = namedtuple('Summary', 'user_id push_token count plant_names summary_date')
+
+
+def resolve_timezone(name):
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        return ZoneInfo(FALLBACK_TIMEZONE)
+
+
+def due_buckets(kind, timezones, now=None):
+    """Group ``timezones`` whose local time has reached ``kind.hour`` by their summarized day."""
+    now = now or timezone.now()
+    buckets = {}
+    for name in timezones:
+        local_now = now.astimezone(resolve_timezone(name))
+        if local_now.hour < kind.hour:
+            continue
+        summary_date = local_now.date() + timedelta(days=kind.day_offset)
+        start = datetime.combine(summary_date, time.min, tzinfo=local_now.tzinfo)
+        end = datetime.combine(summary_date, time.max, tzinfo=local_now.tzinfo)
+        window = (start.astimezone(dt_timezone.utc), end.astimezone(dt_timezone.utc))
+        key = (local_now.date(), summary_date, window)
+        buckets.setdefault(key, Bucket(*key, timezones=[])).timezones.append(name)
+    return list(buckets.values())
+
+
+def _pending_users(kind, buckets):
+    """Users with ``kind`` enabled and a token who have not had it for their local day yet."""
+    user_model = get_user_model()
+    return user_model.objects.filter(
+        reduce(or_, (Q(timezone__in=bucket.timezones) & ~Q(**{kind.last_sent: bucket.local_today})
+                     for bucket in buckets)),
+        **{kind.flag: True},
+        push_token__isnull=False,
+    ).exclude(push_token="")
+
+
+def collect_summaries(kind, now=None):
+    """
+    ``(summaries, checked)`` for everyone due a ``kind`` summary now.
+    ``checked`` maps each local date to the ids of the users examined for it,
+    including those with no reminders in their window, who get no summary.
+    """
+    user_model = get_user_model()
+    timezones = (user_model.objects.filter(**{kind.flag: True}, push_token__isnull=False)
+                 .exclude(push_token="").values_list('timezone', flat=True).distinct())
+    buckets = due_buckets(kind, timezones, now)
+    if not buckets:
+        return [], {}
+
+    users = list(_pending_users(kind, buckets).values_list('id', 'push_token', 'timezone'))
+    bucket_of = {name: bucket for bucket in buckets for name in bucket.timezones}
+    checked = {}
+    for user_id, _, tz_name in users:
+        checked.setdefault(bucket_of[tz_name].local_today, []).append(user_id)
+    if not users:
+        return [], checked
+
+    due = Reminder.objects.filter(
+        reduce(or_, (Q(user__timezone__in=bucket.timezones, scheduled_date__range=bucket.window)
+                     for bucket in buckets)),
+        is_completed=False,
+    )
+    counts, plant_names = {}, {}
+    for start in range(0, len(users), MARK_BATCH_SIZE):
+        reminders = due.filter(user_id__in=[user_id for user_id, _, _ in users[start:start + MARK_BATCH_SIZE]])
+        batch_counts = dict(reminders.values('user_id').annotate(count=Count('id')).values_list('user_id', 'count'))
+        if not batch_counts:
+            continue
+        counts.update(batch_counts)
+        for user_id, name in (reminders.filter(user_plant__isnull=False)
+                              .values_list('user_id', 'user_plant__plant__farsi_name').distinct()):
+            plant_names.setdefault(user_id, []).append(name)
+    if not counts:
+        return [], checked
+
+    summaries = [
+        Summary(user_id, push_token, counts[user_id], sorted(plant_names.get(user_id, [])),
+                bucket_of[tz_name].summary_date)
+        for user_id, push_token, tz_name in users
+        if user_id in counts
+    ]
+    return summaries, checked
+
+
+def mark_summaries_sent(kind, checked):
+    """Record ``kind`` as sent for exactly the users ``collect_summaries`` examined."""
+    user_model = get_user_model()
+    for local_today, user_ids in checked.items():
+        updated = 0
+        for start in range(0, len(user_ids), MARK_BATCH_SIZE):
+            updated += user_model.objects.filter(pk__in=user_ids[start:start + MARK_BATCH_SIZE]).update(
+                **{kind.last_sent: local_today})
+        logger.info(f"Marked {kind.name} sent for {updated} users on {local_today}")
+
+
+def summary_message(kind, summary):
+    """``(title, body, data)`` of the push for one user's summary."""
+    plants_str = f" ({', '.join(summary.plant_names)})" if summary.plant_names else ""
+    if kind is DAILY:
+        title = "Today's Plant Care Tasks 🌸"
+        body = f"Good morning! You have {summary.count} care tasks scheduled for today{plants_str}. Open the app to complete them!"
+    else:
+        title = "Tomorrow's Plant Care Tasks 📅"
+        body = f"Plan ahead: You have {summary.count} care tasks scheduled for tomorrow{plants_str}."
+    return title, body, {"type": kind.name, "date": summary.summary_date.isoformat()}
+
+
+def add_summaries(outbox, kind, now=None):
+    """Queue every due ``kind`` summary in the push ``outbox`` and record them as sent."""
+    summaries, checked = collect_summaries(kind, now)
+    for summary in summaries:
+        title, body, data = summary_message(kind, summary)
+        outbox.add(summary.push_token, title, body, data, user_id=summary.user_id)
+    logger.info(f"Queued {kind.name} notifications to {len(summaries)} users")
+    mark_summaries_sent(kind, checked)
+    return len(summaries)
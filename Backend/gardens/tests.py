@@ -1,3 +1,529 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+import requests
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.push_stub import StubExpoServer
+from core.query_budget import QueryBudgetTestMixin
+from diseases.models import Disease
+from gardens.models import GrowthRecord, PushMessage, Reminder, UserPlant
+from gardens.notifications import PushDispatcher
+from gardens.outbox import (
+    BACKOFF_BASE, BACKOFF_MAX, MAX_ATTEMPTS, RECEIPT_DELAY, PushOutbox, TokenBucket, add_exact_reminders, drain,
+    due_reminders, poll_receipts, prune_settled,
+)
+from gardens.recurrence import roll_over_completed
+from gardens.scheduler import ReminderScheduler
+from gardens.summaries import DAILY, TOMORROW, collect_summaries, mark_summaries_sent
+from gardens.views import GardenDashboardView, GardenRiskView, NotificationsView, UserPlantViewSet
+from plants.models import Plant, PlantImage
+
+
+class GardenRiskTests(QueryBudgetTestMixin, APITestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='grower', password='pass12345')
+        self.rose = Plant.objects.create(farsi_name='رز', english_name='Rose', scientific_name='Rosa',
+                                         description='-', description_en='-')
+        self.tomato = Plant.objects.create(farsi_name='گوجه فرنگی', english_name='Tomato',
+                                           scientific_name='Solanum lycopersicum', description='-', description_en='-')
+        self.fern = Plant.objects.create(farsi_name='سرخس', english_name='Fern', scientific_name='Nephrolepis',
+                                         description='-', description_en='-')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def disease(self, name, plants, **fields):
+        return Disease.objects.create(name=name, description='-', symptoms='-', solution='-',
+                                      affected_plants_list=plants, **fields)
+
+    def test_affected_plants_are_resolved_from_the_list(self):
+        disease = self.disease('Black Spot', 'rose، SOLANUM LYCOPERSICUM, Unknown plant')
+        self.assertEqual(set(disease.affected_plants.all()), {self.rose, self.tomato})
+
+        disease.affected_plants_list = 'Fern'
+        disease.save()
+        self.assertEqual(list(disease.affected_plants.all()), [self.fern])
+
+    def test_risks_cover_the_garden_ordered_by_severity_and_spread(self):
+        for plant in (self.rose, self.tomato):
+            UserPlant.objects.create(user=self.user, plant=plant, nickname=f'my {plant.english_name}')
+        self.disease('Black Spot', 'Rose', severity_level='medium', spread_rate='fast')
+        self.disease('Late Blight', 'Tomato, Rose', severity_level='critical', spread_rate='fast')
+        self.disease('Rust', 'Rose', severity_level='medium', spread_rate='slow')
+        self.disease('Fern Scale', 'Fern', severity_level='critical')
+
+        with self.assertQueryBudget(GardenRiskView, 'get'):
+            response = self.client.get('/api/my-garden/risks/')
+
+        self.assertEqual([risk['name'] for risk in response.data['results']], ['Late Blight', 'Black Spot', 'Rust'])
+        late_blight = response.data['results'][0]
+        self.assertEqual({user_plant['nickname'] for user_plant in late_blight['user_plants']},
+                         {'my Rose', 'my Tomato'})
+
+    def test_empty_garden_has_no_risks(self):
+        self.disease('Black Spot', 'Rose')
+        response = self.client.get('/api/my-garden/risks/')
+        self.assertEqual(response.data, {'count': 0, 'results': []})
+
+
+class GardenListTests(QueryBudgetTestMixin, APITestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='grower', password='pass12345')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        now = timezone.now()
+        self.user_plants = []
+        for i in range(4):
+            plant = Plant.objects.create(farsi_name=f'گیاه {i}', english_name=f'Plant {i}', scientific_name=f'Planta {i}',
+                                         description='-', description_en='-')
+            user_plant = UserPlant.objects.create(user=self.user, plant=plant)
+            for day in range(3):
+                GrowthRecord.objects.create(user_plant=user_plant, date=now - timedelta(days=day), height=10 + day)
+                Reminder.objects.create(user=self.user, user_plant=user_plant, title=f'Water {i}',
+                                        scheduled_date=now + timedelta(days=day), is_completed=day == 0)
+            self.user_plants.append(user_plant)
+
+    def test_list_is_compact_and_fixed_cost(self):
+        with self.assertQueryBudget(UserPlantViewSet, 'list', budget=4):
+            response = self.client.get('/api/my-garden/')
+
+        self.assertEqual(len(response.data['results']), 4)
+        entry = response.data['results'][0]
+        self.assertEqual(entry['id'], self.user_plants[-1].id)
+        self.assertEqual(entry['growth_record_count'], 3)
+        self.assertEqual(entry['pending_reminder_count'], 2)
+        self.assertEqual(entry['latest_growth_record']['height'], '10.00')
+        self.assertNotIn('reminders', entry)
+        self.assertNotIn('description', entry['plant_details'])
+
+    def test_expand_nests_the_full_histories(self):
+        with self.assertQueryBudget(UserPlantViewSet, 'retrieve'):
+            response = self.client.get(f'/api/my-garden/{self.user_plants[0].id}/?expand=growth_records,reminders')
+
+        self.assertEqual(len(response.data['growth_records']), 3)
+        self.assertEqual(len(response.data['reminders']), 3)
+
+    def test_histories_are_cursor_paginated(self):
+        url = f'/api/my-garden/{self.user_plants[0].id}/reminders/?page_size=2'
+        with self.assertQueryBudget(UserPlantViewSet, 'reminders'):
+            first = self.client.get(url)
+        second = self.client.get(first.data['next'])
+
+        dates = [reminder['scheduled_date'] for reminder in first.data['results'] + second.data['results']]
+        self.assertEqual(len(dates), 3)
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        self.assertIsNone(second.data['next'])
+
+
+class GardenDashboardTests(QueryBudgetTestMixin, APITestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='grower', password='pass12345', timezone='UTC')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        today = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        self.user_plants = []
+        for i, health_status in enumerate(['healthy', 'healthy', 'unhealthy']):
+            plant = Plant.objects.create(farsi_name=f'گیاه {i}', english_name=f'Plant {i}', scientific_name=f'Planta {i}',
+                                         description='-', description_en='-')
+            user_plant = UserPlant.objects.create(user=self.user, plant=plant, health_status=health_status)
+            Reminder.objects.filter(user_plant=user_plant).delete()
+            self.user_plants.append(user_plant)
+        first, second, _ = self.user_plants
+        self.overdue = Reminder.objects.create(user=self.user, user_plant=second, title='Prune', care_type='pruning',
+                                               scheduled_date=today - timedelta(days=2))
+        Reminder.objects.create(user=self.user, user_plant=first, title='Water', scheduled_date=today)
+        Reminder.objects.create(user=self.user, user_plant=first, title='Feed', care_type='fertilizing',
+                                scheduled_date=today + timedelta(days=1))
+        Reminder.objects.create(user=self.user, user_plant=first, title='Done', scheduled_date=today, is_completed=True)
+
+    def test_dashboard_counts_next_actions_and_health(self):
+        with self.assertQueryBudget(GardenDashboardView, 'get'):
+            data = self.client.get('/api/my-garden/dashboard/').data
+
+        self.assertEqual(data['counts'], {'overdue': 1, 'today': 1, 'tomorrow': 1})
+        self.assertEqual(data['health'], {'healthy': 2, 'needs_attention': 0, 'unhealthy': 1, 'total': 3})
+        first, second, third = self.user_plants
+        self.assertEqual([entry['id'] for entry in data['plants']], [second.id, first.id, third.id])
+        overdue_plant, first_plant, idle_plant = data['plants']
+        self.assertEqual(overdue_plant['next_action']['title'], 'Prune')
+        self.assertEqual(overdue_plant['overdue_count'], 1)
+        self.assertEqual((first_plant['pending_count'], first_plant['next_action']['care_type']), (2, 'watering'))
+        self.assertIsNone(idle_plant['next_action'])
+
+    def test_dashboard_is_cached_until_the_garden_changes(self):
+        self.client.get('/api/my-garden/dashboard/')
+        # the user, the garden version and the catalog version
+        with self.assertNumQueries(3):
+            self.client.get('/api/my-garden/dashboard/')
+
+        self.overdue.is_completed = True
+        self.overdue.save()
+        data = self.client.get('/api/my-garden/dashboard/').data
+        self.assertEqual(data['counts']['overdue'], 0)
+
+        # written without signals, as rollover in the scheduler process does
+        Reminder.objects.bulk_create([Reminder(user=self.user, user_plant=self.user_plants[2], title='Mist',
+                                               scheduled_date=self.overdue.scheduled_date)])
+        data = self.client.get('/api/my-garden/dashboard/').data
+        self.assertEqual(data['counts']['overdue'], 1)
+
+    @override_settings(ALLOWED_HOSTS=['api.example.com', 'localhost'])
+    def test_cached_image_urls_follow_the_requesting_host(self):
+        PlantImage.objects.create(plant=self.user_plants[0].plant, image='plant_images/rose.jpg', is_primary=True)
+        for host in ('api.example.com', 'localhost'):
+            data = self.client.get('/api/my-garden/dashboard/', HTTP_HOST=host).data
+            image = next(entry['plant_image'] for entry in data['plants'] if entry['id'] == self.user_plants[0].id)
+            self.assertEqual(image, f'http://{host}/media/plant_images/rose.jpg')
+
+    def test_notifications_run_a_fixed_number_of_queries(self):
+        with self.assertQueryBudget(NotificationsView, 'get'):
+            data = self.client.get('/api/my-garden/notifications/').data
+        self.assertEqual((len(data['today']), len(data['tomorrow']), data['total_count']), (1, 1, 2))
+
+
+class PushDispatchTests(TestCase):
+
+    def setUp(self):
+        self.stub = StubExpoServer(latency_ms=0, jitter_ms=0).start()
+        self.addCleanup(self.stub.stop)
+
+    def test_messages_are_batched_over_one_connection(self):
+        with requests.Session() as session:
+            with PushDispatcher(url=self.stub.url, session=session) as dispatcher:
+                for i in range(250):
+                    dispatcher.add(f'ExponentPushToken[{i}]', 'Title', 'Body', key=i)
+                self.assertFalse(dispatcher.add('not-a-token', 'Title', 'Body'))
+
+        self.assertEqual([ticket.key for ticket in dispatcher.tickets], list(range(250)))
+        self.assertTrue(all(ticket.ok for ticket in dispatcher.tickets))
+        self.assertEqual(self.stub.counters, {'connections': 1, 'requests': 3, 'messages': 250, 'receipt_requests': 0})
+
+    def test_send_reminders_maps_tickets_back_to_reminders(self):
+        users = [get_user_model().objects.create_user(
+            username=name, email=f'{name}@example.com', password='pass12345', push_token=f'ExponentPushToken[{name}]',
+            notify_reminders_daily=False, notify_reminders_tomorrow=False,
+        ) for name in ('grower', 'unregistered')]
+        due = timezone.now() - timedelta(minutes=1)
+        reminders = [Reminder.objects.create(user=user, title='Water', scheduled_date=due) for user in users]
+
+        with override_settings(EXPO_PUSH_URL=self.stub.url):
+            call_command('send_reminders', stdout=StringIO())
+
+        self.assertEqual(self.stub.counters['requests'], 1)
+        for reminder in reminders:
+            reminder.refresh_from_db()
+            self.assertTrue(reminder.notified)
+        users[1].refresh_from_db()
+        self.assertIsNone(users[1].push_token)
+        users[0].refresh_from_db()
+        self.assertEqual(users[0].push_token, 'ExponentPushToken[grower]')
+
+    def test_failed_requests_stay_in_the_outbox(self):
+        user = get_user_model().objects.create_user(
+            username='grower', password='pass12345', push_token='ExponentPushToken[grower]',
+            notify_reminders_daily=False, notify_reminders_tomorrow=False,
+        )
+        reminder = Reminder.objects.create(user=user, title='Water',
+                                           scheduled_date=timezone.now() - timedelta(minutes=1))
+        self.stub.stop()
+
+        with override_settings(EXPO_PUSH_URL=self.stub.url):
+            call_command('send_reminders', stdout=StringIO())
+
+        reminder.refresh_from_db()
+        self.assertTrue(reminder.notified)
+        message = PushMessage.objects.get(reminder=reminder)
+        self.assertEqual((message.status, message.attempts), (PushMessage.PENDING, 1))
+        self.assertGreater(message.next_attempt_at, timezone.now())
+
+
+class PushOutboxTests(TestCase):
+
+    def setUp(self):
+        self.stub = StubExpoServer(latency_ms=0, jitter_ms=0).start()
+        self.addCleanup(self.stub.stop)
+        settings_override = override_settings(EXPO_PUSH_URL=self.stub.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def enqueue(self, *names):
+        users = [get_user_model().objects.create_user(
+            username=name, email=f'{name}@example.com', password='pass12345', push_token=f'ExponentPushToken[{name}]',
+        ) for name in names]
+        with PushOutbox() as outbox:
+            for user in users:
+                outbox.add(user.push_token, 'Care Time! 🌿', 'Water your rose.', user_id=user.id)
+        self.now = timezone.now()
+        return users
+
+    def test_failed_sends_back_off_until_they_give_up(self):
+        self.enqueue('grower')
+        self.stub.stop()
+
+        now = self.now
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self.assertEqual(drain(now, limiter=TokenBucket(1000))[PushMessage.SENT], 0)
+            message = PushMessage.objects.get()
+            self.assertEqual(message.attempts, attempt)
+            if attempt < MAX_ATTEMPTS:
+                # nothing is due until the backoff has passed
+                self.assertEqual(sum(drain(message.next_attempt_at - timedelta(seconds=1)).values()), 0)
+                self.assertGreaterEqual(message.next_attempt_at - now, backoff_floor(attempt))
+                now = message.next_attempt_at
+        self.assertEqual(message.status, PushMessage.FAILED)
+        self.assertEqual(message.settled_at, now)
+
+    def test_receipts_settle_sent_messages_and_prune_dead_tokens(self):
+        grower, gone = self.enqueue('grower', 'gone')
+        self.assertEqual(drain(self.now)[PushMessage.SENT], 2)
+
+        self.assertEqual(sum(poll_receipts(self.now).values()), 0)
+        self.assertEqual(self.stub.counters['receipt_requests'], 0)
+
+        counts = poll_receipts(self.now + RECEIPT_DELAY)
+        self.assertEqual((counts[PushMessage.DELIVERED], counts[PushMessage.FAILED]), (1, 1))
+        self.assertEqual(self.stub.counters['receipt_requests'], 1)
+        self.assertEqual(PushMessage.objects.get(user=gone).error, 'DeviceNotRegistered')
+        self.assertEqual(set(PushMessage.objects.values_list('settled_at', flat=True)), {self.now + RECEIPT_DELAY})
+        gone.refresh_from_db()
+        grower.refresh_from_db()
+        self.assertIsNone(gone.push_token)
+        self.assertEqual(grower.push_token, 'ExponentPushToken[grower]')
+
+    @override_settings(PUSH_RETENTION_DAYS=30)
+    def test_settled_messages_are_pruned_after_the_retention_period(self):
+        self.enqueue('delivered', 'failed', 'sent', 'recent')
+        statuses = dict(zip(('delivered', 'failed', 'sent', 'recent'),
+                            (PushMessage.DELIVERED, PushMessage.FAILED, PushMessage.SENT, PushMessage.DELIVERED)))
+        # every message was queued long ago; retention counts from when it settled
+        PushMessage.objects.update(updated_at=self.now - timedelta(days=40))
+        for username, message_status in statuses.items():
+            PushMessage.objects.filter(user__username=username).update(
+                status=message_status, settled_at=self.now - timedelta(days=1 if username == 'recent' else 31))
+
+        self.assertEqual(prune_settled(self.now), 2)
+        self.assertEqual(sorted(PushMessage.objects.values_list('user__username', flat=True)), ['recent', 'sent'])
+
+    def test_token_bucket_spaces_out_bursts(self):
+        clock = [0.0]
+        bucket = TokenBucket(100, clock=lambda: clock[0], sleep=lambda seconds: clock.__setitem__(0, clock[0] + seconds))
+
+        self.assertEqual(bucket.take(100), 0)
+        self.assertAlmostEqual(bucket.take(50), 0.5)
+        # bigger than the bucket: waits for a full bucket, then overdraws it
+        self.assertAlmostEqual(bucket.take(150), 1.0)
+        self.assertAlmostEqual(bucket.take(1), 0.51)
+
+
+    def test_reminders_due_together_share_one_push(self):
+        grower, other = self.enqueue('grower', 'other')
+        PushMessage.objects.all().delete()
+        rose = Plant.objects.create(farsi_name='رز', english_name='Rose', scientific_name='Rosa',
+                                    description='-', description_en='-')
+        fern = Plant.objects.create(farsi_name='سرخس', english_name='Fern', scientific_name='Nephrolepis',
+                                    description='-', description_en='-')
+        gardens = {plant: UserPlant.objects.create(user=grower, plant=plant) for plant in (rose, fern)}
+
+        def remind(user, minutes, title, plant=None):
+            return Reminder.objects.create(user=user, user_plant=gardens.get(plant), title=title,
+                                           scheduled_date=self.now + timedelta(minutes=minutes))
+
+        grouped = [remind(grower, -1, 'Water', rose), remind(grower, 0, 'Fertilize', rose),
+                   remind(grower, 1, 'Prune', fern)]   # pulled forward
+        later = remind(grower, 10, 'Mist', fern)
+        single = remind(other, -1, 'Water')
+
+        with override_settings(PUSH_COALESCE_WINDOW_SECONDS=120), PushOutbox() as outbox:
+            self.assertEqual(add_exact_reminders(outbox, due_reminders(self.now)), 2)
+
+        group = PushMessage.objects.get(user=grower)
+        self.assertEqual(group.data['type'], 'reminder_group')
+        self.assertEqual(group.data['reminder_ids'], [reminder.id for reminder in grouped])
+        self.assertEqual([plant['name'] for plant in group.data['plants']], ['رز', 'رز', 'سرخس'])
+        self.assertEqual(group.body, "It's time for 3 care tasks: Water, Fertilize, Prune.")
+        self.assertEqual(PushMessage.objects.get(user=other).data['reminder_id'], single.id)
+        later.refresh_from_db()
+        self.assertFalse(later.notified)
+
+        Reminder.objects.update(notified=False)
+        with override_settings(PUSH_COALESCE_WINDOW_SECONDS=0), PushOutbox() as outbox:
+            self.assertEqual(add_exact_reminders(outbox, due_reminders(self.now)), 3)
+
+def backoff_floor(attempts):
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1)) / 2
+
+
+class ReminderSummaryTests(TestCase):
+    # 09:30 in Tehran, 10:00 in Dubai, 02:00 in New York
+    now = datetime(2026, 3, 10, 6, 0, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        self.rose = Plant.objects.create(farsi_name='رز', english_name='Rose', scientific_name='Rosa',
+                                         description='-', description_en='-')
+        self.users = {name: get_user_model().objects.create_user(
+            username=name, email=f'{name}@example.com', password='pass12345',
+            push_token=f'ExponentPushToken[{name}]', timezone=tz_name,
+        ) for name, tz_name in (('tehran', 'Asia/Tehran'), ('dubai', 'Asia/Dubai'),
+                                ('newyork', 'America/New_York'), ('nowhere', 'Mars/Olympus'))}
+
+    def remind(self, name, when, plant=None):
+        user_plant = UserPlant.objects.create(user=self.users[name], plant=plant) if plant else None
+        return Reminder.objects.create(user=self.users[name], user_plant=user_plant, title='Water',
+                                       scheduled_date=when)
+
+    def test_daily_summaries_use_each_users_local_day(self):
+        self.remind('tehran', self.now, plant=self.rose)
+        self.remind('tehran', self.now + timedelta(hours=10))
+        self.remind('tehran', self.now + timedelta(hours=20))      # after local midnight
+        self.remind('dubai', self.now - timedelta(hours=5))
+        self.remind('newyork', self.now)                            # too early to send
+        self.remind('nowhere', self.now)                            # falls back to Tehran
+
+        with self.assertNumQueries(4):
+            summaries, checked = collect_summaries(DAILY, self.now)
+
+        by_user = {summary.user_id: summary for summary in summaries}
+        self.assertEqual(set(by_user), {self.users[name].id for name in ('tehran', 'dubai', 'nowhere')})
+        self.assertEqual(by_user[self.users['tehran'].id].count, 2)
+        self.assertEqual(by_user[self.users['tehran'].id].plant_names, ['رز'])
+        self.assertEqual(by_user[self.users['dubai'].id].count, 1)
+        self.assertEqual(list(checked), [date(2026, 3, 10)])
+
+        with self.assertNumQueries(1):
+            mark_summaries_sent(DAILY, checked)
+        self.users['tehran'].refresh_from_db()
+        self.assertEqual(self.users['tehran'].last_daily_notification_date.isoformat(), '2026-03-10')
+        self.assertEqual(collect_summaries(DAILY, self.now)[0], [])
+
+    def test_summaries_are_collected_in_user_batches(self):
+        self.remind('tehran', self.now, plant=self.rose)
+        self.remind('dubai', self.now)
+        self.remind('nowhere', self.now)
+        with patch('gardens.summaries.MARK_BATCH_SIZE', 1):
+            summaries, _ = collect_summaries(DAILY, self.now)
+        self.assertEqual({summary.user_id: summary.count for summary in summaries},
+                         {self.users[name].id: 1 for name in ('tehran', 'dubai', 'nowhere')})
+        self.assertEqual([summary.plant_names for summary in summaries if summary.plant_names], [['رز']])
+
+    def test_users_eligible_after_collection_are_not_marked_sent(self):
+        self.remind('tehran', self.now)
+        self.remind('dubai', self.now)
+        get_user_model().objects.filter(pk=self.users['dubai'].pk).update(push_token='')
+        summaries, checked = collect_summaries(DAILY, self.now)
+
+        # the Dubai user sets a push token between collecting and marking
+        get_user_model().objects.filter(pk=self.users['dubai'].pk).update(push_token='ExponentPushToken[dubai]')
+        mark_summaries_sent(DAILY, checked)
+
+        self.users['dubai'].refresh_from_db()
+        self.assertIsNone(self.users['dubai'].last_daily_notification_date)
+        self.assertEqual([summary.user_id for summary in collect_summaries(DAILY, self.now)[0]],
+                         [self.users['dubai'].id])
+
+    def test_tomorrow_summaries_cover_the_next_local_day(self):
+        evening = self.now + timedelta(hours=12)                    # 21:30 in Tehran
+        self.remind('tehran', evening + timedelta(hours=3))         # 00:30 tomorrow
+        self.remind('tehran', evening + timedelta(hours=2))         # 23:30 today
+
+        summaries, _ = collect_summaries(TOMORROW, evening)
+
+        self.assertEqual([(summary.user_id, summary.count, summary.summary_date.isoformat())
+                          for summary in summaries], [(self.users['tehran'].id, 1, '2026-03-11')])
+
+
+class ReminderRolloverTests(TestCase):
+    now = datetime(2026, 3, 10, 6, 0, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='grower', password='pass12345')
+
+    def reminder(self, scheduled_date, **fields):
+        return Reminder.objects.create(user=self.user, title='Water', scheduled_date=scheduled_date,
+                                       is_recurring=True, recurrence_interval=3, **fields)
+
+    def test_each_completed_occurrence_rolls_over_once(self):
+        late = self.reminder(datetime(2026, 3, 1, 7, 30, tzinfo=dt_timezone.utc), is_completed=True)
+        early = self.reminder(datetime(2026, 3, 12, 7, 30, tzinfo=dt_timezone.utc), is_completed=True)
+        self.reminder(datetime(2026, 3, 9, 7, 30, tzinfo=dt_timezone.utc))   # not completed yet
+
+        # select, then count, insert, count and update inside a savepoint
+        with self.assertNumQueries(7):
+            self.assertEqual(roll_over_completed(self.now), 2)
+        self.assertEqual(roll_over_completed(self.now), 0)
+
+        # the next step on each cadence after now, at the same time of day
+        self.assertEqual(late.next_occurrence.scheduled_date, datetime(2026, 3, 10, 7, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(early.next_occurrence.scheduled_date, datetime(2026, 3, 15, 7, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(Reminder.objects.count(), 5)
+
+    def test_successors_made_by_an_overlapping_run_are_not_counted(self):
+        done = self.reminder(self.now, is_completed=True)
+        self.reminder(self.now + timedelta(days=3), previous_occurrence=done)
+        self.reminder(self.now, is_completed=True)
+
+        self.assertEqual(roll_over_completed(self.now), 1)
+        self.assertEqual(Reminder.objects.count(), 4)
+
+    def test_a_second_successor_is_rejected(self):
+        done = self.reminder(self.now, is_completed=True)
+        roll_over_completed(self.now)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.reminder(self.now, previous_occurrence=done)
+
+
+class ReminderSchedulerTests(TestCase):
+
+    def setUp(self):
+        self.stub = StubExpoServer(latency_ms=0, jitter_ms=0).start()
+        self.addCleanup(self.stub.stop)
+        settings_override = override_settings(EXPO_PUSH_URL=self.stub.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = get_user_model().objects.create_user(
+            username='grower', password='pass12345', push_token='ExponentPushToken[grower]',
+            notify_reminders_daily=False, notify_reminders_tomorrow=False,
+        )
+        self.now = timezone.now()
+        self.scheduler = ReminderScheduler(poll_interval=timedelta(minutes=30), maintenance_interval=timedelta(days=1))
+
+    def remind(self, minutes):
+        return Reminder.objects.create(user=self.user, title='Water',
+                                       scheduled_date=self.now + timedelta(minutes=minutes))
+
+    def test_pushes_go_out_as_reminders_fall_due(self):
+        overdue, soon = self.remind(-1), self.remind(10)
+        self.scheduler.start(self.now)
+
+        self.assertEqual(self.scheduler.tick(self.now), 1)
+        self.assertEqual(self.scheduler.next_wakeup(self.now), soon.scheduled_date)
+        # nothing due: only the change feed is read
+        with self.assertNumQueries(1):
+            self.assertEqual(self.scheduler.tick(self.now + timedelta(minutes=5)), 0)
+        self.assertEqual(self.scheduler.tick(soon.scheduled_date), 1)
+
+        self.assertEqual(self.stub.counters['messages'], 2)
+        self.assertEqual(Reminder.objects.filter(notified=True).count(), 2)
+
+    def test_change_feed_picks_up_new_and_completed_reminders(self):
+        completed = self.remind(5)
+        self.scheduler.start(self.now)
+
+        created = self.remind(3)
+        completed.is_completed = True
+        completed.save()
+        moved = self.remind(20)
+        moved.scheduled_date = self.now + timedelta(minutes=4)
+        moved.save()
+
+        # both are the same user's and fall due together: one grouped push
+        self.assertEqual(self.scheduler.tick(self.now + timedelta(minutes=6)), 1)
+        self.assertEqual(set(Reminder.objects.filter(notified=True).values_list('id', flat=True)),
+                         {created.id, moved.id})
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserPlantViewSet, ReminderViewSet, GrowthRecordViewSet, PlantChatView, NotificationsView
+from .views import UserPlantViewSet, ReminderViewSet, GrowthRecordViewSet, PlantChatView, NotificationsView, GardenRiskView, GardenDashboardView
 
 user_plant_router = DefaultRouter()
 user_plant_router.register(r'', UserPlantViewSet, basename='userplant')
@@ -16,5 +16,7 @@ urlpatterns = [
     path('reminders/', include(reminder_router.urls)),
     path('growth/', include(growth_router.urls)),
     path('notifications/', NotificationsView.as_view(), name='notifications'),
+    path('risks/', GardenRiskView.as_view(), name='garden-risks'),
+    path('dashboard/', GardenDashboardView.as_view(), name='garden-dashboard'),
     path('', include(user_plant_router.urls)),
 ]
\ No newline at end of file
@@ -1,22 +1,90 @@
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
+from diseases.models import Disease
+from diseases.serializers import DiseaseRiskSerializer
+from plants.models import Plant, PlantImage
 from .models import UserPlant, Reminder, GrowthRecord, PlantChatMessage
-from .serializers import UserPlantSerializer, ReminderSerializer , GrowthRecordSerializer
+from .serializers import UserPlantSerializer, UserPlantSummarySerializer, ReminderSerializer , GrowthRecordSerializer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser
+from .dashboard import get_dashboard
 from .llm_chat import get_plant_chat_response
 
+class GardenPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-added_date', '-id')
+
+
+class GrowthHistoryPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-date', '-id')
+
+
+class ReminderHistoryPagination(GrowthHistoryPagination):
+    ordering = ('-scheduled_date', '-id')
+
+
+def _related_count(model, **filters):
+    """Correlated count of ``model`` rows per user plant; a join per relation would multiply rows."""
+    counts = (model.objects.filter(user_plant=OuterRef('pk'), **filters).order_by()
+              .values('user_plant').annotate(count=Count('id')).values('count'))
+    return Coalesce(Subquery(counts), 0)
+
+
 class UserPlantViewSet(viewsets.ModelViewSet):
+    """
+    The user's garden.  ``list`` and ``retrieve`` return compact entries with
+    counts and the latest growth record; ``?expand=growth_records,reminders``
+    nests the full histories, which are also paged at ``growth_records/`` and
+    ``reminders/`` under each plant.
+    """
     serializer_class = UserPlantSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = GardenPagination
+    query_budget = {'list': 6, 'retrieve': 6, 'growth_records': 3, 'reminders': 3, 'default': 8}
+
+    def get_expand(self):
+        requested = self.request.query_params.get('expand', '')
+        return [name for name in UserPlantSummarySerializer.EXPANDABLE if name in requested.split(',')]
 
     def get_queryset(self):
-        return UserPlant.objects.filter(user=self.request.user)
+        queryset = UserPlant.objects.filter(user=self.request.user)
+        if self.action in ('growth_records', 'reminders'):
+            return queryset
+        if self.action not in ('list', 'retrieve'):
+            return queryset.prefetch_related(
+                Prefetch('plant', queryset=Plant.objects.for_listing(self.request.user)),
+                'growth_records', 'reminders',
+            )
+        primary_image = PlantImage.objects.all()[:1]
+        latest_growth = GrowthRecord.objects.order_by('-date', '-id')[:1]
+        queryset = queryset.select_related('plant').prefetch_related(
+            Prefetch('plant__images', queryset=primary_image, to_attr='primary_images'),
+            Prefetch('growth_records', queryset=latest_growth, to_attr='latest_growth_records'),
+        ).annotate(
+            growth_record_count=_related_count(GrowthRecord),
+            pending_reminder_count=_related_count(Reminder, is_completed=False),
+        )
+        for name in self.get_expand():
+            queryset = queryset.prefetch_related(name)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'retrieve'):
+            return UserPlantSummarySerializer
+        return super().get_serializer_class()
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -31,9 +99,33 @@ class UserPlantViewSet(viewsets.ModelViewSet):
 
     def get_serializer_context(self):
         """
-        Pass the request context to the serializer.
+        Pass the request context, and the relations to expand, to the serializer.
+        """
+        return {'request': self.request, 'expand': self.get_expand()}
+
+    def _paged_history(self, queryset, serializer_class, pagination_class):
+        paginator = pagination_class()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = serializer_class(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def growth_records(self, request, pk=None):
+        """
+        The plant's growth records, newest first, cursor paginated.
+        """
+        user_plant = self.get_object()
+        return self._paged_history(GrowthRecord.objects.filter(user_plant=user_plant),
+                                   GrowthRecordSerializer, GrowthHistoryPagination)
+
+    @action(detail=True, methods=['get'])
+    def reminders(self, request, pk=None):
+        """
+        The plant's reminders, latest scheduled first, cursor paginated.
         """
-        return {'request': self.request}
+        user_plant = self.get_object()
+        return self._paged_history(Reminder.objects.filter(user_plant=user_plant),
+                                   ReminderSerializer, ReminderHistoryPagination)
 
     @action(detail=True, methods=['post'])
     def water_plant(self, request, pk=None):
@@ -87,6 +179,7 @@ class ReminderViewSet(viewsets.ModelViewSet):
     """
     serializer_class = ReminderSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'list': 2, 'upcoming': 2, 'overdue': 2, 'default': 4}
 
     def get_queryset(self):
         """
@@ -142,6 +235,7 @@ class GrowthRecordViewSet(viewsets.ModelViewSet):
 
     serializer_class = GrowthRecordSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = {'list': 2, 'default': 4}
 
     def get_queryset(self):
         return GrowthRecord.objects.filter(user_plant__user=self.request.user)
@@ -190,38 +284,75 @@ class PlantChatView(APIView):
 
 class NotificationsView(APIView):
     permission_classes = [IsAuthenticated]
+    query_budget = 3
 
     def get(self, request):
         today = timezone.now().date()
         tomorrow = today + timezone.timedelta(days=1)
 
-        reminders_today = Reminder.objects.filter(
-            user=request.user,
-            is_completed=False,
-            scheduled_date__date=today
-        ).select_related('user_plant__plant')
-
-        reminders_tomorrow = Reminder.objects.filter(
+        reminders = Reminder.objects.filter(
             user=request.user,
             is_completed=False,
-            scheduled_date__date=tomorrow
-        ).select_related('user_plant__plant')
+            scheduled_date__date__in=[today, tomorrow]
+        ).select_related('user_plant__plant').prefetch_related(
+            Prefetch('user_plant__plant__images', queryset=PlantImage.objects.all()[:1], to_attr='primary_images')
+        )
 
         def serialize_reminder(reminder):
+            plant = reminder.user_plant.plant if reminder.user_plant else None
             return {
                 'id': reminder.id,
                 'title': reminder.title,
                 'care_type': reminder.care_type,
                 'scheduled_date': reminder.scheduled_date.isoformat(),
                 'user_plant_id': reminder.user_plant.id if reminder.user_plant else None,
-                'plant_id': reminder.user_plant.plant.id if reminder.user_plant else None,
-                'plant_name': reminder.user_plant.plant.farsi_name if reminder.user_plant else None,
-                'plant_image': reminder.user_plant.plant.primary_image.url if reminder.user_plant and reminder.user_plant.plant.primary_image else None,
+                'plant_id': plant.id if plant else None,
+                'plant_name': plant.farsi_name if plant else None,
+                'plant_image': plant.primary_images[0].image.url if plant and plant.primary_images else None,
             }
 
-        data = {
-            'today': [serialize_reminder(r) for r in reminders_today],
-            'tomorrow': [serialize_reminder(r) for r in reminders_tomorrow],
-            'total_count': reminders_today.count() + reminders_tomorrow.count()
-        }
-        return Response(data)
\ No newline at end of file
+        data = {'today': [], 'tomorrow': []}
+        for reminder in reminders:
+            day = 'today' if timezone.localdate(reminder.scheduled_date) == today else 'tomorrow'
+            data[day].append(serialize_reminder(reminder))
+        data['total_count'] = len(data['today']) + len(data['tomorrow'])
+        return Response(data)
+
+
+class GardenDashboardView(APIView):
+    """
+    Overdue, today and tomorrow task counts, each plant's next due action and
+    a health summary of the garden, cached until the garden changes.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 6
+
+    def get(self, request):
+        return Response(get_dashboard(request.user, timezone.now(), request))
+
+class GardenRiskView(APIView):
+    """
+    Diseases that can affect the plants in the user's garden, most severe and
+    fastest spreading first, each with the garden plants at risk.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 4
+
+    def get(self, request):
+        user_plants_by_plant = {}
+        for user_plant_id, nickname, plant_id, plant_name in UserPlant.objects.filter(user=request.user).values_list(
+                'id', 'nickname', 'plant_id', 'plant__farsi_name'):
+            user_plants_by_plant.setdefault(plant_id, []).append({
+                'id': user_plant_id, 'nickname': nickname, 'plant_id': plant_id, 'plant_name': plant_name,
+            })
+
+        plant_ids = list(user_plants_by_plant)
+        diseases = Disease.objects.filter(affected_plants__in=plant_ids).distinct().by_risk().prefetch_related(
+            Prefetch('affected_plants', queryset=Plant.objects.filter(id__in=plant_ids).only('id'),
+                     to_attr='garden_plants')
+        ) if plant_ids else []
+
+        serializer = DiseaseRiskSerializer(diseases, many=True, context={
+            'request': request, 'user_plants_by_plant': user_plants_by_plant,
+        })
+        return Response({'count': len(serializer.data), 'results': serializer.data})
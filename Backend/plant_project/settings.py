@@ -99,9 +99,13 @@ INSTALLED_APPS = [
     'diseases',
     'gardens',
     'blog',
+    'core',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.RequestContextMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -112,6 +116,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request Server-Timing breakdown (core.middleware.ServerTimingMiddleware)
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'False') == 'True'
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv('SERVER_TIMING_SAMPLE_RATE', '1.0'))
+SERVER_TIMING_SLOW_MS = float(os.getenv('SERVER_TIMING_SLOW_MS', '1000'))
+
+# Per-viewset query budgets and N+1 reports (core.middleware.QueryBudgetMiddleware)
+QUERY_BUDGET_ENABLED = os.getenv('QUERY_BUDGET_ENABLED', 'False') == 'True'
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False') == 'True'
+
 ROOT_URLCONF = 'plant_project.urls'
 
 TEMPLATES = [
@@ -138,7 +151,7 @@ WSGI_APPLICATION = 'plant_project.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('DATABASE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
@@ -305,6 +318,25 @@ OTP_SIMULATION_MODE = os.getenv('OTP_SIMULATION_MODE', 'False') == 'True'
 OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY', 'OPENROUTER_API_KEY')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', 'GEMINI_API_KEY')
 
+# LLM telemetry (core.llm_telemetry); LLM_PRICING = {model: (usd_per_1m_prompt, usd_per_1m_completion)}
+LLM_TELEMETRY_PERSIST = os.getenv('LLM_TELEMETRY_PERSIST', 'True') == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Disease diagnosis pipeline (diseases.diagnosis)
+DIAGNOSIS_WORKERS = int(os.getenv('DIAGNOSIS_WORKERS', '8'))
+DIAGNOSIS_LATENCY_BUDGET_MS = float(os.getenv('DIAGNOSIS_LATENCY_BUDGET_MS', '20000'))
+# Stored disease analyses older than this are refreshed in the background (diseases.analysis)
+DISEASE_ANALYSIS_MAX_AGE_DAYS = int(os.getenv('DISEASE_ANALYSIS_MAX_AGE_DAYS', '90'))
+
+# Expo push API (gardens.notifications); point it at core.push_stub to test delivery offline
+EXPO_PUSH_URL = os.getenv('EXPO_PUSH_URL', 'https://exp.host/--/api/v2/push/send')
+# Messages per second the push outbox sends at most (gardens.outbox); Expo allows 600
+EXPO_PUSH_RATE = float(os.getenv('EXPO_PUSH_RATE', '600'))
+# A user's reminders due within this many seconds of each other share one push (0 turns it off)
+PUSH_COALESCE_WINDOW_SECONDS = int(os.getenv('PUSH_COALESCE_WINDOW_SECONDS', '120'))
+# Delivered and failed pushes are deleted from the outbox after this many days
+PUSH_RETENTION_DAYS = int(os.getenv('PUSH_RETENTION_DAYS', '30'))
+
 # Google OAuth Settings
 GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID', '470968416969-sc4qbgd3d93598kg0o5em017ae6bkood.apps.googleusercontent.com')
 GOOGLE_CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET')
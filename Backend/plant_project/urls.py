@@ -6,6 +6,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from core.views import LLMMetricsView
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularSwaggerView,
@@ -26,6 +27,8 @@ urlpatterns = [
     path('api/diseases/', include('diseases.urls')),
     path('api/my-garden/', include('gardens.urls')),
     path('api/blog/', include('blog.urls')),
+    path('api/catalog/', include('core.urls')),
+    path('api/metrics/llm/', LLMMetricsView.as_view(), name='llm-metrics'),
 
     # JWT Token Authentication
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
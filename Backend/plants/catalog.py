@@ -0,0 +1,19 @@
+"""
+Catalog version.
+
+Anything derived from the whole plant catalog (recommendation rankings,
+facet counts, in-process feature tables) is cached under the current
+version.  The version is read from the database: the number of plants and
+the latest ``updated_at``.  Every process therefore sees a change as soon as
+it is committed, whichever worker, command or bulk import made it.  Counter
+updates (views, favourites) leave ``updated_at`` alone and keep the version.
+"""
+from django.db.models import Count, Max
+
+
+def get_catalog_version():
+    from .models import Plant
+
+    state = Plant.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+    latest = state['latest'].timestamp() if state['latest'] else 0
+    return f"{state['count']}-{latest:.6f}"
@@ -0,0 +1,172 @@
+"""
+Plant checkup: species identification and disease diagnosis from one photo.
+
+The photo is uploaded once and sent to the vision model once, with a prompt
+that asks for both the species and the disease.  The reply is split into the
+shapes the identify and diagnose prompts return.  Each half then goes through
+the usual post-processing: ``resolve_plant`` and ``resolve_disease``.  The
+disease details start generating before the plant is looked up, so both
+database lookups overlap that LLM call.
+"""
+import base64
+import logging
+import os
+import re
+import time
+
+from django.conf import settings
+
+from core.llm_telemetry import track_llm_call
+from diseases.diagnosis import StageTimings, request_details
+from diseases.ml_models import resolve_disease
+
+from .ml_models import parse_model_json, resolve_plant
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# CONFIGURATION & SWITCH
+# =====================================================================
+USE_GEMINI = True
+
+CHECKUP_MODEL = "gemini-3.5-flash" if USE_GEMINI else "gemma-4-31b-it"
+
+# =====================================================================
+# IMPORTS & CLIENT INITIALIZATION
+# =====================================================================
+if USE_GEMINI:
+    from google import genai
+    from google.genai import types
+
+    GEMINI_API_KEY = getattr(settings, 'GEMINI_API_KEY', None)
+    client = genai.Client(api_key=GEMINI_API_KEY)
+else:
+    from openai import OpenAI
+
+    AVALAI_API_KEY = getattr(settings, 'AVALAI_API_KEY', None)
+
+CHECKUP_PROMPT = """You are an expert botanist and plant pathologist performing a plant health checkup from one photo.
+
+Do both tasks for the most prominent plant in the image:
+1. Identify the plant: common English name, scientific name (genus and species) and a confidence percentage (0-100).
+2. Diagnose its health: the exact English standard name of any visible disease (e.g., "Powdery Mildew", "Late Blight"), or "Healthy" when there is none, with a confidence percentage (0-100).
+
+Output **only** valid JSON, with no markdown and no extra text:
+{
+  "is_plant": true,
+  "common_name": "English common name",
+  "scientific_name": "Scientific name",
+  "plant_confidence": 95,
+  "disease_name": "Standard English Disease Name or Healthy",
+  "disease_confidence": 90
+}
+
+If the image does not contain a plant, or it is too blurry to judge, output:
+{
+  "is_plant": false,
+  "error": "No plant detected in the image. Please upload a clear photo of a leaf, flower, stem, or the whole plant."
+}
+"""
+
+MIME_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png', '.webp': 'image/webp',
+              '.gif': 'image/gif'}
+
+
+def read_image(image_data):
+    """``(bytes, mime type)`` of an uploaded file, data URI or file path."""
+    if hasattr(image_data, 'chunks'):
+        ext = os.path.splitext(image_data.name or '')[1].lower()
+        image_bytes = b''.join(image_data.chunks())
+    elif isinstance(image_data, str) and image_data.startswith('data:'):
+        match = re.match(r'data:image/(\w+)', image_data)
+        ext = '.' + match.group(1).lower() if match else '.jpg'
+        image_bytes = base64.b64decode(image_data.split(',', 1)[1])
+    elif isinstance(image_data, str) and image_data.strip():
+        ext = os.path.splitext(image_data)[1].lower()
+        with open(image_data, 'rb') as f:
+            image_bytes = f.read()
+    else:
+        raise ValueError('Invalid image data')
+    return image_bytes, MIME_TYPES.get(ext, 'image/jpeg')
+
+
+def _ask_vision_model(image_bytes, mime_type):
+    prompt = f"{CHECKUP_PROMPT}\n\nCheck up this plant and return JSON as instructed."
+    if USE_GEMINI:
+        with track_llm_call('plant_checkup_image', CHECKUP_MODEL) as call:
+            response = client.models.generate_content(
+                model=CHECKUP_MODEL,
+                contents=[types.Part.from_bytes(data=image_bytes, mime_type=mime_type), prompt],
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    temperature=0.2,
+                )
+            )
+            call.record(response)
+        return response.text.strip()
+
+    openai_client = OpenAI(
+        base_url="https://api.avalai.ir/v1",
+        api_key=AVALAI_API_KEY
+    )
+    base64_image = base64.b64encode(image_bytes).decode('utf-8')
+    with track_llm_call('plant_checkup_image', CHECKUP_MODEL) as call:
+        response = openai_client.chat.completions.create(
+            model=CHECKUP_MODEL,
+            messages=[{
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}},
+                ],
+            }],
+            temperature=0.2,
+            timeout=100
+        )
+        call.record(response)
+    return response.choices[0].message.content.strip()
+
+
+def _failed(error):
+    return {'id': None, 'name': None, 'error': error}, {'id': None, 'details': None, 'error': error}
+
+
+def predict_checkup(image_data):
+    """
+    ``(plant result, disease result)`` in the shapes ``predict_plant`` and
+    ``predict_disease`` return, from a single vision call.
+    """
+    if not (GEMINI_API_KEY if USE_GEMINI else AVALAI_API_KEY):
+        logger.error("Vision API key is missing.")
+        return _failed('API key configuration error')
+
+    try:
+        image_bytes, mime_type = read_image(image_data)
+        timings = StageTimings()
+        vision_started = time.perf_counter()
+        content = _ask_vision_model(image_bytes, mime_type)
+        timings.add('vision', vision_started)
+        result = parse_model_json(content)
+    except Exception as e:
+        logger.error(f"Plant checkup vision call failed: {e}", exc_info=True)
+        return _failed(f'Checkup failed: {e}')
+
+    if result is None or result.get('is_plant') is not True:
+        return _failed((result or {}).get('error', 'No plant detected'))
+
+    disease_label = result.get('disease_name') or 'Healthy'
+    details_future = None
+    if disease_label.lower() != 'healthy':
+        # start the disease details now so the plant lookup overlaps them
+        details_future = request_details(disease_label, timings)
+
+    plant_result = resolve_plant({
+        'is_plant': True,
+        'common_name': result.get('common_name', ''),
+        'scientific_name': result.get('scientific_name', ''),
+        'confidence': result.get('plant_confidence'),
+    })
+    disease_result = resolve_disease(
+        {'disease_name': disease_label, 'confidence': result.get('disease_confidence', 0)}, timings, details_future
+    )
+    return plant_result, disease_result
@@ -0,0 +1,86 @@
+"""
+Facet counts for the plant filter UI.
+
+All facets are computed from a single grouped query over the filtered
+queryset (one row per distinct combination of facet values) and folded into
+per-facet counts in Python.  Results are cached by the filter parameters and
+the catalog version.  The version comes from the database, so an edit made in
+any process expires the cached facets of every worker.
+"""
+import hashlib
+import json
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .care_codes import get_label
+from .catalog import get_catalog_version
+
+CACHE_TIMEOUT = 60 * 60
+
+# facet name -> (Plant field, care_codes attribute used for labels or None)
+FACETS = {
+    'care_difficulty': ('care_difficulty', None),
+    'is_toxic': ('is_toxic', None),
+    'light': ('light_code', 'light'),
+    'watering': ('watering_code', 'watering'),
+    'humidity': ('humidity_code', 'humidity'),
+    'soil': ('soil_code', 'soil'),
+}
+
+DIFFICULTY_LABELS = {
+    'easy': {'en': 'Easy', 'fa': 'آسان'},
+    'medium': {'en': 'Medium', 'fa': 'متوسط'},
+    'hard': {'en': 'Hard', 'fa': 'سخت'},
+}
+
+# Query parameters that do not change the filtered set
+IGNORED_PARAMS = {'page', 'page_size', 'ordering', 'include_facets', 'format'}
+
+
+def facet_signature(params):
+    items = sorted(
+        (key, sorted(params.getlist(key)))
+        for key in params.keys() if key not in IGNORED_PARAMS
+    )
+    payload = json.dumps(items, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _label(facet, value):
+    _, attribute = FACETS[facet]
+    if attribute:
+        return {'en': get_label(attribute, value, 'en'), 'fa': get_label(attribute, value, 'fa')}
+    if facet == 'care_difficulty':
+        return DIFFICULTY_LABELS.get(value, {'en': value, 'fa': value})
+    return None
+
+
+def compute_facets(queryset):
+    """Return ``{facet: [{'value', 'count', 'label'}, ...]}`` for ``queryset`` in one query."""
+    fields = [field for field, _ in FACETS.values()]
+    counters = {facet: Counter() for facet in FACETS}
+    groups = queryset.order_by().values(*fields).annotate(count=Count('id'))
+    for group in groups:
+        for facet, (field, _) in FACETS.items():
+            if group[field] is not None:
+                counters[facet][group[field]] += group['count']
+
+    facets = {}
+    for facet, counter in counters.items():
+        facets[facet] = [
+            {'value': value, 'count': count, 'label': _label(facet, value)}
+            for value, count in sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+        ]
+    return facets
+
+
+def get_facets(queryset, params):
+    """Cached :func:`compute_facets` keyed by the request's filter parameters."""
+    cache_key = f'plants:facets:{get_catalog_version()}:{facet_signature(params)}'
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(cache_key, facets, CACHE_TIMEOUT)
+    return facets
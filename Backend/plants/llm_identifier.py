@@ -1,6 +1,9 @@
 import json
 import re
 from django.conf import settings
+
+from core.llm_telemetry import track_llm_call
+
 from .models import Plant
 
 # =====================================================================
@@ -120,14 +123,16 @@ Return ONLY the raw JSON object.
     content = ""
     if USE_GEMINI:
         try:
-            response = client.models.generate_content(
-                model=IDENTIFIER_MODEL,
-                contents=f"Plant name: {plant_name}",
-                config=types.GenerateContentConfig(
-                    system_instruction=system_prompt,
-                    response_mime_type="application/json",
-                ),
-            )
+            with track_llm_call('plant_lookup', IDENTIFIER_MODEL) as call:
+                response = client.models.generate_content(
+                    model=IDENTIFIER_MODEL,
+                    contents=f"Plant name: {plant_name}",
+                    config=types.GenerateContentConfig(
+                        system_instruction=system_prompt,
+                        response_mime_type="application/json",
+                    ),
+                )
+                call.record(response)
             content = response.text.strip()
         except APIError as api_err:
             print(f"Google GenAI API Error in identifier: {repr(api_err)}")
@@ -142,14 +147,16 @@ Return ONLY the raw JSON object.
                 api_key=YOUR_GAPGPT_API_KEY
             )
 
-            response = openai_client.chat.completions.create(
-                model=IDENTIFIER_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Plant name: {plant_name}"}
-                ],
-                timeout=50
-            )
+            with track_llm_call('plant_lookup', IDENTIFIER_MODEL) as call:
+                response = openai_client.chat.completions.create(
+                    model=IDENTIFIER_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": f"Plant name: {plant_name}"}
+                    ],
+                    timeout=50
+                )
+                call.record(response)
             content = response.choices[0].message.content.strip()
         except Exception as e:
             print(f"Network request or unexpected error occurred in OpenAI identifier: {repr(e)}")
@@ -1,6 +1,8 @@
 import json
 from django.conf import settings
 
+from core.llm_telemetry import track_llm_call
+
 # =====================================================================
 # CONFIGURATION & SWITCH
 # =====================================================================
@@ -94,14 +96,16 @@ Important: The plant must be fully compatible with all restrictions mentioned.
     # ---- 1. GEMINI (GOOGLE GENAI) SECTION ----
     if USE_GEMINI:
         try:
-            response = client.models.generate_content(
-                model=RECOMMENDATION_MODEL,
-                contents=user_prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_prompt,
-                    response_mime_type="application/json",
-                ),
-            )
+            with track_llm_call('plant_recommend', RECOMMENDATION_MODEL) as call:
+                response = client.models.generate_content(
+                    model=RECOMMENDATION_MODEL,
+                    contents=user_prompt,
+                    config=types.GenerateContentConfig(
+                        system_instruction=system_prompt,
+                        response_mime_type="application/json",
+                    ),
+                )
+                call.record(response)
             print(response)
             content = response.text.strip()
             recommendation = json.loads(content)
@@ -124,14 +128,16 @@ Important: The plant must be fully compatible with all restrictions mentioned.
                 api_key=AVALAI_API_KEY
             )
 
-            response = openai_client.chat.completions.create(
-                model=RECOMMENDATION_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                timeout=600.0
-            )
+            with track_llm_call('plant_recommend', RECOMMENDATION_MODEL) as call:
+                response = openai_client.chat.completions.create(
+                    model=RECOMMENDATION_MODEL,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    timeout=600.0
+                )
+                call.record(response)
 
             content = response.choices[0].message.content.strip()
 
@@ -157,4 +163,74 @@ Important: The plant must be fully compatible with all restrictions mentioned.
             return None
         except Exception as e:
             print(f"Unexpected error calling OpenAI for recommendation: {repr(e)}")
-            return None
\ No newline at end of file
+            return None
+
+def get_recommendation_reason_from_llm(plant, answers: dict, language: str, additional_notes: str = ""):
+    """
+    Phrase a short, personal reason for an already-chosen plant.
+
+    The plant itself is picked by plants.recommender; the model only writes
+    the explanation, so the prompt and output stay small.
+    """
+    if USE_GEMINI:
+        if not GEMINI_API_KEY:
+            print("Error: Gemini API key is missing.")
+            return None
+    else:
+        if not AVALAI_API_KEY:
+            print("Error: AvalAI API key is missing in django settings.")
+            return None
+
+    answers_text = ""
+    for key, value in answers.items():
+        answers_text += f"- {key}: {value}\n"
+
+    plant_name = plant.farsi_name if language == 'fa' else (plant.english_name or plant.farsi_name)
+    if language == 'fa':
+        prompt = f"""
+گیاه «{plant_name}» ({plant.scientific_name or ''}) برای کاربری با شرایط زیر انتخاب شده است:
+{answers_text}
+Additional notes: {additional_notes}
+
+در حداکثر ۳ جمله به زبان فارسی توضیح بده چرا این گیاه برای این کاربر مناسب است. فقط متن توضیح را برگردان.
+"""
+    else:
+        prompt = f"""
+The plant "{plant_name}" ({plant.scientific_name or ''}) was chosen for a user with these answers:
+{answers_text}
+Additional notes: {additional_notes}
+
+In at most 3 sentences of English, explain why this plant suits this user. Return only the explanation text.
+"""
+
+    try:
+        if USE_GEMINI:
+            with track_llm_call('plant_recommend_reason', RECOMMENDATION_MODEL) as call:
+                response = client.models.generate_content(
+                    model=RECOMMENDATION_MODEL,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        temperature=0.4,
+                        max_output_tokens=200,
+                    ),
+                )
+                call.record(response)
+            return response.text.strip()
+
+        openai_client = OpenAI(
+            base_url="https://api.avalai.ir/v1/",
+            api_key=AVALAI_API_KEY
+        )
+        with track_llm_call('plant_recommend_reason', RECOMMENDATION_MODEL) as call:
+            response = openai_client.chat.completions.create(
+                model=RECOMMENDATION_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.4,
+                max_tokens=200,
+                timeout=60.0
+            )
+            call.record(response)
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"Error generating recommendation reason: {repr(e)}")
+        return None
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from plants.similarity import rebuild_similarity_table
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the care-attribute neighbour table used by the related-plants endpoint'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = rebuild_similarity_table()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f'Stored {rows} similarity rows in {elapsed:.2f}s')
+        )
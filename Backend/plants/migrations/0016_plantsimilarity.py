@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plants', '0015_plant_other_names_plant_other_names_en'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text='Cosine similarity of the care-attribute vectors')),
+                ('rank', models.PositiveSmallIntegerField(help_text='0 is the most similar neighbour')),
+                ('plant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_plants', to='plants.plant')),
+                ('related_plant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='plants.plant')),
+            ],
+            options={
+                'ordering': ['plant', 'rank'],
+                'indexes': [models.Index(fields=['plant', 'rank'], name='plants_plan_plant_i_f026e8_idx')],
+                'unique_together': {('plant', 'related_plant')},
+            },
+        ),
+    ]
@@ -0,0 +1,244 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:45
+
+import re
+
+from django.db import migrations, models
+
+# A frozen copy of plants.care_codes as it was when this migration was
+# written, so later changes to the live mapping cannot change what it does.
+CARE_CHOICES = {
+    'watering': (
+        ('very_low', 'very low', 'خیلی کم', ('بسیار کم',)),
+        ('low', 'low', 'کم', ()),
+        ('medium', 'medium', 'متوسط', ('moderate',)),
+        ('high', 'high', 'زیاد', ('frequent',)),
+        ('very_high', 'very high', 'خیلی زیاد', ('بسیار زیاد',)),
+    ),
+    'fertilizer': (
+        ('never', 'never', 'هرگز', ('not required', 'نیاز ندارد')),
+        ('yearly', 'once a year', 'سالی یک بار', ('yearly', 'annually', 'سالانه')),
+        ('quarterly', 'every 3 months', 'هر 3 ماه', ('3 months', 'three months', 'سه ماه')),
+        ('monthly', 'monthly', 'ماهانه', ('once a month', 'ماهی یک بار')),
+        ('biweekly', 'every 2 weeks', 'هر 2 هفته', ('2 weeks', 'two weeks', 'biweekly', 'دو هفته')),
+        ('weekly', 'weekly', 'هفتگی', ('every week', 'هفته ای', 'هر هفته')),
+    ),
+    'light': (
+        ('low_light', 'low light', 'نور کم', ('low', 'shade', 'سایه')),
+        ('medium_indirect', 'medium indirect light', 'نور غیرمستقیم متوسط',
+         ('medium indirect', 'medium light', 'غیر مستقیم متوسط', 'نور متوسط')),
+        ('bright_indirect', 'bright indirect light', 'نور غیرمستقیم روشن',
+         ('bright indirect', 'غیر مستقیم روشن', 'غیرمستقیم زیاد', 'پرنور')),
+        ('direct_sun', 'direct sun', 'آفتاب مستقیم', ('full sun', 'نور مستقیم')),
+        ('partial_sun', 'full sun to partial shade', 'آفتاب کامل تا نیم سایه',
+         ('partial shade', 'partial sun', 'نیم سایه')),
+    ),
+    'humidity': (
+        ('low', 'low', 'کم', ('پایین',)),
+        ('moderate', 'moderate', 'متوسط', ('medium',)),
+        ('high', 'high', 'زیاد', ('بالا',)),
+        ('very_high', 'very high', 'خیلی زیاد', ('خیلی بالا', 'بسیار زیاد')),
+    ),
+    'temperature': (
+        ('10_15', '10-15°C', '10 تا 15 درجه', ()),
+        ('15_20', '15-20°C', '15 تا 20 درجه', ()),
+        ('18_24', '18-24°C', '18 تا 24 درجه', ()),
+        ('20_30', '20-30°C', '20 تا 30 درجه', ()),
+        ('above_15', 'above 15°C', 'بالای 15 درجه', ()),
+        ('above_20', 'above 20°C', 'بالای 20 درجه', ()),
+    ),
+    'soil': (
+        ('cactus_mix', 'cactus mix', 'خاک کاکتوس', ('cactus', 'کاکتوس')),
+        ('succulent_mix', 'succulent mix', 'خاک ساکولنت', ('succulent', 'ساکولنت')),
+        ('standard_potting_mix', 'standard potting mix', 'خاک گلدان استاندارد',
+         ('potting', 'standard', 'گلدان', 'استاندارد')),
+        ('peat_based_mix', 'peat-based mix', 'خاک بر پایه پیت', ('peat', 'پیت')),
+        ('loamy_soil', 'loamy soil', 'خاک لومی', ('loam', 'لومی')),
+        ('orchid_bark_mix', 'orchid bark mix', 'پوسته درخت ارکیده', ('orchid', 'bark', 'ارکیده')),
+    ),
+    'pruning': (
+        ('minimal', 'minimal', 'حداقل', ('rarely', 'به ندرت')),
+        ('light', 'light pruning', 'هرس سبک', ('سبک',)),
+        ('regular', 'regular pruning', 'هرس منظم', ('regular', 'منظم')),
+        ('heavy', 'heavy pruning', 'هرس سنگین', ('heavy', 'سنگین')),
+    ),
+    'propagation': (
+        ('stem_cuttings', 'stem cuttings', 'قلمه ساقه', ('stem cutting',)),
+        ('leaf_cuttings', 'leaf cuttings', 'قلمه برگ', ('leaf cutting',)),
+        ('root_division', 'root division', 'تقسیم ریشه', ('division', 'تقسیم')),
+        ('seeds', 'seeds', 'بذر', ('seed',)),
+        ('air_layering', 'air layering', 'خوابانیدن هوایی', ()),
+        ('offsets', 'offsets / pups', 'پاجوش', ('offset', 'pup')),
+    ),
+}
+
+# attribute -> (Persian source field, code field); the English field is "<source>_en"
+CARE_ATTRIBUTES = {
+    'watering': ('watering_frequency', 'watering_code'),
+    'fertilizer': ('fertilizer_schedule', 'fertilizer_code'),
+    'light': ('light_requirements', 'light_code'),
+    'humidity': ('humidity_level', 'humidity_code'),
+    'temperature': ('temperature_range', 'temperature_code'),
+    'soil': ('soil_type', 'soil_code'),
+    'pruning': ('pruning_info', 'pruning_code'),
+    'propagation': ('propagation_methods', 'propagation_code'),
+}
+
+CODE_FIELDS = tuple(code_field for _, code_field in CARE_ATTRIBUTES.values())
+# Midpoint in °C of every temperature code, used to place free-text ranges
+TEMPERATURE_MIDPOINTS = {
+    '10_15': 12.5,
+    '15_20': 17.5,
+    '18_24': 21.0,
+    '20_30': 25.0,
+    'above_15': 20.0,
+    'above_20': 25.0,
+}
+
+_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩يك', '01234567890123456789یک')
+
+
+def normalize_text(value):
+    """Lower-case, unify Arabic/Persian letters and digits, and collapse whitespace and ZWNJ."""
+    text = str(value or '').translate(_DIGITS).lower().replace('‌', ' ').replace('-', ' ')
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _build_keywords():
+    keywords = {}
+    for attribute, choices in CARE_CHOICES.items():
+        entries = []
+        for code, label_en, label_fa, extra in choices:
+            for keyword in (code.replace('_', ' '), label_en, label_fa) + tuple(extra):
+                entries.append((normalize_text(keyword), code))
+        entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+        keywords[attribute] = entries
+    return keywords
+
+
+_KEYWORDS = _build_keywords()
+_CODES = {attribute: {choice[0] for choice in choices} for attribute, choices in CARE_CHOICES.items()}
+
+
+def _resolve_temperature(text):
+    numbers = [float(n) for n in re.findall(r'\d+(?:\.\d+)?', text)]
+    if not numbers:
+        return None
+    if len(numbers) == 1 and any(word in text for word in ('above', 'over', 'بالای', 'بیش')):
+        return 'above_20' if numbers[0] >= 20 else 'above_15'
+    midpoint = (numbers[0] + numbers[1]) / 2 if len(numbers) >= 2 else numbers[0]
+    ranges = [code for code in TEMPERATURE_MIDPOINTS if not code.startswith('above')]
+    return min(ranges, key=lambda code: abs(TEMPERATURE_MIDPOINTS[code] - midpoint))
+
+
+def resolve_code(attribute, *values):
+    """
+    Map free-text values (typically the English then the Persian column) to a code.
+
+    Exact codes and labels win, then the longest keyword found in the text;
+    returns None when nothing matches.
+    """
+    for value in values:
+        text = normalize_text(value)
+        if not text:
+            continue
+        if text.replace(' ', '_') in _CODES[attribute]:
+            return text.replace(' ', '_')
+        for keyword, code in _KEYWORDS[attribute]:
+            if keyword == text:
+                return code
+        if attribute == 'temperature':
+            code = _resolve_temperature(text)
+            if code:
+                return code
+            continue
+        for keyword, code in _KEYWORDS[attribute]:
+            if re.search(rf'(?<!\w){re.escape(keyword)}(?!\w)', text):
+                return code
+    return None
+
+
+def compute_care_codes(plant):
+    """Return ``{code_field: code}`` for every care attribute of ``plant``."""
+    codes = {}
+    for attribute, (source, code_field) in CARE_ATTRIBUTES.items():
+        codes[code_field] = resolve_code(
+            attribute, getattr(plant, f'{source}_en', None), getattr(plant, source, None)
+        )
+    return codes
+
+
+def backfill_care_codes(apps, schema_editor):
+    Plant = apps.get_model('plants', 'Plant')
+    batch = []
+    for plant in Plant.objects.all().iterator(chunk_size=1000):
+        for field, code in compute_care_codes(plant).items():
+            setattr(plant, field, code)
+        batch.append(plant)
+        if len(batch) >= 1000:
+            Plant.objects.bulk_update(batch, CODE_FIELDS)
+            batch = []
+    if batch:
+        Plant.objects.bulk_update(batch, CODE_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plants', '0016_plantsimilarity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plant',
+            name='fertilizer_code',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='humidity_code',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='light_code',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='propagation_code',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='pruning_code',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='soil_code',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='temperature_code',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='watering_code',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['care_difficulty', 'light_code'], name='plant_difficulty_light_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['light_code', 'watering_code'], name='plant_light_watering_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['is_toxic', 'care_difficulty'], name='plant_toxic_difficulty_idx'),
+        ),
+        migrations.RunPython(backfill_care_codes, migrations.RunPython.noop),
+    ]
@@ -8,6 +8,8 @@ import time
 from django.conf import settings
 from django.db.models import Q
 
+from core.llm_telemetry import track_llm_call
+
 logger = logging.getLogger(__name__)
 
 # =====================================================================
@@ -75,9 +77,59 @@ def encode_image_to_base64(image_path):
         return None
 
 
-def predict_plant(image_data):
+def parse_model_json(content):
+    """The JSON object in a model reply, ignoring markdown fences and surrounding text; None if there is none."""
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+
+    json_match = re.search(r'\{.*\}', content, re.DOTALL)
+    if not json_match:
+        return None
+    return json.loads(json_match.group())
+
+
+def resolve_plant(result):
+    """The identification result for a parsed vision reply, matched against the plants in the database."""
     from .models import Plant
 
+    if result.get('is_plant') is True:
+        scientific_name = result.get('scientific_name', '')
+        common_name = result.get('common_name', '')
+
+        detected_plant = Plant.objects.filter(
+            Q(scientific_name__icontains=scientific_name) |
+            Q(farsi_name__icontains=common_name) |
+            Q(english_name__icontains=common_name) |
+            Q(other_names__icontains=common_name) |
+            Q(other_names_en__icontains=common_name)
+        ).first()
+
+        if detected_plant:
+            plant_id = detected_plant.id
+            plant_name = detected_plant.scientific_name
+            logger.info(f"Plant identified: {scientific_name} -> DB id {plant_id}")
+        else:
+            plant_id = None
+            plant_name = scientific_name or common_name
+            logger.info(f"Plant identified but not in DB: {plant_name}")
+
+        return {
+            'id': plant_id,
+            'name': plant_name,
+            'common_name': common_name,
+            'scientific_name': scientific_name,
+            'confidence': result.get('confidence'),
+            'error': None
+        }
+    else:
+        error_msg = result.get('error', 'No plant detected')
+        logger.info(f"Model returned no plant: {error_msg}")
+        return {'id': None, 'name': None, 'error': error_msg}
+
+
+def predict_plant(image_data):
     if USE_GEMINI:
         if not GEMINI_API_KEY:
             logger.error("Gemini API key is missing.")
@@ -135,17 +187,19 @@ def predict_plant(image_data):
                 with open(tmp_path, "rb") as f:
                     image_bytes = f.read()
 
-                response = client.models.generate_content(
-                    model=VISION_MODEL,
-                    contents=[
-                        types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
-                        f"{SYSTEM_PROMPT}\n\nAnalyze this image and return JSON as instructed."
-                    ],
-                    config=types.GenerateContentConfig(
-                        response_mime_type="application/json",
-                        temperature=0.2,
+                with track_llm_call('plant_identify_image', VISION_MODEL) as call:
+                    response = client.models.generate_content(
+                        model=VISION_MODEL,
+                        contents=[
+                            types.Part.from_bytes(data=image_bytes, mime_type=mime_type),
+                            f"{SYSTEM_PROMPT}\n\nAnalyze this image and return JSON as instructed."
+                        ],
+                        config=types.GenerateContentConfig(
+                            response_mime_type="application/json",
+                            temperature=0.2,
+                        )
                     )
-                )
+                    call.record(response)
                 content = response.text.strip()
             except APIError as api_err:
                 logger.error(f"Google GenAI Vision API Error: {repr(api_err)}")
@@ -169,38 +223,42 @@ def predict_plant(image_data):
             retry_delay = 2
             openai_response = None
 
-            for attempt in range(max_retries):
-                try:
-                    logger.info(f"Sending request to OpenAI/GapGPT (Attempt {attempt + 1}/{max_retries})...")
-                    openai_response = openai_client.chat.completions.create(
-                        model=VISION_MODEL,
-                        messages=[
-                            {
-                                "role": "user",
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": f"{SYSTEM_PROMPT}\n\nAnalyze this image and return JSON as instructed."
-                                    },
-                                    {
-                                        "type": "image_url",
-                                        "image_url": {
-                                            "url": f"data:{mime_type};base64,{base64_image}"
+            with track_llm_call('plant_identify_image', VISION_MODEL) as call:
+                for attempt in range(max_retries):
+                    try:
+                        logger.info(f"Sending request to OpenAI/GapGPT (Attempt {attempt + 1}/{max_retries})...")
+                        openai_response = openai_client.chat.completions.create(
+                            model=VISION_MODEL,
+                            messages=[
+                                {
+                                    "role": "user",
+                                    "content": [
+                                        {
+                                            "type": "text",
+                                            "text": f"{SYSTEM_PROMPT}\n\nAnalyze this image and return JSON as instructed."
+                                        },
+                                        {
+                                            "type": "image_url",
+                                            "image_url": {
+                                                "url": f"data:{mime_type};base64,{base64_image}"
+                                            }
                                         }
-                                    }
-                                ]
-                            }
-                        ],
-                        temperature=0.2,
-                        timeout=100
-                    )
-                    break
-                except (APIConnectionError, APITimeoutError) as net_err:
-                    logger.warning(f"Network issue encountered on attempt {attempt + 1}: {net_err}")
-                    if attempt < max_retries - 1:
-                        time.sleep(retry_delay)
-                    else:
-                        raise net_err
+                                    ]
+                                }
+                            ],
+                            temperature=0.2,
+                            timeout=100
+                        )
+                        break
+                    except (APIConnectionError, APITimeoutError) as net_err:
+                        logger.warning(f"Network issue encountered on attempt {attempt + 1}: {net_err}")
+                        if attempt < max_retries - 1:
+                            call.retry()
+                            time.sleep(retry_delay)
+                        else:
+                            raise net_err
+                if openai_response:
+                    call.record(openai_response)
 
             if not openai_response:
                 return {'id': None, 'name': None, 'error': 'Failed to establish connection to OpenAI/GapGPT API'}
@@ -208,51 +266,12 @@ def predict_plant(image_data):
             content = openai_response.choices[0].message.content.strip()
 
         # ---- JSON CLEANING & PARSING BLOCK ----
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
-
-        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if not json_match:
+        result = parse_model_json(content)
+        if result is None:
             logger.warning(f"No JSON found in model response: {content}")
             return {'id': None, 'name': None, 'error': 'Model response format invalid'}
 
-        result = json.loads(json_match.group())
-
-        if result.get('is_plant') is True:
-            scientific_name = result.get('scientific_name', '')
-            common_name = result.get('common_name', '')
-
-            detected_plant = Plant.objects.filter(
-                Q(scientific_name__icontains=scientific_name) |
-                Q(farsi_name__icontains=common_name) |
-                Q(english_name__icontains=common_name) |
-                Q(other_names__icontains=common_name) |
-                Q(other_names_en__icontains=common_name)
-            ).first()
-
-            if detected_plant:
-                plant_id = detected_plant.id
-                plant_name = detected_plant.scientific_name
-                logger.info(f"Plant identified: {scientific_name} -> DB id {plant_id}")
-            else:
-                plant_id = None
-                plant_name = scientific_name or common_name
-                logger.info(f"Plant identified but not in DB: {plant_name}")
-
-            return {
-                'id': plant_id,
-                'name': plant_name,
-                'common_name': common_name,
-                'scientific_name': scientific_name,
-                'confidence': result.get('confidence'),
-                'error': None
-            }
-        else:
-            error_msg = result.get('error', 'No plant detected')
-            logger.info(f"Model returned no plant: {error_msg}")
-            return {'id': None, 'name': None, 'error': error_msg}
+        return resolve_plant(result)
 
     except json.JSONDecodeError as e:
         logger.error(f"JSON decode error from model response: {e}")
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 
 from plant_project import settings
+from .care_codes import CODE_FIELDS, SOURCE_FIELDS, compute_care_codes
 
 
 class PlantImage(models.Model):
@@ -19,6 +20,20 @@ class PlantImage(models.Model):
         return f"Image for {self.plant.farsi_name} - {self.caption or 'No caption'}"
 
 
+class PlantQuerySet(models.QuerySet):
+    def for_listing(self, user=None):
+        """
+        Prefetch images and, for an authenticated ``user``, annotate
+        ``user_favourited`` so plant serializers need no per-row queries.
+        """
+        queryset = self.prefetch_related('images')
+        if user is not None and user.is_authenticated:
+            queryset = queryset.annotate(user_favourited=models.Exists(
+                PlantFavourite.objects.filter(user=user, plant=models.OuterRef('pk'))
+            ))
+        return queryset
+
+
 class Plant(models.Model):
     """Represents a plant in the main database. Each plant has a list of images via plant.images (PlantImage)."""
     farsi_name = models.CharField(max_length=255, unique=False, help_text="Farsi Name")
@@ -61,22 +76,51 @@ class Plant(models.Model):
         ('hard', 'Hard'),
     ], default='medium', help_text="Difficulty level of caring for this plant")
 
+    # Canonical care codes (see care_codes.py), derived from the text fields on save
+    watering_code = models.CharField(max_length=32, blank=True, null=True, db_index=True, editable=False)
+    fertilizer_code = models.CharField(max_length=32, blank=True, null=True, db_index=True, editable=False)
+    light_code = models.CharField(max_length=32, blank=True, null=True, db_index=True, editable=False)
+    humidity_code = models.CharField(max_length=32, blank=True, null=True, db_index=True, editable=False)
+    temperature_code = models.CharField(max_length=32, blank=True, null=True, db_index=True, editable=False)
+    soil_code = models.CharField(max_length=32, blank=True, null=True, db_index=True, editable=False)
+    pruning_code = models.CharField(max_length=32, blank=True, null=True, db_index=True, editable=False)
+    propagation_code = models.CharField(max_length=32, blank=True, null=True, db_index=True, editable=False)
+
     # Analytics
     view_count = models.PositiveIntegerField(default=0, help_text="Number of times the plant detail has been viewed")
     garden_count = models.PositiveIntegerField(default=0, help_text="Number of users who added this plant to their garden")
 
     created_at = models.DateTimeField(default=timezone.now, help_text="Creation timestamp")
-    updated_at = models.DateTimeField(auto_now=True, help_text="Last update timestamp")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, help_text="Last update timestamp")
+
+    objects = PlantQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['care_difficulty', 'light_code'], name='plant_difficulty_light_idx'),
+            models.Index(fields=['light_code', 'watering_code'], name='plant_light_watering_idx'),
+            models.Index(fields=['is_toxic', 'care_difficulty'], name='plant_toxic_difficulty_idx'),
+        ]
 
     def __str__(self):
         return self.farsi_name
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or SOURCE_FIELDS.intersection(update_fields):
+            for field, code in compute_care_codes(self).items():
+                setattr(self, field, code)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(CODE_FIELDS)
+        super().save(*args, **kwargs)
+
     @property
     def primary_image(self):
         """Get the primary image for this plant, or the first image if none is marked as primary."""
-        primary_img = self.images.filter(is_primary=True).first()
-        if primary_img:
-            return primary_img.image
+        # Meta ordering puts the primary image first; use prefetched images when available
+        if 'images' in getattr(self, '_prefetched_objects_cache', {}):
+            images = self.images.all()
+            return images[0].image if images else None
         first_img = self.images.first()
         return first_img.image if first_img else None
 
@@ -112,4 +156,21 @@ class PlantComment(models.Model):
     class Meta:
         ordering = ['created_at']
     def __str__(self):
-        return f"{self.user.username} on {self.plant.farsi_name}: {self.content[:50]}"
\ No newline at end of file
+        return f"{self.user.username} on {self.plant.farsi_name}: {self.content[:50]}"
+
+class PlantSimilarity(models.Model):
+    """Precomputed care-attribute neighbour of a plant (see plants/similarity.py)."""
+    plant = models.ForeignKey(Plant, on_delete=models.CASCADE, related_name='similar_plants')
+    related_plant = models.ForeignKey(Plant, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text="Cosine similarity of the care-attribute vectors")
+    rank = models.PositiveSmallIntegerField(help_text="0 is the most similar neighbour")
+
+    class Meta:
+        ordering = ['plant', 'rank']
+        unique_together = ('plant', 'related_plant')
+        indexes = [
+            models.Index(fields=['plant', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"{self.plant_id} ~ {self.related_plant_id} ({self.score:.3f})"
@@ -0,0 +1,297 @@
+"""
+Deterministic local ranker for the plant recommender.
+
+Questionnaire answers are mapped to soft preferences (light, watering,
+humidity, temperature, difficulty) and hard constraints (no toxic plants
+around pets or small children).  The whole catalog is scored in one
+vectorized NumPy pass over a per-process care table, and rankings are cached
+by a hash of the normalized answers and the catalog version.
+"""
+import hashlib
+import json
+import threading
+
+import numpy as np
+from django.core.cache import cache
+
+from .care_codes import TEMPERATURE_MIDPOINTS
+from .catalog import get_catalog_version
+from .similarity import DIFFICULTY_LEVELS, HUMIDITY_SCALE, LIGHT_CODES, WATERING_SCALE
+
+# =====================================================================
+# CONFIGURATION
+# =====================================================================
+DEFAULT_TOP_N = 5
+MAX_TOP_N = 10
+CACHE_TIMEOUT = 60 * 60 * 24
+
+WEIGHTS = {
+    'light': 3.0,
+    'watering': 2.0,
+    'difficulty': 2.0,
+    'humidity': 1.5,
+    'temperature': 0.5,
+    'popularity': 0.3,
+}
+
+# natural_light answer -> suitability of each light category (missing = 0)
+LIGHT_PREFERENCES = {
+    'direct_intense': {'direct_sun': 1.0, 'partial_sun': 0.8, 'bright_indirect': 0.4},
+    'direct_mild': {'partial_sun': 1.0, 'bright_indirect': 0.9, 'direct_sun': 0.6, 'medium_indirect': 0.4},
+    'bright_indirect': {'bright_indirect': 1.0, 'medium_indirect': 0.7, 'partial_sun': 0.5, 'low_light': 0.3},
+    'medium': {'medium_indirect': 1.0, 'low_light': 0.7, 'bright_indirect': 0.6},
+    'low': {'low_light': 1.0, 'medium_indirect': 0.5},
+    'artificial_only': {'low_light': 1.0, 'medium_indirect': 0.4},
+}
+GROW_LIGHT_BOOST = {'medium_indirect': 0.8, 'bright_indirect': 0.6}
+
+# Targets on the same 0..1 scales as the similarity engine
+WATERING_TARGETS = {
+    'forgetful': 0.1,
+    'weekly_regular': 0.4,
+    'check_regularly': 0.5,
+    'daily_care': 0.8,
+    'overwater': 0.9,
+}
+HUMIDITY_TARGETS = {'very_dry': 0.0, 'moderate': 0.4, 'high': 0.8}
+DIFFICULTY_TARGETS = {
+    'beginner': 0.0,
+    'killed_plants_unknowing': 0.0,
+    'killed_plants_know_reason': 0.25,
+    'maintain_basic': 0.25,
+    'successful_sensitive': 0.75,
+    'professional': 1.0,
+}
+TEMPERATURE_TARGETS = {'cold_below15': 12.0, 'hot_summer': 28.0, 'balanced': 21.0}
+
+PET_ANSWERS = {'dog', 'cat', 'cat_chews'}
+
+# Questions that take a list of answers
+MULTI_CHOICE_QUESTIONS = {'pets'}
+
+CARE_TABLE_FIELDS = (
+    'id', 'view_count', 'is_toxic', 'care_difficulty',
+    'light_code', 'watering_code', 'humidity_code', 'temperature_code',
+)
+
+_table_lock = threading.Lock()
+_table = None
+
+
+def normalize_answers(answers):
+    """Return answers with trimmed, lower-cased keys/values and sorted multi-choice lists."""
+    normalized = {}
+    for key, value in (answers or {}).items():
+        key = str(key).strip().lower()
+        if isinstance(value, (list, tuple, set)):
+            value = sorted({str(v).strip().lower() for v in value if str(v).strip()})
+        elif isinstance(value, str):
+            value = value.strip().lower()
+            if value in ('true', 'false'):
+                value = value == 'true'
+        if value in ('', [], None):
+            continue
+        normalized[key] = value
+    return normalized
+
+
+def validate_answers(answers):
+    """Raise ``ValueError`` unless ``answers`` maps questions to one answer, or a list for multi-choice questions."""
+    if not isinstance(answers, dict):
+        raise ValueError('Answers must be an object')
+    for key, value in answers.items():
+        if str(key).strip().lower() in MULTI_CHOICE_QUESTIONS and isinstance(value, list):
+            value_list = value
+        else:
+            value_list = [value]
+        if any(item is not None and not isinstance(item, (str, bool, int, float)) for item in value_list):
+            raise ValueError(f"Invalid answer for '{key}'")
+
+
+def answers_signature(answers):
+    payload = json.dumps(normalize_answers(answers), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _as_set(value):
+    if isinstance(value, list):
+        return set(value)
+    return {value} if value else set()
+
+
+def build_care_table():
+    """Load the catalog into parallel NumPy arrays (NaN marks an unknown attribute)."""
+    from .models import Plant
+
+    rows = list(Plant.objects.order_by('id').values_list(*CARE_TABLE_FIELDS))
+    n = len(rows)
+    table = {
+        'ids': np.zeros(n, dtype=np.int64),
+        'light': np.full(n, -1, dtype=np.int64),
+        'watering': np.full(n, np.nan),
+        'humidity': np.full(n, np.nan),
+        'temperature': np.full(n, np.nan),
+        'difficulty': np.full(n, np.nan),
+        'toxic': np.zeros(n, dtype=bool),
+        'popularity': np.zeros(n),
+    }
+    for i, row in enumerate(rows):
+        values = dict(zip(CARE_TABLE_FIELDS, row))
+        table['ids'][i] = values['id']
+        if values['light_code'] in LIGHT_CODES:
+            table['light'][i] = LIGHT_CODES.index(values['light_code'])
+        watering = WATERING_SCALE.get(values['watering_code'])
+        humidity = HUMIDITY_SCALE.get(values['humidity_code'])
+        temperature = TEMPERATURE_MIDPOINTS.get(values['temperature_code'])
+        difficulty = DIFFICULTY_LEVELS.get(values['care_difficulty'])
+        table['watering'][i] = np.nan if watering is None else watering
+        table['humidity'][i] = np.nan if humidity is None else humidity
+        table['temperature'][i] = np.nan if temperature is None else temperature
+        table['difficulty'][i] = np.nan if difficulty is None else difficulty
+        table['toxic'][i] = bool(values['is_toxic'])
+        table['popularity'][i] = values['view_count'] or 0
+
+    if n:
+        table['popularity'] = np.log1p(table['popularity'])
+        if table['popularity'].max() > 0:
+            table['popularity'] /= table['popularity'].max()
+    return table
+
+
+def get_care_table(version=None):
+    """Return the care table for the current catalog version, rebuilding it when stale."""
+    global _table
+    version = version or get_catalog_version()
+    with _table_lock:
+        if _table is None or _table[0] != version:
+            _table = (version, build_care_table())
+        return _table[1]
+
+
+def _closeness(values, target):
+    """1.0 at the target, falling linearly with distance; unknown values score 0.5."""
+    score = 1.0 - np.abs(values - target)
+    return np.where(np.isnan(values), 0.5, score)
+
+
+def score_catalog(answers, table):
+    """Return ``(scores, matched)`` arrays; excluded plants score -inf."""
+    answers = normalize_answers(answers)
+    n = len(table['ids'])
+    scores = np.zeros(n)
+    matched = {}
+
+    light_answer = answers.get('natural_light')
+    if light_answer in LIGHT_PREFERENCES:
+        preferences = dict(LIGHT_PREFERENCES[light_answer])
+        if answers.get('artificial_grow_light') is True and light_answer in ('low', 'artificial_only'):
+            for code, value in GROW_LIGHT_BOOST.items():
+                preferences[code] = max(preferences.get(code, 0.0), value)
+        lookup = np.array([preferences.get(code, 0.0) for code in LIGHT_CODES] + [0.3])
+        light_score = lookup[table['light']]  # -1 (unknown) picks the trailing neutral value
+        scores += WEIGHTS['light'] * light_score
+        matched['light'] = light_score >= 0.9
+
+    watering_target = WATERING_TARGETS.get(answers.get('watering_habits'))
+    travel = answers.get('travel_frequency')
+    if travel in ('long_trips', 'few_days_monthly') and answers.get('plant_sitter') is not True:
+        cap = 0.25 if travel == 'long_trips' else 0.5
+        watering_target = cap if watering_target is None else min(watering_target, cap)
+    if watering_target is not None:
+        watering_score = _closeness(table['watering'], watering_target)
+        scores += WEIGHTS['watering'] * watering_score
+        matched['watering'] = watering_score >= 0.85
+
+    humidity_target = HUMIDITY_TARGETS.get(answers.get('humidity'))
+    if humidity_target is not None:
+        if answers.get('humidity') == 'very_dry' and answers.get('willing_humidity_tools') is True:
+            humidity_target = 0.4
+        humidity_score = _closeness(table['humidity'], humidity_target)
+        scores += WEIGHTS['humidity'] * humidity_score
+        matched['humidity'] = humidity_score >= 0.85
+
+    temperature_target = TEMPERATURE_TARGETS.get(answers.get('temperature_winter'))
+    if temperature_target is not None:
+        temperature_score = np.clip(_closeness(table['temperature'] / 10.0, temperature_target / 10.0), 0.0, 1.0)
+        scores += WEIGHTS['temperature'] * temperature_score
+
+    difficulty_target = DIFFICULTY_TARGETS.get(answers.get('experience_level'))
+    if difficulty_target is not None:
+        difficulty_score = _closeness(table['difficulty'], difficulty_target)
+        if difficulty_target == 0.0:
+            # Beginners should never be offered a hard plant.
+            difficulty_score = np.where(table['difficulty'] >= 1.0, -1.0, difficulty_score)
+        scores += WEIGHTS['difficulty'] * difficulty_score
+        matched['difficulty'] = difficulty_score >= 0.9
+
+    pets = _as_set(answers.get('pets')) & PET_ANSWERS
+    if pets or answers.get('children') is True:
+        reachable = 'cat_chews' in pets or answers.get('toxic_plant_placement') is not True
+        if reachable:
+            scores = np.where(table['toxic'], -np.inf, scores)
+        else:
+            scores = scores - np.where(table['toxic'], 1.5, 0.0)
+        matched['pet_safe'] = ~table['toxic']
+
+    scores += WEIGHTS['popularity'] * table['popularity']
+    return scores, matched
+
+
+def recommend_plants(answers, top_n=DEFAULT_TOP_N):
+    """
+    Return up to ``top_n`` ``{'plant_id', 'score', 'matched'}`` dicts, best first.
+
+    Results are cached per answers signature and catalog version, so repeated
+    questionnaires never rescore the catalog.
+    """
+    top_n = max(1, min(int(top_n), MAX_TOP_N))
+    version = get_catalog_version()
+    cache_key = f'plants:recommend:{version}:{top_n}:{answers_signature(answers)}'
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    table = get_care_table(version)
+    results = []
+    if len(table['ids']):
+        scores, matched = score_catalog(answers, table)
+        eligible = np.flatnonzero(np.isfinite(scores))
+        if len(eligible):
+            count = min(top_n, len(eligible))
+            top = eligible[np.argpartition(-scores[eligible], count - 1)[:count]]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            for i in top.tolist():
+                results.append({
+                    'plant_id': int(table['ids'][i]),
+                    'score': round(float(scores[i]), 4),
+                    'matched': sorted(name for name, mask in matched.items() if mask[i]),
+                })
+
+    cache.set(cache_key, results, CACHE_TIMEOUT)
+    return results
+
+
+REASON_PHRASES = {
+    'light': {'en': 'fits the light in your home', 'fa': 'با نور خانه شما سازگار است'},
+    'watering': {'en': 'matches your watering routine', 'fa': 'با برنامه آبیاری شما هماهنگ است'},
+    'humidity': {'en': 'is comfortable with your humidity level', 'fa': 'با رطوبت هوای خانه شما کنار می‌آید'},
+    'difficulty': {'en': 'suits your experience level', 'fa': 'با میزان تجربه شما متناسب است'},
+    'pet_safe': {'en': 'is safe around pets and children', 'fa': 'برای حیوانات خانگی و کودکان بی‌خطر است'},
+}
+
+
+def build_reason(plant, matched, language):
+    """Template reason text used when the LLM is not asked to phrase one."""
+    language = 'fa' if language == 'fa' else 'en'
+    phrases = [REASON_PHRASES[name][language] for name in matched if name in REASON_PHRASES]
+    if language == 'fa':
+        name = plant.farsi_name
+        if not phrases:
+            return f"{name} بهترین تطابق را با پاسخ‌های شما دارد."
+        return f"{name} " + '، '.join(phrases[:-1]) + (' و ' if len(phrases) > 1 else '') + phrases[-1] + '.'
+    name = plant.english_name or plant.farsi_name
+    if not phrases:
+        return f"{name} is the closest match to your answers."
+    if len(phrases) > 1:
+        return f"{name} {', '.join(phrases[:-1])} and {phrases[-1]}."
+    return f"{name} {phrases[0]}."
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .care_codes import care_labels
 from .models import Plant, PlantImage, PlantFavourite, PlantComment
 
 
@@ -25,6 +26,7 @@ class PlantSerializer(serializers.ModelSerializer):
     favourite_count = serializers.IntegerField(read_only=True)
     comment_count = serializers.IntegerField(read_only=True)
     care_difficulty_display = serializers.SerializerMethodField()
+    care_labels = serializers.SerializerMethodField()
 
     class Meta:
         model = Plant
@@ -41,17 +43,20 @@ class PlantSerializer(serializers.ModelSerializer):
             'pruning_info', 'pruning_info_en',
             'propagation_methods', 'propagation_methods_en',
             'care_difficulty', 'care_difficulty_display',
+            'watering_code', 'fertilizer_code', 'light_code', 'humidity_code',
+            'temperature_code', 'soil_code', 'pruning_code', 'propagation_code', 'care_labels',
             'view_count', 'garden_count',
             'is_favourited', 'favourite_count', 'comment_count',
             'created_at', 'updated_at'
         )
 
     def get_primary_image(self, obj):
-        if obj.primary_image:
+        primary_image = obj.primary_image
+        if primary_image:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.primary_image.url)
-            return obj.primary_image.url
+                return request.build_absolute_uri(primary_image.url)
+            return primary_image.url
         return None
 
     def get_care_difficulty_display(self, obj):
@@ -62,8 +67,14 @@ class PlantSerializer(serializers.ModelSerializer):
         }
         return mapping.get(obj.care_difficulty, {'en': obj.care_difficulty, 'fa': obj.care_difficulty})
 
+    def get_care_labels(self, obj):
+        return care_labels(obj)
+
     def get_is_favourited(self, obj):
         """Return True if the authenticated user has favourited this plant, else False."""
+        if hasattr(obj, 'user_favourited'):
+            # annotated by Plant.objects.for_listing()
+            return obj.user_favourited
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             # PlantFavourite model has related_name='favourites' on Plant
@@ -79,17 +90,19 @@ class PlantDetailSerializer(serializers.ModelSerializer):
     favourite_count = serializers.IntegerField(read_only=True)
     comment_count = serializers.IntegerField(read_only=True)
     care_difficulty_display = serializers.SerializerMethodField()
+    care_labels = serializers.SerializerMethodField()
 
     class Meta:
         model = Plant
         fields = '__all__'
 
     def get_primary_image(self, obj):
-        if obj.primary_image:
+        primary_image = obj.primary_image
+        if primary_image:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.primary_image.url)
-            return obj.primary_image.url
+                return request.build_absolute_uri(primary_image.url)
+            return primary_image.url
         return None
 
     def get_care_difficulty_display(self, obj):
@@ -100,14 +113,47 @@ class PlantDetailSerializer(serializers.ModelSerializer):
         }
         return mapping.get(obj.care_difficulty, {'en': obj.care_difficulty, 'fa': obj.care_difficulty})
 
+    def get_care_labels(self, obj):
+        return care_labels(obj)
+
     def get_is_favourited(self, obj):
+        if hasattr(obj, 'user_favourited'):
+            return obj.user_favourited
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.favourites.filter(user=request.user).exists()
         return False
 
 
-class PlantCommentSerializer(serializers.ModelSerializer):
+class CommentRepliesMixin:
+    """
+    Nested ``replies`` for comment serializers without a query per comment.
+    Threads loaded by ``core.comment_tree`` carry their replies already.
+    Otherwise the first comment serialized loads every reply on the same plant
+    (or disease, see ``replies_scope``) once; the map is kept in the serializer
+    context for the rest of the tree.
+    """
+    replies_scope = 'plant_id'
+
+    def get_replies(self, obj):
+        if hasattr(obj, 'thread_replies'):
+            return type(self)(obj.thread_replies, many=True, context=self.context).data
+        scope = getattr(obj, self.replies_scope)
+        replies_by_parent = self.context.setdefault('_replies_by_parent', {})
+        key = (type(obj), scope)
+        if key not in replies_by_parent:
+            children = {}
+            replies = type(obj).objects.filter(**{self.replies_scope: scope}, parent__isnull=False).select_related('user')
+            for reply in replies:
+                children.setdefault(reply.parent_id, []).append(reply)
+            replies_by_parent[key] = children
+        replies = replies_by_parent[key].get(obj.pk)
+        if replies:
+            return type(self)(replies, many=True, context=self.context).data
+        return []
+
+
+class PlantCommentSerializer(CommentRepliesMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.username', read_only=True)
     replies = serializers.SerializerMethodField()
 
@@ -116,8 +162,3 @@ class PlantCommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'user', 'user_name', 'plant', 'parent', 'content',
                   'is_approved', 'created_at', 'updated_at', 'replies')
         read_only_fields = ('user', 'plant', 'is_approved', 'created_at', 'updated_at')
-
-    def get_replies(self, obj):
-        if obj.replies.exists():
-            return PlantCommentSerializer(obj.replies.all(), many=True, context=self.context).data
-        return []
\ No newline at end of file
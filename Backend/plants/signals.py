@@ -1,8 +1,19 @@
 # plants/signals.py
-from django.db.models.signals import post_save, post_delete
+import logging
+
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
 from django.db.models import F
-from .models import PlantFavourite, PlantComment, Plant
+from django.utils import timezone
+
+from core.catalog_bundle import prune_tombstones
+from core.models import CatalogTombstone
+from diseases.affected_plants import PLANT_NAME_FIELDS, link_plant
+from .models import PlantFavourite, PlantComment, Plant, PlantImage, PlantSimilarity
+from .similarity import CARE_FIELDS, refresh_plant_similarity, refresh_dependent_similarity
+
+logger = logging.getLogger(__name__)
+
 
 @receiver(post_save, sender=PlantFavourite)
 def increment_favourite_count(sender, instance, created, **kwargs):
@@ -21,4 +32,68 @@ def increment_comment_count(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=PlantComment)
 def decrement_comment_count(sender, instance, **kwargs):
     if instance.is_approved:
-        Plant.objects.filter(pk=instance.plant_id).update(comment_count=F('comment_count') - 1)
\ No newline at end of file
+        Plant.objects.filter(pk=instance.plant_id).update(comment_count=F('comment_count') - 1)
+
+WATCHED_FIELDS = CARE_FIELDS | PLANT_NAME_FIELDS
+
+def _unchanged(instance, fields):
+    stored = instance.__dict__.get('_stored_fields')
+    return stored is not None and all(stored[field] == getattr(instance, field) for field in fields)
+
+@receiver(pre_save, sender=Plant)
+def remember_stored_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the stored care features and names so post_save can tell whether they changed."""
+    instance.__dict__.pop('_stored_fields', None)
+    if raw or instance.pk is None or (update_fields and not WATCHED_FIELDS.intersection(update_fields)):
+        return
+    instance._stored_fields = Plant.objects.filter(pk=instance.pk).values(*WATCHED_FIELDS).first()
+
+@receiver(post_save, sender=Plant)
+def refresh_similar_plants(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """Keep the related-plants neighbour table current when care attributes change."""
+    if raw or (update_fields and not CARE_FIELDS.intersection(update_fields)):
+        return
+    # saving a plant without touching its care features must not reload the catalog
+    if not created and _unchanged(instance, CARE_FIELDS):
+        return
+    try:
+        refresh_plant_similarity(instance.pk)
+    except Exception as e:
+        logger.error(f"Failed to refresh similar plants for plant {instance.pk}: {e}")
+
+@receiver(post_save, sender=Plant)
+def relink_plant_diseases(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """Link a new or renamed plant to the diseases that name it in their affected plants list."""
+    if raw or (update_fields and not PLANT_NAME_FIELDS.intersection(update_fields)):
+        return
+    if not created and _unchanged(instance, PLANT_NAME_FIELDS):
+        return
+    link_plant(instance)
+
+@receiver(pre_delete, sender=Plant)
+def collect_similarity_dependents(sender, instance, **kwargs):
+    instance._similarity_dependents = list(
+        PlantSimilarity.objects.filter(related_plant=instance).values_list('plant_id', flat=True)
+    )
+
+@receiver(post_delete, sender=Plant)
+def refresh_similarity_dependents(sender, instance, **kwargs):
+    try:
+        refresh_dependent_similarity(getattr(instance, '_similarity_dependents', []))
+    except Exception as e:
+        logger.error(f"Failed to refresh similar plants after deleting plant {instance.pk}: {e}")
+
+@receiver(post_delete, sender=Plant)
+def record_plant_tombstone(sender, instance, **kwargs):
+    """Let offline catalog bundles drop the plant on their next delta sync."""
+    CatalogTombstone.objects.create(kind='plant', object_id=instance.pk)
+    prune_tombstones()
+
+@receiver(post_save, sender=PlantImage)
+@receiver(post_delete, sender=PlantImage)
+def touch_plant_on_image_change(sender, instance, raw=False, **kwargs):
+    """The bundle carries the primary image, so an image change is a plant change."""
+    if raw:
+        return
+    Plant.objects.filter(pk=instance.plant_id).update(updated_at=timezone.now())
+
@@ -0,0 +1,348 @@
+"""
+Care-attribute similarity engine for the related-plants endpoint.
+
+Every plant is encoded as a fixed-length NumPy feature vector built from its
+canonical care codes (watering, light, humidity, temperature, soil,
+propagation) plus toxicity and difficulty.  Cosine similarities are computed in row blocks
+with a single matrix product per block, and the top-k neighbours of every
+plant are stored in ``PlantSimilarity`` so ``PlantViewSet.related`` is one
+indexed lookup.  When a plant changes only the rows that can be affected by
+it are recomputed.
+
+Refreshes after a save use ``feature_cache``: the encoded catalog and each
+plant's weakest stored neighbour score, kept in the process and brought up to
+date from the database by delta (plants with a newer ``updated_at``,
+neighbour rows with a higher id), so a save costs the changed plant's row and
+one matrix-vector product rather than a reload of the catalog.  Popularity
+follows ``view_count`` only on a full load or ``rebuild_similarity_table``.
+"""
+import logging
+import threading
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max, Min
+
+from .care_codes import TEMPERATURE_MIDPOINTS, codes_for
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# CONFIGURATION
+# =====================================================================
+TOP_K = 12              # neighbours stored per plant
+CANDIDATE_POOL = 48     # nearest candidates considered before diversification
+MMR_LAMBDA = 0.8        # 1.0 = pure similarity, lower = more diverse results
+POPULARITY_WEIGHT = 0.02
+BLOCK_SIZE = 1024       # rows per matrix product during a full rebuild
+
+# Fields read from Plant to build a feature vector
+FEATURE_FIELDS = (
+    'id', 'view_count',
+    'watering_code', 'light_code', 'humidity_code', 'temperature_code',
+    'soil_code', 'propagation_code', 'is_toxic', 'care_difficulty',
+)
+
+# Plant fields whose change requires the plant's neighbours to be refreshed.
+# Plant.save adds the code fields to update_fields whenever their text changes.
+CARE_FIELDS = frozenset(FEATURE_FIELDS) - {'id', 'view_count'}
+
+# Ordinal codes (see care_codes.py) mapped onto a 0..1 scale
+WATERING_SCALE = {'very_low': 0.0, 'low': 0.25, 'medium': 0.5, 'high': 0.75, 'very_high': 1.0}
+HUMIDITY_SCALE = {'low': 0.0, 'moderate': 0.4, 'high': 0.7, 'very_high': 1.0}
+DIFFICULTY_LEVELS = {'easy': 0.0, 'medium': 0.5, 'hard': 1.0}
+
+LIGHT_CODES = codes_for('light')
+SOIL_CODES = codes_for('soil')
+PROPAGATION_CODES = codes_for('propagation')
+
+# Relative weight of every feature group in the final vector
+GROUP_WEIGHTS = {
+    'watering': 1.0,
+    'light': 1.2,
+    'humidity': 0.8,
+    'temperature': 0.8,
+    'soil': 0.7,
+    'toxicity': 0.6,
+    'difficulty': 1.0,
+    'propagation': 0.5,
+}
+
+FEATURE_DIM = 1 + len(LIGHT_CODES) + 1 + 1 + len(SOIL_CODES) + 1 + 1 + len(PROPAGATION_CODES)
+
+
+def encode_plant(row):
+    """Encode one row of ``FEATURE_FIELDS`` values into a weighted, unit-length vector."""
+    values = dict(zip(FEATURE_FIELDS, row))
+    vector = np.zeros(FEATURE_DIM, dtype=np.float32)
+    offset = 0
+
+    watering = WATERING_SCALE.get(values['watering_code'])
+    if watering is not None:
+        vector[offset] = GROUP_WEIGHTS['watering'] * watering
+    offset += 1
+
+    if values['light_code'] in LIGHT_CODES:
+        vector[offset + LIGHT_CODES.index(values['light_code'])] = GROUP_WEIGHTS['light']
+    offset += len(LIGHT_CODES)
+
+    humidity = HUMIDITY_SCALE.get(values['humidity_code'])
+    if humidity is not None:
+        vector[offset] = GROUP_WEIGHTS['humidity'] * humidity
+    offset += 1
+
+    temperature = TEMPERATURE_MIDPOINTS.get(values['temperature_code'])
+    if temperature is not None:
+        vector[offset] = GROUP_WEIGHTS['temperature'] * min(max(temperature / 35.0, 0.0), 1.0)
+    offset += 1
+
+    if values['soil_code'] in SOIL_CODES:
+        vector[offset + SOIL_CODES.index(values['soil_code'])] = GROUP_WEIGHTS['soil']
+    offset += len(SOIL_CODES)
+
+    vector[offset] = GROUP_WEIGHTS['toxicity'] * (1.0 if values['is_toxic'] else 0.0)
+    offset += 1
+
+    difficulty = DIFFICULTY_LEVELS.get(values['care_difficulty'])
+    if difficulty is not None:
+        vector[offset] = GROUP_WEIGHTS['difficulty'] * difficulty
+    offset += 1
+
+    if values['propagation_code'] in PROPAGATION_CODES:
+        vector[offset + PROPAGATION_CODES.index(values['propagation_code'])] = GROUP_WEIGHTS['propagation']
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _encode_rows(rows):
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    vectors = np.vstack([encode_plant(row) for row in rows]).astype(np.float32)
+    views = np.fromiter((row[1] or 0 for row in rows), dtype=np.float64, count=len(rows))
+    return ids, vectors, views
+
+
+def _popularity(views):
+    popularity = np.log1p(views).astype(np.float32)
+    if len(popularity) and popularity.max() > 0:
+        popularity /= popularity.max()
+    return popularity
+
+
+def load_feature_matrix(queryset=None):
+    """Return ``(ids, vectors, popularity)`` for every plant in ``queryset``."""
+    from .models import Plant
+
+    queryset = Plant.objects.all() if queryset is None else queryset
+    rows = list(queryset.order_by('id').values_list(*FEATURE_FIELDS))
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, FEATURE_DIM), dtype=np.float32), np.zeros(0)
+    ids, vectors, views = _encode_rows(rows)
+    return ids, vectors, _popularity(views)
+
+
+class FeatureCache:
+    """
+    The encoded catalog and per-plant neighbour thresholds, synced by delta.
+
+    ``sync`` costs one aggregate over ``Plant`` plus the rows changed since the
+    last call.  A plant count that does not add up (a deletion) or a latest
+    ``updated_at`` that went backwards reloads everything.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.vectors = np.zeros((0, FEATURE_DIM), dtype=np.float32)
+        self.views = np.zeros(0)
+        self.index = {}
+        self.as_of = None
+        # weakest stored neighbour score per row; -inf while a plant holds fewer than TOP_K
+        self.thresholds = np.zeros(0)
+        self.weakest = {}
+        self.seen_similarity_id = 0
+
+    def sync(self):
+        """Bring the cache up to date; returns ``(ids, vectors, popularity, thresholds)``."""
+        from .models import Plant
+
+        with self._lock:
+            state = Plant.objects.aggregate(count=Count('id'), latest=Max('updated_at'))
+            if self.as_of is None or state['latest'] is None or state['latest'] < self.as_of:
+                self._load(Plant.objects.all())
+            elif state['latest'] > self.as_of or state['count'] != len(self.ids):
+                # the boundary is re-read in case of rows committed with the same timestamp
+                self._merge(Plant.objects.filter(updated_at__gte=self.as_of))
+                if len(self.ids) != state['count']:
+                    self._load(Plant.objects.all())
+            self.as_of = state['latest']
+            self._sync_thresholds()
+            return self.ids, self.vectors, _popularity(self.views), self.thresholds
+
+    def _load(self, queryset):
+        self.clear()
+        self._merge(queryset)
+
+    def _merge(self, queryset):
+        rows = list(queryset.order_by('id').values_list(*FEATURE_FIELDS))
+        if not rows:
+            return
+        ids, vectors, views = _encode_rows(rows)
+        known = np.array([plant_id in self.index for plant_id in ids.tolist()], dtype=bool)
+        for plant_id, vector, view_count in zip(ids[known].tolist(), vectors[known], views[known]):
+            row = self.index[plant_id]
+            self.vectors[row], self.views[row] = vector, view_count
+        start = len(self.ids)
+        self.ids = np.concatenate([self.ids, ids[~known]])
+        self.vectors = np.concatenate([self.vectors, vectors[~known]])
+        self.views = np.concatenate([self.views, views[~known]])
+        self.index.update((plant_id, start + i) for i, plant_id in enumerate(ids[~known].tolist()))
+
+    def _sync_thresholds(self):
+        """Read the neighbour rows written since the last sync; each rewrite replaces a plant's full set."""
+        from .models import PlantSimilarity
+
+        latest = PlantSimilarity.objects.aggregate(latest=Max('id'))['latest'] or 0
+        if latest < self.seen_similarity_id:
+            self.weakest, self.seen_similarity_id = {}, 0          # the table was rebuilt or rolled back
+        if latest > self.seen_similarity_id:
+            written = (PlantSimilarity.objects.filter(id__gt=self.seen_similarity_id).order_by()
+                       .values('plant_id').annotate(weakest=Min('score'), stored=Count('id')))
+            for row in written:
+                self.weakest[row['plant_id']] = (row['weakest'], row['stored'])
+            self.seen_similarity_id = latest
+
+        full = min(TOP_K, len(self.ids) - 1)
+        self.thresholds = np.full(len(self.ids), -np.inf)
+        for plant_id, (weakest, stored) in self.weakest.items():
+            row = self.index.get(plant_id)
+            if row is not None and stored >= full:
+                self.thresholds[row] = weakest
+
+
+feature_cache = FeatureCache()
+
+
+def _diversify(candidates, scores, vectors, k):
+    """
+    Pick ``k`` neighbours per row by maximal marginal relevance.
+
+    ``candidates`` and ``scores`` are ``(rows, pool)`` arrays sorted by score;
+    every step trades similarity to the plant against redundancy with the
+    neighbours already chosen, for all rows of the block at once.
+    """
+    rows, pool = candidates.shape
+    k = min(k, pool)
+    embedded = vectors[candidates]                                  # rows x pool x dim
+    pairwise = np.einsum('rpd,rqd->rpq', embedded, embedded)        # rows x pool x pool
+    index = np.arange(rows)
+
+    chosen = np.zeros((rows, k), dtype=np.int64)
+    available = np.ones((rows, pool), dtype=bool)
+    available[:, 0] = False
+    redundancy = pairwise[:, 0, :].copy()
+    for step in range(1, k):
+        mmr = MMR_LAMBDA * scores - (1 - MMR_LAMBDA) * redundancy
+        mmr[~available] = -np.inf
+        best = np.argmax(mmr, axis=1)
+        chosen[:, step] = best
+        available[index, best] = False
+        redundancy = np.maximum(redundancy, pairwise[index, best, :])
+    return np.take_along_axis(candidates, chosen, axis=1)
+
+
+def _neighbours_for_rows(rows, vectors, popularity, k=TOP_K):
+    """Yield ``(row, [(neighbour_row, score), ...])`` for each row index in ``rows``."""
+    n = len(vectors)
+    if n <= 1:
+        for row in rows:
+            yield int(row), []
+        return
+
+    pool_size = min(CANDIDATE_POOL, n - 1)
+    rows = np.asarray(rows, dtype=np.int64)
+    for start in range(0, len(rows), BLOCK_SIZE):
+        block = rows[start:start + BLOCK_SIZE]
+        index = np.arange(len(block))
+        similarity = vectors[block] @ vectors.T
+        ranked = similarity + POPULARITY_WEIGHT * popularity[np.newaxis, :]
+        ranked[index, block] = -np.inf
+
+        pool = np.argpartition(-ranked, pool_size - 1, axis=1)[:, :pool_size]
+        order = np.argsort(-np.take_along_axis(ranked, pool, axis=1), axis=1)
+        pool = np.take_along_axis(pool, order, axis=1)
+        chosen = _diversify(pool, np.take_along_axis(ranked, pool, axis=1), vectors, k)
+        scores = np.take_along_axis(similarity, chosen, axis=1)
+        for i, row in enumerate(block.tolist()):
+            yield row, list(zip(chosen[i].tolist(), scores[i].tolist()))
+
+
+def _write_rows(ids, neighbour_rows):
+    from .models import PlantSimilarity
+
+    objs = []
+    plant_ids = []
+    for row, neighbours in neighbour_rows:
+        plant_ids.append(int(ids[row]))
+        for rank, (neighbour, score) in enumerate(neighbours):
+            objs.append(PlantSimilarity(
+                plant_id=int(ids[row]),
+                related_plant_id=int(ids[neighbour]),
+                score=round(score, 6),
+                rank=rank,
+            ))
+    with transaction.atomic():
+        PlantSimilarity.objects.filter(plant_id__in=plant_ids).delete()
+        PlantSimilarity.objects.bulk_create(objs, batch_size=5000)
+    return len(objs)
+
+
+def rebuild_similarity_table():
+    """Recompute the neighbour table for the whole catalog. Returns the number of stored rows."""
+    from .models import PlantSimilarity
+
+    ids, vectors, popularity = load_feature_matrix()
+    with transaction.atomic():
+        PlantSimilarity.objects.all().delete()
+        total = _write_rows(ids, _neighbours_for_rows(range(len(ids)), vectors, popularity))
+    logger.info(f"Plant similarity table rebuilt: {len(ids)} plants, {total} rows")
+    return total
+
+
+def refresh_plant_similarity(plant_id):
+    """
+    Incrementally refresh the neighbour table after ``plant_id`` was created or changed.
+
+    Recomputes the plant's own neighbours plus every plant that either listed it
+    before or would now rank it above its weakest stored neighbour.
+    """
+    from .models import PlantSimilarity
+
+    ids, vectors, popularity, threshold = feature_cache.sync()
+    position = feature_cache.index.get(plant_id)
+    if position is None:
+        return 0
+
+    # Plants holding fewer than TOP_K neighbours have a threshold of -inf,
+    # so they are always refreshed.
+    affected = vectors @ vectors[position] > threshold
+    previous = PlantSimilarity.objects.filter(related_plant_id=plant_id).values_list('plant_id', flat=True)
+    for other_id in previous:
+        if other_id in feature_cache.index:
+            affected[feature_cache.index[other_id]] = True
+    affected[position] = True
+
+    return _write_rows(ids, _neighbours_for_rows(np.flatnonzero(affected), vectors, popularity))
+
+
+def refresh_dependent_similarity(plant_ids):
+    """Recompute the neighbours of ``plant_ids``, e.g. plants that listed a deleted plant."""
+    plant_ids = set(plant_ids)
+    if not plant_ids:
+        return 0
+    ids, vectors, popularity, _ = feature_cache.sync()
+    rows = [feature_cache.index[plant_id] for plant_id in plant_ids if plant_id in feature_cache.index]
+    return _write_rows(ids, _neighbours_for_rows(rows, vectors, popularity))
@@ -1,12 +1,34 @@
+import tempfile
+
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 from unittest.mock import patch
 
+from core.llm_stub import StubLLMServer, stub_llm_clients
+
+from plants import similarity
+from plants.models import Plant, PlantSimilarity
+
 User = get_user_model()
 
+
+def make_plant(name, **care):
+    defaults = {
+        'farsi_name': name,
+        'english_name': name.title(),
+        'scientific_name': f'{name} scientificus',
+        'description': '-',
+        'description_en': '-',
+    }
+    defaults.update(care)
+    return Plant.objects.create(**defaults)
+
+
 class ConfidenceThresholdTests(APITestCase):
 
     def setUp(self):
@@ -72,3 +94,247 @@ class ConfidenceThresholdTests(APITestCase):
         response = self.client.post(self.diagnose_url + '?lang=fa', {'image': self.image}, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("کیفیت عکس شما مناسب نیست", response.data['error'])
+
+
+class RelatedPlantsTests(APITestCase):
+
+    def setUp(self):
+        desert = dict(watering_frequency_en='very low', light_requirements_en='direct sun',
+                      humidity_level_en='low', soil_type_en='cactus mix', care_difficulty='easy')
+        tropical = dict(watering_frequency_en='high', light_requirements_en='bright indirect light',
+                        humidity_level_en='high', soil_type_en='peat-based mix', care_difficulty='hard')
+        self.cactus = make_plant('cactus', **desert)
+        self.aloe = make_plant('aloe', **desert)
+        self.fern = make_plant('fern', **tropical)
+        self.calathea = make_plant('calathea', **tropical)
+
+    def test_neighbours_are_ranked_by_care_similarity(self):
+        neighbours = list(PlantSimilarity.objects.filter(plant=self.cactus).values_list('related_plant_id', flat=True))
+        self.assertEqual(neighbours[0], self.aloe.id)
+        self.assertNotIn(self.cactus.id, neighbours)
+
+    def test_related_endpoint_uses_neighbour_table(self):
+        response = self.client.get(reverse('plant-related', args=[self.fern.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['id'], self.calathea.id)
+
+    def test_saving_without_care_changes_skips_the_refresh(self):
+        self.aloe.description = 'A succulent'
+        with patch('plants.signals.refresh_plant_similarity') as refresh:
+            self.aloe.save()
+            self.cactus.care_difficulty = 'hard'
+            self.cactus.save()
+        self.assertEqual([call.args for call in refresh.call_args_list], [(self.cactus.id,)])
+
+    def test_table_refreshes_when_plant_changes(self):
+        self.aloe.watering_frequency_en = 'high'
+        self.aloe.light_requirements_en = 'bright indirect light'
+        self.aloe.humidity_level_en = 'high'
+        self.aloe.soil_type_en = 'peat-based mix'
+        self.aloe.care_difficulty = 'hard'
+        self.aloe.save()
+        first = PlantSimilarity.objects.filter(plant=self.fern).first()
+        self.assertIn(first.related_plant_id, {self.aloe.id, self.calathea.id})
+        cactus_scores = dict(
+            PlantSimilarity.objects.filter(plant=self.cactus).values_list('related_plant_id', 'score')
+        )
+        self.assertAlmostEqual(cactus_scores[self.aloe.id], cactus_scores[self.fern.id], places=5)
+
+    def test_deleting_plant_refreshes_dependents(self):
+        self.aloe.delete()
+        self.assertFalse(PlantSimilarity.objects.filter(related_plant_id=self.aloe.id).exists())
+        self.assertEqual(PlantSimilarity.objects.filter(plant=self.cactus).count(), 2)
+
+    def test_refresh_reuses_the_encoded_catalog(self):
+        self.fern.care_difficulty = 'easy'
+        with patch('plants.similarity.load_feature_matrix') as load, \
+                patch('plants.similarity.encode_plant', wraps=similarity.encode_plant) as encode:
+            self.fern.save()
+        load.assert_not_called()
+        self.assertLess(encode.call_count, Plant.objects.count())
+        self.assertEqual(PlantSimilarity.objects.filter(plant=self.fern).count(), 3)
+
+
+class PlantRecommenderTests(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('plant-recommender')
+        self.pothos = make_plant('pothos', light_requirements_en='low light', watering_frequency_en='low',
+                                 care_difficulty='easy', is_toxic=True)
+        self.zz = make_plant('zz plant', light_requirements_en='low light', watering_frequency_en='very low',
+                             care_difficulty='easy')
+        self.rose = make_plant('rose', light_requirements_en='direct sun', watering_frequency_en='high',
+                               care_difficulty='hard')
+        self.answers = {'natural_light': 'low', 'watering_habits': 'forgetful', 'experience_level': 'beginner'}
+
+    @patch('plants.views.get_plant_recommendation_from_llm')
+    def test_ranks_catalog_without_llm(self, mock_llm):
+        response = self.client.post(self.url, {'answers': self.answers, 'language': 'en'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ranked = [candidate['plant_id'] for candidate in response.data['candidates']]
+        self.assertEqual(ranked[-1], self.rose.id)
+        self.assertIn(response.data['plant_id'], {self.zz.id, self.pothos.id})
+        self.assertTrue(response.data['reason'])
+        mock_llm.assert_not_called()
+
+    def test_toxic_plants_excluded_for_pets(self):
+        answers = dict(self.answers, pets=['cat_chews'])
+        response = self.client.post(self.url, {'answers': answers}, format='json')
+        ranked = [candidate['plant_id'] for candidate in response.data['candidates']]
+        self.assertEqual(ranked[0], self.zz.id)
+        self.assertNotIn(self.pothos.id, ranked)
+
+    @patch('plants.views.get_recommendation_reason_from_llm', return_value='Because it thrives on neglect.')
+    def test_explain_reason_is_cached(self, mock_reason):
+        payload = {'answers': self.answers, 'language': 'en', 'explain': True}
+        first = self.client.post(self.url, payload, format='json')
+        second = self.client.post(self.url, payload, format='json')
+        self.assertEqual(first.data['reason'], 'Because it thrives on neglect.')
+        self.assertEqual(second.data['reason'], 'Because it thrives on neglect.')
+        self.assertEqual(mock_reason.call_count, 1)
+
+    def test_catalog_change_invalidates_ranking(self):
+        self.client.post(self.url, {'answers': self.answers}, format='json')
+        snake = make_plant('snake plant', light_requirements_en='low light', watering_frequency_en='very low',
+                           care_difficulty='easy', view_count=500)
+        response = self.client.post(self.url, {'answers': self.answers}, format='json')
+        self.assertEqual(response.data['plant_id'], snake.id)
+
+    def test_catalog_change_from_another_process_invalidates_ranking(self):
+        # no signal runs here, as when another worker or a bulk import edits the catalog
+        self.client.post(self.url, {'answers': dict(self.answers, pets=['dog'])}, format='json')
+        Plant.objects.filter(pk=self.pothos.pk).update(is_toxic=False, updated_at=timezone.now())
+        response = self.client.post(self.url, {'answers': dict(self.answers, pets=['dog'])}, format='json')
+        self.assertIn(self.pothos.id, [candidate['plant_id'] for candidate in response.data['candidates']])
+
+    def test_malformed_answers_are_rejected(self):
+        for answers in ({'natural_light': ['low', 'medium']}, {'pets': [{'cat': True}]}, ['low']):
+            with self.subTest(answers=answers):
+                response = self.client.post(self.url, {'answers': answers}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CareCodeFilterTests(APITestCase):
+
+    def setUp(self):
+        self.url = reverse('plant-list')
+        self.monstera = Plant.objects.create(
+            farsi_name='مونسترا', scientific_name='Monstera deliciosa', description='-', description_en='-',
+            light_requirements_en='Bright Indirect Light', light_requirements='نور غیرمستقیم روشن',
+            watering_frequency_en='medium', temperature_range_en='18-24°C',
+        )
+        self.cactus = Plant.objects.create(
+            farsi_name='کاکتوس', scientific_name='Cactaceae', description='-', description_en='-',
+            light_requirements='آفتاب مستقیم', watering_frequency_en='very low', temperature_range='۲۰ تا ۳۰ درجه',
+        )
+
+    def test_codes_are_derived_on_save(self):
+        self.assertEqual(self.monstera.light_code, 'bright_indirect')
+        self.assertEqual(self.monstera.temperature_code, '18_24')
+        self.assertEqual(self.cactus.light_code, 'direct_sun')
+        self.assertEqual(self.cactus.watering_code, 'very_low')
+        self.assertEqual(self.cactus.temperature_code, '20_30')
+
+    def test_filter_accepts_code_or_label_in_either_language(self):
+        for value in ('direct_sun', 'direct sun', 'آفتاب مستقیم'):
+            response = self.client.get(self.url, {'light_requirements': value})
+            ids = [plant['id'] for plant in response.data['results']]
+            self.assertEqual(ids, [self.cactus.id], value)
+
+    def test_update_fields_save_refreshes_code(self):
+        self.cactus.watering_frequency_en = 'high'
+        self.cactus.save(update_fields=['watering_frequency_en'])
+        self.cactus.refresh_from_db()
+        self.assertEqual(self.cactus.watering_code, 'high')
+
+    def test_serializer_returns_localized_labels(self):
+        response = self.client.get(reverse('plant-detail', args=[self.monstera.id]))
+        self.assertEqual(response.data['care_labels']['light']['fa'], 'نور غیرمستقیم روشن')
+        self.assertEqual(response.data['care_labels']['watering']['en'], 'medium')
+        self.assertIsNone(response.data['care_labels']['soil'])
+
+
+class PlantFacetTests(APITestCase):
+
+    def setUp(self):
+        for i, (light, difficulty, toxic) in enumerate([
+            ('low light', 'easy', False),
+            ('low light', 'easy', True),
+            ('direct sun', 'hard', False),
+        ]):
+            Plant.objects.create(
+                farsi_name=f'plant {i}', scientific_name=f'Plantus {i}', description='-', description_en='-',
+                light_requirements_en=light, care_difficulty=difficulty, is_toxic=toxic,
+            )
+
+    def test_facets_count_filtered_set_in_one_query(self):
+        # the catalog version, then the counts
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('plant-facets'), {'care_difficulty': 'easy'})
+        self.assertEqual(response.data['care_difficulty'], [
+            {'value': 'easy', 'count': 2, 'label': {'en': 'Easy', 'fa': 'آسان'}},
+        ])
+        self.assertEqual(response.data['light'][0]['value'], 'low_light')
+        self.assertEqual(response.data['light'][0]['count'], 2)
+        self.assertEqual({f['value']: f['count'] for f in response.data['is_toxic']}, {True: 1, False: 1})
+
+    def test_facets_are_cached_until_catalog_changes(self):
+        self.client.get(reverse('plant-facets'))
+        with self.assertNumQueries(1):
+            self.client.get(reverse('plant-facets'))
+        Plant.objects.create(farsi_name='new', scientific_name='Novus', description='-', description_en='-',
+                             care_difficulty='hard')
+        response = self.client.get(reverse('plant-facets'))
+        counts = {f['value']: f['count'] for f in response.data['care_difficulty']}
+        self.assertEqual(counts['hard'], 2)
+
+    def test_facets_see_catalog_changes_made_by_other_processes(self):
+        self.client.get(reverse('plant-facets'))
+        # a queryset update sends no signal, like an edit served by another worker
+        Plant.objects.filter(care_difficulty='hard').update(care_difficulty='easy', updated_at=timezone.now())
+        response = self.client.get(reverse('plant-facets'))
+        self.assertEqual(response.data['care_difficulty'], [
+            {'value': 'easy', 'count': 3, 'label': {'en': 'Easy', 'fa': 'آسان'}},
+        ])
+
+    def test_list_includes_facets_on_request(self):
+        response = self.client.get(reverse('plant-list'), {'include_facets': 'true'})
+        self.assertEqual(response.data['count'], 3)
+        self.assertIn('facets', response.data)
+        self.assertNotIn('facets', self.client.get(reverse('plant-list')).data)
+
+
+@override_settings(LLM_TELEMETRY_PERSIST=False, MEDIA_ROOT=tempfile.mkdtemp())
+class PlantCheckupTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='checker', password='pass12345')
+        self.client.force_authenticate(user=self.user)
+        self.plant = Plant.objects.create(farsi_name='پوتوس', english_name='Golden Pothos',
+                                          scientific_name='Epipremnum aureum', description='-', description_en='-')
+
+    def image(self):
+        return SimpleUploadedFile('leaf.jpg', b'\xff\xd8\xff\xe0 not really a jpeg', content_type='image/jpeg')
+
+    def test_one_vision_call_identifies_and_diagnoses(self):
+        from diseases.models import Disease
+
+        with StubLLMServer(latency_ms=0, jitter_ms=0) as stub, stub_llm_clients(stub.url):
+            response = self.client.post(reverse('plant-checkup'), {'image': self.image()}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['plant']['id'], self.plant.id)
+        disease = Disease.objects.get(name='Powdery Mildew')
+        self.assertEqual(response.data['disease']['id'], disease.id)
+        self.assertEqual(response.data['disease']['confidence'], 88)
+        # one vision call and one details call, instead of two of each
+        self.assertEqual(sum(stub.calls.values()), 2)
+
+    @patch('plants.views.predict_checkup')
+    def test_no_plant_fails_both_halves(self, mock_checkup):
+        error = 'No plant detected in the image.'
+        mock_checkup.return_value = ({'id': None, 'name': None, 'error': error},
+                                     {'id': None, 'details': None, 'error': error})
+        response = self.client.post(reverse('plant-checkup'), {'image': self.image()}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['plant'], {'error': error})
@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
 from .views import (
     PlantViewSet, PlantIdentifyView, PlantSearchView,
-    PlantFavouriteViewSet, PlantCommentViewSet, PlantRecommenderView
+    PlantFavouriteViewSet, PlantCommentViewSet, PlantRecommenderView, PlantCheckupView
 )
 
 router = DefaultRouter()
@@ -18,6 +18,7 @@ favourite_router.register(r'favourites', PlantFavouriteViewSet, basename='favour
 
 urlpatterns = [
     path('identify/', PlantIdentifyView.as_view(), name='plant-identify'),
+    path('checkup/', PlantCheckupView.as_view(), name='plant-checkup'),
     path('search/', PlantSearchView.as_view(), name='plant-search'),
     path('recommend-plant/', PlantRecommenderView.as_view(), name='plant-recommender'),
     path('', include(router.urls)),
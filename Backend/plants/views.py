@@ -1,3 +1,6 @@
+import hashlib
+
+from django.core.cache import cache
 from django.db.models import Q, F
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
@@ -9,12 +12,21 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.comment_tree import thread_page
+from core.llm_telemetry import record_cache_hit
+from diseases.views import diagnosis_response
+
 from .llm_identifier import create_or_update_plant_from_llm
+from .checkup import predict_checkup
 from .ml_models import predict_plant, logger
-from .models import Plant, PlantImage, PlantFavourite, PlantComment
+from .models import Plant, PlantImage, PlantFavourite, PlantComment, PlantSimilarity
 from .permissions import IsOwnerOrAdminOrReadOnly
 from .serializers import (PlantSerializer, PlantDetailSerializer, PlantCommentSerializer)
-from .llm_recomend import get_plant_recommendation_from_llm
+from .llm_recomend import RECOMMENDATION_MODEL, get_plant_recommendation_from_llm, get_recommendation_reason_from_llm
+from .care_codes import CARE_ATTRIBUTES, resolve_code
+from .catalog import get_catalog_version
+from .facets import get_facets
+from .recommender import DEFAULT_TOP_N, answers_signature, build_reason, recommend_plants, validate_answers
 
 class PlantPagination(PageNumberPagination):
     page_size = 10
@@ -30,11 +42,12 @@ class PlantFavouriteViewSet(viewsets.ModelViewSet):
     """
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = PlantDetailSerializer  # برای نمایش اطلاعات گیاه
+    query_budget = {'list': 4, 'default': 6}
 
     def get_queryset(self):
         # فقط گیاهانی که کاربر جاری علاقه‌مند کرده است
         user = self.request.user
-        return Plant.objects.filter(favourites__user=user).distinct()
+        return Plant.objects.filter(favourites__user=user).distinct().for_listing(user)
 
     def create(self, request, *args, **kwargs):
         plant_id = request.data.get('plant')
@@ -70,11 +83,17 @@ class PlantCommentViewSet(viewsets.ModelViewSet):
     """
     serializer_class = PlantCommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrAdminOrReadOnly]
+    query_budget = {'list': 3, 'default': 6}
 
     def get_queryset(self):
         plant_id = self.kwargs.get('plant_pk')
         return PlantComment.objects.filter(plant_id=plant_id, is_approved=True).select_related('user')
 
+    def list(self, request, *args, **kwargs):
+        """Root comments with their reply trees, paginated with ``?cursor=``."""
+        return thread_page(request, self.get_queryset().filter(parent__isnull=True), self.get_serializer_class(),
+                           context=self.get_serializer_context())
+
     def perform_create(self, serializer):
         plant = Plant.objects.get(pk=self.kwargs['plant_pk'])
         serializer.save(user=self.request.user, plant=plant)
@@ -104,6 +123,7 @@ class PlantViewSet(viewsets.ModelViewSet):
     parser_classes = [JSONParser, MultiPartParser, FormParser]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend, filters.OrderingFilter]
     pagination_class = PlantPagination
+    query_budget = {'list': 4, 'retrieve': 6, 'related': 6, 'facets': 3, 'default': 8}
 
     search_fields = [
         'farsi_name', 'scientific_name', 'description',
@@ -127,12 +147,32 @@ class PlantViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], url_path='related', permission_classes=[AllowAny])
     def related(self, request, pk=None):
         plant = self.get_object()
-        related_plants = Plant.objects.filter(
-            care_difficulty=plant.care_difficulty
-        ).exclude(pk=plant.pk).order_by('-view_count')[:4]
+        plants = Plant.objects.for_listing(request.user)
+        related_ids = list(PlantSimilarity.objects.filter(plant=plant).values_list('related_plant_id', flat=True)[:4])
+        if related_ids:
+            by_id = plants.in_bulk(related_ids)
+            related_plants = [by_id[plant_id] for plant_id in related_ids if plant_id in by_id]
+        else:
+            # Neighbour table not built yet (see build_plant_similarity)
+            related_plants = plants.filter(
+                care_difficulty=plant.care_difficulty
+            ).exclude(pk=plant.pk).order_by('-view_count')[:4]
         serializer = PlantSerializer(related_plants, many=True, context={'request': request})
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='facets', permission_classes=[AllowAny])
+    def facets(self, request):
+        """Counts per care_difficulty, is_toxic, light, watering, humidity and soil for the current filters."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(get_facets(queryset, request.query_params))
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get('include_facets', '').lower() == 'true':
+            queryset = self.filter_queryset(self.get_queryset())
+            response.data['facets'] = get_facets(queryset, request.query_params)
+        return response
+
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return PlantDetailSerializer
@@ -144,6 +184,7 @@ class PlantViewSet(viewsets.ModelViewSet):
         instance = self.get_object()
         instance.view_count = F('view_count') + 1
         instance.save(update_fields=['view_count'])
+        instance.refresh_from_db(fields=['view_count'])
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
@@ -173,29 +214,83 @@ class PlantViewSet(viewsets.ModelViewSet):
         def filter_bilingual(field_name, value):
             return Q(**{f"{field_name}__iexact": value}) | Q(**{f"{field_name}_en__iexact": value})
 
-        if params.get('watering_frequency'):
-            queryset = queryset.filter(filter_bilingual('watering_frequency', params['watering_frequency']))
-        if params.get('fertilizer_schedule'):
-            queryset = queryset.filter(filter_bilingual('fertilizer_schedule', params['fertilizer_schedule']))
-        if params.get('light_requirements'):
-            queryset = queryset.filter(filter_bilingual('light_requirements', params['light_requirements']))
-        if params.get('humidity_level'):
-            queryset = queryset.filter(filter_bilingual('humidity_level', params['humidity_level']))
-        if params.get('temperature_range'):
-            queryset = queryset.filter(filter_bilingual('temperature_range', params['temperature_range']))
-        if params.get('soil_type'):
-            queryset = queryset.filter(filter_bilingual('soil_type', params['soil_type']))
-        if params.get('pruning_info'):
-            queryset = queryset.filter(filter_bilingual('pruning_info', params['pruning_info']))
-        if params.get('propagation_methods'):
-            queryset = queryset.filter(filter_bilingual('propagation_methods', params['propagation_methods']))
+        # Accepts a code or a label in either language; unknown values fall back to the text columns
+        for attribute, (field_name, code_field) in CARE_ATTRIBUTES.items():
+            value = params.get(field_name)
+            if not value:
+                continue
+            code = resolve_code(attribute, value)
+            if code:
+                queryset = queryset.filter(**{code_field: code})
+            else:
+                queryset = queryset.filter(filter_bilingual(field_name, value))
         if params.get('care_difficulty'):
             queryset = queryset.filter(care_difficulty=params['care_difficulty'])
         if params.get('is_toxic') is not None:
             is_toxic = params['is_toxic'].lower() == 'true'
             queryset = queryset.filter(is_toxic=is_toxic)
 
-        return queryset.distinct()
+        return queryset.for_listing(self.request.user)
+
+
+def identification_response(request, image_file, prediction_result):
+    """Response for a ``predict_plant`` result; a matched or newly created plant gets the photo attached."""
+    plant_id = prediction_result.get('id')
+    scientific_name = prediction_result.get('scientific_name')
+    common_name = prediction_result.get('common_name')
+    error_msg = prediction_result.get('error')
+    predicted_name = prediction_result.get('name')
+    confidence = prediction_result.get('confidence')
+
+    if confidence is not None:
+        try:
+            conf_val = float(confidence)
+            if conf_val <= 60:
+                lang = request.query_params.get('lang') or request.headers.get('Accept-Language', 'en')
+                if 'fa' in lang.lower():
+                    err_msg = 'کیفیت عکس شما مناسب نیست. لطفاً عکس بهتر و واضح‌تری گرفته و دوباره تلاش کنید.'
+                else:
+                    err_msg = 'Your photo is not good enough. Please take a clearer, better photo and try again.'
+                return Response({'error': err_msg}, status=status.HTTP_400_BAD_REQUEST)
+        except (ValueError, TypeError):
+            pass
+
+
+    if plant_id is not None:
+        try:
+            plant = Plant.objects.get(id=plant_id)
+            PlantImage.objects.create(
+                plant=plant,
+                image=image_file,
+                is_primary=False,
+                caption="Uploaded by user for identification"
+            )
+            serializer = PlantDetailSerializer(plant, context={'request': request})
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except Plant.DoesNotExist:
+            logger.warning(f"Plant with id {plant_id} not found, will create new.")
+
+    plant_name_to_use = scientific_name or common_name or predicted_name
+
+    if plant_name_to_use:
+        plant = create_or_update_plant_from_llm(plant_name_to_use)
+        if plant:
+            PlantImage.objects.create(
+                plant=plant,
+                image=image_file,
+                is_primary=True,
+                caption="Primary image from user upload"
+            )
+            serializer = PlantDetailSerializer(plant, context={'request': request})
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        else:
+            return Response({'error': 'Plant name detected but could not create/update in database.'},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    if error_msg:
+        return Response({'error': error_msg}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({'error': 'Could not identify the plant.'}, status=status.HTTP_404_NOT_FOUND)
 
 
 class PlantIdentifyView(APIView):
@@ -208,63 +303,30 @@ class PlantIdentifyView(APIView):
 
         image_file = request.data['image']
         prediction_result = predict_plant(image_file)
+        return identification_response(request, image_file, prediction_result)
 
-        plant_id = prediction_result.get('id')
-        scientific_name = prediction_result.get('scientific_name')
-        common_name = prediction_result.get('common_name')
-        error_msg = prediction_result.get('error')
-        predicted_name = prediction_result.get('name')
-        confidence = prediction_result.get('confidence')
-
-        if confidence is not None:
-            try:
-                conf_val = float(confidence)
-                if conf_val <= 60:
-                    lang = request.query_params.get('lang') or request.headers.get('Accept-Language', 'en')
-                    if 'fa' in lang.lower():
-                        err_msg = 'کیفیت عکس شما مناسب نیست. لطفاً عکس بهتر و واضح‌تری گرفته و دوباره تلاش کنید.'
-                    else:
-                        err_msg = 'Your photo is not good enough. Please take a clearer, better photo and try again.'
-                    return Response({'error': err_msg}, status=status.HTTP_400_BAD_REQUEST)
-            except (ValueError, TypeError):
-                pass
-
-
-        if plant_id is not None:
-            try:
-                plant = Plant.objects.get(id=plant_id)
-                PlantImage.objects.create(
-                    plant=plant,
-                    image=image_file,
-                    is_primary=False,
-                    caption="Uploaded by user for identification"
-                )
-                serializer = PlantDetailSerializer(plant, context={'request': request})
-                return Response(serializer.data, status=status.HTTP_200_OK)
-            except Plant.DoesNotExist:
-                logger.warning(f"Plant with id {plant_id} not found, will create new.")
-
-        plant_name_to_use = scientific_name or common_name or predicted_name
-
-        if plant_name_to_use:
-            plant = create_or_update_plant_from_llm(plant_name_to_use)
-            if plant:
-                PlantImage.objects.create(
-                    plant=plant,
-                    image=image_file,
-                    is_primary=True,
-                    caption="Primary image from user upload"
-                )
-                serializer = PlantDetailSerializer(plant, context={'request': request})
-                return Response(serializer.data, status=status.HTTP_200_OK)
-            else:
-                return Response({'error': 'Plant name detected but could not create/update in database.'},
-                                status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        if error_msg:
-            return Response({'error': error_msg}, status=status.HTTP_404_NOT_FOUND)
+class PlantCheckupView(APIView):
+    """
+    Identify and diagnose one photo with a single vision call.  ``plant`` and
+    ``disease`` hold what ``/identify/`` and ``/diseases/diagnose/`` would return.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request, format=None):
+        if 'image' not in request.data:
+            return Response({'error': 'Image file not provided.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({'error': 'Could not identify the plant.'}, status=status.HTTP_404_NOT_FOUND)
+        image_file = request.data['image']
+        plant_result, disease_result = predict_checkup(image_file)
+        plant_response = identification_response(request, image_file, plant_result)
+        disease_response = diagnosis_response(request, disease_result)
+        statuses = (plant_response.status_code, disease_response.status_code)
+        return Response({
+            'plant': plant_response.data,
+            'disease': disease_response.data,
+        }, status=status.HTTP_200_OK if status.HTTP_200_OK in statuses else plant_response.status_code)
 
 
 class PlantSearchView(APIView):
@@ -314,7 +376,13 @@ class PlantSearchView(APIView):
 
 
 class PlantRecommenderView(APIView):
+    """
+    Recommend plants for a questionnaire.
 
+    Candidates are ranked locally by plants.recommender; the LLM is only used
+    to phrase the reason when ``explain`` is true, or as a fallback when the
+    catalog has no eligible plant.
+    """
     permission_classes = [AllowAny]  # یا [IsAuthenticated] در صورت نیاز
     parser_classes = [JSONParser]
 
@@ -322,10 +390,77 @@ class PlantRecommenderView(APIView):
         language = request.data.get('language', 'en')
         answers = request.data.get('answers', {})
         additional_notes = request.data.get('additional_notes', '')
+        explain = str(request.data.get('explain', 'false')).lower() == 'true'
 
         if not answers:
             return Response({'error': 'Answers are required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            validate_answers(answers)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            top_n = int(request.data.get('top_n', DEFAULT_TOP_N))
+        except (TypeError, ValueError):
+            top_n = DEFAULT_TOP_N
+
+        ranking = recommend_plants(answers, top_n)
+        plants = Plant.objects.prefetch_related('images').in_bulk([entry['plant_id'] for entry in ranking])
+        candidates = []
+        for entry in ranking:
+            plant = plants.get(entry['plant_id'])
+            if plant is None:
+                continue
+            candidates.append((plant, entry))
+
+        if not candidates:
+            return self.recommend_with_llm(request, answers, language, additional_notes)
+
+        top_plant, top_entry = candidates[0]
+        top_reason = None
+        if explain:
+            top_reason = self.explain_with_llm(top_plant, answers, language, additional_notes)
+
+        results = []
+        for plant, entry in candidates:
+            results.append({
+                'plant_id': plant.id,
+                'plant_name': plant.farsi_name if language == 'fa' else (plant.english_name or plant.farsi_name),
+                'scientific_name': plant.scientific_name,
+                'primary_image': self.primary_image_url(plant, request),
+                'reason': build_reason(plant, entry['matched'], language),
+                'score': entry['score'],
+            })
+        if top_reason:
+            results[0]['reason'] = top_reason
+
+        response_data = dict(results[0])
+        response_data['description'] = top_plant.description if language == 'fa' else top_plant.description_en
+        response_data['candidates'] = results
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def primary_image_url(plant, request):
+        # images are prefetched and ordered primary-first (PlantImage.Meta.ordering)
+        images = plant.images.all()
+        if not images:
+            return None
+        return request.build_absolute_uri(images[0].image.url)
+
+    @staticmethod
+    def explain_with_llm(plant, answers, language, additional_notes):
+        notes_hash = hashlib.sha256(additional_notes.encode('utf-8')).hexdigest()[:16]
+        cache_key = f'plants:recommend_reason:{get_catalog_version()}:{plant.id}:{language}:{answers_signature(answers)}:{notes_hash}'
+        reason = cache.get(cache_key)
+        if reason is None:
+            reason = get_recommendation_reason_from_llm(plant, answers, language, additional_notes)
+            if reason:
+                cache.set(cache_key, reason, 60 * 60 * 24)
+        else:
+            record_cache_hit('plant_recommend_reason', RECOMMENDATION_MODEL)
+        return reason
+
+    def recommend_with_llm(self, request, answers, language, additional_notes):
         recommendation = get_plant_recommendation_from_llm(answers, language, additional_notes)
         if not recommendation:
             return Response({'error': 'Could not generate recommendation'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -360,5 +495,6 @@ class PlantRecommenderView(APIView):
             'description': plant_data.get('description') if language == 'fa' else plant_data.get('description_en'),
             'primary_image': plant_data.get('primary_image'),
             'reason': reason,
+            'candidates': [],
         }
-        return Response(response_data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(response_data, status=status.HTTP_200_OK)
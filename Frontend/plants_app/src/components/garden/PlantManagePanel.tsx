@@ -94,11 +94,18 @@ export const PlantManagePanel: React.FC<PlantManagePanelProps> = ({
   showHero = true,
 }) => {
   const [activeTab, setActiveTab] = useState<PlantManageTab>(initialTab);
+  // the garden list is compact; growth records and reminders come with the detail
+  const [detail, setDetail] = useState<UserPlant>(userPlant);
 
   useEffect(() => {
     setActiveTab(initialTab);
   }, [userPlant.id, initialTab]);
 
+  useEffect(() => {
+    setDetail(userPlant);
+    gardenService.getUserPlant(userPlant.id).then(setDetail).catch(() => {});
+  }, [userPlant]);
+
   const plant = userPlant.plant_details;
   const displayName =
     userPlant.nickname ||
@@ -297,9 +304,9 @@ export const PlantManagePanel: React.FC<PlantManagePanelProps> = ({
             />
           )}
           {activeTab === 'growth' && (
-            <GrowthTab userPlant={userPlant} isEn={isEn} onRefresh={onRefresh} />
+            <GrowthTab userPlant={detail} isEn={isEn} onRefresh={onRefresh} />
           )}
-          {activeTab === 'reminders' && <RemindersTab userPlant={userPlant} isEn={isEn} />}
+          {activeTab === 'reminders' && <RemindersTab userPlant={detail} isEn={isEn} />}
           {activeTab === 'chat' && (
             <PlantChat plantId={chatPlantId} language={isEn ? 'en' : 'fa'} className="min-h-[420px]" />
           )}
@@ -311,9 +318,9 @@ export const PlantManagePanel: React.FC<PlantManagePanelProps> = ({
 
 const InfoTab = ({ userPlant, isEn }: { userPlant: UserPlant; isEn: boolean }) => {
   const lang = isEn ? 'en' : 'fa';
-  const latestGrowth = userPlant.growth_records?.[0];
+  const latestGrowth = userPlant.latest_growth_record ?? userPlant.growth_records?.[0];
   const health = healthConfig(userPlant.health_status, isEn);
-  const pendingTasks = userPlant.reminders?.filter((r) => !r.is_completed).length ?? 0;
+  const pendingTasks = userPlant.pending_reminder_count ?? 0;
 
   const cardStyle = {
     width: '48%',
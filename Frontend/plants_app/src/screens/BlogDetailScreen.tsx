@@ -69,6 +69,8 @@ const BlogDetailScreen = ({ route, navigation }: any) => {
   // New states
   const [activeTab, setActiveTab] = useState<'article' | 'comments' | 'related'>('article');
   const [comments, setComments] = useState<any[]>([]);
+  const [commentsNext, setCommentsNext] = useState<string | null>(null);
+  const [loadingMoreComments, setLoadingMoreComments] = useState(false);
   const [relatedPosts, setRelatedPosts] = useState<any[]>([]);
   const [likes, setLikes] = useState(0);
   const [dislikes, setDislikes] = useState(0);
@@ -78,13 +80,28 @@ const BlogDetailScreen = ({ route, navigation }: any) => {
 
   const fetchComments = useCallback(async () => {
     try {
-      const data = await blogService.getComments(slug);
-      setComments(data);
+      const page = await blogService.getComments(slug);
+      setComments(page.results);
+      setCommentsNext(page.next);
     } catch (err) {
       console.error('Failed to fetch comments:', err);
     }
   }, [slug]);
 
+  const loadMoreComments = async () => {
+    if (!commentsNext || loadingMoreComments) return;
+    setLoadingMoreComments(true);
+    try {
+      const page = await blogService.getComments(slug, commentsNext);
+      setComments(prev => [...prev, ...page.results]);
+      setCommentsNext(page.next);
+    } catch (err) {
+      console.error('Failed to load more comments:', err);
+    } finally {
+      setLoadingMoreComments(false);
+    }
+  };
+
   const fetchRelated = useCallback(async (tags: string[]) => {
     try {
       const response = await blogService.getPosts({ tags: tags.join(','), limit: 6 });
@@ -611,7 +628,7 @@ const BlogDetailScreen = ({ route, navigation }: any) => {
                 {/* Comments List */}
                 <View className="gap-4">
                   <Text className="text-lg font-black text-slate-900 dark:text-white mb-2 text-start">
-                    {isEn ? `Comments (${comments.length})` : `نظرات (${comments.length})`}
+                    {isEn ? `Comments (${post.comments_count ?? comments.length})` : `نظرات (${post.comments_count ?? comments.length})`}
                   </Text>
                   {comments.length === 0 ? (
                     <View className="items-center py-10">
@@ -659,6 +676,21 @@ const BlogDetailScreen = ({ route, navigation }: any) => {
                       </View>
                     ))
                   )}
+                  {commentsNext && (
+                    <Pressable
+                      onPress={loadMoreComments}
+                      disabled={loadingMoreComments}
+                      className="self-center px-5 py-2.5 rounded-full border border-brand-600"
+                    >
+                      {loadingMoreComments ? (
+                        <ActivityIndicator size="small" color="#16a34a" />
+                      ) : (
+                        <Text className="text-xs font-bold text-brand-600">
+                          {isEn ? 'Load more comments' : 'نظرات بیشتر'}
+                        </Text>
+                      )}
+                    </Pressable>
+                  )}
                 </View>
               </View>
             )}
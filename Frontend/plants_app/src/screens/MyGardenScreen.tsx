@@ -68,7 +68,7 @@ const MyGardenScreen = () => {
     const healthy = userPlants.filter((p) => p.health_status === 'healthy').length;
     const attention = userPlants.filter((p) => p.health_status === 'needs_attention').length;
     const pendingTasks = userPlants.reduce(
-      (acc, p) => acc + (p.reminders?.filter((r) => !r.is_completed).length ?? 0),
+      (acc, p) => acc + (p.pending_reminder_count ?? 0),
       0
     );
     return { total: userPlants.length, healthy, attention, pendingTasks };
@@ -176,7 +176,7 @@ const MyGardenScreen = () => {
     const name =
       item.nickname || (isEn ? plant.english_name || plant.farsi_name : plant.farsi_name);
     const pill = healthPill(item.health_status);
-    const pending = item.reminders?.filter((r) => !r.is_completed).length ?? 0;
+    const pending = item.pending_reminder_count ?? 0;
     const nextWater = formatDate(item.next_watering_date, lang);
 
     return (
@@ -457,10 +457,29 @@ export const diseaseService = {
 
 export const gardenService = {
   getUserPlants: async (): Promise<UserPlant[]> => {
-    const response = await authenticatedFetch(`${API_BASE_URL}/my-garden/`);
+    // the garden is cursor-paginated: { next, previous, results }
+    const plants: UserPlant[] = [];
+    let url: string | null = `${API_BASE_URL}/my-garden/`;
+    while (url) {
+      const response = await authenticatedFetch(url);
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.detail || "Failed to fetch garden");
+      }
+      const data = await response.json();
+      plants.push(...data.results);
+      url = data.next;
+    }
+    return plants;
+  },
+
+  getUserPlant: async (id: number): Promise<UserPlant> => {
+    const response = await authenticatedFetch(
+      `${API_BASE_URL}/my-garden/${id}/?expand=growth_records,reminders`,
+    );
     if (!response.ok) {
       const errorData = await response.json().catch(() => ({}));
-      throw new Error(errorData.detail || "Failed to fetch garden");
+      throw new Error(errorData.detail || "Failed to fetch plant");
     }
     return response.json();
   },
@@ -613,13 +632,19 @@ export const blogService = {
     return response.json();
   },
 
-  getComments: async (slug: string): Promise<any[]> => {
+  getComments: async (
+    slug: string,
+    cursorUrl?: string | null,
+  ): Promise<{ results: any[]; next: string | null }> => {
+    // threads are cursor-paginated: pass the previous page's `next` to load more
     const response = await fetch(
-      `${BLOG_API_BASE_URL}/posts/${slug}/comments/`,
+      cursorUrl || `${BLOG_API_BASE_URL}/posts/${slug}/comments/`,
     );
     if (!response.ok) throw new Error("Failed to fetch comments");
     const data = await response.json();
-    return Array.isArray(data) ? data : data.results || [];
+    return Array.isArray(data)
+      ? { results: data, next: null }
+      : { results: data.results || [], next: data.next ?? null };
   },
 
   addComment: async (slug: string, commentData: any): Promise<any> => {
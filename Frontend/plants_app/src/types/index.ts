@@ -184,6 +184,10 @@ export interface UserPlant {
   pot_size?: string;
   growth_records?: GrowthRecord[];    
   reminders?: Reminder[];  
+  // compact garden list fields; the full histories come with ?expand=
+  growth_record_count?: number;
+  pending_reminder_count?: number;
+  latest_growth_record?: GrowthRecord | null;
 }
 
 export interface GrowthRecord {
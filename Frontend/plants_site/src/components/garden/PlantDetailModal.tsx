@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import {m} from 'framer-motion';
 import {
   FiX, FiSave, FiInfo, FiEdit, FiTrendingUp,
@@ -29,6 +29,13 @@ const TAB_ICONS: Record<Tab, React.ReactNode> = {
 const PlantDetailModal: React.FC<Props> = ({ userPlant, language, onClose, onUpdate, onRefresh }) => {
   const [activeTab, setActiveTab] = useState<Tab>('info');
   const isEn = language === 'en';
+  // the garden list is compact; growth records and reminders come with the detail
+  const [detail, setDetail] = useState<UserPlant>(userPlant);
+
+  useEffect(() => {
+    setDetail(userPlant);
+    gardenService.getUserPlant(userPlant.id).then(setDetail).catch(() => {});
+  }, [userPlant]);
 
   const [form, setForm] = useState({
     nickname: userPlant.nickname || '',
@@ -124,8 +131,8 @@ const PlantDetailModal: React.FC<Props> = ({ userPlant, language, onClose, onUpd
               onRefresh={onRefresh}
             />
           )}
-          {activeTab === 'growth' && <GrowthTab userPlant={userPlant} language={language} />}
-          {activeTab === 'reminders' && <RemindersTab userPlant={userPlant} language={language} />}
+          {activeTab === 'growth' && <GrowthTab userPlant={detail} language={language} />}
+          {activeTab === 'reminders' && <RemindersTab userPlant={detail} language={language} />}
           {activeTab === 'chat' && (
             userPlant.plant_details?.id ? (
               <PlantChat plantId={userPlant.plant_details.id} language={language} />
@@ -141,7 +148,7 @@ const PlantDetailModal: React.FC<Props> = ({ userPlant, language, onClose, onUpd
 
 const InfoTab: React.FC<{ userPlant: UserPlant; language: 'en' | 'fa' }> = ({ userPlant, language }) => {
   const isEn = language === 'en';
-  const latestGrowth = userPlant.growth_records?.[0];
+  const latestGrowth = userPlant.latest_growth_record ?? userPlant.growth_records?.[0];
 
   const healthLabel = userPlant.health_status === 'healthy'
     ? isEn ? 'Healthy' : 'سالم'
@@ -40,6 +40,8 @@ const BlogDetailPage: React.FC = () => {
   const [dislikes, setDislikes] = useState(0);
   const [userVote, setUserVote] = useState<'like' | 'dislike' | null>(null);
   const [comments, setComments] = useState<Comment[]>([]);
+  const [commentsNext, setCommentsNext] = useState<string | null>(null);
+  const [loadingMoreComments, setLoadingMoreComments] = useState(false);
   const [newComment, setNewComment] = useState('');
   const [commentCount, setCommentCount] = useState(0);
   const [backendError, setBackendError] = useState<string | null>(null);
@@ -92,8 +94,9 @@ const BlogDetailPage: React.FC = () => {
     const fetchComments = async () => {
       if (!post) return;
       try {
-        const response = await blogService.getComments(post.slug);
-        setComments(Array.isArray(response) ? response : (response.results || []));
+        const page = await blogService.getComments(post.slug);
+        setComments(page.results);
+        setCommentsNext(page.next);
       } catch (error) {
         console.error('Failed to fetch comments:', error);
       }
@@ -218,13 +221,28 @@ const BlogDetailPage: React.FC = () => {
       await blogService.addComment(post.slug, { content: newComment });
       setNewComment('');
       setCommentCount(prev => prev + 1);
-      const commentsResponse = await blogService.getComments(post.slug);
-      setComments(Array.isArray(commentsResponse) ? commentsResponse : (commentsResponse.results || []));
+      const page = await blogService.getComments(post.slug);
+      setComments(page.results);
+      setCommentsNext(page.next);
     } catch (error) {
       console.error('Failed to add comment:', error);
     }
   };
 
+  const handleLoadMoreComments = async () => {
+    if (!commentsNext || loadingMoreComments) return;
+    setLoadingMoreComments(true);
+    try {
+      const page = await blogService.getComments(post.slug, commentsNext);
+      setComments(prev => [...prev, ...page.results]);
+      setCommentsNext(page.next);
+    } catch (error) {
+      console.error('Failed to load more comments:', error);
+    } finally {
+      setLoadingMoreComments(false);
+    }
+  };
+
   return (
     <div className={`${styles.pageWrapper} ${theme === 'dark' ? styles.dark : ''}`} >
       {/* Hero Section */}
@@ -376,6 +394,11 @@ const BlogDetailPage: React.FC = () => {
                   </div>
                 ))
               )}
+              {commentsNext && (
+                <button onClick={handleLoadMoreComments} disabled={loadingMoreComments} className={styles.loadMoreBtn}>
+                  {loadingMoreComments ? (isEn ? 'Loading...' : 'در حال بارگذاری...') : (isEn ? 'Load more comments' : 'نظرات بیشتر')}
+                </button>
+              )}
             </div>
           </div>
         </article>
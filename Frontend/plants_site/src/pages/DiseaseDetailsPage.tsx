@@ -24,6 +24,8 @@ const DiseaseDetailsPage: React.FC = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [comments, setComments] = useState<DiseaseComment[]>([]);
+  const [commentsNext, setCommentsNext] = useState<string | null>(null);
+  const [loadingMoreComments, setLoadingMoreComments] = useState(false);
   const [newComment, setNewComment] = useState('');
   const [replyTo, setReplyTo] = useState<number | null>(null);
   const [replyContent, setReplyContent] = useState('');
@@ -40,8 +42,9 @@ const DiseaseDetailsPage: React.FC = () => {
         setLoading(true);
         const data = await diseaseService.getDiseaseById(parseInt(id));
         setDisease(data);
-        const commentsData = await diseaseCommentService.getComments(parseInt(id));
-        setComments(commentsData);
+        const commentsPage = await diseaseCommentService.getComments(parseInt(id));
+        setComments(commentsPage.results);
+        setCommentsNext(commentsPage.next);
       } catch (err) {
         console.error(err);
         setError(isEn ? 'Failed to load disease.' : 'خطا در بارگذاری بیماری.');
@@ -88,12 +91,27 @@ const DiseaseDetailsPage: React.FC = () => {
       setReplyTo(null);
       setReplyContent('');
       const refreshed = await diseaseCommentService.getComments(disease.id);
-      setComments(refreshed);
+      setComments(refreshed.results);
+      setCommentsNext(refreshed.next);
     } catch (err) {
       console.error('Reply failed', err);
     }
   };
 
+  const handleLoadMoreComments = async () => {
+    if (!commentsNext || !disease || loadingMoreComments) return;
+    setLoadingMoreComments(true);
+    try {
+      const page = await diseaseCommentService.getComments(disease.id, commentsNext);
+      setComments(prev => [...prev, ...page.results]);
+      setCommentsNext(page.next);
+    } catch (err) {
+      console.error('Failed to load more comments', err);
+    } finally {
+      setLoadingMoreComments(false);
+    }
+  };
+
   const renderAffectedPlants = (plantsStr: string | undefined) => {
     if (!plantsStr) return null;
     const plantsArray = plantsStr.split(',').flatMap(p => {
@@ -317,7 +335,7 @@ const DiseaseDetailsPage: React.FC = () => {
           <div className="flex items-center gap-2 mb-4">
             <FiMessageCircle className="w-5 h-5 text-green-600" />
             <h3 className="text-xl font-semibold text-slate-800 dark:text-slate-200">
-              {isEn ? `Comments (${comments.length})` : `نظرات (${comments.length})`}
+              {isEn ? `Comments (${disease.comment_count || comments.length})` : `نظرات (${disease.comment_count || comments.length})`}
             </h3>
           </div>
 
@@ -372,6 +390,15 @@ const DiseaseDetailsPage: React.FC = () => {
                 ))
               )}
             </AnimatePresence>
+            {commentsNext && (
+              <button
+                onClick={handleLoadMoreComments}
+                disabled={loadingMoreComments}
+                className="mx-auto block px-5 py-2 rounded-xl border border-green-600 text-green-600 font-medium hover:bg-green-50 transition disabled:opacity-60"
+              >
+                {loadingMoreComments ? (isEn ? 'Loading...' : 'در حال بارگذاری...') : (isEn ? 'Load more comments' : 'نظرات بیشتر')}
+              </button>
+            )}
           </div>
         </div>
       </div>
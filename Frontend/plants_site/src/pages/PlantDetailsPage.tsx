@@ -44,6 +44,8 @@ const PlantDetailsPage: React.FC<PlantDetailsPageProps> = ({ plantId, navigateTo
 
   // Comments state
   const [comments, setComments] = useState<PlantComment[]>([]);
+  const [commentsNext, setCommentsNext] = useState<string | null>(null);
+  const [loadingMoreComments, setLoadingMoreComments] = useState(false);
   const [commentCount, setCommentCount] = useState(0);
   const [newComment, setNewComment] = useState('');
   const [replyTo, setReplyTo] = useState<number | null>(null);
@@ -92,8 +94,9 @@ const PlantDetailsPage: React.FC<PlantDetailsPageProps> = ({ plantId, navigateTo
         setRelatedPlants(related.slice(0,4));
 
         // کامنت‌ها
-        const commentsData = await commentService.getComments(data.id);
-        setComments(commentsData);
+        const commentsPage = await commentService.getComments(data.id);
+        setComments(commentsPage.results);
+        setCommentsNext(commentsPage.next);
       } catch {
         setError(isEn ? 'Failed to load plant.' : 'خطا در بارگذاری گیاه.');
       } finally {
@@ -237,13 +240,28 @@ const PlantDetailsPage: React.FC<PlantDetailsPageProps> = ({ plantId, navigateTo
       setReplyTo(null);
       setReplyContent('');
       const refreshed = await commentService.getComments(plant!.id);
-      setComments(refreshed);
+      setComments(refreshed.results);
+      setCommentsNext(refreshed.next);
       setCommentCount(prev => prev + 1);
     } catch (err) {
       console.error('Reply failed', err);
     }
   };
 
+  const handleLoadMoreComments = async () => {
+    if (!commentsNext || loadingMoreComments) return;
+    setLoadingMoreComments(true);
+    try {
+      const page = await commentService.getComments(plant!.id, commentsNext);
+      setComments(prev => [...prev, ...page.results]);
+      setCommentsNext(page.next);
+    } catch (err) {
+      console.error('Failed to load more comments', err);
+    } finally {
+      setLoadingMoreComments(false);
+    }
+  };
+
   if (loading) return <div className={styles.loadingContainer}><LoaderGooeyBlobs size={40} color="#10b981" /></div>;
   if (error || !plant) return (
     <div className={styles.notFound}>
@@ -400,6 +418,11 @@ const PlantDetailsPage: React.FC<PlantDetailsPageProps> = ({ plantId, navigateTo
                   ))
                 )}
               </AnimatePresence>
+              {commentsNext && (
+                <button onClick={handleLoadMoreComments} disabled={loadingMoreComments} className={styles.loadMoreBtn}>
+                  {loadingMoreComments ? (isEn ? 'Loading...' : 'در حال بارگذاری...') : (isEn ? 'Load more comments' : 'نظرات بیشتر')}
+                </button>
+              )}
             </div>
           </div>
         </article>
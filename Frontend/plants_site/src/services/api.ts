@@ -9,6 +9,7 @@ import type {
   GrowthRecord,
   DiseaseComment,
   PaginatedResponse,
+  CursorPage,
 } from "../types";
 import type { PostListItem, PostDetail, BlogComment } from "../types/blog";
 import axios from "axios";
@@ -518,11 +519,31 @@ export const diseaseService = {
 // ==============================
 export const gardenService = {
   getUserPlants: async (): Promise<UserPlant[]> => {
-    const response = await fetch(`${API_BASE_URL}/my-garden/`, {
-      method: "GET",
-      headers: getAuthHeaders(),
-    });
-    if (!response.ok) throw new Error("Failed to fetch user plants");
+    // the garden is cursor-paginated: { next, previous, results }
+    const plants: UserPlant[] = [];
+    let url: string | null = `${API_BASE_URL}/my-garden/`;
+    while (url) {
+      const response = await fetch(url, {
+        method: "GET",
+        headers: getAuthHeaders(),
+      });
+      if (!response.ok) throw new Error("Failed to fetch user plants");
+      const data = await response.json();
+      plants.push(...data.results);
+      url = data.next;
+    }
+    return plants;
+  },
+
+  getUserPlant: async (id: number): Promise<UserPlant> => {
+    const response = await fetch(
+      `${API_BASE_URL}/my-garden/${id}/?expand=growth_records,reminders`,
+      {
+        method: "GET",
+        headers: getAuthHeaders(),
+      },
+    );
+    if (!response.ok) throw new Error("Failed to fetch plant");
     return response.json();
   },
 
@@ -749,9 +770,12 @@ export const blogService = {
 
   getComments: async (
     slug: string,
-  ): Promise<BlogComment[] | PaginatedResponse<BlogComment>> => {
-    const response = await blogApi.get(`/posts/${slug}/comments/`);
-    return response.data;
+    cursorUrl?: string | null,
+  ): Promise<CursorPage<BlogComment>> => {
+    // threads are cursor-paginated: pass the previous page's `next` to load more
+    const response = await blogApi.get(cursorUrl || `/posts/${slug}/comments/`);
+    const data = response.data;
+    return Array.isArray(data) ? { next: null, previous: null, results: data } : data;
   },
 
   addComment: async (
@@ -811,15 +835,20 @@ export const blogService = {
 // Comment Service (for Plants)
 // ==============================
 export const commentService = {
-  getComments: async (plantId: number): Promise<PlantComment[]> => {
+  getComments: async (
+    plantId: number,
+    cursorUrl?: string | null,
+  ): Promise<CursorPage<PlantComment>> => {
+    // threads are cursor-paginated: pass the previous page's `next` to load more
     const response = await fetch(
-      `${API_BASE_URL}/plants/${plantId}/comments/`,
+      cursorUrl || `${API_BASE_URL}/plants/${plantId}/comments/`,
       {
         headers: getAuthHeaders(),
       },
     );
     if (!response.ok) throw new Error("Failed to fetch comments");
-    return response.json();
+    const data = await response.json();
+    return Array.isArray(data) ? { next: null, previous: null, results: data } : data;
   },
 
   addComment: async (
@@ -905,15 +934,20 @@ export const favouriteService = {
 //  Disease Service
 // ==============================
 export const diseaseCommentService = {
-  getComments: async (diseaseId: number): Promise<DiseaseComment[]> => {
+  getComments: async (
+    diseaseId: number,
+    cursorUrl?: string | null,
+  ): Promise<CursorPage<DiseaseComment>> => {
+    // threads are cursor-paginated: pass the previous page's `next` to load more
     const response = await fetch(
-      `${API_BASE_URL}/diseases/${diseaseId}/comments/`,
+      cursorUrl || `${API_BASE_URL}/diseases/${diseaseId}/comments/`,
       {
         headers: getAuthHeaders(),
       },
     );
     if (!response.ok) throw new Error("Failed to fetch comments");
-    return response.json();
+    const data = await response.json();
+    return Array.isArray(data) ? { next: null, previous: null, results: data } : data;
   },
 
   addComment: async (
@@ -126,6 +126,10 @@ export interface UserPlant {
   notes?: string;
    growth_records?: GrowthRecord[];    
   reminders?: Reminder[];  
+  // compact garden list fields; the full histories come with ?expand=
+  growth_record_count?: number;
+  pending_reminder_count?: number;
+  latest_growth_record?: GrowthRecord | null;
 }
 
 export interface PlantFavorite {
@@ -221,4 +225,11 @@ export interface PaginatedResponse<T> {
   next: string | null;
   previous: string | null;
   results: T[];
-}
\ No newline at end of file
+}
+
+// Cursor-paginated lists (comment threads): follow `next` for the following page
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}